@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Server Startup Benchmark
+
+Measures cold-start import time of an AroMCP server module using
+``python -X importtime`` and checks it against a time budget.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# Modules that should only be imported on first tool invocation
+DEFERRED_MODULES = ["tree_sitter", "tree_sitter_typescript", "networkx", "psutil"]
+
+
+def run_importtime(module: str) -> dict[str, tuple[int, int]]:
+    """Import a module in a fresh interpreter and collect -X importtime data.
+
+    Args:
+        module: Dotted module name to import
+
+    Returns:
+        Mapping of module name to (self_us, cumulative_us)
+    """
+    env = dict(os.environ)
+    src_dir = str(Path(__file__).parent.parent / "src")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src_dir, env.get("PYTHONPATH")]))
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to import {module}:\n{result.stderr}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark server cold-start import time")
+    parser.add_argument("--module", default="aromcp.analysis_server.server", help="Server module to import")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh-interpreter runs")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if the median exceeds this budget")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to list")
+    args = parser.parse_args()
+
+    totals_ms = []
+    timings = {}
+    for _ in range(args.runs):
+        timings = run_importtime(args.module)
+        totals_ms.append(timings[args.module][1] / 1000)
+
+    median_ms = statistics.median(totals_ms)
+    print(f"Startup import of {args.module} ({args.runs} runs)")
+    print(f"  median: {median_ms:.1f} ms   min: {min(totals_ms):.1f} ms   max: {max(totals_ms):.1f} ms")
+
+    print(f"\nSlowest modules by cumulative time (last run, top {args.top}):")
+    slowest = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)[: args.top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"  {cumulative_us / 1000:8.1f} ms  (self {self_us / 1000:6.1f} ms)  {name}")
+
+    eager = [name for name in DEFERRED_MODULES if name in timings]
+    if eager:
+        print(f"\n⚠️  Heavy modules imported at startup: {', '.join(eager)}")
+
+    if args.budget_ms is not None:
+        if median_ms > args.budget_ms:
+            print(f"\n❌ Startup budget exceeded: {median_ms:.1f} ms > {args.budget_ms:.1f} ms")
+            return 1
+        print(f"\n✅ Within startup budget: {median_ms:.1f} ms <= {args.budget_ms:.1f} ms")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,25 @@
 """Analysis server tools implementations.
 
 TypeScript analysis tools for Phase 1 implementation.
+
+Tool schemas are declared here from signatures and response models only; the
+implementation modules (tree-sitter grammars, networkx, psutil, analyzers) are
+imported on first tool invocation to keep server cold-start fast.
 """
 
 from ...utils.json_parameter_middleware import json_convert
+from ...utils.lazy_imports import lazy_callable
 from ..models.typescript_models import (
     CallTraceResponse,
     FindReferencesResponse,
     FindUnusedCodeResponse,
     FunctionDetailsResponse,
 )
-from .find_references import find_references_impl
-from .find_unused_code import find_unused_code_impl
-from .get_call_trace import get_call_trace_impl
-from .get_function_details import get_function_details_impl
+
+find_references_impl = lazy_callable(".find_references", "find_references_impl", __package__)
+find_unused_code_impl = lazy_callable(".find_unused_code", "find_unused_code_impl", __package__)
+get_call_trace_impl = lazy_callable(".get_call_trace", "get_call_trace_impl", __package__)
+get_function_details_impl = lazy_callable(".get_function_details", "get_function_details_impl", __package__)
 
 
 def register_analysis_tools(mcp):
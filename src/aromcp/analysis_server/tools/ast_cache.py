@@ -0,0 +1,263 @@
+"""
+Lock-striped LRU cache for parsed TypeScript ASTs.
+
+The cache is split into independently locked stripes so concurrent tool calls
+touching different files rarely contend. Byte accounting is global, and
+eviction always removes the globally least recently used entry by comparing
+the LRU heads of all stripes. When attached to a MemoryBudget, inserts go
+through its admission control and evictions return bytes to the budget.
+"""
+
+import itertools
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+
+from ..models.typescript_models import CacheEntry
+from .memory_manager import MemoryBudget
+
+
+class _CacheSlot:
+    """Cache entry together with its accounted size and last-access tick."""
+
+    __slots__ = ("entry", "size", "tick")
+
+    def __init__(self, entry: CacheEntry, size: int, tick: int):
+        self.entry = entry
+        self.size = size
+        self.tick = tick
+
+
+class _CacheStripe:
+    """One independently locked LRU segment of the cache."""
+
+    __slots__ = ("lock", "slots")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.slots: OrderedDict[str, _CacheSlot] = OrderedDict()
+
+
+class StripedASTCache:
+    """
+    Thread-safe LRU cache of parsed ASTs keyed by file path.
+
+    Features:
+    - Per-stripe locks so lookups for different files proceed in parallel
+    - Global byte budget with exact per-entry accounting
+    - Global LRU eviction across stripes
+    - Optional admission control against a shared MemoryBudget
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        stripes: int = 16,
+        memory_budget: MemoryBudget | None = None,
+        budget_name: str = "typescript_ast_cache",
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Maximum total accounted size of cached entries
+            stripes: Number of independently locked stripes
+            memory_budget: Optional budget shared with other caches; max_bytes is reserved from it
+            budget_name: Reservation name shown in budget reports
+        """
+        self.max_bytes = max_bytes
+        self._stripes = [_CacheStripe() for _ in range(max(1, stripes))]
+        self._ticks = itertools.count()
+        self._size_lock = threading.Lock()
+        self._size_bytes = 0
+        self.eviction_count = 0
+        self.rejected_count = 0
+        self._reservation = (
+            memory_budget.reserve(budget_name, max_bytes, reclaim=self._reclaim_bytes, owner=self)
+            if memory_budget is not None
+            else None
+        )
+
+    def _stripe_for(self, file_path: str) -> _CacheStripe:
+        return self._stripes[hash(file_path) % len(self._stripes)]
+
+    def _adjust_size(self, delta: int) -> None:
+        with self._size_lock:
+            self._size_bytes += delta
+        if delta < 0 and self._reservation is not None:
+            self._reservation.release(-delta)
+
+    @property
+    def size_bytes(self) -> int:
+        """Total accounted size of cached entries."""
+        return self._size_bytes
+
+    def get(self, file_path: str, touch: bool = False) -> CacheEntry | None:
+        """
+        Look up a cache entry.
+
+        Args:
+            file_path: Cache key
+            touch: Mark the entry as most recently used and count the access
+
+        Returns:
+            The cached entry or None
+        """
+        stripe = self._stripe_for(file_path)
+        with stripe.lock:
+            slot = stripe.slots.get(file_path)
+            if slot is None:
+                return None
+            if touch:
+                if self._reservation is not None:
+                    self._reservation.record_hit()
+                slot.entry.access_count += 1
+                slot.tick = next(self._ticks)
+                stripe.slots.move_to_end(file_path)
+            return slot.entry
+
+    def put(self, file_path: str, entry: CacheEntry, size: int) -> bool:
+        """
+        Insert or replace an entry, evicting least recently used entries to fit.
+
+        Args:
+            file_path: Cache key
+            entry: Entry to store
+            size: Accounted size of the entry in bytes
+
+        Returns:
+            False if the memory budget rejected the entry, True otherwise
+        """
+        stripe = self._stripe_for(file_path)
+        with stripe.lock:
+            # Detach the old entry so admission cannot evict it; its bytes stay charged
+            previous = stripe.slots.pop(file_path, None)
+        previous_size = previous.size if previous is not None else 0
+
+        if self._reservation is not None and size > previous_size:
+            # Only the growth over the old entry needs admitting
+            if not self._reservation.try_admit(size - previous_size):
+                self.rejected_count += 1
+                if previous is not None:
+                    self._restore(stripe, file_path, previous)
+                return False
+
+        with stripe.lock:
+            displaced = stripe.slots.pop(file_path, None)
+            stripe.slots[file_path] = _CacheSlot(entry, size, next(self._ticks))
+        self._adjust_size(size - previous_size)
+        if displaced is not None:
+            self._adjust_size(-displaced.size)
+
+        while self._size_bytes > self.max_bytes:
+            if self._evict_oldest(exclude=file_path) is None:
+                break
+        return True
+
+    def _restore(self, stripe: _CacheStripe, file_path: str, slot: _CacheSlot) -> None:
+        """Put a detached entry back unless another put replaced it meanwhile."""
+        with stripe.lock:
+            if file_path not in stripe.slots:
+                slot.tick = next(self._ticks)
+                stripe.slots[file_path] = slot
+                return
+        self._adjust_size(-slot.size)
+
+    def pop(self, file_path: str) -> CacheEntry | None:
+        """Remove an entry and return it (or None if absent)."""
+        stripe = self._stripe_for(file_path)
+        with stripe.lock:
+            slot = stripe.slots.pop(file_path, None)
+        if slot is None:
+            return None
+        self._adjust_size(-slot.size)
+        return slot.entry
+
+    def evict_oldest(self, count: int) -> int:
+        """Evict up to ``count`` least recently used entries; returns how many were evicted."""
+        evicted = 0
+        while evicted < count and self._evict_oldest() is not None:
+            evicted += 1
+        return evicted
+
+    def retain_newest(self, count: int) -> int:
+        """Evict least recently used entries until at most ``count`` remain."""
+        evicted = 0
+        while len(self) > count and self._evict_oldest() is not None:
+            evicted += 1
+        return evicted
+
+    def remove_where(self, predicate: Callable[[str, CacheEntry], bool]) -> int:
+        """Remove every entry for which ``predicate(file_path, entry)`` is true."""
+        removed = 0
+        for stripe in self._stripes:
+            with stripe.lock:
+                doomed = [key for key, slot in stripe.slots.items() if predicate(key, slot.entry)]
+                freed = sum(stripe.slots.pop(key).size for key in doomed)
+            self._adjust_size(-freed)
+            removed += len(doomed)
+        return removed
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        for stripe in self._stripes:
+            with stripe.lock:
+                freed = sum(slot.size for slot in stripe.slots.values())
+                stripe.slots.clear()
+            self._adjust_size(-freed)
+
+    def _reclaim_bytes(self, size_bytes: int) -> None:
+        """Budget reclaim callback: evict LRU entries until ``size_bytes`` are freed."""
+        target = self._size_bytes - size_bytes
+        while self._size_bytes > target and self._evict_oldest() is not None:
+            pass
+
+    def _evict_oldest(self, exclude: str | None = None) -> str | None:
+        """Evict the globally least recently used entry."""
+        while True:
+            oldest_stripe = None
+            oldest_key = None
+            oldest_tick = None
+            for stripe in self._stripes:
+                # Peek at the stripe's LRU head; the choice is re-checked under the lock below
+                with stripe.lock:
+                    for key, slot in stripe.slots.items():
+                        if key == exclude:
+                            continue
+                        if oldest_tick is None or slot.tick < oldest_tick:
+                            oldest_stripe, oldest_key, oldest_tick = stripe, key, slot.tick
+                        break
+
+            if oldest_stripe is None:
+                return None
+
+            with oldest_stripe.lock:
+                slot = oldest_stripe.slots.get(oldest_key)
+                if slot is None or slot.tick != oldest_tick:
+                    continue  # Raced with another thread; pick again
+                del oldest_stripe.slots[oldest_key]
+
+            self._adjust_size(-slot.size)
+            self.eviction_count += 1
+            return oldest_key
+
+    def __len__(self) -> int:
+        return sum(len(stripe.slots) for stripe in self._stripes)
+
+    def __contains__(self, file_path: str) -> bool:
+        return file_path in self._stripe_for(file_path).slots
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([key for key, _ in self.items()])
+
+    def items(self) -> list[tuple[str, CacheEntry]]:
+        """Snapshot of (file_path, entry) pairs, least recently used first."""
+        snapshot = []
+        for stripe in self._stripes:
+            with stripe.lock:
+                snapshot.extend((slot.tick, key, slot.entry) for key, slot in stripe.slots.items())
+        return [(key, entry) for _, key, entry in sorted(snapshot, key=lambda item: item[0])]
+
+    def values(self) -> list[CacheEntry]:
+        """Snapshot of cached entries, least recently used first."""
+        return [entry for _, entry in self.items()]
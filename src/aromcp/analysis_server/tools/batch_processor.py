@@ -10,6 +10,7 @@ Provides efficient batch processing for large numbers of functions with:
 
 import gc
 import os
+import pickle
 import re
 import time
 from dataclasses import dataclass
@@ -25,6 +26,7 @@ from ..models.typescript_models import (
     FunctionDetail,
     MemoryUsageStats,
 )
+from .memory_manager import MemoryBudget
 
 
 @dataclass
@@ -48,12 +50,13 @@ class BatchProcessor:
     - Performance statistics and metrics
     """
 
-    def __init__(self, config_or_analyzer):
+    def __init__(self, config_or_analyzer, memory_budget: MemoryBudget | None = None):
         """
         Initialize batch processor.
 
         Args:
             config_or_analyzer: Either BatchConfig or FunctionAnalyzer instance
+            memory_budget: Optional budget shared with other caches; the shared type cache is admitted through it
         """
         if isinstance(config_or_analyzer, BatchConfig):
             # Test mode - create minimal processor
@@ -69,6 +72,14 @@ class BatchProcessor:
             self.config = BatchConfig()
 
         self.shared_type_cache = {}
+        self._shared_type_bytes = 0
+        self._type_reservation = (
+            memory_budget.reserve(
+                "batch_processor.shared_types", 4 * 1024 * 1024, reclaim=self._reclaim_shared_types, owner=self
+            )
+            if memory_budget is not None
+            else None
+        )
 
         # Performance tracking
         self.process = psutil.Process(os.getpid())
@@ -251,7 +262,7 @@ class BatchProcessor:
         """
         try:
             # Clear existing shared context
-            self.shared_type_cache.clear()
+            self._clear_shared_types()
 
             # Parse common types from all files
             common_types = set()
@@ -275,14 +286,38 @@ class BatchProcessor:
             for type_name in list(common_types)[:50]:  # Limit to 50 most common types
                 try:
                     type_def = self.type_resolver.resolve_type(type_name, file_paths[0] if file_paths else "", "basic")
-                    if type_def.kind != "error":
+                    if type_def.kind != "error" and self._admit_shared_type(type_def):
                         self.shared_type_cache[type_name] = type_def
                 except Exception:
                     continue
 
         except Exception:
             # If context building fails, continue with empty cache
-            self.shared_type_cache.clear()
+            self._clear_shared_types()
+
+    def _admit_shared_type(self, type_def: Any) -> bool:
+        """Charge a shared type definition to the memory budget; False if rejected."""
+        if self._type_reservation is None:
+            return True
+        try:
+            size_bytes = len(pickle.dumps(type_def))
+        except Exception:
+            size_bytes = 4096
+        if not self._type_reservation.try_admit(size_bytes):
+            return False
+        self._shared_type_bytes += size_bytes
+        return True
+
+    def _clear_shared_types(self) -> None:
+        """Clear the shared type context and return its bytes to the memory budget."""
+        self.shared_type_cache.clear()
+        if self._type_reservation is not None and self._shared_type_bytes:
+            self._type_reservation.release(self._shared_type_bytes)
+        self._shared_type_bytes = 0
+
+    def _reclaim_shared_types(self, size_bytes: int) -> None:
+        """Budget reclaim callback: the shared context is rebuilt per batch, so drop it whole."""
+        self._clear_shared_types()
 
     def _extract_types_from_file(self, file_path: str, tree: Any) -> set[str]:
         """
@@ -22,7 +22,7 @@ from threading import Lock, RLock
 from typing import Any, Generic, TypeVar
 
 from ..models.typescript_models import CacheStats
-from .memory_manager import CompressionStrategy, MemoryManager
+from .memory_manager import BudgetReservation, CompressionStrategy, MemoryBudget, MemoryManager
 
 T = TypeVar("T")
 
@@ -259,6 +259,17 @@ class LRUCache(Generic[T]):
         self.stats = CacheLevelStats(level=CacheLevel.MEMORY)
         self._lock = RLock()
         self._eviction_callback = None  # Optional callback for evicted entries
+        self._reservation: BudgetReservation | None = None  # Optional share of a MemoryBudget
+
+    def attach_budget(self, budget: MemoryBudget, name: str):
+        """Reserve this cache's size from a shared budget and admit inserts through it."""
+        self._reservation = budget.reserve(
+            name, int(self.max_size_mb * 1024 * 1024), reclaim=self._reclaim_bytes, owner=self
+        )
+
+    def _release(self, size_bytes: int):
+        if self._reservation is not None:
+            self._reservation.release(size_bytes)
 
     def get(self, key: str) -> T | None:
         """Get item from cache."""
@@ -271,6 +282,8 @@ class LRUCache(Generic[T]):
                 self.entries.move_to_end(key)
 
                 self.stats.hits += 1
+                if self._reservation is not None:
+                    self._reservation.record_hit()
                 return entry.value
 
             self.stats.misses += 1
@@ -288,6 +301,7 @@ class LRUCache(Generic[T]):
                 old_entry = self.entries[key]
                 self.current_size_mb -= old_entry.size_bytes / (1024 * 1024)
                 del self.entries[key]
+                self._release(old_entry.size_bytes)
 
             # Check if we need to evict BEFORE adding the new entry
             # This ensures we make room for the new entry
@@ -310,8 +324,10 @@ class LRUCache(Generic[T]):
                 dependencies=dependencies or set(),
             )
 
-            # Add new entry only if it fits or if cache is empty
+            # Add new entry only if it fits or if cache is empty, and the shared budget admits it
             if self.current_size_mb + entry_size_mb <= self.max_size_mb or len(self.entries) == 0:
+                if self._reservation is not None and not self._reservation.try_admit(actual_size_bytes):
+                    return
                 self.entries[key] = entry
                 self.current_size_mb += entry_size_mb
                 # Update stats to reflect correct entry count
@@ -329,10 +345,12 @@ class LRUCache(Generic[T]):
                 entry = self.entries[key]
                 self.current_size_mb -= entry.size_bytes / (1024 * 1024)
                 del self.entries[key]
+                self._release(entry.size_bytes)
 
     def clear(self):
         """Clear all cache entries."""
         with self._lock:
+            self._release(sum(entry.size_bytes for entry in self.entries.values()))
             self.entries.clear()
             self.current_size_mb = 0.0
 
@@ -356,6 +374,7 @@ class LRUCache(Generic[T]):
             key, entry = self.entries.popitem(last=False)  # Remove first (oldest)
             self.current_size_mb -= entry.size_bytes / (1024 * 1024)
             self.stats.eviction_count += 1
+            self._release(entry.size_bytes)
 
             # Update entry count in stats
             self.stats.entry_count = len(self.entries)
@@ -364,6 +383,19 @@ class LRUCache(Generic[T]):
             return key, entry
         return None, None
 
+    def _reclaim_bytes(self, size_bytes: int):
+        """Budget reclaim callback: evict LRU entries (without demotion) until size_bytes are freed."""
+        # Never block here: another cache may be reclaiming from us while holding its own lock
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            freed = 0
+            while freed < size_bytes and self.entries:
+                _, entry = self._evict_lru()
+                freed += entry.size_bytes
+        finally:
+            self._lock.release()
+
     def _estimate_size(self, value: T) -> int:
         """Estimate size of cached value."""
         try:
@@ -579,6 +611,10 @@ class CacheManager:
 
         self.memory_cache = LRUCache[Any](max_size_mb=memory_limit)
         self.symbol_cache = LRUCache[Any](max_size_mb=symbol_limit)
+        if memory_manager:
+            # In-memory levels share the manager's budget with the other analysis caches
+            self.memory_cache.attach_budget(memory_manager.budget, "cache_manager.memory")
+            self.symbol_cache.attach_budget(memory_manager.budget, "cache_manager.symbol")
         self.filesystem_cache = FilesystemCache(max_size_mb=filesystem_limit)
 
         # Set up eviction callbacks for demotion
@@ -1,25 +1,63 @@
 """
 Cycle Detector for TypeScript call graph analysis.
 
-This module provides cycle detection and handling for call graphs,
-with NetworkX integration and manual fallback implementations.
+This module provides cycle detection and handling for call graphs. Cycles are
+found through an incrementally maintained SCC index, so re-running detection
+after a small graph change only touches the affected components, and the
+full cycle list is enumerated lazily with a cap.
 """
 
 from typing import Any
 
+from .scc_index import DEFAULT_MAX_CYCLES, IncrementalSCCIndex
+
 
 class CycleDetector:
     """Detects and handles cycles in function call graphs."""
 
-    def __init__(self, call_graph_builder):
+    def __init__(self, call_graph_builder, max_cycles: int | None = DEFAULT_MAX_CYCLES):
         """Initialize cycle detector with call graph data.
 
         Args:
             call_graph_builder: CallGraphBuilder instance with built graph
+            max_cycles: Maximum number of cycles to enumerate (None for no limit)
         """
         self.call_graph_builder = call_graph_builder
+        self.max_cycles = max_cycles
         self.detected_cycles = []
         self.broken_edges = []
+        self.scc_index = IncrementalSCCIndex()
+
+    def sync_index(self) -> None:
+        """Apply call graph changes to the SCC index (only changed adjacency lists are touched)."""
+        call_graph = self.call_graph_builder.call_graph
+
+        for node in [node for node in self.scc_index.nodes if node not in call_graph]:
+            self.scc_index.remove_node(node)
+
+        for node, targets in call_graph.items():
+            self.scc_index.set_successors(node, targets)
+
+    def update_function_calls(self, func_name: str, called_functions: list[str]) -> bool:
+        """Update the outgoing calls of one function and report whether it now sits on a cycle.
+
+        Args:
+            func_name: Function whose body changed
+            called_functions: Functions it now calls
+
+        Returns:
+            True if the function participates in a cycle after the update
+        """
+        self.call_graph_builder.call_graph[func_name] = list(called_functions)
+        self.scc_index.set_successors(func_name, called_functions)
+
+        call_graph_nx = self.call_graph_builder.call_graph_nx
+        if self.call_graph_builder.use_networkx and call_graph_nx is not None:
+            if func_name in call_graph_nx:
+                call_graph_nx.remove_edges_from(list(call_graph_nx.out_edges(func_name)))
+            call_graph_nx.add_edges_from((func_name, called) for called in called_functions)
+
+        return self.scc_index.is_in_cycle(func_name)
 
     def detect_and_break_cycles(self) -> list[list[str]]:
         """Detect cycles and break them with placeholder references.
@@ -28,24 +66,26 @@ class CycleDetector:
             List of detected cycles (each cycle is a list of function names)
         """
         try:
+            self.sync_index()
+            if not self.scc_index.has_cycles():
+                self.detected_cycles = []
+                return []
+
             if self.call_graph_builder.use_networkx and self.call_graph_builder.call_graph_nx:
                 return self._detect_cycles_networkx()
             else:
-                return self._detect_cycles_manual()
+                return self._detect_cycles_indexed()
 
         except Exception:
-            # Fallback to manual detection if NetworkX fails
+            # Fallback to manual detection if the index or NetworkX fails
             return self._detect_cycles_manual()
 
     def _detect_cycles_networkx(self) -> list[list[str]]:
-        """Detect cycles using NetworkX."""
+        """Break indexed cycles in the NetworkX graph."""
         cycles = []
 
         try:
-            # Find all strongly connected components (cycles)
-            nx_cycles = list(self.call_graph_builder.nx.simple_cycles(self.call_graph_builder.call_graph_nx))
-
-            for cycle in nx_cycles:
+            for cycle in self.scc_index.find_cycles(self.max_cycles):
                 if len(cycle) > 1:  # Only consider actual cycles, not self-loops
                     cycles.append(cycle)
                     self._break_cycle_networkx(cycle)
@@ -80,6 +120,7 @@ class CycleDetector:
             # Add placeholder node with metadata
             self.call_graph_builder.call_graph_nx.add_node(placeholder_name, **cycle_info)
             self.call_graph_builder.call_graph_nx.add_edge(cycle[-1], placeholder_name)
+            self._redirect_source_edge(cycle[-1], cycle[0], placeholder_name)
 
     def _break_self_loop_networkx(self, func_name: str):
         """Break a self-loop (direct recursion)."""
@@ -93,17 +134,43 @@ class CycleDetector:
 
             self.call_graph_builder.call_graph_nx.add_node(placeholder_name, **recursion_info)
             self.call_graph_builder.call_graph_nx.add_edge(func_name, placeholder_name)
+            self._redirect_source_edge(func_name, func_name, placeholder_name)
+
+    def _redirect_source_edge(self, source: str, target: str, placeholder_name: str):
+        """Mirror a broken edge in the adjacency list the SCC index is synced from."""
+        call_graph = self.call_graph_builder.call_graph
+        targets = call_graph.get(source)
+        if targets is None or target not in targets:
+            return
+        targets.remove(target)
+        targets.append(placeholder_name)
+        call_graph.setdefault(placeholder_name, [])
+        self.scc_index.set_successors(source, targets)
+
+    def _detect_cycles_indexed(self) -> list[list[str]]:
+        """Break indexed cycles in the manual adjacency list."""
+        # Manual cycles repeat their first node at the end
+        cycles = [cycle + [cycle[0]] for cycle in self.scc_index.find_cycles(self.max_cycles)]
+
+        for cycle in cycles:
+            self._break_cycle_manual(cycle)
+
+        self.detected_cycles = cycles
+        return cycles
 
     def _detect_cycles_manual(self) -> list[list[str]]:
         """Manual cycle detection using DFS."""
         visited = set()
         rec_stack = set()
         cycles = []
+        seen_cycles = set()
         call_graph = self.call_graph_builder.call_graph
 
         for node in call_graph:
             if node not in visited:
-                self._dfs_cycle_detection(node, visited, rec_stack, [], cycles, call_graph)
+                self._dfs_cycle_detection(node, visited, rec_stack, [], cycles, call_graph, seen_cycles)
+            if self.max_cycles is not None and len(cycles) >= self.max_cycles:
+                break
 
         # Break detected cycles
         for cycle in cycles:
@@ -120,6 +187,7 @@ class CycleDetector:
         path: list[str],
         cycles: list[list[str]],
         call_graph: dict[str, list[str]],
+        seen_cycles: set[tuple[str, ...]],
     ):
         """DFS-based cycle detection."""
         visited.add(node)
@@ -129,7 +197,7 @@ class CycleDetector:
         if node in call_graph:
             for neighbor in call_graph[node]:
                 if neighbor not in visited:
-                    self._dfs_cycle_detection(neighbor, visited, rec_stack, path, cycles, call_graph)
+                    self._dfs_cycle_detection(neighbor, visited, rec_stack, path, cycles, call_graph, seen_cycles)
                 elif neighbor in rec_stack:
                     # Found cycle - extract the cycle path
                     try:
@@ -137,7 +205,9 @@ class CycleDetector:
                         cycle = path[cycle_start:] + [neighbor]
 
                         # Only add unique cycles
-                        if not self._is_duplicate_cycle(cycle, cycles):
+                        cycle_key = self._canonical_cycle(cycle)
+                        if cycle_key not in seen_cycles:
+                            seen_cycles.add(cycle_key)
                             cycles.append(cycle)
                     except ValueError:
                         # neighbor not in path (shouldn't happen, but be safe)
@@ -146,16 +216,15 @@ class CycleDetector:
         rec_stack.remove(node)
         path.pop()
 
-    def _is_duplicate_cycle(self, new_cycle: list[str], existing_cycles: list[list[str]]) -> bool:
-        """Check if a cycle is already detected (considering rotations)."""
-        for existing_cycle in existing_cycles:
-            if len(new_cycle) == len(existing_cycle):
-                # Check all rotations of the cycle
-                for i in range(len(existing_cycle)):
-                    rotated = existing_cycle[i:] + existing_cycle[:i]
-                    if new_cycle == rotated:
-                        return True
-        return False
+    @staticmethod
+    def _canonical_cycle(cycle: list[str]) -> tuple[str, ...]:
+        """Get a rotation-independent key for a cycle, so duplicates are found by hashing."""
+        if len(cycle) > 1 and cycle[0] == cycle[-1]:
+            cycle = cycle[:-1]
+        if not cycle:
+            return ()
+        start = min(range(len(cycle)), key=cycle.__getitem__)
+        return tuple(cycle[start:] + cycle[:start])
 
     def _break_cycle_manual(self, cycle: list[str]):
         """Break a cycle in the manual adjacency list."""
@@ -17,28 +17,26 @@ from ..models.typescript_models import (
 )
 from .batch_processor import BatchProcessor
 from .function_analyzer import FunctionAnalyzer
+from .memory_manager import get_memory_budget
+from .parser_pool import get_parser_pool
 from .symbol_resolver import SymbolResolver
 from .type_resolver import TypeResolver
 from .typescript_parser import TypeScriptParser
 
 # Shared instances for performance
-_shared_parser = None
 _shared_symbol_resolver = None
 
 
 def get_shared_parser() -> TypeScriptParser:
-    """Get shared TypeScript parser instance."""
-    global _shared_parser
-    if _shared_parser is None:
-        _shared_parser = TypeScriptParser(cache_size_mb=100, max_file_size_mb=5)
-    return _shared_parser
+    """Get the calling thread's TypeScript parser from the shared parser pool."""
+    return get_parser_pool().get_parser()
 
 
 def get_symbol_resolver() -> SymbolResolver:
     """Get shared symbol resolver instance."""
     global _shared_symbol_resolver
     if _shared_symbol_resolver is None:
-        _shared_symbol_resolver = SymbolResolver(get_shared_parser())
+        _shared_symbol_resolver = SymbolResolver(memory_budget=get_memory_budget())
     return _shared_symbol_resolver
 
 
@@ -187,7 +185,7 @@ def get_function_details_impl(
 
         # Use batch processor for large function lists or when explicitly requested
         if batch_processing or len(function_list) > 10:
-            batch_processor = BatchProcessor(function_analyzer)
+            batch_processor = BatchProcessor(function_analyzer, memory_budget=get_memory_budget())
             results, stats, memory_stats = batch_processor.process_batch(
                 functions=function_list,
                 file_paths=valid_files,
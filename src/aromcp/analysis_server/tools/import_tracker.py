@@ -35,6 +35,7 @@ from ..models.typescript_models import (
     ImportInfo,
     ModuleInfo,
 )
+from .scc_index import DEFAULT_MAX_CYCLES, IncrementalSCCIndex
 from .typescript_parser import ResolutionDepth, TypeScriptParser
 
 
@@ -191,6 +192,9 @@ class ImportTracker:
             self.dependency_graph = None  # Will use simple fallback
         self.module_resolver: ModuleResolver | None = None
 
+        # Incrementally maintained module SCCs for circular dependency checks
+        self.scc_index = IncrementalSCCIndex()
+
         # Caches
         self.import_cache: dict[str, list[ImportInfo]] = {}
         self.export_cache: dict[str, list[ExportInfo]] = {}
@@ -370,6 +374,7 @@ class ImportTracker:
         detect_cycles: bool = False,
         page: int = 1,
         max_tokens: int = 20000,
+        max_cycles: int | None = DEFAULT_MAX_CYCLES,
     ) -> ImportAnalysisResult:
         """
         Build a complete dependency graph for the given files.
@@ -381,6 +386,7 @@ class ImportTracker:
             detect_cycles: Whether to detect circular dependency cycles
             page: Page number for pagination
             max_tokens: Maximum tokens per page
+            max_cycles: Maximum number of circular dependencies to enumerate
 
         Returns:
             ImportAnalysisResult with dependency graph and circular dependencies
@@ -405,6 +411,7 @@ class ImportTracker:
             graph.nodes.append(node)
 
         # Analyze imports and create edges
+        module_targets: dict[str, set[str]] = {node_id: set() for node_id in node_map}
         for file_path in file_paths:
             try:
                 import_result = self.analyze_imports(
@@ -440,6 +447,7 @@ class ImportTracker:
                             line=import_info.line,
                         )
                         graph.edges.append(edge)
+                        module_targets[source_id].add(target_id)
 
                         # Update node import/export lists
                         source_node.imports.extend(import_info.imported_names)
@@ -452,10 +460,13 @@ class ImportTracker:
                 )
                 result.errors.append(error)
 
+        # Apply only the changed adjacency lists to the SCC index
+        self._sync_scc_index(module_targets)
+
         # Detect circular dependencies if requested
         if detect_cycles:
             try:
-                circular_deps = self._detect_circular_dependencies(graph)
+                circular_deps = self._detect_circular_dependencies(graph, max_cycles)
                 result.circular_dependencies = circular_deps
             except Exception as e:
                 error = AnalysisError(code="CYCLE_DETECTION_ERROR", message=f"Failed to detect cycles: {e}")
@@ -1222,55 +1233,61 @@ class ImportTracker:
 
         return exports
 
-    def _detect_circular_dependencies(self, graph: DependencyGraph) -> list[CircularDependency]:
-        """Detect circular dependencies in the dependency graph."""
+    def _detect_circular_dependencies(
+        self, graph: DependencyGraph, max_cycles: int | None = DEFAULT_MAX_CYCLES
+    ) -> list[CircularDependency]:
+        """Enumerate circular dependencies from the SCC index, up to max_cycles."""
         circular_deps = []
+        nodes_by_id = {node.module_id: node for node in graph.nodes}
 
-        if NETWORKX_AVAILABLE and nx:
-            # Create networkx graph for cycle detection
-            nx_graph = nx.DiGraph()
-
-            # Add nodes and edges
-            for node in graph.nodes:
-                nx_graph.add_node(node.module_id)
+        if not self.scc_index.has_cycles(include_self_loops=False):
+            return circular_deps
 
-            for edge in graph.edges:
-                nx_graph.add_edge(edge.source, edge.target)
+        for cycle in self.scc_index.iter_cycles(include_self_loops=False):
+            cycle_nodes = [nodes_by_id[node_id] for node_id in cycle if node_id in nodes_by_id]
 
-            # Find cycles
-            try:
-                cycles = list(nx.simple_cycles(nx_graph))
-
-                for cycle in cycles:
-                    if len(cycle) >= 2:  # Only report meaningful cycles
-                        cycle_nodes = []
-                        for node_id in cycle:
-                            for node in graph.nodes:
-                                if node.module_id == node_id:
-                                    cycle_nodes.append(node)
-                                    break
-
-                        circular_dep = CircularDependency(
-                            cycle_path=cycle_nodes,
-                            cycle_length=len(cycle),
-                            severity="warning" if len(cycle) == 2 else "error",
-                        )
-                        circular_deps.append(circular_dep)
+            circular_dep = CircularDependency(
+                cycle_path=cycle_nodes,
+                cycle_length=len(cycle),
+                severity="warning" if len(cycle) == 2 else "error",
+            )
+            circular_deps.append(circular_dep)
 
-            except Exception:
-                # Fallback to simple detection
-                pass
-        else:
-            # Simple fallback cycle detection without networkx
-            # For testing purposes, create a mock circular dependency
-            if len(graph.nodes) >= 2:
-                # Create a simple cycle between first two nodes for testing
-                cycle_nodes = graph.nodes[:2]
-                circular_dep = CircularDependency(cycle_path=cycle_nodes, cycle_length=2, severity="warning")
-                circular_deps.append(circular_dep)
+            if max_cycles is not None and len(circular_deps) >= max_cycles:
+                break
 
         return circular_deps
 
+    def _sync_scc_index(self, module_targets: dict[str, set[str]]) -> None:
+        """Bring the SCC index in line with the current module graph."""
+        for node_id in [node_id for node_id in self.scc_index.nodes if node_id not in module_targets]:
+            self.scc_index.remove_node(node_id)
+
+        for node_id, targets in module_targets.items():
+            self.scc_index.set_successors(node_id, targets)
+
+    def update_file_dependencies(self, file_path: str, imported_files: list[str]) -> list[str]:
+        """
+        Update the module edges of one edited file and return its circular dependency group.
+
+        Only the strongly connected components touched by the changed edges are
+        recomputed, so this is much cheaper than rebuilding the dependency graph.
+
+        Args:
+            file_path: File whose imports changed
+            imported_files: Project files it now imports
+
+        Returns:
+            Module ids in the same circular dependency group (empty if not on a cycle)
+        """
+        source_id = str(Path(file_path).resolve())
+        targets = {str(Path(target).resolve()) for target in imported_files}
+        self.scc_index.set_successors(source_id, targets)
+
+        if not self.scc_index.is_in_cycle(source_id):
+            return []
+        return sorted(self.scc_index.component_of(source_id))
+
     def _apply_pagination(self, result: ImportAnalysisResult, page: int, max_tokens: int) -> ImportAnalysisResult:
         """Apply pagination to large results."""
         total_items = len(result.imports) + len(result.exports)
@@ -6,8 +6,13 @@ This module provides analysis of class inheritance relationships including:
 - Method resolution through inheritance chains
 - Abstract method tracking
 - Interface implementation analysis
+
+The resolver maintains a persistent hierarchy index (derived -> base and
+base -> derived adjacency, memoized depths and method-override tables) that is
+updated incrementally per file, so repeated queries become index lookups.
 """
 
+import os
 from typing import Any
 
 from ..models.typescript_models import (
@@ -64,13 +69,26 @@ class InheritanceResolver:
         self.method_definitions: dict[str, dict[str, MethodDefinition]] = {}  # class -> {method -> definition}
         self.interface_implementations: dict[str, list[str]] = {}  # class -> [interfaces]
 
-        # Analysis cache
+        # Reverse adjacency and class location index
+        self.derived_classes: dict[str, list[str]] = {}  # parent -> [children]
+        self._class_files: dict[str, str] = {}  # class -> defining file
+        self._file_classes: dict[str, list[str]] = {}  # file -> classes defined in it
+        self._file_signatures: dict[str, tuple[int, int]] = {}  # file -> (mtime_ns, size)
+
+        # Memoized lookups, invalidated per affected subtree
+        self._depth_cache: dict[str, int] = {}  # class -> inheritance depth
+        self._override_tables: dict[str, dict[str, list[MethodDefinition]]] = {}  # class -> {method -> definitions}
+
+        # Analysis cache (max_depth -> chains), valid for the current index state
         self.inheritance_cache: dict[str, list[InheritanceChain]] = {}
 
     def build_class_hierarchy(self, file_paths: list[str], max_depth: int = 10) -> list[InheritanceChain]:
         """
         Build the complete class inheritance hierarchy for given files.
 
+        Only files that are new or whose mtime/size changed since the last call
+        are re-analyzed; files no longer in ``file_paths`` are dropped from the index.
+
         Args:
             file_paths: List of TypeScript files to analyze
             max_depth: Maximum inheritance depth to analyze
@@ -78,23 +96,62 @@ class InheritanceResolver:
         Returns:
             List of InheritanceChain objects representing the hierarchy
         """
-        # Reset state
-        self.class_hierarchy.clear()
-        self.method_definitions.clear()
-        self.interface_implementations.clear()
+        requested = set(file_paths)
+
+        # Drop files that are no longer part of the analyzed set
+        for indexed_file in [f for f in self._file_signatures if f not in requested]:
+            self.remove_file(indexed_file)
 
-        # Parse all files and extract class information
+        # Re-analyze only new or modified files
         for file_path in file_paths:
-            try:
-                self._analyze_file_inheritance(file_path)
-            except Exception:
-                # Continue processing other files on error
-                continue
+            if self._file_signatures.get(file_path) != self._get_file_signature(file_path):
+                self.update_file(file_path)
 
-        # Build inheritance chains
-        chains = self._build_inheritance_chains(max_depth)
+        cache_key = str(max_depth)
+        if cache_key not in self.inheritance_cache:
+            self.inheritance_cache[cache_key] = self._build_inheritance_chains(max_depth)
 
-        return chains
+        return list(self.inheritance_cache[cache_key])
+
+    def update_file(self, file_path: str) -> None:
+        """
+        Incrementally re-index a single file after it changed.
+
+        Args:
+            file_path: Path of the TypeScript file to re-analyze
+        """
+        self.remove_file(file_path)
+        self._file_signatures[file_path] = self._get_file_signature(file_path)
+
+        try:
+            self._analyze_file_inheritance(file_path)
+        except Exception:
+            # Keep the signature so a broken file is not re-parsed until it changes again
+            pass
+
+    def remove_file(self, file_path: str) -> None:
+        """
+        Remove every class contributed by a file from the hierarchy index.
+
+        Args:
+            file_path: Path of the file to drop
+        """
+        self._file_signatures.pop(file_path, None)
+
+        for class_name in self._file_classes.pop(file_path, []):
+            # Invalidate before unlinking so the subtree is still reachable
+            self._invalidate_class(class_name)
+            self._unlink_parent(class_name)
+
+            # Edges from children defined in other files stay: they still name this class
+            self.method_definitions.pop(class_name, None)
+            self.interface_implementations.pop(class_name, None)
+            self._class_files.pop(class_name, None)
+
+    def invalidate_file(self, file_path: str) -> None:
+        """Mark a file as changed so the next build re-analyzes it."""
+        if file_path in self._file_signatures:
+            self._file_signatures[file_path] = (-1, -1)
 
     def resolve_method_reference(self, class_name: str, method_name: str) -> list[MethodDefinition]:
         """
@@ -107,24 +164,124 @@ class InheritanceResolver:
         Returns:
             List of potential method definitions in inheritance order
         """
-        method_definitions = []
+        return list(self._get_override_table(class_name).get(method_name, []))
 
-        # Walk up the inheritance chain
-        current_class = class_name
-        visited = set()
-
-        while current_class and current_class not in visited:
-            visited.add(current_class)
-
-            # Check if current class has the method
-            class_methods = self.method_definitions.get(current_class, {})
-            if method_name in class_methods:
-                method_definitions.append(class_methods[method_name])
+    def find_method_overrides(self, class_name: str, method_name: str) -> list[MethodDefinition]:
+        """
+        Find definitions of a method that override it in derived classes.
 
-            # Move to parent class
-            current_class = self.class_hierarchy.get(current_class)
+        Args:
+            class_name: Name of the class declaring the method
+            method_name: Name of the method
 
-        return method_definitions
+        Returns:
+            List of overriding definitions in derived classes (depth-first order)
+        """
+        overrides = []
+        for derived_class in self._find_derived_classes(class_name, max_depth=len(self.class_hierarchy) + 1):
+            definition = self.method_definitions.get(derived_class, {}).get(method_name)
+            if definition is not None:
+                overrides.append(definition)
+        return overrides
+
+    def get_base_classes(self, class_name: str) -> list[str]:
+        """Get the ancestors of a class, nearest first."""
+        ancestors = []
+        current = self.class_hierarchy.get(class_name)
+        while current and current not in ancestors and current != class_name:
+            ancestors.append(current)
+            current = self.class_hierarchy.get(current)
+        return ancestors
+
+    def _get_file_signature(self, file_path: str) -> tuple[int, int]:
+        """Get the (mtime_ns, size) signature used for change detection."""
+        try:
+            stat = os.stat(file_path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return (0, 0)
+
+    def _register_class(
+        self,
+        file_path: str,
+        class_name: str,
+        methods: dict[str, MethodDefinition],
+        parent: str | None = None,
+        interfaces: list[str] | None = None,
+    ) -> None:
+        """Add a class and its edges to the hierarchy index (last definition wins)."""
+        self._invalidate_class(class_name)
+
+        previous_file = self._class_files.get(class_name)
+        if previous_file is not None and previous_file != file_path:
+            self._file_classes.get(previous_file, []).remove(class_name)
+        self._unlink_parent(class_name)
+
+        if class_name not in self._file_classes.setdefault(file_path, []):
+            self._file_classes[file_path].append(class_name)
+        self._class_files[class_name] = file_path
+        self.method_definitions[class_name] = methods
+
+        if parent:
+            self.class_hierarchy[class_name] = parent
+            children = self.derived_classes.setdefault(parent, [])
+            if class_name not in children:
+                children.append(class_name)
+
+        if interfaces:
+            self.interface_implementations[class_name] = interfaces
+        else:
+            self.interface_implementations.pop(class_name, None)
+
+    def _unlink_parent(self, class_name: str) -> None:
+        """Remove the derived -> base edge of a class and its reverse edge."""
+        parent = self.class_hierarchy.pop(class_name, None)
+        if parent is not None:
+            siblings = self.derived_classes.get(parent, [])
+            if class_name in siblings:
+                siblings.remove(class_name)
+            if not siblings:
+                self.derived_classes.pop(parent, None)
+
+    def _invalidate_class(self, class_name: str) -> None:
+        """Drop memoized data for a class and every class derived from it."""
+        self.inheritance_cache.clear()
+
+        stack = [class_name]
+        seen = set()
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            self._depth_cache.pop(current, None)
+            self._override_tables.pop(current, None)
+            stack.extend(self.derived_classes.get(current, []))
+
+    def _get_override_table(self, class_name: str) -> dict[str, list[MethodDefinition]]:
+        """Get the memoized method -> definitions table for a class, most derived first."""
+        table = self._override_tables.get(class_name)
+        if table is not None:
+            return table
+
+        # Collect the ancestor chain iteratively, stopping at cycles or memoized entries
+        chain = [class_name]
+        current = self.class_hierarchy.get(class_name)
+        while current and current not in chain and current not in self._override_tables:
+            chain.append(current)
+            current = self.class_hierarchy.get(current)
+
+        inherited = self._override_tables.get(current, {}) if current and current not in chain else {}
+
+        # Fill tables from the top of the chain down
+        for chain_class in reversed(chain):
+            table = {method: list(definitions) for method, definitions in inherited.items()}
+            for method_name, definition in self.method_definitions.get(chain_class, {}).items():
+                table[method_name] = [definition] + table.get(method_name, [])
+            self._override_tables[chain_class] = table
+            inherited = table
+
+        return self._override_tables[class_name]
 
     def _analyze_file_inheritance(self, file_path: str) -> None:
         """Analyze inheritance relationships in a single file."""
@@ -147,7 +304,7 @@ class InheritanceResolver:
         # Mock inheritance for common test patterns
         if "user.ts" in file_path:
             # BaseUser (abstract base class)
-            self.method_definitions["BaseUser"] = {
+            base_user_methods = {
                 "getId": MethodDefinition(
                     name="getId", class_name="BaseUser", file_path=file_path, line=10, column=4, return_type="number"
                 ),
@@ -164,10 +321,10 @@ class InheritanceResolver:
                     return_type="string",
                 ),
             }
+            self._register_class(file_path, "BaseUser", base_user_methods)
 
             # AuthenticatedUser extends BaseUser
-            self.class_hierarchy["AuthenticatedUser"] = "BaseUser"
-            self.method_definitions["AuthenticatedUser"] = {
+            authenticated_user_methods = {
                 "getDisplayName": MethodDefinition(
                     name="getDisplayName",
                     class_name="AuthenticatedUser",
@@ -203,10 +360,12 @@ class InheritanceResolver:
                     return_type="boolean",
                 ),
             }
+            self._register_class(
+                file_path, "AuthenticatedUser", authenticated_user_methods, parent="BaseUser", interfaces=["User"]
+            )
 
             # GuestUser extends BaseUser
-            self.class_hierarchy["GuestUser"] = "BaseUser"
-            self.method_definitions["GuestUser"] = {
+            guest_user_methods = {
                 "getDisplayName": MethodDefinition(
                     name="getDisplayName",
                     class_name="GuestUser",
@@ -217,9 +376,7 @@ class InheritanceResolver:
                     return_type="string",
                 )
             }
-
-            # Interface implementations
-            self.interface_implementations["AuthenticatedUser"] = ["User"]
+            self._register_class(file_path, "GuestUser", guest_user_methods, parent="BaseUser")
 
     def _extract_real_inheritance(self, tree: Any, file_path: str) -> None:
         """Extract inheritance relationships from real tree-sitter AST."""
@@ -231,22 +388,18 @@ class InheritanceResolver:
         """Build inheritance chains from the class hierarchy."""
         chains = []
 
-        # Find all base classes (classes that are not derived from others)
-        all_classes = set(self.class_hierarchy.keys()) | set(self.class_hierarchy.values())
-        base_classes = all_classes - set(self.class_hierarchy.keys())
+        # Base classes are parents that do not derive from anything themselves
+        base_classes = [parent for parent in self.derived_classes if parent not in self.class_hierarchy]
 
         # Build chains for each base class
         for base_class in base_classes:
             if base_class in self.method_definitions:  # Only if we have actual class info
                 derived_classes = self._find_derived_classes(base_class, max_depth)
                 if derived_classes:
-                    # Find the file path for this base class
-                    file_path = self._find_class_file(base_class)
-
                     chain = InheritanceChain(
                         base_class=base_class,
                         derived_classes=derived_classes,
-                        file_path=file_path,
+                        file_path=self._find_class_file(base_class),
                         inheritance_depth=self._calculate_inheritance_depth(derived_classes),
                     )
                     chains.append(chain)
@@ -254,31 +407,24 @@ class InheritanceResolver:
         return chains
 
     def _find_derived_classes(self, base_class: str, max_depth: int) -> list[str]:
-        """Find all classes derived from a base class."""
-        derived = []
-
-        def find_children(parent: str, current_depth: int) -> None:
-            if current_depth >= max_depth:
-                return
-
-            for child, parent_class in self.class_hierarchy.items():
-                if parent_class == parent and child not in derived:
-                    derived.append(child)
-                    find_children(child, current_depth + 1)
+        """Find all classes derived from a base class (depth-first, via reverse edges)."""
+        derived: list[str] = []
+        seen = {base_class}
+        stack = [(child, 1) for child in reversed(self.derived_classes.get(base_class, []))]
+
+        while stack:
+            child, depth = stack.pop()
+            if depth > max_depth or child in seen:
+                continue
+            seen.add(child)
+            derived.append(child)
+            stack.extend((grandchild, depth + 1) for grandchild in reversed(self.derived_classes.get(child, [])))
 
-        find_children(base_class, 0)
         return derived
 
     def _find_class_file(self, class_name: str) -> str:
         """Find the file path where a class is defined."""
-        # Look through method definitions to find file
-        if class_name in self.method_definitions:
-            methods = self.method_definitions[class_name]
-            if methods:
-                first_method = next(iter(methods.values()))
-                return first_method.file_path
-
-        return ""
+        return self._class_files.get(class_name, "")
 
     def _calculate_inheritance_depth(self, derived_classes: list[str]) -> int:
         """Calculate the maximum inheritance depth for derived classes."""
@@ -291,12 +437,22 @@ class InheritanceResolver:
         return max_depth
 
     def _get_class_depth(self, class_name: str) -> int:
-        """Get the inheritance depth of a specific class."""
-        depth = 1
+        """Get the memoized inheritance depth of a specific class."""
+        if class_name in self._depth_cache:
+            return self._depth_cache[class_name]
+
+        # Walk up until a memoized ancestor, the root, or a cycle
+        chain = []
         current = class_name
+        while current not in self._depth_cache and current not in chain:
+            chain.append(current)
+            if current not in self.class_hierarchy:
+                break
+            current = self.class_hierarchy[current]
 
-        while current in self.class_hierarchy:
+        depth = self._depth_cache.get(current, 0) if current not in chain else 0
+        for chain_class in reversed(chain):
             depth += 1
-            current = self.class_hierarchy[current]
+            self._depth_cache[chain_class] = depth
 
-        return depth
+        return self._depth_cache[class_name]
@@ -5,10 +5,14 @@ Provides memory monitoring, pressure handling, and garbage collection coordinati
 """
 
 import gc
+import inspect
 import logging
+import os
+import threading
 import time
+import weakref
 from collections.abc import Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any
 
@@ -68,6 +72,31 @@ class MemoryProfile:
     allocation_count: int = 0
 
 
+@dataclass
+class ReservationReport:
+    """Budget usage of a single cache reservation."""
+
+    name: str
+    reserved_mb: float = 0.0
+    used_mb: float = 0.0
+    borrowed_mb: float = 0.0
+    hits: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    reclaimed_mb: float = 0.0
+
+
+@dataclass
+class MemoryBudgetReport:
+    """Snapshot of how the global cache budget is split."""
+
+    total_mb: float = 0.0
+    used_mb: float = 0.0
+    reserved_mb: float = 0.0
+    free_mb: float = 0.0
+    reservations: list[ReservationReport] = field(default_factory=list)
+
+
 class MemoryOptimizer:
     """Memory usage optimizer."""
 
@@ -79,6 +108,291 @@ class MemoryOptimizer:
         return {"status": "optimized"}
 
 
+class BudgetReservation:
+    """
+    A cache's share of a MemoryBudget.
+
+    Bytes up to ``reserved_bytes`` are guaranteed to the owning cache. Above
+    that the cache borrows from the unreserved pool and may be asked to give
+    the borrowed bytes back through its reclaim callback.
+    """
+
+    def __init__(
+        self,
+        budget: "MemoryBudget",
+        name: str,
+        reserved_bytes: int,
+        reclaim: Callable[[int], Any] | None = None,
+    ):
+        self.budget = budget
+        self.name = name
+        self.reserved_bytes = reserved_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.reclaimed_bytes = 0
+        # Hold bound methods weakly so the reservation does not keep its cache alive
+        if reclaim is not None and inspect.ismethod(reclaim):
+            self._reclaim_ref = weakref.WeakMethod(reclaim)
+        else:
+            self._reclaim_ref = (lambda: reclaim) if reclaim is not None else None
+
+    @property
+    def borrowed_bytes(self) -> int:
+        """Bytes in use above the guaranteed reservation."""
+        return max(0, self.used_bytes - self.reserved_bytes)
+
+    @property
+    def benefit_density(self) -> float:
+        """Cache hits per megabyte held; low values are evicted first."""
+        return (self.hits + 1) / (self.used_bytes / (1024 * 1024) + 1)
+
+    def try_admit(self, size_bytes: int) -> bool:
+        """
+        Ask the budget for room to insert ``size_bytes``.
+
+        Returns:
+            True if the bytes were charged to this reservation, False if rejected
+        """
+        return self.budget._admit(self, size_bytes)
+
+    def release(self, size_bytes: int) -> None:
+        """Return bytes freed by an eviction or invalidation."""
+        self.budget._release(self, size_bytes)
+
+    def record_hit(self) -> None:
+        """Record a cache hit; hits raise the reservation's eviction priority."""
+        self.hits += 1
+
+    def close(self) -> None:
+        """Give the reservation and everything it holds back to the budget."""
+        self.budget.release_reservation(self)
+
+    def _reclaim(self, size_bytes: int) -> None:
+        callback = self._reclaim_ref() if self._reclaim_ref is not None else None
+        if callback is None:
+            return
+        before = self.used_bytes
+        try:
+            callback(size_bytes)
+        except Exception as e:
+            logger.error(f"Reclaim callback for {self.name} failed: {e}")
+        self.reclaimed_bytes += max(0, before - self.used_bytes)
+
+
+class MemoryBudget:
+    """
+    Global memory budget shared by analysis caches.
+
+    Features:
+    - Per-cache reservations with guaranteed minimum sizes
+    - Admission control: inserts that do not fit are rejected unless room can
+      be reclaimed from caches holding less valuable (fewer hits per MB) data
+    - Periodic report of how the budget is split
+    """
+
+    def __init__(self, total_mb: float, report_interval_seconds: float = 300.0):
+        """
+        Initialize memory budget.
+
+        Args:
+            total_mb: Total bytes (in MB) all reservations may hold together
+            report_interval_seconds: Minimum interval between logged budget reports
+        """
+        self.total_bytes = int(total_mb * 1024 * 1024)
+        self.report_interval_seconds = report_interval_seconds
+        self._reservations: dict[str, BudgetReservation] = {}
+        self._used_bytes = 0
+        self._lock = threading.Lock()
+        self._last_report_time = time.time()
+
+    @property
+    def used_bytes(self) -> int:
+        """Bytes currently charged across all reservations."""
+        return self._used_bytes
+
+    def reserve(
+        self,
+        name: str,
+        reserved_bytes: int,
+        reclaim: Callable[[int], Any] | None = None,
+        owner: Any = None,
+    ) -> BudgetReservation:
+        """
+        Create a reservation for a cache.
+
+        The guaranteed part is capped at whatever is still unreserved; the cache
+        can always borrow beyond it while the budget has room.
+
+        Args:
+            name: Label used in reports (made unique if already taken)
+            reserved_bytes: Requested guaranteed size
+            reclaim: Callback asked to evict at least the given number of bytes
+            owner: Object whose garbage collection closes the reservation
+
+        Returns:
+            The new BudgetReservation
+        """
+        with self._lock:
+            unique_name = name
+            suffix = 2
+            while unique_name in self._reservations:
+                unique_name = f"{name}#{suffix}"
+                suffix += 1
+
+            already_reserved = sum(r.reserved_bytes for r in self._reservations.values())
+            guaranteed = max(0, min(int(reserved_bytes), self.total_bytes - already_reserved))
+            reservation = BudgetReservation(self, unique_name, guaranteed, reclaim)
+            self._reservations[unique_name] = reservation
+
+        if owner is not None:
+            weakref.finalize(owner, reservation.close)
+        return reservation
+
+    def release_reservation(self, reservation: BudgetReservation) -> None:
+        """Remove a reservation and return its bytes to the budget."""
+        with self._lock:
+            if self._reservations.get(reservation.name) is reservation:
+                del self._reservations[reservation.name]
+                self._used_bytes -= reservation.used_bytes
+                reservation.used_bytes = 0
+
+    def _admit(self, reservation: BudgetReservation, size_bytes: int) -> bool:
+        """Charge ``size_bytes`` to a reservation, reclaiming room if worthwhile."""
+        self.maybe_report()
+        reclaimed_from: set[str] = set()
+
+        while True:
+            with self._lock:
+                shortfall = self._used_bytes + size_bytes - self.total_bytes
+                if shortfall <= 0:
+                    reservation.used_bytes += size_bytes
+                    self._used_bytes += size_bytes
+                    reservation.admitted += 1
+                    return True
+
+                victim = self._select_victim(reservation, size_bytes, reclaimed_from)
+                if victim is None:
+                    reservation.rejected += 1
+                    return False
+                reclaimed_from.add(victim.name)
+                if victim is reservation:
+                    amount = shortfall
+                else:
+                    amount = min(shortfall, victim.borrowed_bytes)
+
+            # Reclaim outside the budget lock; the cache releases bytes as it evicts
+            victim._reclaim(amount)
+
+    def _select_victim(
+        self, reservation: BudgetReservation, size_bytes: int, exclude: set[str]
+    ) -> BudgetReservation | None:
+        """Pick the next reservation to reclaim from, lowest benefit first."""
+        within_reservation = reservation.used_bytes + size_bytes <= reservation.reserved_bytes
+        borrowers = [
+            r
+            for r in self._reservations.values()
+            if r is not reservation and r.name not in exclude and r.borrowed_bytes > 0 and r._reclaim_ref is not None
+        ]
+        if not within_reservation:
+            # Only displace data that earns fewer hits per MB than the requester's
+            borrowers = [r for r in borrowers if r.benefit_density < reservation.benefit_density]
+        if borrowers:
+            return min(borrowers, key=lambda r: r.benefit_density)
+
+        # Fall back to evicting the requester's own older entries
+        if reservation.name not in exclude and reservation._reclaim_ref is not None and reservation.used_bytes > 0:
+            return reservation
+        return None
+
+    def _release(self, reservation: BudgetReservation, size_bytes: int) -> None:
+        with self._lock:
+            freed = min(size_bytes, reservation.used_bytes)
+            reservation.used_bytes -= freed
+            if self._reservations.get(reservation.name) is reservation:
+                self._used_bytes -= freed
+
+    def reclaim_borrowed(self) -> int:
+        """
+        Ask every cache to give back what it borrowed beyond its reservation.
+
+        Returns:
+            Number of bytes freed
+        """
+        with self._lock:
+            borrowers = [(r, r.borrowed_bytes) for r in self._reservations.values() if r.borrowed_bytes > 0]
+            used_before = self._used_bytes
+        for reservation, borrowed in borrowers:
+            reservation._reclaim(borrowed)
+        return max(0, used_before - self._used_bytes)
+
+    def get_report(self) -> MemoryBudgetReport:
+        """Get a snapshot of how the budget is split across caches."""
+        mb = 1024 * 1024
+        with self._lock:
+            reservations = [
+                ReservationReport(
+                    name=r.name,
+                    reserved_mb=r.reserved_bytes / mb,
+                    used_mb=r.used_bytes / mb,
+                    borrowed_mb=r.borrowed_bytes / mb,
+                    hits=r.hits,
+                    admitted=r.admitted,
+                    rejected=r.rejected,
+                    reclaimed_mb=r.reclaimed_bytes / mb,
+                )
+                for r in self._reservations.values()
+            ]
+            reserved_total = sum(r.reserved_bytes for r in self._reservations.values())
+            return MemoryBudgetReport(
+                total_mb=self.total_bytes / mb,
+                used_mb=self._used_bytes / mb,
+                reserved_mb=reserved_total / mb,
+                free_mb=max(0, self.total_bytes - self._used_bytes) / mb,
+                reservations=sorted(reservations, key=lambda r: r.used_mb, reverse=True),
+            )
+
+    def format_report(self) -> str:
+        """Render the budget report as a human-readable table."""
+        report = self.get_report()
+        lines = [
+            f"Memory budget: {report.used_mb:.1f}/{report.total_mb:.1f}MB used, "
+            f"{report.reserved_mb:.1f}MB reserved, {report.free_mb:.1f}MB free"
+        ]
+        for r in report.reservations:
+            lines.append(
+                f"  {r.name}: {r.used_mb:.1f}MB used / {r.reserved_mb:.1f}MB reserved "
+                f"(borrowed {r.borrowed_mb:.1f}MB, hits {r.hits}, admitted {r.admitted}, "
+                f"rejected {r.rejected}, reclaimed {r.reclaimed_mb:.1f}MB)"
+            )
+        return "\n".join(lines)
+
+    def maybe_report(self) -> bool:
+        """Log the budget report if the report interval has elapsed."""
+        now = time.time()
+        if now - self._last_report_time < self.report_interval_seconds:
+            return False
+        self._last_report_time = now
+        logger.info(self.format_report())
+        return True
+
+
+_memory_budget: MemoryBudget | None = None
+_memory_budget_lock = threading.Lock()
+
+
+def get_memory_budget() -> MemoryBudget:
+    """Get the process-wide cache budget (sized by MCP_ANALYSIS_CACHE_BUDGET_MB, default 512MB)."""
+    global _memory_budget
+    if _memory_budget is None:
+        with _memory_budget_lock:
+            if _memory_budget is None:
+                total_mb = float(os.environ.get("MCP_ANALYSIS_CACHE_BUDGET_MB", "512"))
+                _memory_budget = MemoryBudget(total_mb)
+    return _memory_budget
+
+
 class MemoryManager:
     """
     Manages memory usage for the TypeScript analysis server.
@@ -97,6 +411,7 @@ class MemoryManager:
         emergency_threshold_mb: int = 450,
         enable_monitoring: bool = True,
         enable_profiling: bool = False,
+        cache_budget_mb: float | None = None,
     ):
         """
         Initialize memory manager.
@@ -107,6 +422,7 @@ class MemoryManager:
             emergency_threshold_mb: Emergency cleanup threshold
             enable_monitoring: Enable active memory monitoring
             enable_profiling: Enable memory profiling
+            cache_budget_mb: Budget shared by all caches using this manager (default 60% of max_memory_mb)
         """
         self.max_memory_mb = max_memory_mb
         self.gc_threshold_mb = gc_threshold_mb
@@ -114,6 +430,9 @@ class MemoryManager:
         self.enable_monitoring = enable_monitoring and PSUTIL_AVAILABLE
         self.enable_profiling = enable_profiling
 
+        # Shared cache budget with admission control
+        self.budget = MemoryBudget(cache_budget_mb if cache_budget_mb is not None else max_memory_mb * 0.6)
+
         # Callbacks for memory pressure
         self._pressure_callbacks: list[Callable[[], None]] = []
         self._emergency_callbacks: list[Callable[[], None]] = []
@@ -207,6 +526,9 @@ class MemoryManager:
         """Handle high memory pressure."""
         logger.info(f"High memory pressure detected: {self.get_memory_usage_mb():.1f}MB")
 
+        # Shrink caches back to their reservations before anything else
+        self.budget.reclaim_borrowed()
+
         # Run pressure callbacks
         for callback in self._pressure_callbacks:
             try:
@@ -335,6 +657,10 @@ class MemoryManager:
             time_since_gc=time.time() - self._last_gc_time,
         )
 
+    def get_budget_report(self) -> MemoryBudgetReport:
+        """Get how the cache budget is split across registered caches."""
+        return self.budget.get_report()
+
     def get_current_usage_mb(self) -> float:
         """Get current memory usage in MB."""
         return self.get_memory_usage_mb()
@@ -0,0 +1,134 @@
+"""
+Thread-safe pool of TypeScript parsers for concurrent tool calls.
+
+Each worker thread gets its own TypeScriptParser (and therefore its own
+tree-sitter parsers), while all of them share a single lock-striped AST cache.
+A file parsed by one tool call is a cache hit for every other thread.
+"""
+
+import threading
+from typing import Any
+
+from ..models.typescript_models import ParserStats
+from .ast_cache import StripedASTCache
+from .memory_manager import MemoryBudget, get_memory_budget
+from .typescript_parser import TypeScriptParser
+
+
+class ParserPool:
+    """
+    Per-thread TypeScriptParser instances backed by one shared AST cache.
+
+    Features:
+    - Parsers created lazily, one per calling thread
+    - Shared, lock-striped LRU cache with a single size budget
+    - Aggregated parse statistics across all threads
+    """
+
+    def __init__(
+        self,
+        cache_size_mb: int = 100,
+        max_file_size_mb: int = 5,
+        cache_stripes: int = 16,
+        memory_manager: Any = None,
+        memory_budget: MemoryBudget | None = None,
+    ):
+        """
+        Initialize the parser pool.
+
+        Args:
+            cache_size_mb: Maximum size of the shared AST cache in megabytes
+            max_file_size_mb: Maximum individual file size to parse
+            cache_stripes: Number of independently locked cache stripes
+            memory_manager: Optional MemoryManager passed to every parser
+            memory_budget: Optional budget the shared cache reserves from (defaults to memory_manager's)
+        """
+        self.cache_size_mb = cache_size_mb
+        self.max_file_size_mb = max_file_size_mb
+        self.memory_manager = memory_manager
+        if memory_budget is None and memory_manager is not None:
+            memory_budget = memory_manager.budget
+        self.ast_cache = StripedASTCache(
+            cache_size_mb * 1024 * 1024, stripes=cache_stripes, memory_budget=memory_budget
+        )
+
+        self._local = threading.local()
+        self._parsers: list[TypeScriptParser] = []
+        self._lock = threading.Lock()
+
+    def get_parser(self) -> TypeScriptParser:
+        """Return the calling thread's parser, creating it on first use."""
+        parser = getattr(self._local, "parser", None)
+        if parser is None:
+            parser = TypeScriptParser(
+                cache_size_mb=self.cache_size_mb,
+                max_file_size_mb=self.max_file_size_mb,
+                memory_manager=self.memory_manager,
+                ast_cache=self.ast_cache,
+            )
+            self._local.parser = parser
+            with self._lock:
+                self._parsers.append(parser)
+        return parser
+
+    @property
+    def size(self) -> int:
+        """Number of parser instances created so far."""
+        with self._lock:
+            return len(self._parsers)
+
+    def get_stats(self) -> ParserStats:
+        """
+        Aggregate parse statistics across every parser in the pool.
+
+        Returns:
+            ParserStats summed over all threads
+        """
+        with self._lock:
+            parsers = list(self._parsers)
+
+        total = ParserStats()
+        for parser in parsers:
+            stats = parser.get_parser_stats()
+            total.files_parsed += stats.files_parsed
+            total.cache_hits += stats.cache_hits
+            total.cache_misses += stats.cache_misses
+            total.total_parse_time_ms += stats.total_parse_time_ms
+        if total.files_parsed:
+            total.average_parse_time_ms = total.total_parse_time_ms / total.files_parsed
+        return total
+
+    def get_memory_usage_mb(self) -> float:
+        """Current size of the shared AST cache in megabytes."""
+        return self.ast_cache.size_bytes / (1024 * 1024)
+
+    def invalidate(self, file_path: str) -> None:
+        """Remove a file from the shared cache."""
+        self.ast_cache.pop(file_path)
+
+    def clear(self) -> None:
+        """Clear the shared cache and reset every parser's statistics."""
+        with self._lock:
+            parsers = list(self._parsers)
+        for parser in parsers:
+            parser.clear_all_caches()
+        self.ast_cache.clear()
+
+
+_parser_pool: ParserPool | None = None
+_parser_pool_lock = threading.Lock()
+
+
+def get_parser_pool() -> ParserPool:
+    """Get or create the process-wide parser pool."""
+    global _parser_pool
+    if _parser_pool is None:
+        with _parser_pool_lock:
+            if _parser_pool is None:
+                _parser_pool = ParserPool(cache_size_mb=100, max_file_size_mb=5, memory_budget=get_memory_budget())
+    return _parser_pool
+
+
+def get_shared_parser() -> TypeScriptParser:
+    """Get the calling thread's parser from the process-wide pool."""
+    return get_parser_pool().get_parser()
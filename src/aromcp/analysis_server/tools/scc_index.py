@@ -0,0 +1,430 @@
+"""
+Incremental strongly connected component index for dependency and call graphs.
+
+This module maintains the SCCs of a directed graph as edges are added or
+removed, so cycle checks after a small edit only touch the affected region:
+- Edge insertions use a dynamic topological order of the condensation
+  (Pearce-Kelly) and merge components only when a new cycle is closed
+- Edge removals re-run Tarjan's algorithm inside the one component involved
+- Simple cycles are enumerated lazily (Johnson's algorithm) with a cap
+"""
+
+from collections import defaultdict
+from collections.abc import Hashable, Iterable, Iterator
+
+# Default upper bound on the number of cycles enumerated per query
+DEFAULT_MAX_CYCLES = 1000
+
+
+class IncrementalSCCIndex:
+    """
+    Directed graph with incrementally maintained strongly connected components.
+
+    Components are kept in a topological order of the condensation graph. Order
+    keys are tuples of ints: splitting a component with key ``k`` gives its parts
+    keys ``k + (i,)``, which sort between ``k`` and every other live key.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._succ: dict[Hashable, set[Hashable]] = {}
+        self._pred: dict[Hashable, set[Hashable]] = {}
+        self._node_ids: dict[Hashable, int] = {}  # insertion order, used for deterministic output
+        self._next_node_id = 0
+
+        self._component_of: dict[Hashable, int] = {}
+        self._components: dict[int, set[Hashable]] = {}
+        self._order: dict[int, tuple[int, ...]] = {}
+        self._next_component_id = 0
+        self._next_order = 0
+
+        self._self_loops: set[Hashable] = set()
+
+        # Work counters exposed through get_stats()
+        self._stats = {"merges": 0, "splits": 0, "reorders": 0, "nodes_visited": 0}
+
+    # ------------------------------------------------------------------
+    # Graph mutation
+    # ------------------------------------------------------------------
+
+    def add_node(self, node: Hashable) -> None:
+        """Add a node as its own singleton component."""
+        if node in self._succ:
+            return
+
+        self._succ[node] = set()
+        self._pred[node] = set()
+        self._node_ids[node] = self._next_node_id
+        self._next_node_id += 1
+
+        component_id = self._new_component({node})
+        self._order[component_id] = (self._next_order,)
+        self._next_order += 1
+
+    def remove_node(self, node: Hashable) -> None:
+        """Remove a node and all of its incident edges."""
+        if node not in self._succ:
+            return
+
+        for target in list(self._succ[node]):
+            self.remove_edge(node, target)
+        for source in list(self._pred[node]):
+            self.remove_edge(source, node)
+
+        component_id = self._component_of.pop(node)
+        self._components.pop(component_id, None)
+        self._order.pop(component_id, None)
+        del self._succ[node]
+        del self._pred[node]
+        del self._node_ids[node]
+
+    def add_edge(self, source: Hashable, target: Hashable) -> None:
+        """Add an edge, merging components if it closes a cycle."""
+        self.add_node(source)
+        self.add_node(target)
+        if target in self._succ[source]:
+            return
+
+        self._succ[source].add(target)
+        self._pred[target].add(source)
+
+        if source == target:
+            self._self_loops.add(source)
+            return
+
+        source_component = self._component_of[source]
+        target_component = self._component_of[target]
+        if source_component == target_component:
+            return
+
+        # Edge respects the current order: nothing to do
+        if self._order[source_component] < self._order[target_component]:
+            return
+
+        self._restore_order(source_component, target_component)
+
+    def remove_edge(self, source: Hashable, target: Hashable) -> None:
+        """Remove an edge, splitting its component if the edge held a cycle together."""
+        if source not in self._succ or target not in self._succ[source]:
+            return
+
+        self._succ[source].discard(target)
+        self._pred[target].discard(source)
+
+        if source == target:
+            self._self_loops.discard(source)
+            return
+
+        component_id = self._component_of[source]
+        if component_id == self._component_of[target]:
+            self._split_component(component_id)
+
+    def set_successors(self, node: Hashable, targets: Iterable[Hashable]) -> None:
+        """
+        Replace the outgoing edges of a node (e.g. the imports of one edited file).
+
+        Only edges that actually changed are applied.
+        """
+        self.add_node(node)
+        new_targets = set(targets)
+        old_targets = self._succ[node]
+
+        for target in old_targets - new_targets:
+            self.remove_edge(node, target)
+        for target in new_targets - old_targets:
+            self.add_edge(node, target)
+
+    def clear(self) -> None:
+        """Remove every node and edge."""
+        self.__init__()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def __contains__(self, node: Hashable) -> bool:
+        return node in self._succ
+
+    def __len__(self) -> int:
+        return len(self._succ)
+
+    @property
+    def nodes(self) -> list[Hashable]:
+        """All nodes in insertion order."""
+        return list(self._succ)
+
+    def successors(self, node: Hashable) -> set[Hashable]:
+        """Get the direct successors of a node."""
+        return set(self._succ.get(node, ()))
+
+    def component_of(self, node: Hashable) -> set[Hashable]:
+        """Get the strongly connected component that contains a node."""
+        if node not in self._component_of:
+            return set()
+        return set(self._components[self._component_of[node]])
+
+    def is_in_cycle(self, node: Hashable) -> bool:
+        """Check whether a node participates in any cycle."""
+        if node in self._self_loops:
+            return True
+        component_id = self._component_of.get(node)
+        return component_id is not None and len(self._components[component_id]) > 1
+
+    def has_cycles(self, include_self_loops: bool = True) -> bool:
+        """Check whether the graph contains any cycle."""
+        if include_self_loops and self._self_loops:
+            return True
+        return any(len(members) > 1 for members in self._components.values())
+
+    def cyclic_components(self, include_self_loops: bool = True) -> list[list[Hashable]]:
+        """Get every component that contains a cycle, in topological order."""
+        components = []
+        for component_id in sorted(self._components, key=self._order.__getitem__):
+            members = self._components[component_id]
+            if len(members) > 1 or (include_self_loops and members & self._self_loops):
+                components.append(sorted(members, key=self._node_ids.__getitem__))
+        return components
+
+    def iter_cycles(self, include_self_loops: bool = True) -> Iterator[list[Hashable]]:
+        """
+        Lazily enumerate simple cycles, one component at a time.
+
+        Each cycle is listed once, starting at its earliest-inserted node, without
+        repeating the first node at the end.
+        """
+        for members in self.cyclic_components(include_self_loops):
+            yield from self._iter_component_cycles(members, include_self_loops)
+
+    def find_cycles(
+        self, max_cycles: int | None = DEFAULT_MAX_CYCLES, include_self_loops: bool = True
+    ) -> list[list[Hashable]]:
+        """
+        Enumerate simple cycles on demand.
+
+        Args:
+            max_cycles: Maximum number of cycles to return (None for no limit)
+            include_self_loops: Whether single-node self-loops count as cycles
+
+        Returns:
+            List of cycles, each a list of nodes
+        """
+        cycles = []
+        for cycle in self.iter_cycles(include_self_loops):
+            cycles.append(cycle)
+            if max_cycles is not None and len(cycles) >= max_cycles:
+                break
+        return cycles
+
+    def get_stats(self) -> dict[str, int]:
+        """Get size and work statistics for the index."""
+        return {
+            "nodes": len(self._succ),
+            "edges": sum(len(targets) for targets in self._succ.values()),
+            "components": len(self._components),
+            "cyclic_components": len(self.cyclic_components()),
+            **self._stats,
+        }
+
+    # ------------------------------------------------------------------
+    # Internal maintenance
+    # ------------------------------------------------------------------
+
+    def _new_component(self, members: set[Hashable]) -> int:
+        component_id = self._next_component_id
+        self._next_component_id += 1
+        self._components[component_id] = members
+        for member in members:
+            self._component_of[member] = component_id
+        return component_id
+
+    def _component_successors(self, component_id: int) -> Iterator[int]:
+        for member in self._components[component_id]:
+            for target in self._succ[member]:
+                target_component = self._component_of[target]
+                if target_component != component_id:
+                    yield target_component
+
+    def _component_predecessors(self, component_id: int) -> Iterator[int]:
+        for member in self._components[component_id]:
+            for source in self._pred[member]:
+                source_component = self._component_of[source]
+                if source_component != component_id:
+                    yield source_component
+
+    def _restore_order(self, source_component: int, target_component: int) -> None:
+        """Repair the topological order after adding an edge that violates it."""
+        upper = self._order[source_component]
+        lower = self._order[target_component]
+
+        # Components reachable from the target that sit at or before the source
+        forward = self._bounded_search(target_component, self._component_successors, lambda key: key <= upper)
+        # Components that reach the source and sit at or after the target
+        backward = self._bounded_search(source_component, self._component_predecessors, lambda key: key >= lower)
+
+        pool = sorted(self._order[component_id] for component_id in forward | backward)
+        by_order = self._order.__getitem__
+
+        if source_component in forward:
+            # New cycle: everything on a target -> source path collapses into one component
+            cycle_members = forward & backward
+            before = sorted(backward - cycle_members, key=by_order)
+            after = sorted(forward - cycle_members, key=by_order)
+
+            merged_nodes = set()
+            for component_id in cycle_members:
+                merged_nodes |= self._components.pop(component_id)
+                self._order.pop(component_id)
+            merged_component = self._new_component(merged_nodes)
+            self._stats["merges"] += 1
+
+            ordered = before + [merged_component] + after
+            keys = pool[: len(before) + 1] + pool[len(pool) - len(after) :]
+        else:
+            ordered = sorted(backward, key=by_order) + sorted(forward, key=by_order)
+            keys = pool
+            self._stats["reorders"] += 1
+
+        for component_id, key in zip(ordered, keys, strict=True):
+            self._order[component_id] = key
+
+    def _bounded_search(self, start: int, neighbors, in_bounds) -> set[int]:
+        visited = {start}
+        stack = [start]
+        while stack:
+            component_id = stack.pop()
+            self._stats["nodes_visited"] += len(self._components[component_id])
+            for neighbor in neighbors(component_id):
+                if neighbor not in visited and in_bounds(self._order[neighbor]):
+                    visited.add(neighbor)
+                    stack.append(neighbor)
+        return visited
+
+    def _split_component(self, component_id: int) -> None:
+        """Recompute SCCs inside one component after an internal edge was removed."""
+        members = self._components[component_id]
+        self._stats["nodes_visited"] += len(members)
+        parts = self._tarjan(members)
+        if len(parts) == 1:
+            return
+
+        # Tarjan emits sink components first, so reverse for topological order
+        base_key = self._order.pop(component_id)
+        del self._components[component_id]
+        for index, part in enumerate(reversed(parts)):
+            part_id = self._new_component(part)
+            self._order[part_id] = base_key + (index,)
+        self._stats["splits"] += 1
+
+    def _tarjan(self, members: set[Hashable]) -> list[set[Hashable]]:
+        """Iterative Tarjan's algorithm restricted to the given node set."""
+        index_of: dict[Hashable, int] = {}
+        lowlink: dict[Hashable, int] = {}
+        on_stack: set[Hashable] = set()
+        stack: list[Hashable] = []
+        components: list[set[Hashable]] = []
+        counter = 0
+
+        for root in sorted(members, key=self._node_ids.__getitem__):
+            if root in index_of:
+                continue
+
+            work = [(root, iter(self._succ[root]))]
+            index_of[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                node, successors = work[-1]
+                advanced = False
+                for target in successors:
+                    if target not in members:
+                        continue
+                    if target not in index_of:
+                        index_of[target] = lowlink[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, iter(self._succ[target])))
+                        advanced = True
+                        break
+                    if target in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[target])
+
+                if advanced:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+                if lowlink[node] == index_of[node]:
+                    component = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.add(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+        return components
+
+    def _iter_component_cycles(self, members: list[Hashable], include_self_loops: bool) -> Iterator[list[Hashable]]:
+        """Johnson's simple-cycle enumeration inside one component."""
+        if include_self_loops:
+            for node in members:
+                if node in self._self_loops:
+                    yield [node]
+
+        if len(members) < 2:
+            return
+
+        position = {node: i for i, node in enumerate(members)}
+
+        for start_index, start in enumerate(members):
+
+            def allowed_successors(node, start_index=start_index):
+                return [
+                    target for target in self._succ[node] if target != node and position.get(target, -1) >= start_index
+                ]
+
+            path = [start]
+            blocked = {start}
+            closed: set[Hashable] = set()
+            blocked_by: dict[Hashable, set[Hashable]] = defaultdict(set)
+            stack = [(start, allowed_successors(start))]
+
+            while stack:
+                node, successors = stack[-1]
+                if successors:
+                    target = successors.pop()
+                    if target == start:
+                        yield list(path)
+                        closed.update(path)
+                    elif target not in blocked:
+                        path.append(target)
+                        stack.append((target, allowed_successors(target)))
+                        closed.discard(target)
+                        blocked.add(target)
+                        continue
+
+                if not successors:
+                    if node in closed:
+                        self._unblock(node, blocked, blocked_by)
+                    else:
+                        for target in allowed_successors(node):
+                            blocked_by[target].add(node)
+                    stack.pop()
+                    path.pop()
+
+    @staticmethod
+    def _unblock(node: Hashable, blocked: set[Hashable], blocked_by: dict[Hashable, set[Hashable]]) -> None:
+        pending = {node}
+        while pending:
+            current = pending.pop()
+            if current in blocked:
+                blocked.remove(current)
+                pending.update(blocked_by[current])
+                blocked_by[current].clear()
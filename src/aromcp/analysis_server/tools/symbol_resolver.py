@@ -12,6 +12,7 @@ project-wide analysis modes.
 
 import hashlib
 import os
+import pickle
 import time
 
 try:
@@ -35,18 +36,14 @@ from ..models.typescript_models import (
 )
 from .import_tracker import ImportTracker
 from .inheritance_resolver import InheritanceResolver
+from .memory_manager import MemoryBudget
+from .parser_pool import get_parser_pool
 from .typescript_parser import ResolutionDepth, TypeScriptParser
 
-# Shared parser instance
-_shared_parser = None
-
 
 def get_shared_parser() -> TypeScriptParser:
-    """Get or create shared TypeScript parser instance."""
-    global _shared_parser
-    if _shared_parser is None:
-        _shared_parser = TypeScriptParser(cache_size_mb=100)
-    return _shared_parser
+    """Get the calling thread's TypeScript parser from the shared parser pool."""
+    return get_parser_pool().get_parser()
 
 
 class ResolutionPass:
@@ -87,19 +84,22 @@ class SymbolResolver:
     support for inheritance chains, cross-file references, and confidence scoring.
     """
 
-    def __init__(self, cache_enabled: bool = True, max_cache_size_mb: int = 100):
+    def __init__(
+        self, cache_enabled: bool = True, max_cache_size_mb: int = 100, memory_budget: MemoryBudget | None = None
+    ):
         """
         Initialize the symbol resolver.
 
         Args:
             cache_enabled: Whether to enable result caching
             max_cache_size_mb: Maximum cache size in megabytes
+            memory_budget: Optional budget shared with other caches; parse and result caches reserve from it
         """
         self.cache_enabled = cache_enabled
         self.max_cache_size_mb = max_cache_size_mb
 
         # Initialize core components
-        self.parser = TypeScriptParser(cache_size_mb=max_cache_size_mb // 2)
+        self.parser = TypeScriptParser(cache_size_mb=max_cache_size_mb // 2, memory_budget=memory_budget)
 
         # Track invalidations
         self._invalidation_count = 0
@@ -111,8 +111,19 @@ class SymbolResolver:
         self.reference_cache: dict[str, list[ReferenceInfo]] = {}  # symbol_name -> references
 
         # Result-level cache for complete resolution results
-        self.result_cache: dict[str, SymbolResolutionResult] = {}  # cache_key -> result
+        self.result_cache: dict[str, SymbolResolutionResult] = {}  # cache_key -> result, oldest first
         self.cache_stats = {"hits": 0, "misses": 0}
+        self._result_sizes: dict[str, int] = {}  # cache_key -> admitted bytes
+        self._result_reservation = (
+            memory_budget.reserve(
+                "symbol_resolver.results",
+                (max_cache_size_mb // 2) * 1024 * 1024,
+                reclaim=self._reclaim_results,
+                owner=self,
+            )
+            if memory_budget is not None
+            else None
+        )
 
         # Statistics tracking
         self.analysis_stats = AnalysisStats()
@@ -167,6 +178,10 @@ class SymbolResolver:
 
         if cache_key in self.result_cache:
             self.cache_stats["hits"] += 1
+            if self._result_reservation is not None:
+                self._result_reservation.record_hit()
+                # Keep dict order least-recently-used first for reclaiming
+                self.result_cache[cache_key] = self.result_cache.pop(cache_key)
             return self.result_cache[cache_key]
 
         self.cache_stats["misses"] += 1
@@ -180,8 +195,34 @@ class SymbolResolver:
         # Store a copy of the result to avoid mutation issues
         import copy
 
+        if self._result_reservation is not None:
+            self._drop_result(cache_key)
+            try:
+                size_bytes = len(pickle.dumps(result))
+            except Exception:
+                size_bytes = 64 * 1024
+            if not self._result_reservation.try_admit(size_bytes):
+                return
+            self._result_sizes[cache_key] = size_bytes
+
         self.result_cache[cache_key] = copy.deepcopy(result)
 
+    def _drop_result(self, cache_key: str) -> None:
+        """Remove a cached result and return its bytes to the memory budget."""
+        self.result_cache.pop(cache_key, None)
+        size_bytes = self._result_sizes.pop(cache_key, 0)
+        if size_bytes and self._result_reservation is not None:
+            self._result_reservation.release(size_bytes)
+
+    def _reclaim_results(self, size_bytes: int) -> None:
+        """Budget reclaim callback: drop least recently used results until size_bytes are freed."""
+        freed = 0
+        for cache_key in list(self.result_cache):
+            if freed >= size_bytes:
+                break
+            freed += self._result_sizes.get(cache_key, 0)
+            self._drop_result(cache_key)
+
     def resolve_symbols(
         self,
         file_paths: list[str],
@@ -1654,8 +1695,9 @@ class SymbolResolver:
         for key in keys_to_remove:
             del self.reference_cache[key]
 
-        # Invalidate parser cache for this file
+        # Invalidate parser cache and inheritance index entries for this file
         self.parser.invalidate_cache(file_path)
+        self.inheritance_resolver.invalidate_file(file_path)
 
     def get_all_symbols(self) -> list[SymbolInfo]:
         """Get all symbols from all cached files."""
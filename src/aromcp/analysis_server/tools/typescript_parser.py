@@ -8,20 +8,33 @@ It implements a 3-tier resolution depth system and includes LRU caching for perf
 import hashlib
 import os
 import pickle
+import threading
 import time
 import zlib
-from collections import OrderedDict
 from typing import Any
 
-import tree_sitter_typescript as ts_typescript
-from tree_sitter import Language, Parser
-
 from ..models.typescript_models import (
     AnalysisError,
     CacheEntry,
     ParseResult,
     ParserStats,
 )
+from .ast_cache import StripedASTCache
+
+# Grammars are loaded on first parse and shared by every parser instance
+_LANGUAGES: dict[str, Any] = {}
+
+
+def _load_language(name: str) -> Any:
+    """Load a tree-sitter grammar ("typescript" or "tsx") on first use."""
+    language = _LANGUAGES.get(name)
+    if language is None:
+        import tree_sitter_typescript as ts_typescript
+        from tree_sitter import Language
+
+        loader = ts_typescript.language_tsx if name == "tsx" else ts_typescript.language_typescript
+        language = _LANGUAGES[name] = Language(loader())
+    return language
 
 
 class ResolutionDepth:
@@ -77,7 +90,8 @@ class TypeScriptParser:
 
     Features:
     - Separate parsers for TypeScript (.ts) and TSX (.tsx) files
-    - LRU cache with configurable size limits
+    - Thread-safe, lock-striped LRU cache with configurable size limits
+    - Per-thread tree-sitter parsers so concurrent tool calls can parse in parallel
     - 3-tier resolution depth system
     - Performance monitoring and statistics
     - Graceful error handling for malformed files
@@ -90,6 +104,8 @@ class TypeScriptParser:
         memory_manager: Any = None,
         enable_compression: bool = True,
         enable_string_interning: bool = True,
+        ast_cache: StripedASTCache | None = None,
+        memory_budget: Any = None,
     ):
         """
         Initialize TypeScript parser with configuration.
@@ -100,6 +116,8 @@ class TypeScriptParser:
             memory_manager: Optional MemoryManager instance for coordinated memory management
             enable_compression: Enable compressed AST storage for memory optimization
             enable_string_interning: Enable string interning for memory deduplication
+            ast_cache: Optional AST cache shared with other parser instances (see ParserPool)
+            memory_budget: Optional MemoryBudget the AST cache reserves from (defaults to memory_manager's)
         """
         self.cache_size_mb = cache_size_mb
         self.max_file_size_mb = max_file_size_mb
@@ -108,17 +126,20 @@ class TypeScriptParser:
         self.enable_compression = enable_compression
         self.enable_string_interning = enable_string_interning
 
-        # Initialize tree-sitter parsers if available
-        self._ts_parser = None
-        self._tsx_parser = None
-        self._init_parsers()
+        # Tree-sitter parsers are not thread-safe, so each thread gets its own pair,
+        # created on that thread's first parse (see _ts_parser/_tsx_parser)
+        self._thread_parsers = threading.local()
 
         # LRU cache for parsed ASTs
-        self._ast_cache: OrderedDict[str, CacheEntry] = OrderedDict()
-        self._cache_size_bytes = 0
+        if ast_cache is None:
+            if memory_budget is None and memory_manager is not None:
+                memory_budget = memory_manager.budget
+            ast_cache = StripedASTCache(cache_size_mb * 1024 * 1024, memory_budget=memory_budget)
+        self._ast_cache = ast_cache
 
         # Statistics tracking
         self._stats = ParserStats()
+        self._stats_lock = threading.Lock()
 
         # String interning statistics
         self._string_intern_pool = {}
@@ -133,30 +154,63 @@ class TypeScriptParser:
             self.memory_manager.register_pressure_callback(self._handle_memory_pressure)
             self.memory_manager.register_emergency_callback(self._handle_emergency_memory)
 
-    def _init_parsers(self) -> None:
-        """Initialize tree-sitter parsers for TypeScript and TSX."""
+    def _init_parsers(self) -> dict[str, Any]:
+        """Initialize tree-sitter parsers for TypeScript and TSX on the calling thread."""
         # tree-sitter is always available
 
         try:
-            # Create parsers for TypeScript and TSX
-            self._ts_parser = Parser()
-            self._tsx_parser = Parser()
+            from tree_sitter import Parser
 
-            # Get the TypeScript language from tree-sitter-typescript
-            ts_language = Language(ts_typescript.language_typescript())
+            # Create parsers for TypeScript and TSX
+            ts_parser = Parser()
+            tsx_parser = Parser()
 
-            # Get the TSX language from tree-sitter-typescript
-            # TSX is provided in the same package as 'tsx'
-            tsx_language = Language(ts_typescript.language_tsx())
+            # Set the languages on the parsers (TSX is provided in tree-sitter-typescript as 'tsx')
+            ts_parser.language = _load_language("typescript")
+            tsx_parser.language = _load_language("tsx")
 
-            # Set the languages on the parsers
-            self._ts_parser.language = ts_language
-            self._tsx_parser.language = tsx_language
+            parsers = {"typescript": ts_parser, "tsx": tsx_parser}
 
         except Exception:
             # Graceful fallback - parser will work but return basic results
-            self._ts_parser = None
-            self._tsx_parser = None
+            parsers = {"typescript": None, "tsx": None}
+
+        self._thread_parsers.parsers = parsers
+        return parsers
+
+    def _get_thread_parsers(self) -> dict[str, Any]:
+        """Return the calling thread's parsers, creating them on first access."""
+        parsers = getattr(self._thread_parsers, "parsers", None)
+        if parsers is None:
+            parsers = self._init_parsers()
+        return parsers
+
+    @property
+    def _ts_parser(self) -> Any:
+        """TypeScript parser for the calling thread, created on first access."""
+        return self._get_thread_parsers()["typescript"]
+
+    @property
+    def _tsx_parser(self) -> Any:
+        """TSX parser for the calling thread, created on first access."""
+        return self._get_thread_parsers()["tsx"]
+
+    @property
+    def _cache_size_bytes(self) -> int:
+        """Accounted size of the AST cache in bytes."""
+        return self._ast_cache.size_bytes
+
+    def _record_parse(self, parse_time_ms: float, cache_hit: bool | None = None) -> int:
+        """Update parse statistics atomically and return the new files_parsed count."""
+        with self._stats_lock:
+            if cache_hit is True:
+                self._stats.cache_hits += 1
+            self._stats.files_parsed += 1
+            self._stats.total_parse_time_ms += parse_time_ms
+            # Only calculate average occasionally to reduce overhead
+            if self._stats.files_parsed % 5 == 0:
+                self._stats.average_parse_time_ms = self._stats.total_parse_time_ms / self._stats.files_parsed
+            return self._stats.files_parsed
 
     def parse_file(self, file_path: str, resolution_depth: str = ResolutionDepth.SYNTACTIC) -> ParseResult:
         """
@@ -174,18 +228,11 @@ class TypeScriptParser:
         # Single optimized cache check
         cached_tree = self._get_cached_tree_internal(file_path)
         if cached_tree is not None:
-            self._stats.cache_hits += 1
-            self._stats.files_parsed += 1
-            # Update cache LRU order efficiently
-            if file_path in self._ast_cache:
-                self._ast_cache[file_path].access_count += 1
-                self._ast_cache.move_to_end(file_path)
+            # Update cache LRU order and access count
+            self._ast_cache.get(file_path, touch=True)
             # Minimal time calculation for cache hits
             parse_time_ms = 0.001  # Very fast for cache hits
-            self._stats.total_parse_time_ms += parse_time_ms
-            # Only calculate average occasionally to reduce overhead
-            if self._stats.files_parsed % 5 == 0:
-                self._stats.average_parse_time_ms = self._stats.total_parse_time_ms / self._stats.files_parsed
+            self._record_parse(parse_time_ms, cache_hit=True)
             return ParseResult(success=True, tree=cached_tree, parse_time_ms=parse_time_ms)
 
         # Only do file I/O if not cached
@@ -215,7 +262,8 @@ class TypeScriptParser:
             return ParseResult(success=False, errors=[error])
 
         # Cache miss - parse the file
-        self._stats.cache_misses += 1
+        with self._stats_lock:
+            self._stats.cache_misses += 1
 
         try:
             # Optimized file reading - use faster I/O
@@ -236,16 +284,12 @@ class TypeScriptParser:
         # Optimized statistics update - avoid expensive division on every parse
         parse_time_ms = (time.perf_counter() - start_time) * 1000
         result.parse_time_ms = parse_time_ms
-        self._stats.files_parsed += 1
-        self._stats.total_parse_time_ms += parse_time_ms
-        # Only calculate average occasionally to reduce overhead
-        if self._stats.files_parsed % 5 == 0:
-            self._stats.average_parse_time_ms = self._stats.total_parse_time_ms / self._stats.files_parsed
+        files_parsed = self._record_parse(parse_time_ms)
 
         # Cache successful parse - optimized for performance
         if result.success and result.tree is not None:
             # Only check memory pressure occasionally to reduce overhead
-            if self.memory_manager and self._stats.files_parsed % 10 == 0:
+            if self.memory_manager and files_parsed % 10 == 0:
                 self.memory_manager.handle_memory_pressure()
 
             self._cache_result(file_path, result.tree, content, parse_time_ms)
@@ -348,11 +392,10 @@ class TypeScriptParser:
         Internal method to get cached AST without updating access statistics.
         Used for internal cache checks to avoid inflating cache hit counts.
         """
-        if file_path not in self._ast_cache:
+        cache_entry = self._ast_cache.get(file_path)
+        if cache_entry is None:
             return None
 
-        cache_entry = self._ast_cache[file_path]
-
         # Check if file has been modified since caching
         try:
             current_mtime = os.path.getmtime(file_path)
@@ -378,12 +421,7 @@ class TypeScriptParser:
         Args:
             file_path: Path to the file to remove from cache
         """
-        if file_path in self._ast_cache:
-            cache_entry = self._ast_cache[file_path]
-            # Subtract the entry size from total cache size
-            entry_size = self._estimate_cache_entry_size(cache_entry)
-            self._cache_size_bytes -= entry_size
-            del self._ast_cache[file_path]
+        if self._ast_cache.pop(file_path) is not None:
             self._invalidation_count += 1
 
     def _cache_result(self, file_path: str, tree: Any, content: str, parse_time_ms: float) -> None:
@@ -425,17 +463,8 @@ class TypeScriptParser:
         base_size = len(content) * ast_size_multiplier + 4096
         estimated_size = int(base_size * compression_ratio)
 
-        # Evict entries if cache would exceed size limit
-        max_cache_bytes = self.cache_size_mb * 1024 * 1024
-        while self._cache_size_bytes + estimated_size > max_cache_bytes and len(self._ast_cache) > 0:
-            # Remove least recently used entry
-            oldest_file, oldest_entry = self._ast_cache.popitem(last=False)
-            old_size = self._estimate_cache_entry_size(oldest_entry)
-            self._cache_size_bytes -= old_size
-
-        # Add new entry
-        self._ast_cache[file_path] = cache_entry
-        self._cache_size_bytes += estimated_size
+        # Add new entry; the cache evicts least recently used entries to stay within its size limit
+        self._ast_cache.put(file_path, cache_entry, estimated_size)
 
     def get_parser_stats(self) -> ParserStats:
         """
@@ -447,7 +476,8 @@ class TypeScriptParser:
         # Return a copy to avoid reference issues in tests
         from dataclasses import replace
 
-        return replace(self._stats)
+        with self._stats_lock:
+            return replace(self._stats)
 
     def get_memory_usage_mb(self) -> float:
         """
@@ -463,25 +493,13 @@ class TypeScriptParser:
         # Remove only 10% of cache entries (oldest first) to maintain cache effectiveness
         # This is more conservative to preserve cache functionality under WSL2 memory pressure
         entries_to_remove = max(1, len(self._ast_cache) * 1 // 10)
-        removed = 0
-        for _ in range(entries_to_remove):
-            if self._ast_cache and removed < entries_to_remove:
-                file_path, entry = self._ast_cache.popitem(last=False)
-                entry_size = self._estimate_cache_entry_size(entry)
-                self._cache_size_bytes -= entry_size
-                removed += 1
+        self._ast_cache.evict_oldest(entries_to_remove)
 
     def _handle_emergency_memory(self) -> None:
         """Handle emergency memory situation by clearing most of cache."""
         # In emergency situations, clear 95% of cache (keep only 5% most recent)
         entries_to_keep = max(1, len(self._ast_cache) // 20)
-        removed_count = 0
-
-        while len(self._ast_cache) > entries_to_keep:
-            file_path, entry = self._ast_cache.popitem(last=False)
-            entry_size = self._estimate_cache_entry_size(entry)
-            self._cache_size_bytes -= entry_size
-            removed_count += 1
+        self._ast_cache.retain_newest(entries_to_keep)
 
         # Clear string intern pool in emergency
         if self.enable_string_interning:
@@ -672,12 +690,7 @@ class TypeScriptParser:
                 language_name = "typescript"
 
             # Get the appropriate language object
-            if language_name == "tsx" and ts_typescript:
-                language = Language(ts_typescript.language_tsx())
-            elif ts_typescript:
-                language = Language(ts_typescript.language_typescript())
-            else:
-                return []
+            language = _load_language("tsx" if language_name == "tsx" else "typescript")
 
             # Create and execute the query
             # For now, return empty list as query API is complex and varies between versions
@@ -691,12 +704,12 @@ class TypeScriptParser:
     def clear_all_caches(self):
         """Clear all cached parse results."""
         self._ast_cache.clear()
-        self._cache_size_bytes = 0
-        self._stats.cache_hits = 0
-        self._stats.cache_misses = 0
-        self._stats.files_parsed = 0
-        self._stats.total_parse_time_ms = 0
-        self._stats.average_parse_time_ms = 0
+        with self._stats_lock:
+            self._stats.cache_hits = 0
+            self._stats.cache_misses = 0
+            self._stats.files_parsed = 0
+            self._stats.total_parse_time_ms = 0
+            self._stats.average_parse_time_ms = 0
 
     def cleanup_old_entries(self):
         """Clean up old cache entries to manage memory."""
@@ -705,17 +718,10 @@ class TypeScriptParser:
         current_time = time.time()
         max_age_seconds = 3600  # 1 hour
 
-        keys_to_remove = []
-        for file_path, cache_entry in self._ast_cache.items():
-            # Check if entry is older than max age using modification_time
-            if current_time - cache_entry.modification_time > max_age_seconds:
-                keys_to_remove.append(file_path)
-
-        for key in keys_to_remove:
-            del self._ast_cache[key]
-
-        # Recalculate cache size
-        self._cache_size_bytes = sum(len(str(entry.tree)) + 1024 for entry in self._ast_cache.values())
+        # Remove entries older than max age using modification_time
+        self._ast_cache.remove_where(
+            lambda file_path, cache_entry: current_time - cache_entry.modification_time > max_age_seconds
+        )
 
     def get_string_intern_stats(self):
         """Get string interning statistics."""
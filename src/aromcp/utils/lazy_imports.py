@@ -0,0 +1,63 @@
+"""Deferred imports for tool implementations.
+
+MCP hosts spawn one server process per agent session, so every module imported
+at startup is paid for on each cold start. Tool registration only needs the
+tool signatures and response models; the implementation modules (parsers,
+language grammars, graph libraries) can be resolved on first invocation.
+"""
+
+import importlib
+import threading
+from collections.abc import Callable
+from typing import Any
+
+
+class LazyCallable:
+    """Callable proxy that imports its target the first time it is called."""
+
+    def __init__(self, module_name: str, attr_name: str, package: str | None = None):
+        """Initialize the proxy.
+
+        Args:
+            module_name: Absolute or relative module path of the implementation
+            attr_name: Name of the callable inside that module
+            package: Anchor package for relative module paths
+        """
+        self.module_name = module_name
+        self.attr_name = attr_name
+        self.package = package
+        self._target: Callable[..., Any] | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the implementation module has been imported."""
+        return self._target is not None
+
+    def resolve(self) -> Callable[..., Any]:
+        """Import and return the target callable."""
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    module = importlib.import_module(self.module_name, self.package)
+                    self._target = getattr(module, self.attr_name)
+        return self._target
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "deferred"
+        return f"<LazyCallable {self.module_name}.{self.attr_name} ({state})>"
+
+
+def lazy_callable(module_name: str, attr_name: str, package: str | None = None) -> LazyCallable:
+    """Create a callable that defers importing ``module_name`` until first use.
+
+    Example:
+        find_references_impl = lazy_callable(".find_references", "find_references_impl", __package__)
+    """
+    return LazyCallable(module_name, attr_name, package)
+
+
+__all__ = ["LazyCallable", "lazy_callable"]
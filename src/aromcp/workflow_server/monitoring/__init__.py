@@ -11,7 +11,9 @@ from .exporters import (
     MetricsExporter,
     PrometheusExporter,
 )
+from .histogram import LogHistogram, RollingHistogram
 from .metrics import (
+    HistogramKey,
     MetricsCollector,
     PerformanceMetrics,
     ResourceMetrics,
@@ -19,12 +21,16 @@ from .metrics import (
 )
 from .observability import ObservabilityManager
 from .performance_monitor import PerformanceMonitor
+from .tracing import Span, Tracer, get_tracer
 
 __all__ = [
     "MetricsCollector",
     "WorkflowMetrics",
     "PerformanceMetrics",
     "ResourceMetrics",
+    "HistogramKey",
+    "LogHistogram",
+    "RollingHistogram",
     "ExecutionMetricsCollector",
     "StateMetricsCollector",
     "TransformationMetricsCollector",
@@ -34,4 +40,7 @@ __all__ = [
     "JSONExporter",
     "PerformanceMonitor",
     "ObservabilityManager",
+    "Span",
+    "Tracer",
+    "get_tracer",
 ]
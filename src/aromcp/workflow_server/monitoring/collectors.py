@@ -88,23 +88,27 @@ class ExecutionMetricsCollector:
 
     def _calculate_step_timing_stats(self, workflow_id: str):
         """Calculate timing statistics for completed workflow."""
-        # Get all performance metrics for this workflow
-        all_metrics = self.metrics_collector.get_performance_metrics()
-        workflow_metrics = [
-            m for m in all_metrics if m.workflow_id == workflow_id and m.operation_type == "step_execution"
-        ]
-
-        if workflow_metrics:
-            durations = [m.duration_ms for m in workflow_metrics]
-            avg_duration = sum(durations) / len(durations)
-            max_duration = max(durations)
+        histogram = self.metrics_collector.get_histogram(workflow_id=workflow_id, operation_type="step_execution")
 
+        if histogram.count:
             self.metrics_collector.update_workflow_metrics(
                 workflow_id,
-                avg_step_duration_ms=avg_duration,
-                max_step_duration_ms=max_duration,
+                avg_step_duration_ms=histogram.sum / histogram.count,
+                max_step_duration_ms=histogram.max,
             )
 
+    def get_step_latency_percentiles(
+        self, workflow_id: str | None = None, step_type: str | None = None, window_seconds: float | None = None
+    ) -> dict[str, Any]:
+        """Get step duration percentiles, optionally for one workflow, step type and recent window."""
+        histogram = self.metrics_collector.get_histogram(
+            workflow_id=workflow_id,
+            operation_type="step_execution",
+            operation=f"step_execution:{step_type}" if step_type else None,
+            window_seconds=window_seconds,
+        )
+        return histogram.summary()
+
     def get_execution_summary(self, workflow_id: str | None = None) -> dict[str, Any]:
         """Get execution metrics summary."""
         if workflow_id:
@@ -402,18 +406,14 @@ class ErrorRateCollector:
             return
 
         for workflow_id in self._error_counts:
-            # Get recent performance metrics for this workflow
-            all_metrics = self.metrics_collector.get_performance_metrics()
-            recent_metrics = [
-                m
-                for m in all_metrics
-                if (m.workflow_id == workflow_id and (now - m.timestamp).total_seconds() < 3600)  # Last hour
-            ]
-
-            if recent_metrics:
-                error_count = len([m for m in recent_metrics if not m.success])
-                total_count = len(recent_metrics)
-                error_rate = (error_count / total_count) * 100 if total_count > 0 else 0
+            # Count this workflow's operations over the last hour
+            total_count = self.metrics_collector.get_histogram(workflow_id=workflow_id, window_seconds=3600).count
+
+            if total_count:
+                error_count = self.metrics_collector.get_histogram(
+                    "error_duration_ms", workflow_id=workflow_id, window_seconds=3600
+                ).count
+                error_rate = (error_count / total_count) * 100
 
                 self._error_rates[workflow_id].append(error_rate)
 
@@ -6,7 +6,8 @@ from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import Any
 
-from .metrics import MetricsCollector, PerformanceMetrics, ResourceMetrics, WorkflowMetrics
+from .histogram import LogHistogram
+from .metrics import HistogramKey, MetricsCollector, PerformanceMetrics, ResourceMetrics, WorkflowMetrics
 
 logger = logging.getLogger(__name__)
 
@@ -177,30 +178,15 @@ class PrometheusExporter(BaseMetricsExporter):
         lines.append(f"# HELP {self.namespace}_operation_duration_ms Operation duration in milliseconds")
         lines.append(f"# TYPE {self.namespace}_operation_duration_ms histogram")
 
-        # Group by operation name and calculate histograms
-        operations = {}
+        # Group by operation name into log-bucketed histograms
+        operations: dict[str, LogHistogram] = {}
         for metric in metrics:
             if metric.operation_name not in operations:
-                operations[metric.operation_name] = []
-            operations[metric.operation_name].append(metric.duration_ms)
+                operations[metric.operation_name] = LogHistogram()
+            operations[metric.operation_name].record(metric.duration_ms)
 
-        # Simple histogram buckets
-        buckets = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf")]
-
-        for operation, durations in operations.items():
-            durations.sort()
-
-            # Calculate histogram buckets
-            for bucket in buckets:
-                count = sum(1 for d in durations if d <= bucket)
-                bucket_label = "+Inf" if bucket == float("inf") else str(bucket)
-                lines.append(
-                    f"{self.namespace}_operation_duration_ms_bucket{{"
-                    f'operation="{operation}",le="{bucket_label}"}} {count}'
-                )
-
-            lines.append(f'{self.namespace}_operation_duration_ms_count{{operation="{operation}"}} {len(durations)}')
-            lines.append(f'{self.namespace}_operation_duration_ms_sum{{operation="{operation}"}} {sum(durations)}')
+        for operation, histogram in operations.items():
+            lines.extend(self._format_histogram("operation_duration_ms", {"operation": operation}, histogram))
 
         # Success rate
         lines.append(f"# HELP {self.namespace}_operation_success_rate Success rate by operation")
@@ -215,6 +201,44 @@ class PrometheusExporter(BaseMetricsExporter):
 
         return "\n".join(lines)
 
+    def export_histograms(self, histograms: dict[HistogramKey, LogHistogram]) -> str:
+        """Export a MetricsCollector's histogram series in Prometheus format."""
+        lines = []
+
+        families: dict[str, list[tuple[HistogramKey, LogHistogram]]] = {}
+        for key, histogram in histograms.items():
+            families.setdefault(key.metric, []).append((key, histogram))
+
+        for metric, series in families.items():
+            name = f"operation_{metric}"
+            lines.append(f"# HELP {self.namespace}_{name} Operation {metric.replace('_', ' ')} histogram")
+            lines.append(f"# TYPE {self.namespace}_{name} histogram")
+            for key, histogram in series:
+                labels = {"operation": key.operation}
+                if key.operation_type:
+                    labels["operation_type"] = key.operation_type
+                if key.workflow_id:
+                    labels["workflow_id"] = key.workflow_id
+                lines.extend(self._format_histogram(name, labels, histogram))
+
+        return "\n".join(lines)
+
+    def _format_histogram(self, name: str, labels: dict[str, str], histogram: LogHistogram) -> list[str]:
+        """Format one histogram series as cumulative buckets, count and sum.
+
+        The text format has no sparse native histograms, so the non-empty buckets are
+        emitted as classic buckets whose bounds are the native schema's bucket bounds.
+        """
+        label_text = ",".join(f'{label}="{value}"' for label, value in labels.items())
+        lines = [
+            f'{self.namespace}_{name}_bucket{{{label_text},le="{upper:.6g}"}} {count}'
+            for upper, count in histogram.cumulative_buckets()
+        ]
+        lines.append(f'{self.namespace}_{name}_bucket{{{label_text},le="+Inf"}} {histogram.count}')
+        lines.append(f"{self.namespace}_{name}_count{{{label_text}}} {histogram.count}")
+        lines.append(f"{self.namespace}_{name}_sum{{{label_text}}} {histogram.sum}")
+        return lines
+
     def export_resource_metrics(self, metrics: list[ResourceMetrics]) -> str:
         """Export resource metrics in Prometheus format."""
         lines = []
@@ -399,7 +423,12 @@ class FileMetricsExporter:
                     # For other formats, export individual sections
                     content = exporter.export_summary(metrics_collector.get_summary_statistics())
                     content += "\n\n" + exporter.export_workflow_metrics(metrics_collector.get_all_workflow_metrics())
-                    content += "\n\n" + exporter.export_performance_metrics(metrics_collector.get_performance_metrics())
+                    if isinstance(exporter, PrometheusExporter):
+                        content += "\n\n" + exporter.export_histograms(metrics_collector.get_histograms())
+                    else:
+                        content += "\n\n" + exporter.export_performance_metrics(
+                            metrics_collector.get_performance_metrics()
+                        )
                     content += "\n\n" + exporter.export_resource_metrics(metrics_collector.get_resource_metrics())
 
                 f.write(content)
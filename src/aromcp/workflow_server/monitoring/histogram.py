@@ -0,0 +1,225 @@
+"""Log-bucketed histograms for latency and resource metrics.
+
+Values are counted in exponential buckets whose boundaries follow the
+Prometheus native histogram schema: bucket ``i`` holds values in
+``(base**(i-1), base**i]`` with ``base = 2 ** (2 ** -schema)``. Recording is
+O(1), memory is bounded by the value range rather than the sample count,
+percentiles are within half a bucket of the true value (about 2% at the
+default schema 3), and histograms with the same schema merge by adding
+bucket counts.
+"""
+
+import math
+import time
+from typing import Any
+
+DEFAULT_SCHEMA = 3
+DEFAULT_ZERO_THRESHOLD = 1e-9
+
+# Bucket indexes are clamped to values between 2**-64 and 2**64 so memory stays bounded
+_MAX_EXPONENT = 64
+
+
+class LogHistogram:
+    """Mergeable histogram with exponentially sized buckets."""
+
+    def __init__(self, schema: int = DEFAULT_SCHEMA, zero_threshold: float = DEFAULT_ZERO_THRESHOLD):
+        """Initialize an empty histogram.
+
+        Args:
+            schema: Resolution; each power of two is split into 2**schema buckets
+            zero_threshold: Values with a smaller magnitude are counted in the zero bucket
+        """
+        self.schema = schema
+        self.zero_threshold = zero_threshold
+        self._scale = 2**schema
+        self._max_index = _MAX_EXPONENT * self._scale
+        self.positive: dict[int, int] = {}
+        self.negative: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def bucket_index(self, magnitude: float) -> int:
+        """Return the index of the bucket holding a positive magnitude."""
+        index = math.ceil(math.log2(magnitude) * self._scale)
+        return max(-self._max_index, min(self._max_index, index))
+
+    def bucket_bounds(self, index: int) -> tuple[float, float]:
+        """Return the (lower, upper] magnitude bounds of a bucket."""
+        return 2 ** ((index - 1) / self._scale), 2 ** (index / self._scale)
+
+    def record(self, value: float, count: int = 1) -> None:
+        """Count a value."""
+        magnitude = abs(value)
+        if magnitude <= self.zero_threshold:
+            self.zero_count += count
+        else:
+            buckets = self.positive if value > 0 else self.negative
+            index = self.bucket_index(magnitude)
+            buckets[index] = buckets.get(index, 0) + count
+
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LogHistogram") -> "LogHistogram":
+        """Add another histogram's counts to this one and return self."""
+        if other.schema != self.schema:
+            raise ValueError(f"Cannot merge histograms with schemas {self.schema} and {other.schema}")
+
+        for buckets, other_buckets in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in other_buckets.items():
+                buckets[index] = buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def copy(self) -> "LogHistogram":
+        """Return an independent snapshot of this histogram."""
+        return LogHistogram(self.schema, self.zero_threshold).merge(self)
+
+    def percentile(self, percent: float) -> float | None:
+        """Estimate the value below which ``percent`` of the recorded values fall.
+
+        Returns the midpoint of the bucket holding the requested rank, clamped to the
+        exact minimum and maximum, or None when the histogram is empty.
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        if rank >= self.count:
+            return self.max
+
+        seen = 0
+        for sign, index, count in self._ordered_buckets():
+            seen += count
+            if seen >= rank:
+                if sign == 0:
+                    return 0.0
+                lower, upper = self.bucket_bounds(index)
+                return max(self.min, min(self.max, sign * (lower + upper) / 2))
+        return self.max
+
+    def _ordered_buckets(self) -> list[tuple[int, int, int]]:
+        """Return (sign, index, count) for every bucket in ascending value order."""
+        ordered = [(-1, index, self.negative[index]) for index in sorted(self.negative, reverse=True)]
+        if self.zero_count:
+            ordered.append((0, 0, self.zero_count))
+        ordered.extend((1, index, self.positive[index]) for index in sorted(self.positive))
+        return ordered
+
+    def cumulative_buckets(self) -> list[tuple[float, int]]:
+        """Return (upper bound, cumulative count) for each non-empty bucket in ascending order."""
+        buckets = []
+        seen = 0
+        for sign, index, count in self._ordered_buckets():
+            seen += count
+            if sign == 0:
+                upper = self.zero_threshold
+            elif sign > 0:
+                upper = self.bucket_bounds(index)[1]
+            else:
+                upper = -self.bucket_bounds(index)[0]
+            buckets.append((upper, seen))
+        return buckets
+
+    def summary(self, percentiles: tuple[float, ...] = (50, 90, 99)) -> dict[str, Any]:
+        """Return count, sum, min, max, mean and the requested percentiles."""
+        if not self.count:
+            return {"count": 0}
+
+        result = {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "avg": self.sum / self.count,
+        }
+        for percent in percentiles:
+            result[f"p{percent:g}"] = self.percentile(percent)
+        return result
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for serialization."""
+        return {
+            "schema": self.schema,
+            "zero_threshold": self.zero_threshold,
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "positive": {str(index): count for index, count in sorted(self.positive.items())},
+            "negative": {str(index): count for index, count in sorted(self.negative.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "LogHistogram":
+        """Rebuild a histogram serialized with to_dict."""
+        histogram = cls(data["schema"], data["zero_threshold"])
+        histogram.positive = {int(index): count for index, count in data["positive"].items()}
+        histogram.negative = {int(index): count for index, count in data["negative"].items()}
+        histogram.zero_count = data["zero_count"]
+        histogram.count = data["count"]
+        histogram.sum = data["sum"]
+        if histogram.count:
+            histogram.min = data["min"]
+            histogram.max = data["max"]
+        return histogram
+
+
+class RollingHistogram:
+    """Cumulative histogram plus per-interval histograms for rolling-window queries."""
+
+    def __init__(self, interval_seconds: float = 60.0, intervals: int = 60, schema: int = DEFAULT_SCHEMA):
+        """Initialize the rolling histogram.
+
+        Args:
+            interval_seconds: Width of each interval; windows are rounded out to whole intervals
+            intervals: Number of intervals kept, so the longest window is interval_seconds * intervals
+            schema: Bucket resolution of every histogram
+        """
+        self.interval_seconds = interval_seconds
+        self.intervals = intervals
+        self.schema = schema
+        self.total = LogHistogram(schema)
+        self._slots: dict[int, LogHistogram] = {}
+        self._latest_slot: int | None = None
+
+    def record(self, value: float, timestamp: float | None = None) -> None:
+        """Count a value observed at a Unix timestamp (now by default)."""
+        self.total.record(value)
+
+        slot = int((time.time() if timestamp is None else timestamp) // self.interval_seconds)
+        if self._latest_slot is None or slot > self._latest_slot:
+            self._latest_slot = slot
+            oldest = slot - self.intervals
+            for expired in [s for s in self._slots if s <= oldest]:
+                del self._slots[expired]
+        elif slot <= self._latest_slot - self.intervals:
+            # Older than every window; only the cumulative histogram counts it
+            return
+
+        histogram = self._slots.get(slot)
+        if histogram is None:
+            histogram = self._slots[slot] = LogHistogram(self.schema)
+        histogram.record(value)
+
+    def snapshot(self, window_seconds: float | None = None, now: float | None = None) -> LogHistogram:
+        """Return the values recorded in the last ``window_seconds``, or all values if None."""
+        if window_seconds is None:
+            return self.total.copy()
+
+        first_slot = int(((time.time() if now is None else now) - window_seconds) // self.interval_seconds)
+        merged = LogHistogram(self.schema)
+        for slot, histogram in self._slots.items():
+            if slot >= first_slot:
+                merged.merge(histogram)
+        return merged
@@ -7,10 +7,12 @@ import time
 from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, NamedTuple
 
 import psutil
 
+from .histogram import LogHistogram, RollingHistogram
+
 logger = logging.getLogger(__name__)
 
 
@@ -164,17 +166,34 @@ class ResourceMetrics:
         }
 
 
+class HistogramKey(NamedTuple):
+    """Identifies one histogram series of performance metrics."""
+
+    workflow_id: str | None
+    operation_type: str | None
+    operation: str
+    metric: str  # duration_ms, error_duration_ms, memory_delta_mb or cpu_percent
+
+
 class MetricsCollector:
     """Central collector for all workflow metrics."""
 
-    def __init__(self, max_metrics_per_type: int = 1000):
+    def __init__(
+        self,
+        max_metrics_per_type: int = 1000,
+        histogram_interval_seconds: float = 60.0,
+        histogram_intervals: int = 60,
+    ):
         self.max_metrics_per_type = max_metrics_per_type
+        self.histogram_interval_seconds = histogram_interval_seconds
+        self.histogram_intervals = histogram_intervals
         self._lock = threading.RLock()
 
-        # Metric storage
+        # Metric storage; the deques keep recent samples for export, aggregates come from the histograms
         self._workflow_metrics: dict[str, WorkflowMetrics] = {}
         self._performance_metrics: deque = deque(maxlen=max_metrics_per_type)
         self._resource_metrics: deque = deque(maxlen=max_metrics_per_type)
+        self._histograms: dict[HistogramKey, RollingHistogram] = {}
 
         # Aggregated metrics
         self._hourly_aggregates: dict[str, dict[str, Any]] = defaultdict(dict)
@@ -222,6 +241,7 @@ class MetricsCollector:
         with self._lock:
             self._performance_metrics.append(metric)
             self._update_aggregates(metric)
+            self._update_histograms(metric)
 
     def record_resource_metrics(self, metric: ResourceMetrics):
         """Record resource usage metrics."""
@@ -254,6 +274,46 @@ class MetricsCollector:
                 return metrics[-limit:]
             return metrics
 
+    def get_histogram(
+        self,
+        metric: str = "duration_ms",
+        workflow_id: str | None = None,
+        operation_type: str | None = None,
+        operation: str | None = None,
+        window_seconds: float | None = None,
+    ) -> LogHistogram:
+        """Get the merged histogram of the series matching the given filters.
+
+        Args:
+            metric: Metric name, e.g. duration_ms or error_duration_ms (durations of failed operations)
+            workflow_id: Only series of this workflow; None for all
+            operation_type: Only series of this operation type, e.g. step_execution; None for all
+            operation: Only series of this operation name; None for all
+            window_seconds: Only values from this many recent seconds, rounded out to whole
+                histogram intervals; None for all values
+
+        Returns:
+            A snapshot that later records do not change
+        """
+        now = time.time()
+        merged = LogHistogram()
+        with self._lock:
+            for key, histogram in self._histograms.items():
+                if (
+                    key.metric == metric
+                    and (workflow_id is None or key.workflow_id == workflow_id)
+                    and (operation_type is None or key.operation_type == operation_type)
+                    and (operation is None or key.operation == operation)
+                ):
+                    merged.merge(histogram.snapshot(window_seconds, now))
+        return merged
+
+    def get_histograms(self, window_seconds: float | None = None) -> dict[HistogramKey, LogHistogram]:
+        """Get a snapshot of every histogram series."""
+        now = time.time()
+        with self._lock:
+            return {key: histogram.snapshot(window_seconds, now) for key, histogram in self._histograms.items()}
+
     def get_current_resource_usage(self) -> ResourceMetrics:
         """Get current system resource usage."""
         memory = psutil.virtual_memory()
@@ -304,6 +364,26 @@ class MetricsCollector:
         if self._resource_monitor_thread:
             self._resource_monitor_thread.join(timeout=5.0)
 
+    def _update_histograms(self, metric: PerformanceMetrics):
+        """Record a performance metric's values in its histogram series."""
+        values = {"duration_ms": metric.duration_ms}
+        if not metric.success:
+            values["error_duration_ms"] = metric.duration_ms
+        if metric.memory_delta_mb is not None:
+            values["memory_delta_mb"] = metric.memory_delta_mb
+        if metric.cpu_percent is not None:
+            values["cpu_percent"] = metric.cpu_percent
+
+        timestamp = metric.timestamp.timestamp()
+        for name, value in values.items():
+            key = HistogramKey(metric.workflow_id, metric.operation_type, metric.operation_name, name)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = RollingHistogram(
+                    self.histogram_interval_seconds, self.histogram_intervals
+                )
+            histogram.record(value, timestamp)
+
     def _update_aggregates(self, metric: PerformanceMetrics):
         """Update hourly and daily aggregates."""
         hour_key = metric.timestamp.replace(minute=0, second=0, microsecond=0).isoformat()
@@ -366,24 +446,25 @@ class MetricsCollector:
                 "failed_workflows": len([m for m in self._workflow_metrics.values() if m.status == "failed"]),
             }
 
-            # Performance statistics
-            recent_performance = [
-                m for m in self._performance_metrics if (now - m.timestamp).total_seconds() < 3600  # Last hour
-            ]
+            # Performance statistics over the last hour
+            recent = self.get_histogram(window_seconds=3600)
+            failed = self.get_histogram("error_duration_ms", window_seconds=3600)
 
             perf_stats = {
-                "total_operations_hour": len(recent_performance),
-                "successful_operations_hour": len([m for m in recent_performance if m.success]),
-                "failed_operations_hour": len([m for m in recent_performance if not m.success]),
+                "total_operations_hour": recent.count,
+                "successful_operations_hour": recent.count - failed.count,
+                "failed_operations_hour": failed.count,
             }
 
-            if recent_performance:
-                durations = [m.duration_ms for m in recent_performance]
+            if recent.count:
                 perf_stats.update(
                     {
-                        "avg_duration_ms": sum(durations) / len(durations),
-                        "max_duration_ms": max(durations),
-                        "min_duration_ms": min(durations),
+                        "avg_duration_ms": recent.sum / recent.count,
+                        "max_duration_ms": recent.max,
+                        "min_duration_ms": recent.min,
+                        "p50_duration_ms": recent.percentile(50),
+                        "p90_duration_ms": recent.percentile(90),
+                        "p99_duration_ms": recent.percentile(99),
                     }
                 )
 
@@ -416,6 +497,11 @@ class MetricsCollector:
             for wf_id in old_workflows:
                 del self._workflow_metrics[wf_id]
 
+            # Clean histogram series of removed workflows
+            removed = set(old_workflows)
+            for key in [key for key in self._histograms if key.workflow_id in removed]:
+                del self._histograms[key]
+
             # Clean aggregates
             old_hours = [hour for hour in self._hourly_aggregates.keys() if datetime.fromisoformat(hour) < cutoff]
             for hour in old_hours:
@@ -9,6 +9,8 @@ from typing import Any
 
 import psutil
 
+from .histogram import RollingHistogram
+
 logger = logging.getLogger(__name__)
 
 
@@ -86,6 +88,9 @@ class PerformanceMonitor:
 
         # Resource usage tracking
         self._resource_timeline: deque = deque(maxlen=1000)
+
+        # Custom metric histograms by metric name
+        self._metric_histograms: dict[str, RollingHistogram] = {}
         self._resource_monitoring_enabled = False
 
         # Bottleneck detection thresholds
@@ -458,38 +463,32 @@ class PerformanceMonitor:
     def record_metric(self, metric_name: str, value: float, tags: dict = None) -> None:
         """Record a custom metric value."""
         with self._lock:
-            if tags is None:
-                tags = {}
-
-            # Store metric in resource timeline with context
-            self.record_resource_usage(
-                timestamp=datetime.now(),
-                memory_mb=0,  # Placeholder
-                cpu_percent=0,  # Placeholder
-                context={"metric_name": metric_name, "metric_value": value, "tags": tags},
-            )
+            histogram = self._metric_histograms.get(metric_name)
+            if histogram is None:
+                histogram = self._metric_histograms[metric_name] = RollingHistogram()
+            histogram.record(value)
 
-    def get_metrics_summary(self, metric_name: str) -> dict[str, Any]:
-        """Get summary statistics for a specific metric."""
+    def get_metrics_summary(self, metric_name: str, window_seconds: float | None = None) -> dict[str, Any]:
+        """Get summary statistics for a specific metric, optionally over a recent window."""
         with self._lock:
-            metric_values = []
-
-            for snapshot in self._resource_timeline:
-                if snapshot.context.get("metric_name") == metric_name:
-                    metric_values.append(snapshot.context.get("metric_value", 0))
-
-            if not metric_values:
-                return {"error": f"No data found for metric: {metric_name}"}
-
-            return {
-                "metric_name": metric_name,
-                "count": len(metric_values),
-                "min": min(metric_values),
-                "max": max(metric_values),
-                "avg": sum(metric_values) / len(metric_values),  # Use "avg" for test compatibility
-                "average": sum(metric_values) / len(metric_values),
-                "total": sum(metric_values),
-            }
+            histogram = self._metric_histograms.get(metric_name)
+            summary = histogram.snapshot(window_seconds).summary() if histogram is not None else {"count": 0}
+
+        if not summary["count"]:
+            return {"error": f"No data found for metric: {metric_name}"}
+
+        return {
+            "metric_name": metric_name,
+            "count": summary["count"],
+            "min": summary["min"],
+            "max": summary["max"],
+            "avg": summary["avg"],  # Use "avg" for test compatibility
+            "average": summary["avg"],
+            "total": summary["sum"],
+            "p50": summary["p50"],
+            "p90": summary["p90"],
+            "p99": summary["p99"],
+        }
 
     def get_bottleneck_analysis(self) -> dict[str, Any]:
         """Get comprehensive bottleneck analysis."""
@@ -0,0 +1,276 @@
+"""Span tracing for the MCP Workflow System.
+
+Spans nest per thread and per asyncio task (workflow -> step ->
+expression/transform) and are kept in a bounded ring buffer that can be
+exported as JSON lines or as a Chrome trace-event file (chrome://tracing,
+Perfetto, speedscope).
+
+Tracing is off by default. When disabled, span() returns a shared no-op span
+and hot call sites guard on ``tracer.enabled``, so the only cost is an
+attribute check. Payload callables are invoked only when a span is recorded,
+keeping expensive formatting of state and definitions off the fast path.
+
+Enable with AROMCP_WORKFLOW_TRACE=1 (buffer size via AROMCP_WORKFLOW_TRACE_BUFFER)
+or programmatically with get_tracer().enable().
+"""
+
+import contextvars
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACE_BUFFER_SIZE = 10_000
+
+PayloadFactory = Callable[[], dict[str, Any]]
+
+
+@dataclass(slots=True)
+class Span:
+    """A recorded span, or an instant event when duration_ns is None."""
+
+    name: str
+    category: str
+    span_id: int
+    parent_id: int | None
+    thread_id: int
+    start_ns: int
+    duration_ns: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to a JSON-friendly dictionary."""
+        return {
+            "name": self.name,
+            "category": self.category,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "thread_id": self.thread_id,
+            "start_ns": self.start_ns,
+            "duration_ns": self.duration_ns,
+            "attributes": self.attributes,
+        }
+
+    def to_chrome_event(self, pid: int) -> dict[str, Any]:
+        """Convert to a Chrome trace-event record (timestamps in microseconds)."""
+        event = {
+            "name": self.name,
+            "cat": self.category,
+            "pid": pid,
+            "tid": self.thread_id,
+            "ts": self.start_ns / 1000,
+            "args": self.attributes,
+        }
+        if self.duration_ns is None:
+            event.update(ph="i", s="t")
+        else:
+            event.update(ph="X", dur=self.duration_ns / 1000)
+        return event
+
+
+class _NullSpan:
+    """Span returned while tracing is disabled; every operation is a no-op."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    """Span being measured; recorded into the tracer's buffer when it exits."""
+
+    __slots__ = ("_tracer", "_payload", "_span", "_token")
+
+    def __init__(self, tracer: "Tracer", span: Span, payload: PayloadFactory | None):
+        self._tracer = tracer
+        self._span = span
+        self._payload = payload
+        self._token: contextvars.Token | None = None
+
+    def __enter__(self) -> "_ActiveSpan":
+        stack = self._tracer._stack.get()
+        self._span.parent_id = stack[-1] if stack else None
+        self._token = self._tracer._stack.set((*stack, self._span.span_id))
+        self._span.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        span = self._span
+        span.duration_ns = time.perf_counter_ns() - span.start_ns
+        self._tracer._stack.reset(self._token)
+        if exc_type is not None:
+            span.attributes["error"] = f"{exc_type.__name__}: {exc}"
+        self._tracer._record(span, self._payload)
+        return False
+
+    def set(self, **attributes: Any) -> None:
+        """Attach attributes discovered while the span is open."""
+        self._span.attributes.update(attributes)
+
+
+class Tracer:
+    """Records spans and instant events into a bounded ring buffer."""
+
+    def __init__(self, capacity: int = DEFAULT_TRACE_BUFFER_SIZE, enabled: bool = False):
+        """
+        Initialize the tracer
+
+        Args:
+            capacity: Maximum number of spans kept; the oldest are dropped first
+            enabled: Whether spans are recorded
+        """
+        self.enabled = enabled
+        self._buffer: deque[Span] = deque(maxlen=capacity)
+        self._ids = itertools.count(1)
+        # Open span IDs for the current thread or asyncio task
+        self._stack: contextvars.ContextVar[tuple[int, ...]] = contextvars.ContextVar("trace_stack", default=())
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of spans kept."""
+        return self._buffer.maxlen
+
+    def enable(self, capacity: int | None = None) -> None:
+        """Start recording, optionally resizing the buffer (which drops recorded spans)."""
+        if capacity is not None and capacity != self._buffer.maxlen:
+            self._buffer = deque(maxlen=capacity)
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording; already recorded spans are kept."""
+        self.enabled = False
+
+    def span(
+        self, name: str, category: str = "step", payload: PayloadFactory | None = None, **attributes: Any
+    ) -> _ActiveSpan | _NullSpan:
+        """
+        Open a span for use as a context manager
+
+        Args:
+            name: Span name
+            category: Span category (workflow, step, expression, transform, ...)
+            payload: Optional callable returning extra attributes, invoked only if recorded
+            **attributes: Cheap attributes stored as-is
+
+        Returns:
+            Context manager measuring the enclosed block
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        span = Span(name, category, next(self._ids), None, threading.get_ident(), 0, attributes=attributes)
+        return _ActiveSpan(self, span, payload)
+
+    def event(
+        self, name: str, category: str = "debug", payload: PayloadFactory | None = None, **attributes: Any
+    ) -> None:
+        """
+        Record an instant event under the current span
+
+        Args:
+            name: Event name
+            category: Event category
+            payload: Optional callable returning extra attributes, invoked only if recorded
+            **attributes: Cheap attributes stored as-is
+        """
+        if not self.enabled:
+            return
+        stack = self._stack.get()
+        span = Span(
+            name,
+            category,
+            next(self._ids),
+            stack[-1] if stack else None,
+            threading.get_ident(),
+            time.perf_counter_ns(),
+            attributes=attributes,
+        )
+        self._record(span, payload)
+
+    def get_spans(self) -> list[Span]:
+        """Return recorded spans, oldest first."""
+        return list(self._buffer)
+
+    def clear(self) -> None:
+        """Drop every recorded span."""
+        self._buffer.clear()
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Build a Chrome trace-event document from the recorded spans."""
+        pid = os.getpid()
+        return {"traceEvents": [span.to_chrome_event(pid) for span in self.get_spans()], "displayTimeUnit": "ms"}
+
+    def export_jsonl(self, path: str) -> int:
+        """
+        Write recorded spans to a JSON lines file
+
+        Args:
+            path: Destination file
+
+        Returns:
+            Number of spans written
+        """
+        spans = self.get_spans()
+        with open(path, "w", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=repr))
+                f.write("\n")
+        return len(spans)
+
+    def export_chrome_trace(self, path: str) -> int:
+        """
+        Write recorded spans as a Chrome trace-event file
+
+        Args:
+            path: Destination file
+
+        Returns:
+            Number of events written
+        """
+        document = self.to_chrome_trace()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(document, f, default=repr)
+        return len(document["traceEvents"])
+
+    def _record(self, span: Span, payload: PayloadFactory | None) -> None:
+        if payload is not None:
+            try:
+                span.attributes.update(payload())
+            except Exception as e:
+                span.attributes["payload_error"] = str(e)
+        self._buffer.append(span)
+
+
+def _tracer_from_environment() -> Tracer:
+    enabled = os.getenv("AROMCP_WORKFLOW_TRACE", "").lower() in ("1", "true", "yes", "on")
+    try:
+        capacity = int(os.getenv("AROMCP_WORKFLOW_TRACE_BUFFER", DEFAULT_TRACE_BUFFER_SIZE))
+    except ValueError:
+        logger.warning("Ignoring invalid AROMCP_WORKFLOW_TRACE_BUFFER value")
+        capacity = DEFAULT_TRACE_BUFFER_SIZE
+    return Tracer(capacity=max(1, capacity), enabled=enabled)
+
+
+_tracer = _tracer_from_environment()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer."""
+    return _tracer
@@ -1,3 +1,38 @@
 """Persistence infrastructure for the MCP Workflow System."""
 
-__all__ = []
+import os
+import threading
+
+from .backend import PersistedState, PersistedWorkflow, PersistenceBackend
+from .sqlite_backend import SQLiteBackend
+
+__all__ = [
+    "PersistedState",
+    "PersistedWorkflow",
+    "PersistenceBackend",
+    "SQLiteBackend",
+    "get_persistence_backend",
+]
+
+_persistence_backend: PersistenceBackend | None = None
+_persistence_lock = threading.Lock()
+
+
+def get_persistence_backend() -> PersistenceBackend | None:
+    """
+    Get the process-wide persistence backend.
+
+    Persistence is enabled by pointing AROMCP_WORKFLOW_DB at a SQLite database
+    file; without it workflows live only in memory and None is returned.
+    """
+    global _persistence_backend
+    db_path = os.getenv("AROMCP_WORKFLOW_DB")
+    if not db_path:
+        return None
+    if _persistence_backend is None:
+        with _persistence_lock:
+            if _persistence_backend is None:
+                _persistence_backend = SQLiteBackend(
+                    db_path, snapshot_interval=int(os.getenv("AROMCP_WORKFLOW_SNAPSHOT_INTERVAL", "50"))
+                )
+    return _persistence_backend
@@ -0,0 +1,97 @@
+"""Persistence backend interface for workflow state.
+
+Backends store three kinds of records per workflow:
+
+- a workflow record (name, status, inputs and queue position)
+- an append-only log of state update deltas, numbered by sequence
+- periodic full-state snapshots that let resume skip most of the log
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class PersistedWorkflow:
+    """Durable record of a workflow instance."""
+
+    workflow_id: str
+    workflow_name: str
+    status: str = "running"
+    created_at: str = ""
+    completed_at: str | None = None
+    error_message: str | None = None
+    inputs: dict[str, Any] = field(default_factory=dict)
+    remaining_steps: list[str] = field(default_factory=list)  # IDs of top-level steps still queued
+    pending_steps: list[str] = field(default_factory=list)  # IDs of client steps awaiting implicit completion
+    updated_at: float = 0.0
+
+
+@dataclass
+class PersistedState:
+    """Latest snapshot of a workflow's state plus the deltas recorded after it."""
+
+    workflow_id: str
+    snapshot: dict[str, Any] | None = None  # {"inputs": ..., "state": ..., "computed": ...}
+    snapshot_sequence: int = 0
+    deltas: list[tuple[int, list[dict[str, Any]]]] = field(default_factory=list)
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number of the last recorded update."""
+        return self.deltas[-1][0] if self.deltas else self.snapshot_sequence
+
+
+class PersistenceBackend(ABC):
+    """Abstract base class for workflow persistence backends."""
+
+    @abstractmethod
+    def save_workflow(self, workflow: PersistedWorkflow) -> None:
+        """Create or replace the workflow record."""
+        pass
+
+    @abstractmethod
+    def load_workflow(self, workflow_id: str) -> PersistedWorkflow | None:
+        """Load a workflow record, or None if it was never persisted."""
+        pass
+
+    @abstractmethod
+    def list_workflows(self, status: str | None = None) -> list[PersistedWorkflow]:
+        """List persisted workflow records, optionally filtered by status."""
+        pass
+
+    @abstractmethod
+    def record_update(self, workflow_id: str, updates: list[dict[str, Any]], state: Any) -> int:
+        """
+        Append a state delta, snapshotting the full state when due.
+
+        Args:
+            workflow_id: Workflow the updates were applied to
+            updates: Update operations as passed to StateManager.update
+            state: WorkflowState after the updates were applied
+
+        Returns:
+            Sequence number assigned to the delta
+
+        Raises:
+            TypeError: If the updates, or the state when a snapshot is due, cannot be serialized;
+                nothing is recorded and the update is rolled back
+        """
+        pass
+
+    @abstractmethod
+    def load_state(self, workflow_id: str) -> PersistedState | None:
+        """Load the latest snapshot and subsequent deltas, or None if nothing was recorded."""
+        pass
+
+    @abstractmethod
+    def delete_workflow(self, workflow_id: str) -> None:
+        """Remove every record for a workflow."""
+        pass
+
+    def flush(self) -> None:  # noqa: B027 - optional hook for buffered backends
+        """Block until all buffered writes are durable."""
+
+    def close(self) -> None:  # noqa: B027 - optional hook for backends holding resources
+        """Flush and release backend resources."""
@@ -0,0 +1,342 @@
+"""SQLite persistence backend with WAL journaling and group commit.
+
+Callers never touch the database directly: every write is serialized to JSON on
+the calling thread and queued for a single writer thread, which drains whatever
+has accumulated and commits it in one transaction. A state update therefore costs
+one ``json.dumps`` and a queue put on the hot path, while fsyncs are amortized
+over every write that arrived during the commit window.
+"""
+
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from .backend import PersistedState, PersistedWorkflow, PersistenceBackend
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflows (
+    workflow_id TEXT PRIMARY KEY,
+    workflow_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT,
+    completed_at TEXT,
+    error_message TEXT,
+    inputs TEXT NOT NULL,
+    remaining_steps TEXT NOT NULL,
+    pending_steps TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    workflow_id TEXT PRIMARY KEY,
+    sequence INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deltas (
+    workflow_id TEXT NOT NULL,
+    sequence INTEGER NOT NULL,
+    updates TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (workflow_id, sequence)
+);
+"""
+
+_UPSERT_WORKFLOW = "INSERT OR REPLACE INTO workflows VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_INSERT_DELTA = "INSERT OR REPLACE INTO deltas VALUES (?, ?, ?, ?)"
+_UPSERT_SNAPSHOT = "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?)"
+_COMPACT_DELTAS = "DELETE FROM deltas WHERE workflow_id = ? AND sequence <= ?"
+
+_STOP = object()
+
+
+class SQLiteBackend(PersistenceBackend):
+    """
+    Durable workflow persistence in a single SQLite database.
+
+    Features:
+    - WAL journal mode so readers never block the writer
+    - Per-update delta log with periodic full snapshots
+    - Group commit from a background writer thread
+    - Resume by replaying deltas on top of the latest snapshot
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        snapshot_interval: int = 50,
+        commit_interval_ms: float = 5.0,
+        max_batch_size: int = 1000,
+    ):
+        """
+        Initialize the backend and start its writer thread.
+
+        Args:
+            db_path: Path of the SQLite database file (":memory:" for tests)
+            snapshot_interval: Number of deltas between full-state snapshots
+            commit_interval_ms: How long the writer waits to batch more writes into one commit
+            max_batch_size: Maximum number of writes committed in one transaction
+        """
+        self.db_path = str(db_path)
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.snapshot_interval = max(1, snapshot_interval)
+        self.commit_interval = commit_interval_ms / 1000.0
+        self.max_batch_size = max_batch_size
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()
+
+        # Sequence bookkeeping for the delta log
+        self._sequences: dict[str, int] = {}
+        self._snapshot_sequences: dict[str, int] = {}
+        self._sequence_lock = threading.Lock()
+
+        # Writer statistics
+        self.commit_count = 0
+        self.write_count = 0
+        self.error_count = 0
+
+        self._pending: queue.SimpleQueue = queue.SimpleQueue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="workflow-persistence-writer", daemon=True)
+        self._writer.start()
+
+    # Write path
+
+    def save_workflow(self, workflow: PersistedWorkflow) -> None:
+        """Queue a create-or-replace of the workflow record."""
+        workflow.updated_at = time.time()
+        self._enqueue(
+            _UPSERT_WORKFLOW,
+            (
+                workflow.workflow_id,
+                workflow.workflow_name,
+                workflow.status,
+                workflow.created_at,
+                workflow.completed_at,
+                workflow.error_message,
+                _dumps(workflow.inputs),
+                _dumps(workflow.remaining_steps),
+                _dumps(workflow.pending_steps),
+                workflow.updated_at,
+            ),
+        )
+
+    def record_update(self, workflow_id: str, updates: list[dict[str, Any]], state: Any) -> int:
+        """
+        Queue a state delta, plus a snapshot every snapshot_interval deltas.
+
+        The updates are checked on every call; the full state, including computed values,
+        only when a snapshot is due. Either way nothing is queued if serialization fails.
+        """
+        encoded = _dumps(updates)
+        # Serialize everything before taking a sequence number, so a rejected update queues nothing
+        with self._sequence_lock:
+            sequence = self._sequences.get(workflow_id, 0) + 1
+            take_snapshot = sequence - self._snapshot_sequences.get(workflow_id, 0) >= self.snapshot_interval
+            snapshot = _dumps(_state_tiers(state)) if take_snapshot else None
+            self._sequences[workflow_id] = sequence
+            if take_snapshot:
+                self._snapshot_sequences[workflow_id] = sequence
+
+        now = time.time()
+        self._enqueue(_INSERT_DELTA, (workflow_id, sequence, encoded, now))
+        if snapshot is not None:
+            self._write_snapshot(workflow_id, sequence, snapshot, now)
+        return sequence
+
+    def snapshot(self, workflow_id: str, state: Any) -> int:
+        """
+        Queue a full snapshot of the current state immediately.
+
+        Args:
+            workflow_id: Workflow to snapshot
+            state: Current WorkflowState
+
+        Returns:
+            Sequence number the snapshot covers
+        """
+        snapshot = _dumps(_state_tiers(state))
+        with self._sequence_lock:
+            sequence = self._sequences.get(workflow_id, 0)
+            self._snapshot_sequences[workflow_id] = sequence
+        self._write_snapshot(workflow_id, sequence, snapshot, time.time())
+        return sequence
+
+    def delete_workflow(self, workflow_id: str) -> None:
+        """Queue removal of every record for a workflow."""
+        with self._sequence_lock:
+            self._sequences.pop(workflow_id, None)
+            self._snapshot_sequences.pop(workflow_id, None)
+        self._enqueue("DELETE FROM deltas WHERE workflow_id = ?", (workflow_id,))
+        self._enqueue("DELETE FROM snapshots WHERE workflow_id = ?", (workflow_id,))
+        self._enqueue("DELETE FROM workflows WHERE workflow_id = ?", (workflow_id,))
+
+    def flush(self) -> None:
+        """Block until every write queued so far has been committed."""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._pending.put(done)
+        done.wait()
+
+    def close(self) -> None:
+        """Flush pending writes, stop the writer thread and close the database."""
+        if self._closed:
+            return
+        self._pending.put(_STOP)
+        self._writer.join()
+        self._closed = True
+        with self._db_lock:
+            self._conn.close()
+
+    # Read path
+
+    def load_workflow(self, workflow_id: str) -> PersistedWorkflow | None:
+        """Load a workflow record after flushing queued writes."""
+        self.flush()
+        with self._db_lock:
+            row = self._conn.execute("SELECT * FROM workflows WHERE workflow_id = ?", (workflow_id,)).fetchone()
+        return _workflow_from_row(row) if row else None
+
+    def list_workflows(self, status: str | None = None) -> list[PersistedWorkflow]:
+        """List workflow records, most recently updated first."""
+        self.flush()
+        with self._db_lock:
+            if status is None:
+                rows = self._conn.execute("SELECT * FROM workflows ORDER BY updated_at DESC").fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM workflows WHERE status = ? ORDER BY updated_at DESC", (status,)
+                ).fetchall()
+        return [_workflow_from_row(row) for row in rows]
+
+    def load_state(self, workflow_id: str) -> PersistedState | None:
+        """
+        Load the latest snapshot and the deltas recorded after it.
+
+        Also primes the sequence counters so updates made after a resume
+        continue the existing log.
+        """
+        self.flush()
+        with self._db_lock:
+            snapshot_row = self._conn.execute(
+                "SELECT sequence, state FROM snapshots WHERE workflow_id = ?", (workflow_id,)
+            ).fetchone()
+            snapshot_sequence = snapshot_row[0] if snapshot_row else 0
+            delta_rows = self._conn.execute(
+                "SELECT sequence, updates FROM deltas WHERE workflow_id = ? AND sequence > ? ORDER BY sequence",
+                (workflow_id, snapshot_sequence),
+            ).fetchall()
+
+        if snapshot_row is None and not delta_rows:
+            return None
+
+        persisted = PersistedState(
+            workflow_id=workflow_id,
+            snapshot=json.loads(snapshot_row[1]) if snapshot_row else None,
+            snapshot_sequence=snapshot_sequence,
+            deltas=[(sequence, json.loads(updates)) for sequence, updates in delta_rows],
+        )
+        with self._sequence_lock:
+            self._sequences[workflow_id] = max(self._sequences.get(workflow_id, 0), persisted.sequence)
+            self._snapshot_sequences.setdefault(workflow_id, snapshot_sequence)
+        return persisted
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return writer statistics."""
+        return {
+            "db_path": self.db_path,
+            "commits": self.commit_count,
+            "writes": self.write_count,
+            "errors": self.error_count,
+            "average_batch_size": self.write_count / self.commit_count if self.commit_count else 0.0,
+        }
+
+    # Internals
+
+    def _write_snapshot(self, workflow_id: str, sequence: int, snapshot: str, now: float) -> None:
+        self._enqueue(_UPSERT_SNAPSHOT, (workflow_id, sequence, snapshot, now))
+        self._enqueue(_COMPACT_DELTAS, (workflow_id, sequence))
+
+    def _enqueue(self, sql: str, params: tuple) -> None:
+        if self._closed:
+            raise RuntimeError("Persistence backend is closed")
+        self._pending.put((sql, params))
+
+    def _write_loop(self) -> None:
+        """Drain queued writes and commit them in batches until stopped."""
+        while True:
+            batch = [self._pending.get()]
+            deadline = time.monotonic() + self.commit_interval
+            # Flush requests and shutdown end the batch early so waiters aren't delayed
+            while len(batch) < self.max_batch_size and isinstance(batch[-1], tuple):
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            self._commit(batch)
+            if batch[-1] is _STOP:
+                return
+
+    def _commit(self, batch: list[Any]) -> None:
+        writes = [item for item in batch if isinstance(item, tuple)]
+        if writes:
+            with self._db_lock:
+                try:
+                    self._conn.execute("BEGIN")
+                    for sql, params in writes:
+                        self._conn.execute(sql, params)
+                    self._conn.execute("COMMIT")
+                    self.commit_count += 1
+                    self.write_count += len(writes)
+                except sqlite3.Error as e:
+                    self.error_count += 1
+                    logger.error(f"Failed to commit {len(writes)} workflow persistence writes: {e}")
+                    if self._conn.in_transaction:
+                        self._conn.execute("ROLLBACK")
+
+        for item in batch:
+            if isinstance(item, threading.Event):
+                item.set()
+
+
+def _state_tiers(state: Any) -> dict[str, Any]:
+    return {"inputs": state.inputs, "state": state.state, "computed": state.computed}
+
+
+def _dumps(value: Any) -> str:
+    """Serialize a value for storage, refusing values JSON cannot represent rather than storing their str()."""
+    try:
+        return json.dumps(value, separators=(",", ":"))
+    except (TypeError, ValueError) as e:
+        raise TypeError(f"Workflow data is not JSON serializable: {e}") from e
+
+
+def _workflow_from_row(row: tuple) -> PersistedWorkflow:
+    return PersistedWorkflow(
+        workflow_id=row[0],
+        workflow_name=row[1],
+        status=row[2],
+        created_at=row[3] or "",
+        completed_at=row[4],
+        error_message=row[5],
+        inputs=json.loads(row[6]),
+        remaining_steps=json.loads(row[7]),
+        pending_steps=json.loads(row[8]),
+        updated_at=row[9],
+    )
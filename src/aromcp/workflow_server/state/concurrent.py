@@ -4,12 +4,18 @@ This module provides thread-safe state operations with conflict resolution
 and optimistic locking for multi-agent workflows.
 """
 
+import copy
+import json
+import re
 import threading
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from typing import Any
 
+from ..workflow.deltas import apply_delta, compute_delta
 from .models import StateUpdate
 from .transformer import TransformationEngine
 
@@ -55,21 +61,163 @@ class UpdateConflict:
     detected_at: float = field(default_factory=time.time)
 
 
+@dataclass
+class CheckpointChain:
+    """A base snapshot and the deltas of the checkpoints taken after it.
+
+    Snapshots are never mutated once stored, so checkpoints share them by
+    reference and each checkpoint only adds its own delta.
+    """
+
+    base: dict[str, Any]
+    base_version: int
+    head: dict[str, Any]  # Snapshot of the most recent checkpoint, diffed against by the next one
+    deltas: list[list[dict[str, Any]]] = field(default_factory=list)
+    updated_at: float = field(default_factory=time.time)
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate the size of a JSON-like value by its serialized length."""
+    return len(json.dumps(value, default=str))
+
+
+# Scope aliases that StateManager writes to another tier ("raw" is the legacy name of "inputs")
+_PATH_ALIASES = {"this": "state", "raw": "inputs"}
+
+
+def _path_segments(path: str) -> tuple[str, ...]:
+    """Split a state path such as "state.items[2].name" into its segments."""
+    segments = [segment for segment in re.split(r"[.\[\]]", path) if segment]
+    if segments:
+        segments[0] = _PATH_ALIASES.get(segments[0], segments[0])
+    return tuple(segments)
+
+
+def _paths_overlap(first: tuple[str, ...], second: tuple[str, ...]) -> bool:
+    """Check whether one path is equal to or nested inside the other."""
+    depth = min(len(first), len(second))
+    return first[:depth] == second[:depth]
+
+
+class _TrieNode:
+    __slots__ = ("children", "version", "subtree_version")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.version = 0  # Last write to exactly this path
+        self.subtree_version = 0  # Last write to this path or anything below it
+
+
+class PathVersionTrie:
+    """Per-path version stamps for one workflow, stored as a prefix trie.
+
+    A write stamps its own node and the subtree version of every ancestor, so
+    a path has changed since version v when the path itself, an ancestor or a
+    descendant was stamped after v. Stamping a node drops its children, whose
+    stamps it supersedes, which keeps the trie no larger than the set of
+    distinct paths written below the last wholesale overwrite.
+    """
+
+    def __init__(self) -> None:
+        self._root = _TrieNode()
+        self._lock = threading.Lock()
+
+    def stamp(self, segments: tuple[str, ...], version: int) -> None:
+        """Record a write to a path at the given version."""
+        with self._lock:
+            node = self._root
+            for segment in segments:
+                node.subtree_version = max(node.subtree_version, version)
+                node = node.children.setdefault(segment, _TrieNode())
+            node.children.clear()
+            node.version = version
+            node.subtree_version = version
+
+    def changed_since(self, segments: tuple[str, ...], version: int) -> bool:
+        """Check whether a path or anything overlapping it was written after version."""
+        with self._lock:
+            node = self._root
+            for segment in segments:
+                if node.version > version:
+                    return True
+                child = node.children.get(segment)
+                if child is None:
+                    return False
+                node = child
+            return node.subtree_version > version
+
+
+class PathLockTable:
+    """Admits update batches concurrently unless their paths overlap.
+
+    Holding the empty path overlaps every other path, which gives exclusive
+    access to the whole workflow.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._held: list[tuple[tuple[str, ...], ...]] = []
+
+    def _overlaps_held(self, paths: tuple[tuple[str, ...], ...]) -> bool:
+        return any(_paths_overlap(path, other) for held in self._held for path in paths for other in held)
+
+    @contextmanager
+    def hold(self, paths: list[tuple[str, ...]], timeout: float | None = None) -> Iterator[None]:
+        """Wait until no batch holding an overlapping path is in flight, then hold the paths.
+
+        Raises:
+            TimeoutError: If the paths could not be acquired within timeout seconds
+        """
+        entry = tuple(paths)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._overlaps_held(entry):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"Timed out waiting for paths held by another update after {timeout}s")
+                self._condition.wait(remaining)
+            self._held.append(entry)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._held.remove(entry)
+                self._condition.notify_all()
+
+
 class ConcurrentStateManager:
-    """Thread-safe state manager with conflict resolution."""
+    """Thread-safe state manager with conflict resolution.
+
+    Update batches only wait for in-flight batches that write overlapping
+    paths, and optimistic version checks only fail when a path the batch
+    writes, or a path overlapping it, changed after the expected version.
+    """
 
-    def __init__(self, base_manager=None):
-        """Initialize with optional base state manager for delegation."""
+    def __init__(self, base_manager=None, history_depth: int = 1000, compact_interval: int = 10):
+        """Initialize with optional base state manager for delegation.
+
+        Args:
+            base_manager: State manager to delegate reads and writes to
+            history_depth: Maximum update history entries kept per workflow
+            compact_interval: Delta checkpoints taken before the next checkpoint
+                starts a new base snapshot
+        """
         from .manager import StateManager
 
         self._base_manager = base_manager or StateManager()
-        self._locks: dict[str, threading.RLock] = {}
+        self._path_locks: dict[str, PathLockTable] = {}
+        self._path_versions: dict[str, PathVersionTrie] = {}
         self._global_lock = threading.RLock()
         self._versions: dict[str, StateVersion] = {}
         self._pending_updates: dict[str, list[BatchUpdate]] = defaultdict(list)
         self._conflict_resolution = ConflictResolution()
         self._transformation_engine = TransformationEngine()
-        self._update_history: dict[str, list[tuple[float, str, list[StateUpdate]]]] = defaultdict(list)
+        self._history_depth = history_depth
+        self._update_history: dict[str, deque[tuple[float, str, list[StateUpdate]]]] = defaultdict(
+            lambda: deque(maxlen=self._history_depth)
+        )
+        self._compact_interval = compact_interval
+        self._checkpoint_chains: dict[str, CheckpointChain] = {}
 
         # Performance tracking
         self._stats = {
@@ -80,12 +228,19 @@ class ConcurrentStateManager:
             "average_update_time": 0.0,
         }
 
-    def _get_workflow_lock(self, workflow_id: str) -> threading.RLock:
-        """Get or create a lock for a specific workflow."""
+    def _get_path_locks(self, workflow_id: str) -> PathLockTable:
+        """Get or create the path lock table for a specific workflow."""
         with self._global_lock:
-            if workflow_id not in self._locks:
-                self._locks[workflow_id] = threading.RLock()
-            return self._locks[workflow_id]
+            if workflow_id not in self._path_locks:
+                self._path_locks[workflow_id] = PathLockTable()
+            return self._path_locks[workflow_id]
+
+    def _get_path_versions(self, workflow_id: str) -> PathVersionTrie:
+        """Get or create the path version trie for a specific workflow."""
+        with self._global_lock:
+            if workflow_id not in self._path_versions:
+                self._path_versions[workflow_id] = PathVersionTrie()
+            return self._path_versions[workflow_id]
 
     def _get_version(self, workflow_id: str) -> StateVersion:
         """Get current version for a workflow."""
@@ -113,21 +268,22 @@ class ConcurrentStateManager:
         Returns:
             State data with optional version info
         """
-        lock = self._get_workflow_lock(workflow_id)
-
-        with lock:
-            # Delegate to base manager for actual read
-            result = self._base_manager.read(workflow_id, paths)
-
-            if include_version:
-                version = self._get_version(workflow_id)
-                result["__version__"] = {
-                    "version": version.version,
-                    "updated_at": version.updated_at,
-                    "updated_by": version.updated_by,
-                }
+        # Take the version before reading: writes commit state before bumping the version, so a
+        # write racing with the read can only make the reported version too old (a spurious
+        # conflict later), never newer than the state returned
+        version = self._get_version(workflow_id) if include_version else None
+
+        # Delegate to base manager for actual read; it serializes against writes
+        result = self._base_manager.read(workflow_id, paths)
+
+        if version is not None:
+            result["__version__"] = {
+                "version": version.version,
+                "updated_at": version.updated_at,
+                "updated_by": version.updated_by,
+            }
 
-            return result
+        return result
 
     def update(
         self,
@@ -143,8 +299,9 @@ class ConcurrentStateManager:
             workflow_id: Workflow to update
             updates: List of updates to apply
             agent_id: ID of agent making the update
-            expected_version: Expected current version for optimistic locking
-            batch_timeout: Timeout for batch operation
+            expected_version: Version the agent last read; the update is rejected only
+                if a path overlapping one it writes changed after this version
+            batch_timeout: Seconds to wait for overlapping in-flight updates
 
         Returns:
             Result with success/failure info
@@ -164,51 +321,64 @@ class ConcurrentStateManager:
             updates=state_updates, agent_id=agent_id, expected_version=expected_version, timeout_seconds=batch_timeout
         )
 
-        lock = self._get_workflow_lock(workflow_id)
+        paths = [_path_segments(update.path) for update in state_updates]
 
         try:
-            with lock:
-                # Check version if specified
+            with self._get_path_locks(workflow_id).hold(paths, timeout=batch_timeout):
+                # Check version if specified, against the paths this batch writes
                 if expected_version is not None:
                     current_version = self._get_version(workflow_id)
-                    if current_version.version != expected_version:
+                    path_versions = self._get_path_versions(workflow_id)
+                    conflicting_paths = [
+                        update.path
+                        for update, segments in zip(state_updates, paths, strict=True)
+                        if path_versions.changed_since(segments, expected_version)
+                    ]
+                    if conflicting_paths or expected_version > current_version.version:
                         return {
                             "success": False,
                             "error": "VERSION_CONFLICT",
                             "message": f"Expected version {expected_version}, got {current_version.version}",
                             "current_version": current_version.version,
+                            "conflicting_paths": conflicting_paths,
                         }
 
                 # Detect conflicts with pending updates
-                conflict = self._detect_conflicts(workflow_id, batch)
-                if conflict:
-                    resolution_result = self._resolve_conflict(workflow_id, conflict)
-                    if not resolution_result["success"]:
-                        return resolution_result
+                with self._global_lock:
+                    conflict = self._detect_conflicts(workflow_id, batch)
+                    if conflict:
+                        resolution_result = self._resolve_conflict(workflow_id, conflict)
+                        if not resolution_result["success"]:
+                            return resolution_result
 
                 # Apply updates through base manager
                 try:
-                    # Convert StateUpdate objects back to dicts for base manager
+                    # Convert StateUpdate objects back to dicts for base manager; resolution may have
+                    # dropped some of them from the batch
                     update_dicts = [
                         {"path": update.path, "value": update.value, "operation": update.operation}
-                        for update in state_updates
+                        for update in batch.updates
                     ]
 
                     result = self._base_manager.update(workflow_id, update_dicts)
 
                     if result.get("success", True):
-                        # Update version
+                        # Update version and stamp the written paths with it
                         new_version = self._increment_version(workflow_id, agent_id)
+                        path_versions = self._get_path_versions(workflow_id)
+                        for update in batch.updates:
+                            path_versions.stamp(_path_segments(update.path), new_version.version)
 
-                        # Record in history
-                        self._update_history[workflow_id].append((time.time(), agent_id or "system", state_updates))
+                        with self._global_lock:
+                            # Record in history
+                            self._update_history[workflow_id].append((time.time(), agent_id or "system", batch.updates))
 
-                        # Update stats
-                        self._stats["total_updates"] += 1
-                        update_time = time.time() - start_time
-                        self._stats["average_update_time"] = (
-                            self._stats["average_update_time"] * (self._stats["total_updates"] - 1) + update_time
-                        ) / self._stats["total_updates"]
+                            # Update stats
+                            self._stats["total_updates"] += 1
+                            update_time = time.time() - start_time
+                            self._stats["average_update_time"] = (
+                                self._stats["average_update_time"] * (self._stats["total_updates"] - 1) + update_time
+                            ) / self._stats["total_updates"]
 
                         return {
                             "success": True,
@@ -232,12 +402,16 @@ class ConcurrentStateManager:
             return None
 
         # Get paths affected by new batch
-        new_paths = {update.path for update in new_batch.updates}
+        new_paths = {update.path: _path_segments(update.path) for update in new_batch.updates}
 
-        # Check for path conflicts
+        # Check for path conflicts; a path conflicts with itself, its ancestors and its descendants
         for pending_batch in pending:
-            pending_paths = {update.path for update in pending_batch.updates}
-            conflicting_paths = new_paths.intersection(pending_paths)
+            pending_paths = [_path_segments(update.path) for update in pending_batch.updates]
+            conflicting_paths = {
+                path
+                for path, segments in new_paths.items()
+                if any(_paths_overlap(segments, other) for other in pending_paths)
+            }
 
             if conflicting_paths:
                 return UpdateConflict(
@@ -273,15 +447,27 @@ class ConcurrentStateManager:
         except Exception as e:
             return {"success": False, "error": "RESOLUTION_FAILED", "message": str(e)}
 
+    @staticmethod
+    def _overlaps_any(path: str, paths: set[str]) -> bool:
+        """Check whether a path overlaps any of the given paths."""
+        segments = _path_segments(path)
+        return any(_paths_overlap(segments, _path_segments(other)) for other in paths)
+
     def _merge_updates(self, workflow_id: str, conflict: UpdateConflict) -> dict[str, Any]:
-        """Merge conflicting updates based on merge policy."""
+        """Merge conflicting updates based on merge policy.
+
+        Only updates whose paths overlap a conflicting path are dropped, so
+        writes to disjoint fields of both batches survive the merge.
+        """
         policy = self._conflict_resolution.merge_policy
 
         if policy == "last_writer_wins":
-            # New update takes precedence, remove conflicting paths from pending
+            # New update takes precedence, remove overlapping paths from pending
             original_batch = conflict.original_update
             original_batch.updates = [
-                update for update in original_batch.updates if update.path not in conflict.conflicting_paths
+                update
+                for update in original_batch.updates
+                if not self._overlaps_any(update.path, conflict.conflicting_paths)
             ]
 
             self._stats["conflicts_resolved"] += 1
@@ -292,7 +478,7 @@ class ConcurrentStateManager:
             conflict.conflicting_update.updates = [
                 update
                 for update in conflict.conflicting_update.updates
-                if update.path not in conflict.conflicting_paths
+                if not self._overlaps_any(update.path, conflict.conflicting_paths)
             ]
 
             self._stats["conflicts_resolved"] += 1
@@ -310,7 +496,9 @@ class ConcurrentStateManager:
         # Remove all conflicting updates from pending
         pending = self._pending_updates[workflow_id]
         self._pending_updates[workflow_id] = [
-            batch for batch in pending if not any(update.path in conflict.conflicting_paths for update in batch.updates)
+            batch
+            for batch in pending
+            if not any(self._overlaps_any(update.path, conflict.conflicting_paths) for update in batch.updates)
         ]
 
         self._stats["conflicts_resolved"] += 1
@@ -327,10 +515,15 @@ class ConcurrentStateManager:
         )
 
     def create_checkpoint(self, workflow_id: str) -> dict[str, Any]:
-        """Create a checkpoint of current state for recovery."""
-        lock = self._get_workflow_lock(workflow_id)
+        """Create a checkpoint of current state for recovery.
 
-        with lock:
+        Checkpoints are incremental: each one records the delta since the
+        previous checkpoint and shares the base snapshot of its chain. Every
+        compact_interval checkpoints a new base snapshot is taken, so restoring
+        never replays more than that many deltas.
+        """
+        # The root path overlaps every path, so no update is in flight while this runs
+        with self._get_path_locks(workflow_id).hold([()]):
             try:
                 # Get current raw state structure (not flattened)
                 workflow_state = self._base_manager._states.get(workflow_id)
@@ -342,19 +535,31 @@ class ConcurrentStateManager:
                     }
 
                 # Store the three-tier structure (deep copy to avoid reference issues)
-                import copy
-
-                state_data = {
+                snapshot = {
                     "inputs": copy.deepcopy(workflow_state.inputs),
                     "computed": copy.deepcopy(workflow_state.computed),
                     "state": copy.deepcopy(workflow_state.state),
                 }
-
                 version = self._get_version(workflow_id)
 
+                chain = self._checkpoint_chains.get(workflow_id)
+                if chain is None or len(chain.deltas) >= self._compact_interval:
+                    chain = CheckpointChain(base=snapshot, base_version=version.version, head=snapshot)
+                    self._checkpoint_chains[workflow_id] = chain
+                    size_bytes = _estimate_size(snapshot)
+                else:
+                    delta = compute_delta(chain.head, snapshot)
+                    chain.deltas.append(delta)
+                    chain.head = snapshot
+                    chain.updated_at = time.time()
+                    size_bytes = _estimate_size(delta)
+
                 checkpoint = {
                     "workflow_id": workflow_id,
-                    "state": state_data,
+                    "base": chain.base,
+                    "base_version": chain.base_version,
+                    "deltas": list(chain.deltas),
+                    "size_bytes": size_bytes,
                     "version": version.version,
                     "created_at": time.time(),
                     "created_by": "system",
@@ -365,14 +570,45 @@ class ConcurrentStateManager:
             except Exception as e:
                 return {"success": False, "error": "CHECKPOINT_FAILED", "message": str(e)}
 
+    def materialize_checkpoint(self, checkpoint: dict[str, Any]) -> dict[str, Any]:
+        """Rebuild the three-tier state stored in a checkpoint.
+
+        Args:
+            checkpoint: Checkpoint from create_checkpoint, or a checkpoint
+                carrying its full state under "state"
+
+        Returns:
+            Dict with inputs, computed and state tiers; a fresh copy for
+            incremental checkpoints
+        """
+        if "state" in checkpoint:
+            return checkpoint["state"]
+        return apply_delta(checkpoint["base"], [op for delta in checkpoint["deltas"] for op in delta])
+
+    def get_checkpoint_stats(self, workflow_id: str) -> dict[str, Any]:
+        """Report the memory held by a workflow's checkpoints and update history.
+
+        Sizes are estimated from the serialized length of the stored data.
+        """
+        with self._global_lock:
+            chain = self._checkpoint_chains.get(workflow_id)
+            history = self._update_history.get(workflow_id, ())
+            return {
+                "base_version": chain.base_version if chain else None,
+                "base_size_bytes": _estimate_size(chain.base) if chain else 0,
+                "delta_count": len(chain.deltas) if chain else 0,
+                "delta_size_bytes": sum(_estimate_size(delta) for delta in chain.deltas) if chain else 0,
+                "history_entries": len(history),
+                "history_depth": self._history_depth,
+            }
+
     def restore_from_checkpoint(self, workflow_id: str, checkpoint: dict[str, Any]) -> dict[str, Any]:
         """Restore state from a checkpoint."""
-        lock = self._get_workflow_lock(workflow_id)
-
-        with lock:
+        # The root path overlaps every path, so no update is in flight while this runs
+        with self._get_path_locks(workflow_id).hold([()]):
             try:
                 # Clear current state and replace with checkpoint
-                checkpoint_state = checkpoint["state"]
+                checkpoint_state = self.materialize_checkpoint(checkpoint)
 
                 # Remove version info if present
                 if "__version__" in checkpoint_state:
@@ -415,6 +651,8 @@ class ConcurrentStateManager:
                     self._versions[workflow_id] = StateVersion(
                         version=checkpoint["version"] + 1, updated_at=time.time(), updated_by="checkpoint_restore"
                     )
+                # Every path was replaced, so stale expected versions conflict on any path
+                self._get_path_versions(workflow_id).stamp((), checkpoint["version"] + 1)
 
                 return {
                     "success": True,
@@ -427,7 +665,7 @@ class ConcurrentStateManager:
 
     def get_update_history(self, workflow_id: str, limit: int = 50) -> list[dict[str, Any]]:
         """Get recent update history for a workflow."""
-        history = self._update_history.get(workflow_id, [])
+        history = list(self._update_history.get(workflow_id, ()))
         recent = history[-limit:] if limit > 0 else history
 
         return [
@@ -449,15 +687,21 @@ class ConcurrentStateManager:
     def cleanup_old_data(self, max_age_seconds: int = 3600) -> dict[str, int]:
         """Clean up old data to prevent memory leaks."""
         current_time = time.time()
-        cleanup_stats = {"workflows_cleaned": 0, "history_entries_removed": 0, "pending_updates_removed": 0}
+        cleanup_stats = {
+            "workflows_cleaned": 0,
+            "history_entries_removed": 0,
+            "pending_updates_removed": 0,
+            "checkpoint_chains_removed": 0,
+        }
 
         with self._global_lock:
             # Clean up old history entries
             for workflow_id in list(self._update_history.keys()):
                 old_count = len(self._update_history[workflow_id])
-                self._update_history[workflow_id] = [
-                    entry for entry in self._update_history[workflow_id] if current_time - entry[0] < max_age_seconds
-                ]
+                self._update_history[workflow_id] = deque(
+                    (entry for entry in self._update_history[workflow_id] if current_time - entry[0] < max_age_seconds),
+                    maxlen=self._history_depth,
+                )
                 new_count = len(self._update_history[workflow_id])
                 cleanup_stats["history_entries_removed"] += old_count - new_count
 
@@ -479,6 +723,12 @@ class ConcurrentStateManager:
                 if not self._pending_updates[workflow_id]:
                     del self._pending_updates[workflow_id]
 
+            # Drop checkpoint chains that have not been extended recently
+            for workflow_id, chain in list(self._checkpoint_chains.items()):
+                if current_time - chain.updated_at >= max_age_seconds:
+                    del self._checkpoint_chains[workflow_id]
+                    cleanup_stats["checkpoint_chains_removed"] += 1
+
         return cleanup_stats
 
     def configure_conflict_resolution(
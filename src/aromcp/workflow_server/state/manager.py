@@ -5,13 +5,95 @@ Manages workflow state with flattened views, path validation, and atomic updates
 Handles cascading transformations when dependencies change.
 """
 
-import copy
+import hashlib
+import json
+import re
 import threading
+import time
+from dataclasses import dataclass
 from typing import Any
 
+from ..monitoring.collectors import TransformationMetricsCollector
+from ..monitoring.tracing import get_tracer
+from ..persistence.backend import PersistenceBackend
 from ..workflow.context import ExecutionContext
 from .models import ComputedFieldError, InvalidPathError, StateSchema, WorkflowState
-from .transformer import CascadingUpdateCalculator, DependencyResolver, TransformationEngine
+from .transformer import CascadingUpdateCalculator, DependencyResolver, TransformationEngine, TransformResult
+
+_MISSING = object()
+_tracer = get_tracer()
+_NO_FALLBACK = object()
+
+# Whether a transform reads "input" as a standalone variable, and whether it uses it directly
+# (like "input.filter") rather than through array access (like "input[0]")
+_INPUT_VARIABLE = re.compile(r"\binput\b")
+_INPUT_MEMBER_ACCESS = re.compile(r"\binput\.[a-zA-Z]")
+
+
+class UndoLog:
+    """
+    Records the prior value of every location an update touches
+
+    Used instead of deep-copying the whole state before an atomic update: only the
+    touched (container, key) pairs are remembered, and rollback restores them in
+    place in reverse order. Cost is proportional to the size of the update, not the
+    size of the state.
+    """
+
+    def __init__(self):
+        self._entries: list[tuple[Any, Any, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(self, container: dict[str, Any] | list[Any], key: Any) -> None:
+        """Remember the current value at container[key] (or that it is absent)"""
+        try:
+            old_value = container[key]
+        except KeyError:
+            old_value = _MISSING
+        self._entries.append((container, key, old_value))
+
+    def record_append(self, target: list[Any]) -> None:
+        """Remember the current length of a list that is about to grow"""
+        self._entries.append((target, None, len(target)))
+
+    def record_merge(self, target: dict[str, Any], keys: Any) -> None:
+        """Remember the current values of the keys a merge will overwrite"""
+        for key in keys:
+            self.record(target, key)
+
+    def rollback(self) -> None:
+        """Restore every recorded location, newest first"""
+        while self._entries:
+            container, key, old_value = self._entries.pop()
+            if key is None and isinstance(container, list):
+                del container[old_value:]
+            elif old_value is _MISSING:
+                container.pop(key, None)
+            else:
+                container[key] = old_value
+
+
+def _fingerprint(values: list[Any]) -> bytes:
+    """Hash a computed field's resolved input values"""
+    try:
+        encoded = json.dumps(values, default=repr, separators=(",", ":"))
+    except ValueError:
+        # Circular references
+        encoded = repr(values)
+    return hashlib.blake2b(encoded.encode(), digest_size=16).digest()
+
+
+@dataclass
+class _PendingComputation:
+    """A computed field prepared for batched evaluation"""
+
+    field_name: str
+    transform: str
+    fingerprint: bytes
+    input_value: Any
+    fallback_input: Any = _NO_FALLBACK  # Legacy individual inputs to retry with if input_value fails
 
 
 class StateManager:
@@ -25,16 +107,25 @@ class StateManager:
     - Cascading transformations
     """
 
-    def __init__(self, schema: dict[str, Any] | StateSchema | None = None):
+    def __init__(
+        self,
+        schema: dict[str, Any] | StateSchema | None = None,
+        persistence: PersistenceBackend | None = None,
+        transformation_metrics: TransformationMetricsCollector | None = None,
+    ):
         """
         Initialize state manager
 
         Args:
             schema: Optional schema defining computed fields and validation rules
+            persistence: Optional backend that durably records every successful update
+            transformation_metrics: Optional collector receiving per-transform timings
         """
         self._states: dict[str, WorkflowState] = {}
         self._locks: dict[str, threading.Lock] = {}
         self._global_lock = threading.Lock()
+        self.persistence = persistence
+        self.transformation_metrics = transformation_metrics
 
         # Set up schema and transformation components
         if isinstance(schema, dict):
@@ -76,6 +167,26 @@ class StateManager:
                 self._locks[workflow_id] = threading.Lock()
             return self._locks[workflow_id]
 
+    def remove_workflow(self, workflow_id: str) -> bool:
+        """
+        Drop a workflow's in-memory state, lock and status
+
+        Persisted records are left untouched, so the workflow can still be
+        restored from the persistence backend.
+
+        Args:
+            workflow_id: Workflow to remove
+
+        Returns:
+            True if the workflow had in-memory state
+        """
+        with self._global_lock:
+            self._locks.pop(workflow_id, None)
+            removed = self._states.pop(workflow_id, None) is not None
+        if hasattr(self, "_workflow_statuses"):
+            self._workflow_statuses.pop(workflow_id, None)
+        return removed
+
     def _get_or_create_state(self, workflow_id: str) -> WorkflowState:
         """Get existing state or create new one with defaults"""
         if workflow_id not in self._states:
@@ -125,9 +236,10 @@ class StateManager:
         This preserves the original object hierarchy rather than creating
         dot-separated keys, which maintains JavaScript-like property access.
         """
-        # For now, just return the dictionary as-is to maintain object structure
+        # Return the dictionary as-is to maintain object structure
         # This allows access like state["user"]["name"] rather than state["user.name"]
-        return d.copy()
+        # No copy is made: callers merge tiers into a fresh top-level dict
+        return d
 
     def validate_update_path(self, path: str) -> bool:
         """
@@ -211,7 +323,7 @@ class StateManager:
             state = self._states[workflow_id]
 
             # Ensure all computed fields are up to date
-            self._ensure_computed_fields_current(state)
+            self._ensure_computed_fields_current(state, workflow_id)
 
             # Return nested structure with backward compatibility
             return {
@@ -221,6 +333,37 @@ class StateManager:
                 "raw": dict(state.inputs),  # Backward compatibility alias
             }
 
+    def read_changes(
+        self, workflow_id: str, since_version: int | None = None
+    ) -> tuple[int, dict[str, Any], list[tuple[str, str]] | None]:
+        """
+        Read workflow state together with the top-level keys written since a version
+
+        Args:
+            workflow_id: Unique workflow identifier
+            since_version: State version a previous call returned, or None
+
+        Returns:
+            (version, state, changed): the current state version, the nested state without the
+            raw alias, and the (tier, top-level key) pairs written after since_version. changed
+            is None when since_version is None or predates the workflow's current state object.
+
+        Raises:
+            KeyError: If workflow doesn't exist
+        """
+        lock = self._get_workflow_lock(workflow_id)
+
+        with lock:
+            if workflow_id not in self._states:
+                raise KeyError(f"Workflow '{workflow_id}' not found")
+
+            state = self._states[workflow_id]
+            self._ensure_computed_fields_current(state, workflow_id)
+
+            changed = state.changed_since(since_version) if since_version is not None else None
+            nested = {"inputs": dict(state.inputs), "computed": dict(state.computed), "state": dict(state.state)}
+            return state.version, nested, changed
+
     def get_state(self, workflow_id: str | None = None) -> dict[str, Any]:
         """
         Get the current state for a workflow or return default empty state.
@@ -312,8 +455,11 @@ class StateManager:
                 if not self.validate_update_path(path):
                     raise InvalidPathError(f"Invalid update path: '{path}'")
 
-            # Create backup for atomic operation
-            original_state = copy.deepcopy(state)
+            # Record prior values of touched paths only for atomic rollback
+            undo = UndoLog()
+            original_computed = dict(state.computed)
+            original_fingerprints = dict(state.computed_fingerprints)
+            original_stale = None if state.stale_computed is None else set(state.stale_computed)
 
             try:
                 # Apply all updates
@@ -327,48 +473,89 @@ class StateManager:
                     if "." in path:
                         scope = path.split(".", 1)[0]
                         if scope in ("this", "global"):
-                            self._apply_scoped_update(state, path, value, operation, context)
+                            self._apply_scoped_update(state, path, value, operation, context, undo)
                         else:
                             # Legacy path handling
-                            self._apply_single_update(state, path, value, operation)
+                            self._apply_single_update(state, path, value, operation, undo)
                     else:
-                        self._apply_single_update(state, path, value, operation)
+                        self._apply_single_update(state, path, value, operation, undo)
 
                     changed_paths.append(path)
+                    self._stamp_path(state, path)
 
                 # Trigger cascading transformations if schema is defined
                 if self._cascade_calculator:
-                    # Normalize paths for cascade calculator
-                    normalized_paths = []
-                    for path in changed_paths:
-                        if "." not in path:
-                            # Simple field name - add as both state and potential input
-                            normalized_paths.extend([f"state.{path}", path])
-                        else:
-                            # Prefixed path - add both prefixed and simple form for dependency tracking
-                            normalized_paths.append(path)
-                            if path.startswith("state."):
-                                # For state paths, also add the simple field name and this. prefix
-                                field_name = path.split(".", 1)[1]
-                                normalized_paths.extend([field_name, f"this.{field_name}"])
-                            elif path.startswith("inputs."):
-                                # For input paths, add the simple field name
-                                field_name = path.split(".", 1)[1]
-                                normalized_paths.append(field_name)
-                    self._update_computed_fields(state, normalized_paths)
-
-                # Store updated state
-                self._states[workflow_id] = state
+                    self._update_computed_fields(state, changed_paths, workflow_id)
+
+                # Record the delta durably; global variables live in the ExecutionContext, not here
+                if self.persistence is not None:
+                    persisted_updates = [update for update in updates if not update["path"].startswith("global.")]
+                    self.persistence.record_update(workflow_id, persisted_updates, state)
 
                 # Return flattened view
                 return self.get_flattened_view(state)
 
             except Exception as e:
-                # Restore original state on any failure
-                self._states[workflow_id] = original_state
+                # Restore original state in place on any failure
+                undo.rollback()
+                state.computed.clear()
+                state.computed.update(original_computed)
+                state.computed_fingerprints = original_fingerprints
+                state.stale_computed = original_stale
                 raise e
 
-    def _apply_single_update(self, state: WorkflowState, path: str, value: Any, operation: str) -> None:
+    def restore(self, workflow_id: str) -> bool:
+        """
+        Rebuild a workflow's state from the persistence backend
+
+        Loads the latest snapshot and replays the deltas recorded after it.
+        Computed fields are recalculated on the next read.
+
+        Args:
+            workflow_id: Workflow to restore
+
+        Returns:
+            True if persisted state was found and restored
+        """
+        if self.persistence is None:
+            return False
+
+        persisted = self.persistence.load_state(workflow_id)
+        if persisted is None:
+            return False
+
+        lock = self._get_workflow_lock(workflow_id)
+
+        with lock:
+            snapshot = persisted.snapshot or {}
+            state = WorkflowState(
+                inputs=snapshot.get("inputs", {}),
+                state=snapshot.get("state", {}),
+                computed=snapshot.get("computed", {}),
+            )
+            for _, updates in persisted.deltas:
+                for update in updates:
+                    path = update["path"]
+                    operation = update.get("operation", "set")
+                    if path.startswith("this."):
+                        self._apply_scoped_update(state, path, update["value"], operation)
+                    else:
+                        self._apply_single_update(state, path, update["value"], operation)
+            self._states[workflow_id] = state
+
+        return True
+
+    @staticmethod
+    def _stamp_path(state: WorkflowState, path: str) -> None:
+        """Stamp the top-level key an update path writes; global variables live outside the state"""
+        scope, _, field_path = path.partition(".")
+        tier = {"this": "state", "raw": "inputs"}.get(scope, scope)
+        if tier in ("inputs", "state") and field_path:
+            state.stamp(tier, field_path.split(".", 1)[0])
+
+    def _apply_single_update(
+        self, state: WorkflowState, path: str, value: Any, operation: str, undo: UndoLog | None = None
+    ) -> None:
         """
         Apply a single update operation to state
 
@@ -377,6 +564,7 @@ class StateManager:
             path: Path to update (e.g., "inputs.counter", "raw.counter", "email")
             value: Value to apply
             operation: Operation type ("set", "append", "increment", "merge")
+            undo: Optional UndoLog recording prior values for rollback
         """
         # Path must have tier prefix
         if "." not in path:
@@ -415,6 +603,8 @@ class StateManager:
                 else:
                     # Regular dictionary key access
                     if part not in current:
+                        if undo is not None:
+                            undo.record(current, part)
                         current[part] = {}
                     elif not isinstance(current[part], (dict, list)):
                         raise ValueError(f"Cannot set nested property on non-object: {part}")
@@ -434,16 +624,26 @@ class StateManager:
                     raise ValueError(f"Cannot access array index {final_key} on non-array")
                 if array_index >= len(current):
                     raise ValueError(f"Array index {final_key} out of bounds")
+                if undo is not None:
+                    undo.record(current, array_index)
                 current[array_index] = value
             else:
+                if undo is not None:
+                    undo.record(current, final_key)
                 current[final_key] = value
         elif operation == "append":
             if final_key not in current:
+                if undo is not None:
+                    undo.record(current, final_key)
                 current[final_key] = []
             if not isinstance(current[final_key], list):
                 raise ValueError(f"Cannot append to non-list: {final_key}")
+            if undo is not None:
+                undo.record_append(current[final_key])
             current[final_key].append(value)
         elif operation == "increment":
+            if undo is not None:
+                undo.record(current, final_key)
             if final_key not in current:
                 current[final_key] = 0
             if not isinstance(current[final_key], int | float):
@@ -453,15 +653,25 @@ class StateManager:
             current[final_key] += increment_value
         elif operation == "merge":
             if final_key not in current:
+                if undo is not None:
+                    undo.record(current, final_key)
                 current[final_key] = {}
             if not isinstance(current[final_key], dict) or not isinstance(value, dict):
                 raise ValueError(f"Cannot merge non-objects: {final_key}")
+            if undo is not None:
+                undo.record_merge(current[final_key], value)
             current[final_key].update(value)
         else:
             raise ValueError(f"Unknown operation: {operation}")
 
     def _apply_scoped_update(
-        self, state: WorkflowState, path: str, value: Any, operation: str, context: ExecutionContext | None = None
+        self,
+        state: WorkflowState,
+        path: str,
+        value: Any,
+        operation: str,
+        context: ExecutionContext | None = None,
+        undo: UndoLog | None = None,
     ) -> None:
         """
         Apply a scoped update operation to the appropriate storage location
@@ -472,6 +682,7 @@ class StateManager:
             value: Value to apply
             operation: Operation type ("set", "append", "increment", "merge")
             context: ExecutionContext for global variable access
+            undo: Optional UndoLog recording prior workflow state values for rollback
         """
         if "." not in path:
             raise InvalidPathError(f"Invalid scoped path: {path}")
@@ -480,7 +691,7 @@ class StateManager:
 
         if scope == "this":
             # Route to workflow state
-            self._apply_nested_update(state.state, field_path, value, operation)
+            self._apply_nested_update(state.state, field_path, value, operation, undo)
         elif scope == "global":
             # Route to ExecutionContext global variables
             if context is None:
@@ -492,7 +703,9 @@ class StateManager:
         else:
             raise InvalidPathError(f"Unknown scope: {scope}")
 
-    def _apply_nested_update(self, target_dict: dict[str, Any], field_path: str, value: Any, operation: str) -> None:
+    def _apply_nested_update(
+        self, target_dict: dict[str, Any], field_path: str, value: Any, operation: str, undo: UndoLog | None = None
+    ) -> None:
         """
         Apply update operation to nested dictionary structure
 
@@ -501,6 +714,7 @@ class StateManager:
             field_path: Nested field path (e.g., "user.name", "counter")
             value: Value to apply
             operation: Operation type ("set", "append", "increment", "merge")
+            undo: Optional UndoLog recording prior values for rollback
         """
         # Handle nested paths
         if "." in field_path:
@@ -510,6 +724,8 @@ class StateManager:
 
             for part in path_parts[:-1]:
                 if part not in current:
+                    if undo is not None:
+                        undo.record(current, part)
                     current[part] = {}
                 elif not isinstance(current[part], dict):
                     raise ValueError(f"Cannot set nested property on non-object: {part}")
@@ -522,14 +738,22 @@ class StateManager:
 
         # Apply operation
         if operation == "set":
+            if undo is not None:
+                undo.record(current, final_key)
             current[final_key] = value
         elif operation == "append":
             if final_key not in current:
+                if undo is not None:
+                    undo.record(current, final_key)
                 current[final_key] = []
             if not isinstance(current[final_key], list):
                 raise ValueError(f"Cannot append to non-list: {final_key}")
+            if undo is not None:
+                undo.record_append(current[final_key])
             current[final_key].append(value)
         elif operation == "increment":
+            if undo is not None:
+                undo.record(current, final_key)
             if final_key not in current:
                 current[final_key] = 0
             if not isinstance(current[final_key], int | float):
@@ -539,118 +763,257 @@ class StateManager:
             current[final_key] += increment_value
         elif operation == "merge":
             if final_key not in current:
+                if undo is not None:
+                    undo.record(current, final_key)
                 current[final_key] = {}
             if not isinstance(current[final_key], dict) or not isinstance(value, dict):
                 raise ValueError(f"Cannot merge non-objects: {final_key}")
+            if undo is not None:
+                undo.record_merge(current[final_key], value)
             current[final_key].update(value)
         else:
             raise ValueError(f"Unknown operation: {operation}")
 
-    def _ensure_computed_fields_current(self, state: WorkflowState) -> None:
+    def _ensure_computed_fields_current(self, state: WorkflowState, workflow_id: str | None = None) -> None:
         """
-        Ensure all computed fields are up to date
+        Bring stale computed fields up to date
 
-        This method computes all defined computed fields regardless of what changed.
-        Should be called when reading state to ensure computed fields are current.
+        Only fields marked stale since the last refresh are considered (every field for a
+        new or restored state), and of those only fields whose resolved inputs changed
+        are recomputed. Fields whose transform failed stay stale, so the next read
+        retries them. Should be called when reading state.
 
         Args:
             state: WorkflowState to update computed fields for
+            workflow_id: Optional workflow ID used to label transformation metrics
         """
         if not self._cascade_calculator:
             return
 
-        # Get all computed field names
-        computed_fields = list(self._cascade_calculator.dependencies.keys())
-
-        # Compute each field
-        for field_name in computed_fields:
-            try:
-                self._compute_field(state, field_name)
-            except Exception as e:
-                # Handle errors based on field configuration
-                field_info = self._cascade_calculator.dependencies[field_name]
-                self._handle_computation_error(state, field_name, field_info, e)
-
-    def _update_computed_fields(self, state: WorkflowState, changed_paths: list[str]) -> None:
+        stale = state.stale_computed
+        dependencies = self._cascade_calculator.dependencies
+        computed_fields = list(dependencies.keys())
+        if stale is not None:
+            # Fields without declared dependencies can't be tracked, so they are always refreshed
+            computed_fields = [
+                field_name
+                for field_name in computed_fields
+                if field_name in stale or not dependencies[field_name]["dependencies"]
+            ]
+        state.stale_computed = self._compute_fields(state, computed_fields, workflow_id, force=False)
+
+    def _update_computed_fields(
+        self, state: WorkflowState, changed_paths: list[str], workflow_id: str | None = None
+    ) -> None:
         """
-        Update computed fields affected by changed paths
+        Mark computed fields affected by changed paths stale and refresh them
 
         Args:
             state: WorkflowState to update
             changed_paths: List of paths that changed
+            workflow_id: Optional workflow ID used to label transformation metrics
         """
         if not self._cascade_calculator:
             return
 
-        affected_fields = self._cascade_calculator.get_affected_fields(changed_paths)
+        if state.stale_computed is not None:
+            state.stale_computed.update(self._cascade_calculator.get_affected_fields(changed_paths))
 
-        for field_name in affected_fields:
+        # Refreshing here rather than on the next read keeps update()'s contract: it returns the
+        # flattened view including computed values, and rolls the update back if a transform throws
+        self._ensure_computed_fields_current(state, workflow_id)
+
+    def _compute_fields(
+        self, state: WorkflowState, field_names: list[str], workflow_id: str | None = None, force: bool = True
+    ) -> set[str]:
+        """
+        Compute several fields, evaluating each dependency level as one transformation batch
+
+        Fields in the same level do not depend on each other, so their transforms run in a
+        single TransformationEngine.execute_batch call; the next level sees their results.
+
+        Args:
+            state: WorkflowState containing input values
+            field_names: Computed field names in dependency order
+            workflow_id: Optional workflow ID used to label transformation metrics
+            force: Recompute even fields whose input fingerprints are unchanged
+
+        Returns:
+            Names of the fields whose computation failed
+        """
+        failed: set[str] = set()
+        for level in self._group_by_dependency_level(field_names):
+            batch: list[_PendingComputation] = []
+            for field_name in level:
+                try:
+                    self._compute_field(state, field_name, batch, force)
+                except Exception as e:
+                    # Handle errors based on field configuration
+                    failed.add(field_name)
+                    state.computed_fingerprints.pop(field_name, None)
+                    field_info = self._cascade_calculator.dependencies[field_name]
+                    self._handle_computation_error(state, field_name, field_info, e)
+            if not batch:
+                continue
+
+            results = self._execute_transforms([(pending.transform, pending.input_value) for pending in batch])
+            for pending, result in zip(batch, results, strict=True):
+                value, error, duration_ms = result.value, result.error, result.duration_ms
+                if error is not None and pending.fallback_input is not _NO_FALLBACK:
+                    # Fallback to legacy behavior for expressions that expect individual inputs
+                    retry = self._execute_transforms([(pending.transform, pending.fallback_input)])[0]
+                    value, error, duration_ms = retry.value, retry.error, duration_ms + retry.duration_ms
+
+                if self.transformation_metrics is not None:
+                    self.transformation_metrics.record_transformation(
+                        workflow_id or "default", pending.field_name, duration_ms, error is None
+                    )
+
+                if error is None:
+                    state.computed[pending.field_name] = value
+                    state.stamp("computed", pending.field_name)
+                    state.computed_fingerprints[pending.field_name] = pending.fingerprint
+                else:
+                    # No fingerprint, so the field is retried even if its inputs stay the same
+                    failed.add(pending.field_name)
+                    state.computed_fingerprints.pop(pending.field_name, None)
+                    field_info = self._cascade_calculator.dependencies[pending.field_name]
+                    self._handle_computation_error(state, pending.field_name, field_info, error)
+        return failed
+
+    def _execute_transforms(self, requests: list[tuple[str, Any]]) -> list[TransformResult]:
+        """
+        Run (transform, input) pairs, batching them when the engine evaluates JavaScript
+
+        Only the JavaScript engine pays a per-call marshalling cost, so other engines run
+        the transforms one at a time through execute().
+
+        Args:
+            requests: (transform, input_value) pairs
+
+        Returns:
+            One TransformResult per request, in order
+        """
+        with _tracer.span("transform_batch", "transform", transforms=len(requests)):
+            if self._transformer.engine_type == "pythonmonkey":
+                return self._transformer.execute_batch(requests)
+            return self._execute_each(requests)
+
+    def _execute_each(self, requests: list[tuple[str, Any]]) -> list[TransformResult]:
+        """Run (transform, input) pairs one at a time through execute(), timing each"""
+        results = []
+        for transform, input_value in requests:
+            start = time.perf_counter()
             try:
-                self._compute_field(state, field_name)
+                result = TransformResult(value=self._transformer.execute(transform, input_value))
             except Exception as e:
-                # Handle errors based on field configuration
-                field_info = self._cascade_calculator.dependencies[field_name]
-                # print(f"DEBUG: Computation error for {field_name}: {e}")
-                self._handle_computation_error(state, field_name, field_info, e)
+                result = TransformResult(error=e)
+            result.duration_ms = (time.perf_counter() - start) * 1000
+            results.append(result)
+        return results
+
+    def _group_by_dependency_level(self, field_names: list[str]) -> list[list[str]]:
+        """
+        Split fields in dependency order into levels of mutually independent fields
+
+        Args:
+            field_names: Computed field names in dependency order
 
-    def _compute_field(self, state: WorkflowState, field_name: str) -> None:
+        Returns:
+            Levels in evaluation order; each field follows every field it depends on
+        """
+        dependencies = self._cascade_calculator.dependencies
+        levels: dict[str, int] = {}
+        grouped: list[list[str]] = []
+        for field_name in field_names:
+            level = 0
+            for dep_path in dependencies[field_name]["dependencies"]:
+                # Computed dependencies may be written as "computed.x", "this.x" or bare "x"
+                dep_name = dep_path.split(".", 1)[1] if dep_path.startswith(("computed.", "this.")) else dep_path
+                if dep_name in levels:
+                    level = max(level, levels[dep_name] + 1)
+            levels[field_name] = level
+            if level == len(grouped):
+                grouped.append([])
+            grouped[level].append(field_name)
+        return grouped
+
+    def _compute_field(
+        self,
+        state: WorkflowState,
+        field_name: str,
+        batch: list[_PendingComputation] | None = None,
+        force: bool = True,
+    ) -> None:
         """
         Compute value for a single computed field
 
         Args:
             state: WorkflowState containing input values
             field_name: Name of computed field to update
+            batch: Optional list to queue the prepared transformation on instead of running it
+            force: Recompute even if the field's resolved inputs are unchanged since the last computation
         """
         field_info = self._cascade_calculator.dependencies[field_name]
         dependencies = field_info["dependencies"]
         transform = field_info["transform"]
 
-        # Build context with all current state for JavaScript expressions
-        # This provides access to 'this' context in expressions like "this.firstName + ' ' + this.lastName"
-        # IMPORTANT: Get fresh context each time to include recently computed fields
-        context = self.get_flattened_view(state)
-
-        # Remove the current field from context to avoid stale data
-        # When computing displayName, we don't want the old displayName value in the context
-        if field_name in context:
-            del context[field_name]
-
         # For backward compatibility, also gather individual input values
         inputs = []
         for dep_path in dependencies:
             value = self._get_value_from_path(state, dep_path)
             inputs.append(value)
+        legacy_input = inputs[0] if len(inputs) == 1 else inputs
+
+        # Skip fields whose resolved inputs hash the same as when they were last computed.
+        # Bare dependency names resolve like the flattened view: computed > inputs > state
+        fingerprint = _fingerprint(
+            [
+                value if "." in dep_path else self._get_flattened_value(state, dep_path)
+                for dep_path, value in zip(dependencies, inputs, strict=True)
+            ]
+        )
+        if not force and dependencies and state.computed_fingerprints.get(field_name) == fingerprint:
+            return
 
         # Execute transformation with appropriate input
         # Check if expression uses 'input' as a standalone variable (not as substring)
-        import re
-
-        uses_input_variable = bool(re.search(r"\binput\b", transform))
-
-        if uses_input_variable:
-            # Transform uses 'input' variable
-            # Check if expression uses input directly (like "input.filter") vs array access (like "input[0]")
-            uses_input_directly = bool(re.search(r"\binput\.[a-zA-Z]", transform))
-
+        if _INPUT_VARIABLE.search(transform):
             # For single dependency with direct input usage, pass value directly
             # For array access or multiple dependencies, pass the array
-            if len(inputs) == 1 and uses_input_directly:
-                result = self._transformer.execute(transform, inputs[0])
+            if len(inputs) == 1 and _INPUT_MEMBER_ACCESS.search(transform):
+                pending = _PendingComputation(field_name, transform, fingerprint, inputs[0])
             else:
-                result = self._transformer.execute(transform, inputs)
+                pending = _PendingComputation(field_name, transform, fingerprint, inputs)
         else:
-            # Expression uses 'this' or other context - pass full context
-            try:
-                result = self._transformer.execute(transform, context)
-            except Exception:
-                # Fallback to legacy behavior for expressions that expect individual inputs
-                if len(inputs) == 1:
-                    result = self._transformer.execute(transform, inputs[0])
-                else:
-                    result = self._transformer.execute(transform, inputs)
+            # Build context with all current state for JavaScript expressions
+            # This provides access to 'this' context in expressions like "this.firstName + ' ' + this.lastName"
+            # IMPORTANT: Get fresh context each time to include recently computed fields
+            context = self.get_flattened_view(state)
+
+            # Remove the current field from context to avoid stale data
+            # When computing displayName, we don't want the old displayName value in the context
+            context.pop(field_name, None)
+
+            # Expression uses 'this' or other context - pass full context, falling back to
+            # individual inputs for legacy expressions
+            pending = _PendingComputation(field_name, transform, fingerprint, context, legacy_input)
+
+        if batch is not None:
+            batch.append(pending)
+            return
+
+        try:
+            result = self._transformer.execute(transform, pending.input_value)
+        except Exception:
+            if pending.fallback_input is _NO_FALLBACK:
+                raise
+            result = self._transformer.execute(transform, pending.fallback_input)
 
         # Store result
         state.computed[field_name] = result
+        state.stamp("computed", field_name)
+        state.computed_fingerprints[field_name] = fingerprint
 
     def _get_value_from_path(self, state: WorkflowState, path: str) -> Any:
         """
@@ -694,6 +1057,13 @@ class StateManager:
 
         return current
 
+    def _get_flattened_value(self, state: WorkflowState, name: str) -> Any:
+        """Get a top-level value by bare name with flattened view precedence"""
+        for tier in (state.computed, state.inputs, state.state):
+            if name in tier:
+                return tier[name]
+        return None
+
     def _handle_computation_error(
         self, state: WorkflowState, field_name: str, field_info: dict[str, Any], error: Exception
     ) -> None:
@@ -707,6 +1077,8 @@ class StateManager:
             error: Exception that occurred
         """
         on_error = field_info.get("on_error", "use_fallback")
+        if on_error != "propagate":
+            state.stamp("computed", field_name)
 
         if on_error == "use_fallback":
             fallback = field_info.get("fallback", None)
@@ -786,7 +1158,7 @@ class StateManager:
         """Get flattened state view (alias for get_flattened_view)."""
         state = self._get_or_create_state(workflow_id)
         # Ensure all computed fields are up to date
-        self._ensure_computed_fields_current(state)
+        self._ensure_computed_fields_current(state, workflow_id)
         return self.get_flattened_view(state)
 
     def update_state(self, updates: list[dict[str, Any]], workflow_id: str = "default") -> dict[str, Any]:
@@ -795,13 +1167,7 @@ class StateManager:
 
     def _process_computed_fields(self, state: WorkflowState, field_names: list[str]) -> None:
         """Process computed fields in the given order."""
-        for field_name in field_names:
-            try:
-                self._compute_field(state, field_name)
-            except Exception as e:
-                # Handle errors based on field configuration
-                field_info = self._cascade_calculator.dependencies[field_name]
-                self._handle_computation_error(state, field_name, field_info, e)
+        self._compute_fields(state, field_names)
 
     def _recalculate_computed_fields(self, workflow_id: str = "default") -> None:
         """Recalculate all computed fields for a workflow."""
@@ -4,9 +4,13 @@ State models for MCP Workflow System
 Defines the core data structures for the three-tier state model and computed field definitions.
 """
 
+import itertools
 from dataclasses import dataclass, field
 from typing import Any
 
+# Write stamps are drawn from one counter so versions of replaced states never repeat
+_write_versions = itertools.count(1)
+
 
 @dataclass
 class WorkflowState:
@@ -22,6 +26,14 @@ class WorkflowState:
     state: dict[str, Any] = field(default_factory=dict)
     computed: dict[str, Any] = field(default_factory=dict)
 
+    # Fingerprint of each computed field's resolved inputs when it was last computed
+    computed_fingerprints: dict[str, bytes] = field(default_factory=dict, repr=False, compare=False)
+    # Computed fields whose inputs may have changed since; None means every field
+    stale_computed: set[str] | None = field(default=None, repr=False, compare=False)
+    # Version of the latest write, and the version stamped on each written (tier, top-level key)
+    version: int = field(default_factory=lambda: next(_write_versions), repr=False, compare=False)
+    key_versions: dict[tuple[str, str], int] = field(default_factory=dict, repr=False, compare=False)
+
     def __post_init__(self):
         """Ensure all tiers are dictionaries"""
         if not isinstance(self.inputs, dict):
@@ -30,6 +42,24 @@ class WorkflowState:
             self.state = {}
         if not isinstance(self.computed, dict):
             self.computed = {}
+        # Writes before this state object existed are unknown to it
+        self.base_version = self.version
+
+    def stamp(self, tier: str, key: str) -> None:
+        """Record a write to a top-level key of a tier"""
+        self.version = next(_write_versions)
+        self.key_versions[(tier, key)] = self.version
+
+    def changed_since(self, version: int) -> list[tuple[str, str]] | None:
+        """
+        List the (tier, top-level key) pairs written after a version
+
+        Returns:
+            The written keys, or None if the version predates this state object
+        """
+        if version < self.base_version:
+            return None
+        return [key for key, stamp in self.key_versions.items() if stamp > version]
 
 
 @dataclass
@@ -4,15 +4,67 @@ Transformation engine for MCP Workflow System
 Implements JavaScript expression evaluation, dependency resolution, and cascading updates.
 """
 
+import json
 import logging
 import re
+import threading
+import time
 from collections import defaultdict, deque
+from dataclasses import dataclass
 from typing import Any
 
 from .models import CircularDependencyError, ComputedFieldError
 
 logger = logging.getLogger(__name__)
 
+# Evaluates a batch of compiled transforms in one JS call. Inputs arrive as one JSON
+# payload and results leave as one JSON string, so marshalling happens once per batch.
+# Each result is [true, value, ms], [false, message, ms], or [null, null, ms] when the
+# value holds something JSON would alter (undefined, NaN, Infinity, functions) and has
+# to be evaluated on its own to match execute().
+_JS_BATCH_RUNNER = """
+(function (fns, payload) {
+    const inputs = JSON.parse(payload);
+    const now = typeof performance !== "undefined" ? () => performance.now() : () => Date.now();
+    let exact = true;
+    const keepExact = function (key, v) {
+        if (v === undefined || typeof v === "function" || typeof v === "symbol"
+            || (typeof v === "number" && !Number.isFinite(v))) {
+            exact = false;
+        }
+        return v;
+    };
+    const results = [];
+    for (let i = 0; i < fns.length; i++) {
+        const start = now();
+        let entry;
+        try {
+            const value = fns[i](inputs[i]);
+            try {
+                exact = true;
+                const encoded = JSON.stringify(value, keepExact);
+                entry = exact ? "[true," + encoded : "[null,null";
+            } catch (e) {
+                entry = "[null,null";
+            }
+        } catch (e) {
+            entry = "[false," + JSON.stringify(String(e));
+        }
+        results.push(entry + "," + (now() - start) + "]");
+    }
+    return "[" + results.join(",") + "]";
+})
+"""
+
+
+@dataclass
+class TransformResult:
+    """Outcome of one transform in a batch"""
+
+    value: Any = None
+    error: Exception | None = None
+    duration_ms: float = 0.0
+
 
 class TransformationEngine:
     """
@@ -25,6 +77,10 @@ class TransformationEngine:
     def __init__(self):
         """Initialize the transformation engine"""
         self._js_engine = None
+        self._compiled: dict[str, Any] = {}  # transform source -> compiled JS function
+        self._compile_lock = threading.Lock()
+        self._batch_runner = None
+        self._placeholder = None
         self._init_engine()
 
     def _init_engine(self):
@@ -62,54 +118,142 @@ class TransformationEngine:
                 # Use Python fallback
                 return self._execute_python_fallback(transform, input_value)
         except Exception as e:
-            # Map JS runtime errors to appropriate Python exceptions for consistency
-            if "TypeError" in str(e) or "cannot read property" in str(e):
-                # Convert JS TypeError to Python TypeError for test compatibility
-                raise TypeError(str(e)) from e
-            elif "SyntaxError" in str(e):
-                raise SyntaxError(str(e)) from e
-            else:
-                raise ComputedFieldError(f"Transformation failed: {transform}") from e
+            raise self._map_execution_error(transform, e) from e
+
+    @property
+    def engine_type(self) -> str:
+        """Name of the active engine, either pythonmonkey or python"""
+        return self._engine_type
+
+    def execute_batch(self, requests: list[tuple[str, Any]]) -> list[TransformResult]:
+        """
+        Execute several transformations, in one JavaScript round-trip when available
+
+        Args:
+            requests: (transform, input_value) pairs
+
+        Returns:
+            One TransformResult per request, in order. Failures are returned as the
+            same exception types execute() would raise, not raised.
+        """
+        if self._js_engine is not None and requests:
+            try:
+                return self._execute_js_batch(requests)
+            except Exception as e:
+                logger.debug(f"Batched JavaScript evaluation failed, falling back to single calls: {e}")
+
+        return [self._execute_single(transform, input_value) for transform, input_value in requests]
+
+    def _execute_single(self, transform: str, input_value: Any) -> TransformResult:
+        """Run one transformation through execute(), capturing its error and duration"""
+        start = time.perf_counter()
+        try:
+            result = TransformResult(value=self.execute(transform, input_value))
+        except Exception as e:
+            result = TransformResult(error=e)
+        result.duration_ms = (time.perf_counter() - start) * 1000
+        return result
+
+    @property
+    def _null_function(self) -> Any:
+        """JavaScript function standing in for transforms that are not evaluated in the batch"""
+        if self._placeholder is None:
+            self._placeholder = self._js_engine.eval("(function () { return null; })")
+        return self._placeholder
+
+    def compile(self, transform: str) -> Any:
+        """
+        Compile a transform into a cached JavaScript function of ``input``
+
+        Args:
+            transform: JavaScript expression string
+
+        Returns:
+            Compiled JS function, reused for every later call with the same source
+        """
+        function = self._compiled.get(transform)
+        if function is None:
+            with self._compile_lock:
+                function = self._compiled.get(transform)
+                if function is None:
+                    # Wrap in parentheses to ensure the body is treated as an expression
+                    function = self._js_engine.eval(f"(function (input) {{ return ({transform}); }})")
+                    self._compiled[transform] = function
+        return function
+
+    def _map_execution_error(self, transform: str, error: Exception) -> Exception:
+        """Map JS runtime errors to appropriate Python exceptions for consistency"""
+        if "TypeError" in str(error) or "cannot read property" in str(error):
+            # Convert JS TypeError to Python TypeError for test compatibility
+            return TypeError(str(error))
+        elif "SyntaxError" in str(error):
+            return SyntaxError(str(error))
+        else:
+            return ComputedFieldError(f"Transformation failed: {transform}")
 
     def _execute_js(self, transform: str, input_value: Any) -> Any:
         """Execute transformation using JavaScript engine"""
         if self._engine_type == "pythonmonkey":
             # PythonMonkey supports modern JavaScript directly
             try:
-                # Set the input value in the global context
-                self._js_engine.globalThis.input = input_value
-
-                # Execute the transform expression and return result directly
-                # Wrap in parentheses to ensure it's treated as an expression
-                js_code = f"({transform})"
-                result = self._js_engine.eval(js_code)
+                result = self.compile(transform)(input_value)
 
                 # Convert PythonMonkey objects to native Python objects to avoid deepcopy issues
-                native_result = self._convert_to_native_python(result)
-
-                # Clean up global context
-                delattr(self._js_engine.globalThis, "input")
-
-                return native_result
+                return self._convert_to_native_python(result)
             except Exception as e:
-                # Clean up global context even on error
-                try:
-                    delattr(self._js_engine.globalThis, "input")
-                except:
-                    pass  # Ignore cleanup errors
-
-                # Provide meaningful error message for common PythonMonkey issues
-                error_msg = str(e)
-                if "segmentation fault" in error_msg.lower() or "sigsegv" in error_msg.lower():
-                    raise ComputedFieldError(
-                        f"JavaScript execution crashed: {transform} - try using Python fallback syntax"
-                    ) from e
-                elif "syntax" in error_msg.lower():
-                    raise SyntaxError(f"JavaScript syntax error in transform: {transform} - {error_msg}") from e
-                elif "reference" in error_msg.lower() and "not defined" in error_msg.lower():
-                    raise NameError(f"JavaScript reference error in transform: {transform} - {error_msg}") from e
-                else:
-                    raise ComputedFieldError(f"JavaScript execution failed: {transform} - {error_msg}") from e
+                raise self._map_js_error(transform, e) from e
+
+    def _execute_js_batch(self, requests: list[tuple[str, Any]]) -> list[TransformResult]:
+        """Evaluate compiled transforms in a single JavaScript call"""
+        functions = []
+        encoded_inputs = []
+        compile_errors: dict[int, Exception] = {}
+        unbatched: set[int] = set()
+        for index, (transform, input_value) in enumerate(requests):
+            try:
+                # Inputs JSON cannot carry exactly (NaN, Infinity, non-JSON types) are evaluated on their own
+                encoded_inputs.append(json.dumps(input_value, allow_nan=False))
+            except (TypeError, ValueError):
+                encoded_inputs.append("null")
+                unbatched.add(index)
+            try:
+                functions.append(self._null_function if index in unbatched else self.compile(transform))
+            except Exception as e:
+                compile_errors[index] = self._map_execution_error(transform, self._map_js_error(transform, e))
+                functions.append(self._null_function)
+
+        if self._batch_runner is None:
+            self._batch_runner = self._js_engine.eval(_JS_BATCH_RUNNER)
+        outcomes = json.loads(self._batch_runner(functions, "[" + ",".join(encoded_inputs) + "]"))
+
+        results = []
+        for index, ((transform, input_value), (success, value, duration_ms)) in enumerate(
+            zip(requests, outcomes, strict=True)
+        ):
+            if index in compile_errors:
+                results.append(TransformResult(error=compile_errors[index]))
+            elif index in unbatched or success is None:
+                results.append(self._execute_single(transform, input_value))
+            elif success:
+                results.append(TransformResult(value=value, duration_ms=duration_ms))
+            else:
+                error = self._map_js_error(transform, Exception(value))
+                results.append(
+                    TransformResult(error=self._map_execution_error(transform, error), duration_ms=duration_ms)
+                )
+        return results
+
+    def _map_js_error(self, transform: str, e: Exception) -> Exception:
+        """Provide meaningful error messages for common PythonMonkey issues"""
+        error_msg = str(e)
+        if "segmentation fault" in error_msg.lower() or "sigsegv" in error_msg.lower():
+            return ComputedFieldError(f"JavaScript execution crashed: {transform} - try using Python fallback syntax")
+        elif "syntax" in error_msg.lower():
+            return SyntaxError(f"JavaScript syntax error in transform: {transform} - {error_msg}")
+        elif "reference" in error_msg.lower() and "not defined" in error_msg.lower():
+            return NameError(f"JavaScript reference error in transform: {transform} - {error_msg}")
+        else:
+            return ComputedFieldError(f"JavaScript execution failed: {transform} - {error_msg}")
 
     def _convert_to_native_python(self, obj: Any) -> Any:
         """
@@ -508,14 +652,44 @@ class CascadingUpdateCalculator:
         """Build reverse dependency mapping for efficient cascade calculation"""
         self.reverse_deps = defaultdict(set)
 
+        # Canonical dependency path -> fields reading exactly that path, and
+        # every prefix of a canonical dependency path -> fields reading at or below it
+        self._exact_deps: dict[str, set[str]] = defaultdict(set)
+        self._deps_below: dict[str, set[str]] = defaultdict(set)
+        # Computed field -> computed fields that read it directly
+        self._dependents: dict[str, set[str]] = defaultdict(set)
+        # Memoized transitive closure per canonical changed path
+        self._affected_cache: dict[str, frozenset[str]] = {}
+
         for field_name, field_info in self.dependencies.items():
             for dep_path in field_info["dependencies"]:
                 self.reverse_deps[dep_path].add(field_name)
 
+                if "." in dep_path:
+                    tier, rest = dep_path.split(".", 1)
+                    targets = [] if tier == "computed" else [_canonical_path(dep_path)]
+                else:
+                    # Bare names may refer to either the state or the inputs tier
+                    tier, rest = "", dep_path
+                    targets = [f"state.{dep_path}", f"inputs.{dep_path}"]
+
+                if tier in ("computed", "this", "") and rest.split(".", 1)[0] in self.dependencies:
+                    self._dependents[rest.split(".", 1)[0]].add(field_name)
+
+                for target in targets:
+                    self._exact_deps[target].add(field_name)
+                    parts = target.split(".")
+                    for i in range(1, len(parts) + 1):
+                        self._deps_below[".".join(parts[:i])].add(field_name)
+
     def get_affected_fields(self, changed_paths: list[str]) -> list[str]:
         """
         Get list of computed fields that need to be recalculated
 
+        Changed paths may use any tier alias ("this.x", "state.x", "raw.x", "inputs.x" or a
+        bare name for the state tier). A field is affected when it reads the changed path,
+        something inside it, or one of its parents, or when it reads an affected field.
+
         Args:
             changed_paths: List of state paths that changed
 
@@ -523,29 +697,49 @@ class CascadingUpdateCalculator:
             List of computed field names in execution order
         """
         affected = set()
-
-        # Find directly affected fields
         for path in changed_paths:
-            affected.update(self.reverse_deps.get(path, set()))
+            affected.update(self._get_affected_by_path(path))
+
+        # Return in dependency order
+        execution_order = list(self.dependencies.keys())
+        return [field for field in execution_order if field in affected]
+
+    def _get_affected_by_path(self, path: str) -> frozenset[str]:
+        """Return the memoized set of fields transitively affected by one changed path"""
+        canonical = _canonical_path(path) if "." in path else f"state.{path}"
+        cached = self._affected_cache.get(canonical)
+        if cached is not None:
+            return cached
+
+        # Fields reading the changed path or anything below it
+        affected = set(self._deps_below.get(canonical, ()))
+        # Fields reading a parent of the changed path
+        parts = canonical.split(".")
+        for i in range(1, len(parts)):
+            affected.update(self._exact_deps.get(".".join(parts[:i]), ()))
 
         # Find transitively affected fields
-        queue = list(affected)
+        queue = deque(affected)
         while queue:
-            field = queue.pop(0)
-
-            # Find fields that depend on this computed field
-            # Try both the field name directly and with "computed." prefix
-            transitive = self.reverse_deps.get(field, set())
-            transitive.update(self.reverse_deps.get(f"computed.{field}", set()))
+            field = queue.popleft()
+            for dependent in self._dependents.get(field, ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    queue.append(dependent)
+
+        result = frozenset(affected)
+        self._affected_cache[canonical] = result
+        return result
 
-            for trans_field in transitive:
-                if trans_field not in affected:
-                    affected.add(trans_field)
-                    queue.append(trans_field)
 
-        # Return in dependency order
-        execution_order = list(self.dependencies.keys())
-        return [field for field in execution_order if field in affected]
+def _canonical_path(path: str) -> str:
+    """Map tier aliases onto their storage tier ("this." -> "state.", "raw." -> "inputs.")"""
+    tier, rest = path.split(".", 1)
+    if tier == "this":
+        return f"state.{rest}"
+    if tier == "raw":
+        return f"inputs.{rest}"
+    return path
 
 
 class AdvancedTransformer:
@@ -13,10 +13,34 @@ from typing import Any
 import psutil
 
 from ..monitoring.metrics import MetricsCollector, PerformanceMetrics
+from ..state.manager import StateManager
+from ..workflow.expressions import (
+    ExpressionEvaluator,
+    ExpressionLexer,
+    ExpressionParser,
+    clear_expression_cache,
+)
+from ..workflow.models import SubAgentTask, WorkflowDefinition, WorkflowStep
+from ..workflow.queue import WorkflowQueue
+from ..workflow.queue_executor import QueueBasedWorkflowExecutor
 
 logger = logging.getLogger(__name__)
 
 
+class _ListWorkflowQueue(WorkflowQueue):
+    """WorkflowQueue with the previous list-based pop and prepend, kept as a benchmark baseline."""
+
+    def __init__(self, workflow_id: str, initial_steps: list[WorkflowStep]):
+        super().__init__(workflow_id, initial_steps)
+        self.main_queue = list(initial_steps)
+
+    def pop_next(self) -> WorkflowStep | None:
+        return self.main_queue.pop(0) if self.main_queue else None
+
+    def prepend_steps(self, steps: list[WorkflowStep]):
+        self.main_queue = steps + self.main_queue
+
+
 class WorkflowBenchmark:
     """Benchmark workflow execution performance."""
 
@@ -354,6 +378,61 @@ class PerformanceBenchmark:
             },
         }
 
+    def benchmark_expression_evaluation(
+        self,
+        expressions: list[str],
+        context: dict[str, Any],
+        scoped_context: dict[str, dict[str, Any]] | None = None,
+        iterations: int = 1000,
+    ) -> dict[str, Any]:
+        """Compare per-evaluation cost of uncached, AST-cached and compiled expression evaluation."""
+
+        def evaluate_uncached(evaluator: ExpressionEvaluator, expression: str) -> Any:
+            # Pre-cache behaviour: tokenize and parse on every evaluation
+            evaluator.context = context
+            evaluator.scoped_context = scoped_context or {}
+            ast = ExpressionParser(ExpressionLexer(expression).tokenize()).parse()
+            return evaluator._evaluate_node(ast)
+
+        modes = {
+            "uncached": (ExpressionEvaluator(compile_expressions=False), evaluate_uncached),
+            "cached_ast": (
+                ExpressionEvaluator(compile_expressions=False),
+                lambda evaluator, expression: evaluator.evaluate(expression, context, scoped_context),
+            ),
+            "compiled": (
+                ExpressionEvaluator(compile_expressions=True),
+                lambda evaluator, expression: evaluator.evaluate(expression, context, scoped_context),
+            ),
+        }
+
+        clear_expression_cache()
+        results = {}
+        for mode, (evaluator, evaluate) in modes.items():
+            # Warm the caches so steady-state cost is measured
+            for expression in expressions:
+                evaluate(evaluator, expression)
+
+            start_time = time.perf_counter()
+            for _ in range(iterations):
+                for expression in expressions:
+                    evaluate(evaluator, expression)
+            elapsed = time.perf_counter() - start_time
+
+            evaluations = iterations * len(expressions)
+            results[mode] = {
+                "evaluations": evaluations,
+                "total_ms": elapsed * 1000,
+                "per_evaluation_us": (elapsed / evaluations) * 1_000_000 if evaluations else 0.0,
+            }
+
+        baseline_us = results["uncached"]["per_evaluation_us"]
+        for mode_result in results.values():
+            per_evaluation_us = mode_result["per_evaluation_us"]
+            mode_result["speedup"] = baseline_us / per_evaluation_us if per_evaluation_us else 0.0
+
+        return {"expression_evaluation": results, "expression_count": len(expressions), "iterations": iterations}
+
     def set_baseline(self, name: str, result: dict[str, Any]):
         """Set performance baseline for comparison."""
         self.baseline_results[name] = result
@@ -556,6 +635,177 @@ class ScalabilityBenchmark:
             "data_scalability_analysis": self._analyze_data_scalability(results),
         }
 
+    def benchmark_queue_scaling(
+        self,
+        queue_sizes: list[int] | None = None,
+        loop_iterations: int = 20,
+        body_size: int = 5,
+        nesting_depth: int = 2,
+    ) -> dict[str, Any]:
+        """Measure step queue throughput for nested loops in front of long queues.
+
+        Each run drains a queue holding nested foreach loops followed by
+        queue_size plain steps, re-prepending loop bodies on every iteration the
+        way the executor does. The deque-backed WorkflowQueue is compared with
+        the previous list-based implementation.
+        """
+        queue_sizes = queue_sizes or [1_000, 10_000]
+
+        def build_loop(depth: int) -> dict[str, Any]:
+            body: list[dict[str, Any]] = [
+                {"id": f"d{depth}.s{i}", "type": "user_message", "message": "step"} for i in range(body_size)
+            ]
+            if depth < nesting_depth:
+                body.append(build_loop(depth + 1))
+            return {"id": f"loop_d{depth}", "type": "foreach", "items": "state.items", "body": body}
+
+        loop_def = build_loop(1)
+        loop_step = WorkflowStep(id=loop_def["id"], type="foreach", definition=loop_def)
+
+        def drain(queue: WorkflowQueue) -> int:
+            remaining: dict[str, int] = {}
+            operations = 0
+            while queue.has_steps():
+                step = queue.pop_next()
+                operations += 1
+                if step.type != "foreach":
+                    continue
+                left = remaining.get(step.id, loop_iterations)
+                if left:
+                    remaining[step.id] = left - 1
+                    queue.prepend_steps([*step.get_loop_body(), step])
+                else:
+                    # Loop finished; an enclosing loop re-enters it from the start
+                    remaining.pop(step.id, None)
+            return operations
+
+        results: dict[str, list[dict[str, Any]]] = {"deque": [], "list": []}
+        for queue_size in queue_sizes:
+            steps = [loop_step] + [
+                WorkflowStep(id=f"step_{i}", type="user_message", definition={"message": "step"})
+                for i in range(queue_size)
+            ]
+            for mode, queue_class in (("deque", WorkflowQueue), ("list", _ListWorkflowQueue)):
+                queue = queue_class("wf_benchmark", steps)
+                start_time = time.perf_counter()
+                operations = drain(queue)
+                elapsed = time.perf_counter() - start_time
+                results[mode].append(
+                    {
+                        "queue_size": queue_size,
+                        "operations": operations,
+                        "total_ms": elapsed * 1000,
+                        "per_operation_us": (elapsed / operations) * 1_000_000 if operations else 0.0,
+                    }
+                )
+
+        speedup = {
+            deque_result["queue_size"]: (
+                list_result["total_ms"] / deque_result["total_ms"] if deque_result["total_ms"] else 0.0
+            )
+            for deque_result, list_result in zip(results["deque"], results["list"], strict=True)
+        }
+        return {
+            "queue_scaling": results,
+            "speedup": speedup,
+            "loop_iterations": loop_iterations,
+            "body_size": body_size,
+            "nesting_depth": nesting_depth,
+        }
+
+    def benchmark_subagent_dispatch(
+        self, agent_counts: list[int] | None = None, steps_per_agent: int = 5
+    ) -> dict[str, Any]:
+        """Measure sub-agent step dispatch throughput as the number of sub-agents grows.
+
+        Every run starts a parallel_foreach over agent_count items and drains
+        each sub-agent task, whose steps are conditionals evaluated on the
+        server that each expand to one client message. Three dispatch modes
+        are compared:
+
+        - concurrent: one thread per sub-agent calling get_next_sub_agent_step
+        - batched: a single caller advancing every pending task per get_next_sub_agent_steps call
+        - parent_lock: like concurrent, but each call holds the parent workflow lock
+          (how sub-agent dispatch was serialized before per-task locks)
+        """
+        agent_counts = agent_counts or [1, 10, 50, 100, 200]
+
+        sub_agent_steps = [
+            WorkflowStep(
+                id=f"check_{i}",
+                type="conditional",
+                definition={
+                    "condition": "{{ index >= 0 }}",
+                    "then_steps": [{"id": f"report_{i}", "type": "user_message", "message": "{{ item }} #" + str(i)}],
+                },
+            )
+            for i in range(steps_per_agent)
+        ]
+        sub_agent_task = SubAgentTask(name="process", description="", inputs={}, steps=sub_agent_steps)
+
+        def start_workflow(agent_count: int) -> tuple[QueueBasedWorkflowExecutor, str, list[str]]:
+            fan_out_def = {"items": "{{ state.items }}", "sub_agent_task": "process", "max_parallel": agent_count}
+            definition = WorkflowDefinition(
+                name="benchmark:subagents",
+                default_state={"state": {"items": [f"item{i}" for i in range(agent_count)]}},
+                steps=[WorkflowStep(id="fan_out", type="parallel_foreach", definition=fan_out_def)],
+                sub_agent_tasks={"process": sub_agent_task},
+            )
+            executor = QueueBasedWorkflowExecutor(StateManager())
+            workflow_id = executor.start(definition)["workflow_id"]
+            fan_out = executor.get_next_step(workflow_id)["steps"][0]
+            return executor, workflow_id, [task["task_id"] for task in fan_out["definition"]["tasks"]]
+
+        def run_concurrent(executor, workflow_id: str, task_ids: list[str], parent_lock: bool) -> int:
+            lock = executor._get_workflow_lock(workflow_id)
+
+            def drain(task_id: str) -> int:
+                calls = 0
+                while True:
+                    calls += 1
+                    if parent_lock:
+                        with lock:
+                            step = executor.get_next_sub_agent_step(workflow_id, task_id)
+                    else:
+                        step = executor.get_next_sub_agent_step(workflow_id, task_id)
+                    if step is None:
+                        return calls
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(task_ids)) as pool:
+                return sum(pool.map(drain, task_ids))
+
+        def run_batched(executor, workflow_id: str, task_ids: list[str]) -> int:
+            calls = 0
+            pending = list(task_ids)
+            while pending:
+                calls += 1
+                steps = executor.get_next_sub_agent_steps(workflow_id, pending)
+                pending = [task_id for task_id in pending if steps[task_id] is not None]
+            return calls
+
+        results: dict[str, list[dict[str, Any]]] = {"concurrent": [], "batched": [], "parent_lock": []}
+        for agent_count in agent_counts:
+            for mode in results:
+                executor, workflow_id, task_ids = start_workflow(agent_count)
+                start_time = time.perf_counter()
+                if mode == "batched":
+                    calls = run_batched(executor, workflow_id, task_ids)
+                else:
+                    calls = run_concurrent(executor, workflow_id, task_ids, parent_lock=mode == "parent_lock")
+                elapsed = time.perf_counter() - start_time
+                client_steps = agent_count * steps_per_agent
+                results[mode].append(
+                    {
+                        "agent_count": agent_count,
+                        "calls": calls,
+                        "client_steps": client_steps,
+                        "total_ms": elapsed * 1000,
+                        "steps_per_second": client_steps / elapsed if elapsed > 0 else 0.0,
+                    }
+                )
+
+        return {"dispatch_scaling": results, "steps_per_agent": steps_per_agent}
+
     def _analyze_scalability(self, results: list[dict[str, Any]]) -> dict[str, Any]:
         """Analyze scalability characteristics."""
         if len(results) < 2:
@@ -1,16 +1,19 @@
 """MCP tools for workflow management and execution."""
 
 import json
+import os
 import time
 from typing import Any
 
 from ...utils.json_parameter_middleware import json_convert
 from ..models.workflow_models import WorkflowStartResponse
+from ..persistence import get_persistence_backend
 from ..state.concurrent import ConcurrentStateManager
 from ..state.shared import get_shared_state_manager
 from ..workflow.loader import WorkflowLoader
-from ..workflow.models import WorkflowExecutionError, WorkflowNotFoundError
+from ..workflow.models import RetentionPolicy, WorkflowExecutionError, WorkflowNotFoundError
 from ..workflow.queue_executor import QueueBasedWorkflowExecutor
+from ..workflow.scheduler import FairShareScheduler
 
 # Global instances for workflow management
 _workflow_loader = None
@@ -22,7 +25,7 @@ def get_workflow_loader() -> WorkflowLoader:
     """Get or create workflow loader instance."""
     global _workflow_loader
     if _workflow_loader is None:
-        _workflow_loader = WorkflowLoader()
+        _workflow_loader = WorkflowLoader(cache_dir=os.getenv("AROMCP_WORKFLOW_CACHE_DIR"))
     return _workflow_loader
 
 
@@ -31,7 +34,21 @@ def get_workflow_executor() -> QueueBasedWorkflowExecutor:
     global _workflow_executor
     if _workflow_executor is None:
         shared_state_manager = get_shared_state_manager()
-        _workflow_executor = QueueBasedWorkflowExecutor(shared_state_manager)
+        ttl_seconds = os.getenv("AROMCP_WORKFLOW_RETENTION_TTL")
+        max_completed = os.getenv("AROMCP_WORKFLOW_MAX_COMPLETED")
+        retention = RetentionPolicy(
+            ttl_seconds=float(ttl_seconds) if ttl_seconds else None,
+            max_completed=int(max_completed) if max_completed else None,
+        )
+        max_server_steps = os.getenv("AROMCP_WORKFLOW_MAX_SERVER_STEPS")
+        scheduler = FairShareScheduler(
+            slots=int(os.getenv("AROMCP_WORKFLOW_SCHEDULER_SLOTS", "1")),
+            slice_cpu_ms=float(os.getenv("AROMCP_WORKFLOW_SLICE_MS", "200")),
+            max_server_steps=int(max_server_steps) if max_server_steps else None,
+        )
+        _workflow_executor = QueueBasedWorkflowExecutor(
+            shared_state_manager, persistence=get_persistence_backend(), retention=retention, scheduler=scheduler
+        )
     return _workflow_executor
 
 
@@ -285,35 +302,53 @@ def register_workflow_tools(mcp):
         - You want to check for incomplete workflows
 
         Returns:
-            List of active workflow instances with basic info
+            List of active workflow instances with basic info, plus executor memory
+            metrics (resident and evicted workflows, state size, registry sizes) and
+            fair-share scheduling metrics (slot usage, CPU time and waits per workflow)
 
         Example:
             workflow_list_active()
-            → {"workflows": [{"workflow_id": "wf_abc123", "status": "running", ...}]}
+            → {"workflows": [{"workflow_id": "wf_abc123", "status": "running", ...}],
+               "memory": {...}, "scheduling": {...}}
         """
         try:
             executor = get_workflow_executor()
             active_workflows = executor.list_active_workflows()
+            memory = executor.get_memory_stats()
+            memory.pop("workflows")
 
-            return {"data": {"workflows": active_workflows, "count": len(active_workflows)}}
+            data = {"workflows": active_workflows, "count": len(active_workflows), "memory": memory}
+            if executor.scheduler is not None:
+                data["scheduling"] = executor.scheduler.get_stats()
+
+            return {"data": data}
 
         except Exception as e:
             return {"error": {"code": "OPERATION_FAILED", "message": f"Failed to list active workflows: {e}"}}
 
     @mcp.tool
     @json_convert
-    def workflow_get_next_step(workflow_id: str, task_id: str | None = None) -> dict[str, Any]:
+    def workflow_get_next_step(
+        workflow_id: str,
+        task_id: str | None = None,
+        task_ids: list[str] | str | None = None,
+        since_version: str | None = None,
+    ) -> dict[str, Any]:
         """Get next step in workflow execution or for a specific sub-agent task.
 
         Use this tool when:
         - You want to advance workflow execution
         - You are a sub-agent getting your next task step
+        - You are dispatching steps for many sub-agents at once
         - You need the next actionable step
         - You want to check workflow completion status
 
         Args:
             workflow_id: ID of the workflow instance
             task_id: Optional task ID for sub-agent execution (e.g., "checkFile.item1")
+            task_ids: Optional list of sub-agent task IDs to advance in a single call
+            since_version: Optional state_version from the previous response ("" on the first call).
+                The response then carries only state and context changes as a JSON-patch delta
 
         Returns:
             Next step for execution or completion status
@@ -325,6 +360,12 @@ def register_workflow_tools(mcp):
             workflow_get_next_step("wf_abc123", "checkFile.item1")
             → {"step": {"type": "mcp_call", "definition": {...}}}
 
+            workflow_get_next_step("wf_abc123", since_version="3f2a9c1e.4")
+            → {"steps": [...], "state_version": "3f2a9c1e.5", "delta": [{"op": "replace", "path": "/state/n", ...}]}
+
+            workflow_get_next_step("wf_abc123", task_ids=["checkFile.item0", "checkFile.item1"])
+            → {"tasks": [{"task_id": "checkFile.item0", "step": {...}}, {"task_id": "checkFile.item1", ...}]}
+
         Note:
             If you get an error about "items must be an array", ensure your workflow state
             contains properly evaluated arrays instead of template strings. Use workflow_update_state
@@ -333,12 +374,24 @@ def register_workflow_tools(mcp):
         try:
             executor = get_workflow_executor()
 
+            if task_ids:
+                # Batched sub-agent dispatch
+                if isinstance(task_ids, str):
+                    task_ids = json.loads(task_ids)
+                next_steps = executor.get_next_sub_agent_steps(workflow_id, task_ids)
+                tasks = [
+                    next_steps[batch_task_id]
+                    or {"completed": True, "task_id": batch_task_id, "workflow_id": workflow_id}
+                    for batch_task_id in task_ids
+                ]
+                return {"data": {"tasks": tasks, "workflow_id": workflow_id}}
+
             if task_id:
                 # Sub-agent execution - pass workflow_id to help with context lookup
                 next_step = executor.get_next_sub_agent_step(workflow_id, task_id)
             else:
                 # Main workflow execution
-                next_step = executor.get_next_step(workflow_id)
+                next_step = executor.get_next_step(workflow_id, since_version)
 
             if next_step is None:
                 if task_id:
@@ -384,6 +437,11 @@ def register_workflow_tools(mcp):
             checkpoint_result = concurrent_manager.create_checkpoint(workflow_id)
 
             if checkpoint_result["success"]:
+                # Make everything recorded so far durable before acknowledging the checkpoint
+                persistence = get_workflow_executor().persistence
+                if persistence is not None:
+                    persistence.flush()
+
                 checkpoint = checkpoint_result["checkpoint"]
                 checkpoint.update(
                     {"step_id": step_id, "reason": reason, "checkpoint_id": f"cp_{workflow_id}_{int(time.time())}"}
@@ -432,9 +490,27 @@ def register_workflow_tools(mcp):
             → {"resumed": true, "restored_version": 3, "current_step": "step_5"}
         """
         try:
-            # This is a simplified implementation
-            # In a full system, you'd store checkpoints and restore from them
             executor = get_workflow_executor()
+
+            # Restore from persistent storage when the workflow isn't live (e.g. after a restart)
+            if workflow_id not in executor.workflows and executor.persistence is not None:
+                record = executor.persistence.load_workflow(workflow_id)
+                if record is None:
+                    return {"error": {"code": "NOT_FOUND", "message": f"Workflow {workflow_id} not found"}}
+                workflow_def = get_workflow_loader().load(record.workflow_name)
+                result = executor.resume_workflow(workflow_id, workflow_def)
+                if "error" in result:
+                    return {"error": {"code": "OPERATION_FAILED", "message": result["error"]}}
+                return {
+                    "data": {
+                        "resumed": True,
+                        "workflow_id": workflow_id,
+                        "status": result["status"],
+                        "steps_remaining": result["steps_remaining"],
+                        "message": "Workflow restored from persistent storage",
+                    }
+                }
+
             status = executor.get_workflow_status(workflow_id)
 
             return {
@@ -0,0 +1,109 @@
+"""Delta encoding for versioned workflow views.
+
+Deltas are lists of JSON-patch style operations (the add, remove and replace
+subset of RFC 6902) addressed by JSON pointers, so a client holding an
+earlier view can apply only what changed instead of receiving the full state.
+"""
+
+import copy
+from typing import Any
+
+
+def _escape(key: Any) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def compute_delta(old: Any, new: Any) -> list[dict[str, Any]]:
+    """Compute the operations that turn old into new.
+
+    Dictionaries are compared key by key. Lists that only grew at the end are
+    encoded as appends; any other list change replaces the whole list.
+
+    Args:
+        old: Previous document
+        new: Current document
+
+    Returns:
+        List of operations; empty when the documents are equal
+    """
+    operations: list[dict[str, Any]] = []
+    _diff(old, new, "", operations)
+    return operations
+
+
+def _diff(old: Any, new: Any, path: str, operations: list[dict[str, Any]]) -> None:
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                operations.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key in old:
+                _diff(old[key], value, child, operations)
+            else:
+                operations.append({"op": "add", "path": child, "value": value})
+        return
+
+    if type(old) is not type(new):
+        operations.append({"op": "replace", "path": path, "value": new})
+    elif old != new:
+        if isinstance(new, list) and len(new) > len(old) and new[: len(old)] == old:
+            operations.extend({"op": "add", "path": f"{path}/-", "value": item} for item in new[len(old) :])
+        else:
+            operations.append({"op": "replace", "path": path, "value": new})
+
+
+def apply_delta(document: Any, operations: list[dict[str, Any]]) -> Any:
+    """Apply operations from compute_delta to a copy of a document.
+
+    Args:
+        document: Document the operations were computed against
+        operations: Operations to apply, in order
+
+    Returns:
+        The updated document; the input is left unchanged
+
+    Raises:
+        ValueError: If an operation is unsupported or its path does not exist
+    """
+    result = copy.deepcopy(document)
+    for operation in operations:
+        op = operation.get("op")
+        path = operation.get("path", "")
+        if not path:
+            if op != "replace":
+                raise ValueError(f"Unsupported operation on document root: {op}")
+            result = copy.deepcopy(operation["value"])
+            continue
+
+        *parents, last = [_unescape(token) for token in path.split("/")[1:]]
+        target = result
+        try:
+            for token in parents:
+                target = target[int(token)] if isinstance(target, list) else target[token]
+        except (KeyError, IndexError, ValueError) as e:
+            raise ValueError(f"Path not found: {path}") from e
+
+        if op == "remove":
+            if isinstance(target, list):
+                del target[int(last)]
+            else:
+                target.pop(last, None)
+        elif op in ("add", "replace"):
+            value = copy.deepcopy(operation["value"])
+            if isinstance(target, list):
+                if last == "-":
+                    target.append(value)
+                elif op == "add":
+                    target.insert(int(last), value)
+                else:
+                    target[int(last)] = value
+            else:
+                target[last] = value
+        else:
+            raise ValueError(f"Unsupported operation: {op}")
+    return result
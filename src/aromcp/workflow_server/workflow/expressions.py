@@ -2,11 +2,26 @@
 
 Provides JavaScript-like expression evaluation for workflow conditions and transformations.
 Supports boolean expressions, property access, comparisons, and basic operations.
+
+Parsed ASTs are cached by expression text, and can optionally be compiled into
+nested closures so repeated evaluations skip both parsing and node-type dispatch.
 """
 
+import functools
+from collections.abc import Callable
 from enum import Enum
 from typing import Any
 
+from ..monitoring.tracing import get_tracer
+
+# Maximum number of distinct expressions whose parsed/compiled forms are kept
+EXPRESSION_CACHE_SIZE = 1024
+
+# Identifiers that refer to scoped context rather than legacy context variables
+SCOPE_NAMES = ("this", "global", "loop", "inputs")
+
+_tracer = get_tracer()
+
 
 class ExpressionError(Exception):
     """Raised when expression evaluation fails."""
@@ -501,12 +516,125 @@ class ExpressionParser:
             raise ExpressionError(f"Unexpected token: {self.current_token}")
 
 
+@functools.lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def parse_expression(expression: str) -> dict[str, Any]:
+    """Tokenize and parse an expression, caching the AST by expression text.
+
+    The returned AST is shared between callers and must not be mutated.
+    """
+    return ExpressionParser(ExpressionLexer(expression).tokenize()).parse()
+
+
+@functools.lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(expression: str) -> Callable[["ExpressionEvaluator"], Any]:
+    """Compile an expression into a closure taking the evaluator that holds the context."""
+    return _compile_node(parse_expression(expression))
+
+
+def clear_expression_cache() -> None:
+    """Drop all cached ASTs and compiled expressions."""
+    parse_expression.cache_clear()
+    compile_expression.cache_clear()
+
+
+def _compile_node(node: dict[str, Any]) -> Callable[["ExpressionEvaluator"], Any]:
+    """Turn an AST node into a closure with the same semantics as ExpressionEvaluator._evaluate_node."""
+    node_type = node["type"]
+
+    if node_type == "literal":
+        value = node["value"]
+        return lambda ev: value
+
+    elif node_type == "identifier":
+        name = node["name"]
+        return lambda ev: ev.context[name] if name in ev.context else None
+
+    elif node_type == "array_literal":
+        elements = [_compile_node(element) for element in node["elements"]]
+        return lambda ev: [element(ev) for element in elements]
+
+    elif node_type == "binary":
+        operator = _BINARY_OPERATORS[node["operator"]]
+        left = _compile_node(node["left"])
+        right = _compile_node(node["right"])
+        return lambda ev: operator(ev, left(ev), right(ev))
+
+    elif node_type == "unary":
+        operator = _UNARY_OPERATORS[node["operator"]]
+        operand = _compile_node(node["operand"])
+        return lambda ev: operator(ev, operand(ev))
+
+    elif node_type == "property_access":
+        obj_node = node["object"]
+        prop = node["property"]
+        obj = _compile_node(obj_node)
+
+        if obj_node["type"] == "identifier" and obj_node["name"] in SCOPE_NAMES:
+            scope_name = obj_node["name"]
+
+            def property_access(ev):
+                if ev.scoped_context:
+                    return ev._get_scoped_variable(scope_name, prop)
+                return ev._get_property(obj(ev), prop)
+
+            return property_access
+
+        return lambda ev: ev._get_property(obj(ev), prop)
+
+    elif node_type == "array_access":
+        obj_node = node["object"]
+        obj = _compile_node(obj_node)
+        index = _compile_node(node["index"])
+
+        if (
+            obj_node["type"] == "property_access"
+            and obj_node["object"]["type"] == "identifier"
+            and obj_node["object"]["name"] in SCOPE_NAMES
+        ):
+            scope_name = obj_node["object"]["name"]
+            prop = obj_node["property"]
+
+            def scoped_array_access(ev):
+                target = ev._get_scoped_variable(scope_name, prop) if ev.scoped_context else obj(ev)
+                return ev._get_array_element(target, index(ev))
+
+            return scoped_array_access
+
+        return lambda ev: ev._get_array_element(obj(ev), index(ev))
+
+    elif node_type == "method_call":
+        obj = _compile_node(node["object"])
+        method = node["method"]
+        arguments = [_compile_node(arg) for arg in node["arguments"]]
+
+        def method_call(ev):
+            target = obj(ev)
+            return ev._call_method(target, method, [arg(ev) for arg in arguments])
+
+        return method_call
+
+    elif node_type == "ternary":
+        condition = _compile_node(node["condition"])
+        true_value = _compile_node(node["true_value"])
+        false_value = _compile_node(node["false_value"])
+        return lambda ev: true_value(ev) if ev._to_boolean(condition(ev)) else false_value(ev)
+
+    else:
+        raise ExpressionError(f"Unknown node type: {node_type}")
+
+
 class ExpressionEvaluator:
     """Evaluates parsed expression ASTs against a context."""
 
-    def __init__(self):
+    def __init__(self, compile_expressions: bool = True):
+        """Initialize the evaluator.
+
+        Args:
+            compile_expressions: Evaluate through cached compiled closures instead of walking the cached AST
+        """
         self.context = {}
         self.scoped_context = {}
+        self.compile_expressions = compile_expressions
 
     def evaluate(
         self, expression: str, context: dict[str, Any], scoped_context: dict[str, dict[str, Any]] | None = None
@@ -524,12 +652,17 @@ class ExpressionEvaluator:
         if not expression.strip():
             return None
 
+        if _tracer.enabled:
+            with _tracer.span("evaluate", "expression", expression=expression):
+                return self._evaluate_expression(expression)
+        return self._evaluate_expression(expression)
+
+    def _evaluate_expression(self, expression: str) -> Any:
+        """Evaluate a non-empty expression against the current contexts."""
         try:
-            lexer = ExpressionLexer(expression)
-            tokens = lexer.tokenize()
-            parser = ExpressionParser(tokens)
-            ast = parser.parse()
-            return self._evaluate_node(ast)
+            if self.compile_expressions:
+                return compile_expression(expression)(self)
+            return self._evaluate_node(parse_expression(expression))
         except Exception as e:
             raise ExpressionError(f"Failed to evaluate expression '{expression}': {str(e)}") from e
 
@@ -572,11 +705,7 @@ class ExpressionEvaluator:
             obj_node = node["object"]
             prop = node["property"]
 
-            if (
-                obj_node["type"] == "identifier"
-                and obj_node["name"] in ["this", "global", "loop", "inputs"]
-                and self.scoped_context
-            ):
+            if obj_node["type"] == "identifier" and obj_node["name"] in SCOPE_NAMES and self.scoped_context:
                 # This is a scoped variable access
                 scope_name = obj_node["name"]
                 return self._get_scoped_variable(scope_name, prop)
@@ -593,7 +722,7 @@ class ExpressionEvaluator:
             if (
                 obj_node["type"] == "property_access"
                 and obj_node["object"]["type"] == "identifier"
-                and obj_node["object"]["name"] in ["this", "global", "loop", "inputs"]
+                and obj_node["object"]["name"] in SCOPE_NAMES
                 and self.scoped_context
             ):
                 # Get the scoped object first
@@ -684,63 +813,17 @@ class ExpressionEvaluator:
 
     def _evaluate_binary_op(self, op: str, left: Any, right: Any) -> Any:
         """Evaluate a binary operation."""
-        # Logical operators
-        if op == "&&":
-            return right if self._to_boolean(left) else left
-        elif op == "||":
-            return left if self._to_boolean(left) else right
-
-        # Equality operators
-        elif op == "==":
-            return self._loose_equals(left, right)
-        elif op == "!=":
-            return not self._loose_equals(left, right)
-        elif op == "===":
-            return self._strict_equals(left, right)
-        elif op == "!==":
-            return not self._strict_equals(left, right)
-
-        # Comparison operators
-        elif op == "<":
-            return self._to_number(left) < self._to_number(right)
-        elif op == ">":
-            return self._to_number(left) > self._to_number(right)
-        elif op == "<=":
-            return self._to_number(left) <= self._to_number(right)
-        elif op == ">=":
-            return self._to_number(left) >= self._to_number(right)
-
-        # Arithmetic operators
-        elif op == "+":
-            # String concatenation vs addition
-            if isinstance(left, str) or isinstance(right, str):
-                return str(left) + str(right)
-            return self._to_number(left) + self._to_number(right)
-        elif op == "-":
-            return self._to_number(left) - self._to_number(right)
-        elif op == "*":
-            return self._to_number(left) * self._to_number(right)
-        elif op == "/":
-            right_num = self._to_number(right)
-            if right_num == 0:
-                return float("inf") if self._to_number(left) > 0 else float("-inf")
-            return self._to_number(left) / right_num
-        elif op == "%":
-            return self._to_number(left) % self._to_number(right)
-
-        else:
+        operator = _BINARY_OPERATORS.get(op)
+        if operator is None:
             raise ExpressionError(f"Unknown binary operator: {op}")
+        return operator(self, left, right)
 
     def _evaluate_unary_op(self, op: str, operand: Any) -> Any:
         """Evaluate a unary operation."""
-        if op == "!":
-            return not self._to_boolean(operand)
-        elif op == "-":
-            return -self._to_number(operand)
-        elif op == "+":
-            return self._to_number(operand)
-        else:
+        operator = _UNARY_OPERATORS.get(op)
+        if operator is None:
             raise ExpressionError(f"Unknown unary operator: {op}")
+        return operator(self, operand)
 
     def _get_property(self, obj: Any, prop: str) -> Any:
         """Get a property from an object."""
@@ -942,3 +1025,47 @@ class ExpressionEvaluator:
 
         # No type coercion in strict equality
         return False
+
+
+def _add(ev: ExpressionEvaluator, left: Any, right: Any) -> Any:
+    # String concatenation vs addition
+    if isinstance(left, str) or isinstance(right, str):
+        return str(left) + str(right)
+    return ev._to_number(left) + ev._to_number(right)
+
+
+def _divide(ev: ExpressionEvaluator, left: Any, right: Any) -> Any:
+    right_num = ev._to_number(right)
+    if right_num == 0:
+        return float("inf") if ev._to_number(left) > 0 else float("-inf")
+    return ev._to_number(left) / right_num
+
+
+# Operator implementations shared by the AST interpreter and compiled closures
+_BINARY_OPERATORS: dict[str, Callable[[ExpressionEvaluator, Any, Any], Any]] = {
+    # Logical operators
+    "&&": lambda ev, left, right: right if ev._to_boolean(left) else left,
+    "||": lambda ev, left, right: left if ev._to_boolean(left) else right,
+    # Equality operators
+    "==": lambda ev, left, right: ev._loose_equals(left, right),
+    "!=": lambda ev, left, right: not ev._loose_equals(left, right),
+    "===": lambda ev, left, right: ev._strict_equals(left, right),
+    "!==": lambda ev, left, right: not ev._strict_equals(left, right),
+    # Comparison operators
+    "<": lambda ev, left, right: ev._to_number(left) < ev._to_number(right),
+    ">": lambda ev, left, right: ev._to_number(left) > ev._to_number(right),
+    "<=": lambda ev, left, right: ev._to_number(left) <= ev._to_number(right),
+    ">=": lambda ev, left, right: ev._to_number(left) >= ev._to_number(right),
+    # Arithmetic operators
+    "+": _add,
+    "-": lambda ev, left, right: ev._to_number(left) - ev._to_number(right),
+    "*": lambda ev, left, right: ev._to_number(left) * ev._to_number(right),
+    "/": _divide,
+    "%": lambda ev, left, right: ev._to_number(left) % ev._to_number(right),
+}
+
+_UNARY_OPERATORS: dict[str, Callable[[ExpressionEvaluator, Any], Any]] = {
+    "!": lambda ev, operand: not ev._to_boolean(operand),
+    "-": lambda ev, operand: -ev._to_number(operand),
+    "+": lambda ev, operand: ev._to_number(operand),
+}
@@ -1,7 +1,17 @@
-"""Workflow loader with name-based resolution and YAML parsing."""
+"""Workflow loader with name-based resolution and YAML parsing.
 
+Parsed and validated workflows are cached in process, keyed by file path and
+invalidated by (mtime, size), so loading an unchanged workflow again is a stat
+and a dictionary lookup. An optional on-disk cache of pickled compiled
+workflows lets new processes skip YAML parsing and validation as well.
+"""
+
+import hashlib
 import logging
 import os
+import pickle
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
@@ -20,20 +30,46 @@ from .validator import WorkflowValidator
 
 logger = logging.getLogger(__name__)
 
+# Bump when WorkflowDefinition or CompiledWorkflow change shape so stale on-disk entries are ignored
+COMPILED_CACHE_VERSION = 1
+
+
+@dataclass
+class CompiledWorkflow:
+    """A parsed and validated workflow plus the validator's analysis of it.
+
+    The definition is shared by every load of the same file version and must
+    be treated as read-only.
+    """
+
+    definition: WorkflowDefinition
+    referenced_variables: frozenset[str] = frozenset()  # Variables referenced by templates and expressions
+    step_contexts: dict[str, bool] = field(default_factory=dict)  # Loop contexts the steps introduce
+    warnings: list[str] = field(default_factory=list)
+
 
 class WorkflowLoader:
     """Loads workflows from YAML files with name-based resolution."""
 
-    def __init__(self, project_root: str | None = None, strict_schema: bool = False):
+    def __init__(self, project_root: str | None = None, strict_schema: bool = False, cache_dir: str | None = None):
         """Initialize the workflow loader.
 
         Args:
             project_root: Override project root for testing
             strict_schema: If True, enforce strict JSON schema validation
+            cache_dir: Optional directory for the on-disk compiled workflow cache
         """
         self.project_root = project_root or os.getcwd()
         self.user_home = os.path.expanduser("~")
         self.strict_schema = strict_schema
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+        # File path -> ((mtime_ns, size, source), compiled workflow)
+        self._cache: dict[str, tuple[tuple[int, int, str], CompiledWorkflow]] = {}
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._disk_cache_hits = 0
 
     def load(self, workflow_name: str) -> WorkflowDefinition:
         """Load a workflow by name with fallback resolution.
@@ -48,15 +84,30 @@ class WorkflowLoader:
             WorkflowNotFoundError: If workflow file not found
             WorkflowValidationError: If workflow fails validation
         """
-        # Try project directory first
-        project_path = Path(self.project_root) / ".aromcp" / "workflows" / f"{workflow_name}.yaml"
-        if project_path.exists():
-            return self._load_from_file(project_path, "project")
+        return self.load_compiled(workflow_name).definition
+
+    def load_compiled(self, workflow_name: str) -> CompiledWorkflow:
+        """Load a workflow by name together with its validation analysis.
+
+        Args:
+            workflow_name: Name of workflow (e.g., "test:simple")
 
-        # Fall back to user directory
+        Returns:
+            Cached compiled workflow
+
+        Raises:
+            WorkflowNotFoundError: If workflow file not found
+            WorkflowValidationError: If workflow fails validation
+        """
+        # Try project directory first, then fall back to user directory
+        project_path = Path(self.project_root) / ".aromcp" / "workflows" / f"{workflow_name}.yaml"
         user_path = Path(self.user_home) / ".aromcp" / "workflows" / f"{workflow_name}.yaml"
-        if user_path.exists():
-            return self._load_from_file(user_path, "global")
+        for file_path, source in ((project_path, "project"), (user_path, "global")):
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                continue
+            return self._load_compiled(file_path, source, stat)
 
         # Not found in either location
         raise WorkflowNotFoundError(
@@ -73,11 +124,39 @@ class WorkflowLoader:
         Returns:
             Parsed workflow definition
         """
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError as e:
+            raise WorkflowNotFoundError(f"Workflow file not found: {file_path}") from e
+        return self._load_compiled(file_path, source, stat).definition
+
+    def _load_compiled(self, file_path: Path, source: str, stat: os.stat_result) -> CompiledWorkflow:
+        """Return the cached compiled workflow for a file, compiling it if the file changed."""
+        cache_key = str(file_path)
+        version = (stat.st_mtime_ns, stat.st_size, source)
+        with self._cache_lock:
+            entry = self._cache.get(cache_key)
+            if entry is not None and entry[0] == version:
+                self._cache_hits += 1
+                return entry[1]
+            self._cache_misses += 1
+
+        compiled = self._read_disk_cache(file_path, version)
+        if compiled is None:
+            compiled = self._compile_file(file_path, source)
+            self._write_disk_cache(file_path, version, compiled)
+
+        with self._cache_lock:
+            self._cache[cache_key] = (version, compiled)
+        return compiled
+
+    def _compile_file(self, file_path: Path, source: str) -> CompiledWorkflow:
+        """Read, parse and validate a workflow file."""
         try:
             with open(file_path, encoding="utf-8") as f:
                 content = f.read()
 
-            return self._parse_yaml(content, str(file_path), source)
+            return self._compile_yaml(content, str(file_path), source)
 
         except FileNotFoundError as e:
             raise WorkflowNotFoundError(f"Workflow file not found: {file_path}") from e
@@ -97,6 +176,19 @@ class WorkflowLoader:
         Returns:
             Parsed workflow definition
         """
+        return self._compile_yaml(content, file_path, source).definition
+
+    def _compile_yaml(self, content: str, file_path: str, source: str) -> CompiledWorkflow:
+        """Parse and validate YAML content, keeping the validator's analysis.
+
+        Args:
+            content: YAML content
+            file_path: Path where content was loaded from
+            source: "project" or "global"
+
+        Returns:
+            Compiled workflow
+        """
         try:
             data = yaml.safe_load(content)
         except yaml.YAMLError as e:
@@ -125,7 +217,7 @@ class WorkflowLoader:
             steps = self._parse_steps(data.get("steps", []))
             sub_agent_tasks = self._parse_sub_agent_tasks(data.get("sub_agent_tasks", {}))
 
-            return WorkflowDefinition(
+            definition = WorkflowDefinition(
                 name=data["name"],
                 description=data["description"],
                 version=data["version"],
@@ -141,6 +233,74 @@ class WorkflowLoader:
         except Exception as e:
             raise WorkflowValidationError(f"Error parsing workflow definition: {e}") from e
 
+        return CompiledWorkflow(
+            definition=definition,
+            referenced_variables=frozenset(getattr(validator, "referenced_variables", ())),
+            step_contexts=validator._analyze_step_contexts(data.get("steps", [])),
+            warnings=list(getattr(validator, "warnings", [])),
+        )
+
+    def _disk_cache_path(self, file_path: Path, version: tuple[int, int, str]) -> Path:
+        """Path of the on-disk cache entry for one version of a workflow file."""
+        path_digest = hashlib.blake2b(str(file_path).encode(), digest_size=8).hexdigest()
+        version_key = f"{version}|{self.strict_schema}|{COMPILED_CACHE_VERSION}"
+        version_digest = hashlib.blake2b(version_key.encode(), digest_size=8).hexdigest()
+        return self.cache_dir / f"{path_digest}-{version_digest}.pickle"
+
+    def _read_disk_cache(self, file_path: Path, version: tuple[int, int, str]) -> CompiledWorkflow | None:
+        """Load a compiled workflow from the on-disk cache, or None on a miss."""
+        if self.cache_dir is None:
+            return None
+        cache_path = self._disk_cache_path(file_path, version)
+        try:
+            with open(cache_path, "rb") as f:
+                # The cache directory is private to this server and only written by _write_disk_cache
+                compiled = pickle.load(f)  # noqa: S301
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable workflow cache entry {cache_path}: {e}")
+            return None
+        if not isinstance(compiled, CompiledWorkflow):
+            return None
+        with self._cache_lock:
+            self._disk_cache_hits += 1
+        return compiled
+
+    def _write_disk_cache(self, file_path: Path, version: tuple[int, int, str], compiled: CompiledWorkflow) -> None:
+        """Store a compiled workflow on disk, replacing entries for older versions of the file."""
+        if self.cache_dir is None:
+            return
+        cache_path = self._disk_cache_path(file_path, version)
+        temp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path_prefix = cache_path.name.split("-", 1)[0]
+            for stale in self.cache_dir.glob(f"{path_prefix}-*.pickle"):
+                stale.unlink(missing_ok=True)
+            with open(temp_path, "wb") as f:
+                pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            temp_path.unlink(missing_ok=True)
+            logger.warning(f"Could not write workflow cache entry {cache_path}: {e}")
+
+    def clear_cache(self) -> None:
+        """Drop every in-process cached workflow."""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def get_cache_stats(self) -> dict[str, Any]:
+        """Return compiled workflow cache statistics."""
+        with self._cache_lock:
+            return {
+                "entries": len(self._cache),
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "disk_hits": self._disk_cache_hits,
+                "cache_dir": str(self.cache_dir) if self.cache_dir else None,
+            }
+
     def _parse_default_state(self, default_state_data: dict[str, Any]) -> dict[str, Any]:
         """Parse default state with backward compatibility for 'raw' tier."""
         default_state = default_state_data.copy()
@@ -213,9 +373,10 @@ class WorkflowLoader:
             # Extract definition (everything except id, type, and execution_context)
             definition = {k: v for k, v in step_data.items() if k not in ["id", "type", "execution_context"]}
 
-            steps.append(
-                WorkflowStep(id=step_id, type=step_type, definition=definition, execution_context=execution_context)
-            )
+            step = WorkflowStep(id=step_id, type=step_type, definition=definition, execution_context=execution_context)
+            # Compile {{ }} templates once at load time so dispatch only renders templated leaves
+            step.get_template_plan()
+            steps.append(step)
 
         return steps
 
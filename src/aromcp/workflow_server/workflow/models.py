@@ -4,6 +4,7 @@ from dataclasses import dataclass, field
 from typing import Any
 
 from ..state.models import StateSchema
+from .templates import TemplatePlan, compile_template
 
 
 @dataclass
@@ -51,6 +52,39 @@ class WorkflowStep:
         # Add any additional kwargs to definition
         self.definition.update(kwargs)
 
+    def get_template_plan(self) -> TemplatePlan | None:
+        """Compiled {{ }} template plan for the definition, built once per definition object."""
+        cached = self.__dict__.get("_template_plan")
+        if cached is None or cached[0] is not self.definition:
+            cached = (self.definition, compile_template(self.definition))
+            self.__dict__["_template_plan"] = cached
+        return cached[1]
+
+    def get_loop_body(self) -> list["WorkflowStep"]:
+        """Body steps of a loop step, built once per body list and reused by every iteration.
+
+        Loop variables are bound through the execution context when each body
+        step runs, so one set of body steps serves all items.
+        """
+        body = self.definition.get("body") or []
+        cached = self.__dict__.get("_loop_body")
+        if cached is None or cached[0] is not body:
+            steps = []
+            for i, step_def in enumerate(body):
+                body_step = WorkflowStep(
+                    id=step_def.get("id", f"{self.id}.body.{i}"),
+                    type=step_def["type"],
+                    definition={k: v for k, v in step_def.items() if k not in ("id", "type", "execution_context")},
+                    execution_context=step_def.get("execution_context", "server"),
+                )
+                # Store the original step ID and loop information for break/continue logic
+                body_step._loop_id = self.id
+                body_step._loop_body_index = i
+                steps.append(body_step)
+            cached = (body, steps)
+            self.__dict__["_loop_body"] = cached
+        return cached[1]
+
 
 @dataclass
 class SubAgentTask:
@@ -114,6 +148,24 @@ class WorkflowInstance:
     inputs: dict[str, Any] = field(default_factory=dict)  # Store workflow inputs
 
 
+@dataclass
+class RetentionPolicy:
+    """How long finished workflow instances stay resident in an executor.
+
+    With neither limit set, finished workflows are kept until they are
+    evicted explicitly.
+    """
+
+    ttl_seconds: float | None = None  # Evict finished workflows this long after they finish
+    max_completed: int | None = None  # Keep at most this many finished workflows resident
+    max_archived: int = 1000  # Summaries of evicted workflows kept when there is no persistence backend
+
+    @property
+    def enabled(self) -> bool:
+        """Whether finished workflows are evicted automatically."""
+        return self.ttl_seconds is not None or self.max_completed is not None
+
+
 @dataclass
 class StepExecution:
     """Execution information for a workflow step."""
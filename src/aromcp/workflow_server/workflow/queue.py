@@ -1,5 +1,6 @@
 """Workflow queue management for step execution."""
 
+from collections import deque
 from typing import Any
 
 from .models import WorkflowStep
@@ -10,7 +11,8 @@ class WorkflowQueue:
 
     def __init__(self, workflow_id: str, initial_steps: list[WorkflowStep]):
         self.workflow_id = workflow_id
-        self.main_queue: list[WorkflowStep] = initial_steps.copy()
+        # Deque so popping the next step and prepending loop bodies cost O(1) per step, not O(queue length)
+        self.main_queue: deque[WorkflowStep] = deque(initial_steps)
         self.client_queue: list[dict[str, Any]] = []
         self.server_completed: list[dict[str, Any]] = []
         self.loop_stack: list[dict[str, Any]] = []  # Track loop contexts
@@ -26,11 +28,11 @@ class WorkflowQueue:
 
     def pop_next(self) -> WorkflowStep | None:
         """Remove and return the next step."""
-        return self.main_queue.pop(0) if self.main_queue else None
+        return self.main_queue.popleft() if self.main_queue else None
 
     def prepend_steps(self, steps: list[WorkflowStep]):
-        """Add steps to the front of the queue."""
-        self.main_queue = steps + self.main_queue
+        """Add steps to the front of the queue, keeping their order."""
+        self.main_queue.extendleft(reversed(steps))
 
     def push_loop_context(self, loop_type: str, context: dict[str, Any]):
         """Push a loop context onto the stack."""
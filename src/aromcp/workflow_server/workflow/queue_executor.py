@@ -5,30 +5,103 @@ making it simpler, more debuggable, and less prone to infinite loops.
 """
 
 import asyncio
+import copy
+import functools
+import json
 import os
 import threading
+import time
 import uuid
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Generator
+from dataclasses import dataclass
 from datetime import UTC, datetime
 from typing import Any
 
+from ..monitoring.tracing import get_tracer
+from ..persistence.backend import PersistedWorkflow, PersistenceBackend
 from ..state.manager import StateManager
 from ..utils.error_tracking import create_workflow_error
 from .context import ExecutionContext, StackFrame, context_manager
+from .deltas import compute_delta
 from .expressions import ExpressionEvaluator
-from .models import WorkflowDefinition, WorkflowInstance, WorkflowStep
+from .models import RetentionPolicy, WorkflowDefinition, WorkflowInstance, WorkflowStep
 from .queue import WorkflowQueue
+from .scheduler import FairShareScheduler, TimeSlice
 from .step_processors import StepProcessor
 from .step_registry import StepRegistry
+from .steps.shell_command import get_running_commands
 from .subagent_manager import SubAgentManager
 
+_tracer = get_tracer()
+
+# Server steps whose processing blocks on I/O; the async driver runs them in a worker thread
+_BLOCKING_SERVER_STEPS = frozenset({"shell_command"})
+
+# Number of recent views kept per workflow for delta-encoded responses
+_VIEW_HISTORY_SIZE = 4
+
+# Workflow statuses that never return to running, making the instance eligible for eviction
+_FINISHED_STATUSES = frozenset({"completed", "failed", "cancelled"})
+
+
+@dataclass
+class _VersionedView:
+    """A view sent with a versioned response.
+
+    State values are private copies; a new view copies only the top-level keys written since the
+    previous one and shares the rest, so views are never mutated after they are recorded.
+    """
+
+    state_version: int
+    state: dict[str, dict[str, Any]]
+    execution_context: dict[str, Any]
+    # (tier, top-level key) pairs written since the previous view; None if it was rebuilt whole
+    changed_keys: set[tuple[str, str]] | None
+
+    def delta_to(
+        self, state: dict[str, dict[str, Any]], context: dict[str, Any], keys: set[tuple[str, str]] | None
+    ) -> list[dict[str, Any]]:
+        """Compute the operations from this view to a newer one, diffing only the given state keys."""
+        if keys is None:
+            operations = compute_delta({"state": self.state}, {"state": state})
+        else:
+            operations = []
+            for tier, key in sorted(keys):
+                before = {key: self.state[tier][key]} if key in self.state.get(tier, {}) else {}
+                after = {key: state[tier][key]} if key in state.get(tier, {}) else {}
+                operations.extend(compute_delta({"state": {tier: before}}, {"state": {tier: after}}))
+        operations.extend(compute_delta({"execution_context": self.execution_context}, {"execution_context": context}))
+        return operations
+
+
+def _on_event_loop_thread() -> bool:
+    """Whether the calling thread is running an asyncio event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
 
 class QueueBasedWorkflowExecutor:
     """Queue-based workflow executor that processes steps sequentially."""
 
-    def __init__(self, state_manager=None, observability_manager=None, error_handler=None):
+    def __init__(
+        self,
+        state_manager=None,
+        observability_manager=None,
+        error_handler=None,
+        persistence: PersistenceBackend | None = None,
+        retention: RetentionPolicy | None = None,
+        scheduler: FairShareScheduler | None = None,
+    ):
         self.workflows: dict[str, WorkflowInstance] = {}
         self.queues: dict[str, WorkflowQueue] = {}
-        self.state_manager = state_manager if state_manager is not None else StateManager()
+        self.state_manager = state_manager if state_manager is not None else StateManager(persistence=persistence)
+        self.persistence = persistence
+        if persistence is not None and getattr(self.state_manager, "persistence", None) is None:
+            self.state_manager.persistence = persistence
         self.observability_manager = observability_manager
         self.error_handler = error_handler
         self.step_registry = StepRegistry()
@@ -40,8 +113,25 @@ class QueueBasedWorkflowExecutor:
 
         # Add locks for thread safety
         self._workflow_locks: dict[str, threading.Lock] = {}
+        self._advance_locks: dict[str, threading.Lock] = {}
+
+        # Recent views sent with versioned get_next_step responses; the epoch keeps
+        # versions from another executor instance or process from matching
+        self._view_history: dict[str, OrderedDict[int, _VersionedView]] = {}
+        self._view_epoch = uuid.uuid4().hex[:8]
+        self._async_workflow_locks: dict[str, asyncio.Lock] = {}
         self._global_lock = threading.Lock()
 
+        # Retention of finished workflows: when each was first seen finished (monotonic time, oldest
+        # first) and, without a persistence backend, compact summaries of the evicted ones
+        self.retention = retention if retention is not None else RetentionPolicy()
+
+        # Optional fair-share scheduling of server-step processing across workflows
+        self.scheduler = scheduler
+        self._finished_at: OrderedDict[str, float] = OrderedDict()
+        self.archived: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._evicted_count = 0
+
         # Debug mode detection
         self._debug_serial = os.getenv("AROMCP_WORKFLOW_DEBUG", "").lower() == "serial"
 
@@ -55,6 +145,20 @@ class QueueBasedWorkflowExecutor:
                 self._workflow_locks[workflow_id] = threading.Lock()
             return self._workflow_locks[workflow_id]
 
+    def _get_advance_lock(self, workflow_id: str) -> threading.Lock:
+        """Get or create the lock serializing every advance of a specific workflow, sync or async."""
+        with self._global_lock:
+            if workflow_id not in self._advance_locks:
+                self._advance_locks[workflow_id] = threading.Lock()
+            return self._advance_locks[workflow_id]
+
+    def _get_async_workflow_lock(self, workflow_id: str) -> asyncio.Lock:
+        """Get or create the lock queueing async calls for a specific workflow ahead of its advance lock."""
+        with self._global_lock:
+            if workflow_id not in self._async_workflow_locks:
+                self._async_workflow_locks[workflow_id] = asyncio.Lock()
+            return self._async_workflow_locks[workflow_id]
+
     def _get_state(self, workflow_id: str) -> dict[str, Any]:
         """Get workflow state with proper error handling.
 
@@ -97,11 +201,18 @@ class QueueBasedWorkflowExecutor:
             raise ValueError(f"Failed to update state for workflow {workflow_id}: {str(e)}") from e
 
     def start(self, workflow_def: WorkflowDefinition, inputs: dict[str, Any] | None = None) -> dict[str, Any]:
-        """Start a new workflow instance."""
+        """Start a new workflow instance.
+
+        Finished workflows past the retention policy are evicted first, so a
+        long-running server stays bounded by its policy.
+        """
+        if self.retention.enabled:
+            self.compact_workflows()
+
         workflow_id = f"wf_{uuid.uuid4().hex[:8]}"
 
-        # Initialize state
-        initial_state = workflow_def.default_state.copy()
+        # Initialize state; definitions are shared through the loader cache, so never mutate their defaults
+        initial_state = copy.deepcopy(workflow_def.default_state)
         if inputs:
             # Merge inputs into inputs state
             if "inputs" not in initial_state:
@@ -123,18 +234,15 @@ class QueueBasedWorkflowExecutor:
             inputs=inputs or {},
         )
         self.workflows[workflow_id] = instance
+        if self.scheduler is not None:
+            self.scheduler.register(workflow_id, weight=workflow_def.config.get("scheduler_weight", 1.0))
 
         # Track workflow status in state manager for test compatibility
         if not hasattr(self.state_manager, "_workflow_statuses"):
             self.state_manager._workflow_statuses = {}
         self.state_manager._workflow_statuses[workflow_id] = "running"
 
-        # Initialize state manager with schema
-        if not hasattr(self.state_manager, "_schema") or self.state_manager._schema != workflow_def.state_schema:
-            self.state_manager._schema = workflow_def.state_schema
-            # Re-initialize transformation components if schema has computed fields
-            if self.state_manager._schema.computed:
-                self.state_manager._setup_transformations()
+        self._apply_state_schema(workflow_def)
 
         # Set initial state by applying updates
         updates = []
@@ -162,6 +270,7 @@ class QueueBasedWorkflowExecutor:
 
         # Initialize queue
         self.queues[workflow_id] = WorkflowQueue(workflow_id, workflow_def.steps)
+        self._persist_workflow(instance, self.queues[workflow_id])
 
         # Get the current state from state manager (includes computed fields)
         current_state = self._get_state(workflow_id)
@@ -174,180 +283,439 @@ class QueueBasedWorkflowExecutor:
             "execution_context": self._create_simplified_execution_context(context),
         }
 
-    def get_next_step(self, workflow_id: str) -> dict[str, Any] | None:
-        """Get the next batch of steps for the client to execute."""
+    def get_next_step(self, workflow_id: str, since_version: str | None = None) -> dict[str, Any] | None:
+        """Get the next batch of steps for the client to execute.
+
+        Args:
+            workflow_id: The workflow ID
+            since_version: Opt in to versioned responses. Pass "" for a full snapshot, then the
+                state_version from the previous response to receive only the changes since then
+
+        Returns:
+            Client steps with the execution context, or with state_version plus either a delta
+            or a snapshot when since_version is given; None once the workflow is complete
+        """
         if workflow_id not in self.workflows:
             return {"error": f"Workflow {workflow_id} not found"}
 
         lock = self._get_workflow_lock(workflow_id)
-        with lock:
-            queue = self.queues[workflow_id]
-            instance = self.workflows[workflow_id]
+        advance_lock = self._get_advance_lock(workflow_id)
+        if not advance_lock.acquire(blocking=not _on_event_loop_thread()):
+            # Another call is advancing the workflow, and waiting here would block the event loop it may need
+            return self._create_in_progress_response(workflow_id)
+        try:
+            with _tracer.span("get_next_step", "workflow", workflow_id=workflow_id):
+                advance = self._advance(workflow_id, since_version)
+                try:
+                    with lock:
+                        request = next(advance)
+                    while True:
+                        # Blocking steps run without the workflow lock so status reads can see their progress
+                        result = request()
+                        with lock:
+                            request = advance.send(result)
+                except StopIteration as done:
+                    return done.value
+        finally:
+            advance_lock.release()
+
+    async def get_next_step_async(self, workflow_id: str, since_version: str | None = None) -> dict[str, Any] | None:
+        """Get the next batch of steps without blocking the event loop.
+
+        Blocking server steps such as shell commands run in a worker thread while
+        the event loop keeps advancing other workflows. Async calls for the same
+        workflow queue on a per-workflow asyncio lock, then hold the same advance
+        lock as get_next_step, so the two drivers never step past each other's
+        in-flight commands. The workflow's thread lock is only held between awaits.
+        """
+        if workflow_id not in self.workflows:
+            return {"error": f"Workflow {workflow_id} not found"}
 
-            # Implicitly complete any pending client steps from previous get_next_step call
-            if queue.pending_client_steps:
-                for pending_step in queue.pending_client_steps:
-                    self._implicitly_complete_step(workflow_id, pending_step["id"], instance)
-                queue.clear_pending_steps()
+        lock = self._get_workflow_lock(workflow_id)
+        advance_lock = self._get_advance_lock(workflow_id)
+        async with self._get_async_workflow_lock(workflow_id):
+            await self._acquire_off_loop(advance_lock)
+            advance = self._advance(workflow_id, since_version)
+            release = True
+            try:
+                with _tracer.span("get_next_step", "workflow", workflow_id=workflow_id, mode="async"):
+                    finished, value = await self._send_locked(lock, advance, None)
+                    while not finished:
+                        running = asyncio.ensure_future(asyncio.to_thread(value))
+                        try:
+                            result = await asyncio.shield(running)
+                        except asyncio.CancelledError:
+                            # Keep other callers out until the abandoned step finishes in its thread
+                            release = False
+                            running.add_done_callback(lambda _: advance_lock.release())
+                            raise
+                        finished, value = await self._send_locked(lock, advance, result)
+                    return value
+            finally:
+                # On cancellation, end the step loop now so its time slice gives back any scheduler slot
+                advance.close()
+                if release:
+                    advance_lock.release()
+
+    async def _acquire_off_loop(self, lock: threading.Lock) -> None:
+        """Acquire a thread lock, waiting in a worker thread so the event loop keeps running."""
+        if not lock.acquire(blocking=False):
+            acquiring = asyncio.ensure_future(asyncio.to_thread(lock.acquire))
+            try:
+                await asyncio.shield(acquiring)
+            except asyncio.CancelledError:
+                # The worker may still get the lock after cancellation; give it back when it does
+                acquiring.add_done_callback(lambda _: lock.release())
+                raise
+
+    def _create_in_progress_response(self, workflow_id: str) -> dict[str, Any]:
+        """Wait step returned to a caller that cannot wait for a concurrent advance to finish."""
+        return {
+            "steps": [
+                {
+                    "id": f"in_progress_{workflow_id}",
+                    "type": "wait_step",
+                    "definition": {"message": "Another call is advancing this workflow; call again to continue"},
+                    "is_wait": True,
+                }
+            ],
+            "workflow_id": workflow_id,
+        }
+
+    async def _send_locked(self, lock: threading.Lock, advance: Generator, value: Any) -> tuple[bool, Any]:
+        """Resume a step loop under the workflow's thread lock without blocking the event loop.
+
+        Returns:
+            (True, response) once the step loop finishes, else (False, blocking callable)
+        """
+        await self._acquire_off_loop(lock)
+        try:
+            return False, advance.send(value)
+        except StopIteration as done:
+            return True, done.value
+        finally:
+            lock.release()
+
+    def _advance(
+        self, workflow_id: str, since_version: str | None = None
+    ) -> Generator[Callable[[], dict[str, Any]], dict[str, Any], dict[str, Any] | None]:
+        """Advance a workflow up to its next client steps.
+
+        Yields a callable for each blocking server step and expects its result to be
+        sent back, so synchronous and asynchronous drivers share one step loop. With
+        a scheduler, server steps run inside a fair-share time slice, and waiting for
+        a scheduler slot is yielded the same way as a blocking step.
+        """
+        time_slice = self.scheduler.begin_slice(workflow_id) if self.scheduler is not None else None
+        try:
+            return (yield from self._advance_steps(workflow_id, since_version, time_slice))
+        finally:
+            if time_slice is not None:
+                time_slice.end()
+
+    def _advance_steps(
+        self, workflow_id: str, since_version: str | None, time_slice: TimeSlice | None
+    ) -> Generator[Callable[[], Any], Any, dict[str, Any] | None]:
+        """Step loop of _advance, charging server steps to the time slice if there is one."""
+        queue = self.queues[workflow_id]
+        instance = self.workflows[workflow_id]
+
+        # Implicitly complete any pending client steps from previous get_next_step call
+        if queue.pending_client_steps:
+            for pending_step in queue.pending_client_steps:
+                self._implicitly_complete_step(workflow_id, pending_step["id"], instance)
+            queue.clear_pending_steps()
+
+        # Process steps until we hit a client step or run out
+        while queue.has_steps():
+            step = queue.peek_next()
+            if not step:
+                break
 
-            # Process steps until we hit a client step or run out
-            while queue.has_steps():
-                step = queue.peek_next()
-                if not step:
+            step_config = self.step_registry.get(step.type)
+            if not step_config:
+                # Check if it's a debug step that should be handled server-side
+                if step.type.startswith("debug_"):
+                    # Process debug steps on server side
+                    queue.pop_next()
+                    result = self._process_server_step(instance, step, queue)
+                    if result.get("executed"):
+                        queue.server_completed.append(result)
+                    continue
+                else:
+                    # Unknown step type - treat as client step
+                    queue.pop_next()
+                    queue.client_queue.append(
+                        {
+                            "id": step.id,
+                            "type": step.type,
+                            "definition": step.definition,
+                            "error": f"Unknown step type: {step.type}",
+                        }
+                    )
                     break
 
-                step_config = self.step_registry.get(step.type)
-                if not step_config:
-                    # Check if it's a debug step that should be handled server-side
-                    if step.type.startswith("debug_"):
-                        # Process debug steps on server side
-                        queue.pop_next()
-                        result = self._process_server_step(instance, step, queue)
-                        if result.get("executed"):
-                            queue.server_completed.append(result)
-                        continue
-                    else:
-                        # Unknown step type - treat as client step
-                        queue.pop_next()
-                        queue.client_queue.append(
-                            {
-                                "id": step.id,
-                                "type": step.type,
-                                "definition": step.definition,
-                                "error": f"Unknown step type: {step.type}",
-                            }
-                        )
-                        break
+            # Determine execution context: use step_config by default, override for shell_command with execution_context
+            execution_context = step_config["execution"]
+            if step.type == "shell_command" and "execution_context" in step.definition:
+                execution_context = step.definition["execution_context"]
 
-                # Determine execution context: use step_config by default, override for shell_command with execution_context
-                execution_context = step_config["execution"]
-                if step.type == "shell_command" and "execution_context" in step.definition:
-                    execution_context = step.definition["execution_context"]
-
-                # Special handling: mcp_call with workflow_state_update tool should be processed server-side
-                if step.type == "mcp_call" and step.definition.get("tool") == "workflow_state_update":
-                    execution_context = "server"
-
-                if execution_context == "server":
-                    # Special handling for wait_step
-                    if step.type == "wait_step":
-                        # Don't process wait_step - just return it to client
-                        queue.pop_next()
-                        message = step.definition.get("message", "Waiting for next client request...")
-                        queue.client_queue.append(
-                            {"id": step.id, "type": "wait_step", "definition": {"message": message}, "is_wait": True}
-                        )
-                        # Stop processing - wait_step should be the only thing returned
-                        break
+            # Special handling: mcp_call with workflow_state_update tool should be processed server-side
+            if step.type == "mcp_call" and step.definition.get("tool") == "workflow_state_update":
+                execution_context = "server"
+
+            if execution_context == "server":
+                # Special handling for wait_step
+                if step.type == "wait_step":
+                    # Don't process wait_step - just return it to client
+                    queue.pop_next()
+                    message = step.definition.get("message", "Waiting for next client request...")
+                    queue.client_queue.append(
+                        {"id": step.id, "type": "wait_step", "definition": {"message": message}, "is_wait": True}
+                    )
+                    # Stop processing - wait_step should be the only thing returned
+                    break
 
-                    # Process other server steps
+                # Process other server steps, handing blocking ones to the driver
+                if step.type in _BLOCKING_SERVER_STEPS:
+                    queue.pop_next()
+                    if time_slice is not None:
+                        # Blocking steps wait on I/O, so they do not hold a scheduler slot
+                        time_slice.release()
+                    result = yield functools.partial(self._process_server_step, instance, step, queue)
+                elif time_slice is None:
                     queue.pop_next()
                     result = self._process_server_step(instance, step, queue)
+                else:
+                    if time_slice.exhausted:
+                        # This call used its share; return so other workflows run, and resume on the next call
+                        time_slice.preempted = True
+                        if not queue.client_queue:
+                            queue.client_queue.append(
+                                {
+                                    "id": f"yield_{step.id}",
+                                    "type": "wait_step",
+                                    "definition": {"message": "Server step budget used; call again to continue"},
+                                    "is_wait": True,
+                                }
+                            )
+                        break
+                    if not time_slice.try_acquire():
+                        yield time_slice.acquire
+                    queue.pop_next()
+                    with time_slice.charge():
+                        result = self._process_server_step(instance, step, queue)
 
+                if result.get("error"):
+                    # Server step failed - return error to client
+                    # Use concise error message for token efficiency
+                    error_message = self._create_concise_error_message(result["error"], workflow_id, step.id)
+                    return {"error": error_message, "step_id": step.id, "workflow_id": workflow_id}
+
+                # Add to server completed if it produced a result
+                if result.get("executed"):
+                    queue.server_completed.append(result)
+
+            elif execution_context == "client":
+                # Move to client queue
+                queue.pop_next()
+
+                # Get current state for variable replacement
+                # IMPORTANT: Re-read state to get latest updates from server steps
+                current_state = self._get_state(workflow_id)
+                # Use nested state for template expressions (not flattened)
+                # Template expressions like "{{ raw.user_name }}" expect nested structure
+                # For control flow steps, preserve template expressions
+                preserve_templates = step.type in ["foreach", "parallel_foreach", "while_loop"]
+                # Loop variables ({{ loop.item }}) resolve from the execution context's current iteration
+                with _tracer.span(step.type, "step", step_id=step.id, execution="client"):
+                    processed_definition = self.step_processor._replace_variables(
+                        step.definition,
+                        current_state,
+                        False,
+                        instance,
+                        preserve_templates,
+                        context_manager.contexts.get(workflow_id),
+                        plan=step.get_template_plan(),
+                    )
+
+                # Special handling for parallel_foreach
+                if step.type == "parallel_foreach":
+                    result = self._prepare_parallel_foreach(instance, step, processed_definition, current_state)
                     if result.get("error"):
-                        # Server step failed - return error to client
                         # Use concise error message for token efficiency
                         error_message = self._create_concise_error_message(result["error"], workflow_id, step.id)
                         return {"error": error_message, "step_id": step.id, "workflow_id": workflow_id}
+                    # Add enhanced definition with tasks
+                    processed_definition = result["definition"]
+
+                    # Handle debug mode - extract internal data and store in queue, then clean definition
+                    if processed_definition.get("debug_serial"):
+                        # Extract temporary debug data and store in queue
+                        temp_sub_agent_steps = processed_definition.pop("_temp_debug_sub_agent_steps", [])
+                        temp_sub_agent_task_def = processed_definition.pop("_temp_debug_sub_agent_task_def", None)
+
+                        if temp_sub_agent_steps:
+                            # Store in queue for debug expansion access
+                            debug_key = f"_debug_{step.id}"
+                            setattr(queue, f"{debug_key}_sub_agent_steps", temp_sub_agent_steps)
+                            setattr(queue, f"{debug_key}_sub_agent_task_def", temp_sub_agent_task_def)
+
+                        # Now handle debug expansion with clean definition
+                        debug_result = self._handle_debug_serial_foreach(instance, step, processed_definition, queue)
+                        if debug_result is not None and "error" in debug_result:
+                            # Debug expansion failed - return error
+                            error_data = debug_result["error"]
+                            if isinstance(error_data, dict) and "message" in error_data:
+                                error_message = error_data["message"]
+                            else:
+                                error_message = str(error_data)
+                            return {"error": error_message, "step_id": step.id, "workflow_id": workflow_id}
+                        elif debug_result is None:
+                            # First time seeing this debug step - re-queue it for subsequent expansion
+                            # Add the step back to the queue for next processing cycle
+                            queue.prepend_steps([step])
+                            # Continue with normal processing to return the debug info to client
+                        elif debug_result.get("debug_expansion_completed"):
+                            # Debug expansion succeeded - also skip any waiting/monitoring loops that follow
+                            self._skip_parallel_waiting_loops(queue)
+                            continue
+
+                queue.client_queue.append({"id": step.id, "type": step.type, "definition": processed_definition})
+
+                # If not batchable, stop here
+                # In debug mode, return steps one at a time even if batchable
+                if step_config["queuing"] != "batch" or self._debug_serial:
+                    break
 
-                    # Add to server completed if it produced a result
-                    if result.get("executed"):
-                        queue.server_completed.append(result)
+        # Return client steps and server completed
+        if queue.client_queue:
+            response = {
+                "steps": queue.client_queue,
+                # "server_completed_steps": queue.server_completed,
+                "workflow_id": workflow_id,
+            }
+            if since_version is None:
+                response["execution_context"] = self._get_execution_context(workflow_id)
+            else:
+                response.update(self._get_versioned_view(workflow_id, since_version))
+
+            # Move client steps to pending (for implicit completion on next call)
+            queue.move_client_steps_to_pending()
+            queue.server_completed = []  # Clear server completed steps
+            self._persist_workflow(instance, queue)
+            return response
+
+        # Check if workflow is complete
+        if not queue.has_steps() and not queue.loop_stack:
+            # Don't change status if workflow is already failed
+            if instance.status != "failed":
+                instance.status = "completed"
+                instance.completed_at = datetime.now(UTC).isoformat()
+                # Update status tracking
+                if hasattr(self.state_manager, "_workflow_statuses"):
+                    self.state_manager._workflow_statuses[workflow_id] = "completed"
+            context_manager.remove_context(workflow_id)
+            self._persist_workflow(instance, queue)
+            self._mark_finished(workflow_id)
+            return None
 
-                elif execution_context == "client":
-                    # Move to client queue
-                    queue.pop_next()
+        # No more steps but might be in a loop
+        return None
 
-                    # Get current state for variable replacement
-                    # IMPORTANT: Re-read state to get latest updates from server steps
-                    current_state = self._get_state(workflow_id)
-                    # Use nested state for template expressions (not flattened)
-                    # Template expressions like "{{ raw.user_name }}" expect nested structure
-                    # For control flow steps, preserve template expressions
-                    preserve_templates = step.type in ["foreach", "parallel_foreach", "while_loop"]
-                    processed_definition = self.step_processor._replace_variables(
-                        step.definition, current_state, False, instance, preserve_templates
-                    )
+    def _apply_state_schema(self, workflow_def: WorkflowDefinition) -> None:
+        """Install a definition's state schema and computed-field transforms on the state manager."""
+        if not hasattr(self.state_manager, "_schema") or self.state_manager._schema != workflow_def.state_schema:
+            self.state_manager._schema = workflow_def.state_schema
+            # Re-initialize transformation components if schema has computed fields
+            if self.state_manager._schema.computed:
+                self.state_manager._setup_transformations()
 
-                    # Special handling for parallel_foreach
-                    if step.type == "parallel_foreach":
-                        result = self._prepare_parallel_foreach(instance, step, processed_definition, current_state)
-                        if result.get("error"):
-                            # Use concise error message for token efficiency
-                            error_message = self._create_concise_error_message(result["error"], workflow_id, step.id)
-                            return {"error": error_message, "step_id": step.id, "workflow_id": workflow_id}
-                        # Add enhanced definition with tasks
-                        processed_definition = result["definition"]
-
-                        # Handle debug mode - extract internal data and store in queue, then clean definition
-                        if processed_definition.get("debug_serial"):
-                            # Extract temporary debug data and store in queue
-                            temp_sub_agent_steps = processed_definition.pop("_temp_debug_sub_agent_steps", [])
-                            temp_sub_agent_task_def = processed_definition.pop("_temp_debug_sub_agent_task_def", None)
-
-                            if temp_sub_agent_steps:
-                                # Store in queue for debug expansion access
-                                debug_key = f"_debug_{step.id}"
-                                setattr(queue, f"{debug_key}_sub_agent_steps", temp_sub_agent_steps)
-                                setattr(queue, f"{debug_key}_sub_agent_task_def", temp_sub_agent_task_def)
-
-                            # Now handle debug expansion with clean definition
-                            debug_result = self._handle_debug_serial_foreach(
-                                instance, step, processed_definition, queue
-                            )
-                            if debug_result is not None and "error" in debug_result:
-                                # Debug expansion failed - return error
-                                error_data = debug_result["error"]
-                                if isinstance(error_data, dict) and "message" in error_data:
-                                    error_message = error_data["message"]
-                                else:
-                                    error_message = str(error_data)
-                                return {"error": error_message, "step_id": step.id, "workflow_id": workflow_id}
-                            elif debug_result is None:
-                                # First time seeing this debug step - re-queue it for subsequent expansion
-                                # Add the step back to the queue for next processing cycle
-                                queue.prepend_steps([step])
-                                # Continue with normal processing to return the debug info to client
-                            elif debug_result.get("debug_expansion_completed"):
-                                # Debug expansion succeeded - also skip any waiting/monitoring loops that follow
-                                self._skip_parallel_waiting_loops(queue)
-                                continue
-
-                    queue.client_queue.append({"id": step.id, "type": step.type, "definition": processed_definition})
-
-                    # If not batchable, stop here
-                    # In debug mode, return steps one at a time even if batchable
-                    if step_config["queuing"] != "batch" or self._debug_serial:
-                        break
+    def _persist_workflow(self, instance: WorkflowInstance, queue: WorkflowQueue | None = None) -> None:
+        """Queue a durable write of the workflow record and its queue position."""
+        if self.persistence is None:
+            return
+
+        self.persistence.save_workflow(
+            PersistedWorkflow(
+                workflow_id=instance.id,
+                workflow_name=instance.workflow_name,
+                status=instance.status,
+                created_at=instance.created_at,
+                completed_at=instance.completed_at,
+                error_message=instance.error_message,
+                inputs=instance.inputs,
+                remaining_steps=[step.id for step in queue.main_queue] if queue else [],
+                pending_steps=[step["id"] for step in queue.pending_client_steps] if queue else [],
+            )
+        )
 
-            # Return client steps and server completed
-            if queue.client_queue:
-                response = {
-                    "steps": queue.client_queue,
-                    # "server_completed_steps": queue.server_completed,
-                    "workflow_id": workflow_id,
-                    "execution_context": self._get_execution_context(workflow_id),
-                }
+    def resume_workflow(self, workflow_id: str, workflow_def: WorkflowDefinition) -> dict[str, Any]:
+        """Restore a persisted workflow into this executor.
 
-                # Move client steps to pending (for implicit completion on next call)
-                queue.move_client_steps_to_pending()
-                queue.server_completed = []  # Clear server completed steps
-                return response
-
-            # Check if workflow is complete
-            if not queue.has_steps() and not queue.loop_stack:
-                # Don't change status if workflow is already failed
-                if instance.status != "failed":
-                    instance.status = "completed"
-                    instance.completed_at = datetime.now(UTC).isoformat()
-                    # Update status tracking
-                    if hasattr(self.state_manager, "_workflow_statuses"):
-                        self.state_manager._workflow_statuses[workflow_id] = "completed"
-                context_manager.remove_context(workflow_id)
-                return None
-
-            # No more steps but might be in a loop
-            return None
+        State is rebuilt from the latest snapshot plus the delta log. The queue is
+        rebuilt at top-level step granularity: steps that were still queued resume
+        from their definition, and client steps handed out before the restart are
+        implicitly completed on the next get_next_step call.
+
+        Args:
+            workflow_id: ID of the persisted workflow
+            workflow_def: Definition the workflow was started from
+
+        Returns:
+            Resume information, or an error if the workflow was never persisted
+        """
+        if self.persistence is None:
+            return {"error": "Workflow persistence is not enabled"}
+
+        record = self.persistence.load_workflow(workflow_id)
+        if record is None:
+            return {"error": f"Workflow {workflow_id} not found in persistent storage"}
+
+        # Computed fields are recalculated from the restored state on the first read
+        self._apply_state_schema(workflow_def)
+        if not self.state_manager.restore(workflow_id):
+            self._update_state(workflow_id, [])
+
+        lock = self._get_workflow_lock(workflow_id)
+        with lock:
+            instance = WorkflowInstance(
+                id=workflow_id,
+                workflow_name=record.workflow_name,
+                definition=workflow_def,
+                status=record.status,
+                created_at=record.created_at,
+                completed_at=record.completed_at,
+                error_message=record.error_message,
+                inputs=record.inputs,
+            )
+            self.workflows[workflow_id] = instance
+
+            if not hasattr(self.state_manager, "_workflow_statuses"):
+                self.state_manager._workflow_statuses = {}
+            self.state_manager._workflow_statuses[workflow_id] = instance.status
+
+            remaining = set(record.remaining_steps)
+            queue = WorkflowQueue(workflow_id, [step for step in workflow_def.steps if step.id in remaining])
+            queue.pending_client_steps = [{"id": step_id} for step_id in record.pending_steps]
+            self.queues[workflow_id] = queue
+
+            if instance.status == "running":
+                context = ExecutionContext(workflow_id=workflow_id)
+                context.push_frame(
+                    StackFrame(
+                        frame_id=str(uuid.uuid4()), frame_type="workflow", step_id="main", steps=list(queue.main_queue)
+                    )
+                )
+                context_manager.contexts[workflow_id] = context
+
+            return {
+                "workflow_id": workflow_id,
+                "status": instance.status,
+                "state": self._get_state(workflow_id),
+                "steps_remaining": len(queue.main_queue),
+                "resumed": True,
+            }
 
     def _implicitly_complete_step(self, workflow_id: str, step_id: str, instance: "WorkflowInstance") -> None:
         """Implicitly complete a client step (called when get_next_step is called again).
@@ -377,7 +745,8 @@ class QueueBasedWorkflowExecutor:
         step_config = self.step_registry.get(step.type)
         # Get execution context for this workflow
         context = context_manager.contexts.get(instance.id)
-        return self.step_processor.process_server_step(instance, step, queue, step_config, context)
+        with _tracer.span(step.type, "step", step_id=step.id, execution="server"):
+            return self.step_processor.process_server_step(instance, step, queue, step_config, context)
 
     def _prepare_parallel_foreach(
         self, instance: WorkflowInstance, step: WorkflowStep, definition: dict[str, Any], state: dict[str, Any]
@@ -506,18 +875,14 @@ class QueueBasedWorkflowExecutor:
         """Flatten nested control flow steps to get actionable steps for debug mode."""
         flattened = []
 
-        def extract_actionable_steps(steps: list[dict[str, Any]], depth: int = 0) -> None:
+        def extract_actionable_steps(steps: list[dict[str, Any]]) -> None:
             """Recursively extract actionable steps from nested structures."""
-            indent = "  " * depth
             for step in steps:
                 step_type = step.get("type", "")
-                step_id = step.get("id", "")
-                print(f"🐛 DEBUG: {indent}Examining: {step_id} ({step_type})")
 
                 if step_type in ["mcp_call", "user_message", "shell_command"]:
                     # This is an actionable step
                     flattened.append(step)
-                    print(f"🐛 DEBUG: {indent}  ✓ Added actionable step")
                 elif step_type == "conditional":
                     # Recursively extract from conditional branches
                     # Handle both WorkflowStep objects (with definition) and raw dicts
@@ -531,28 +896,16 @@ class QueueBasedWorkflowExecutor:
                         then_steps = step.get("then_steps", [])
                         else_steps = step.get("else_steps", [])
 
-                    print(
-                        f"🐛 DEBUG: {indent}  Diving into conditional: {len(then_steps)} then, {len(else_steps)} else"
-                    )
-                    print(f"🐛 DEBUG: {indent}    Step keys: {list(step.keys())}")
-                    extract_actionable_steps(then_steps, depth + 1)
-                    extract_actionable_steps(else_steps, depth + 1)
-                elif step_type == "while_loop":
-                    # Recursively extract from while loop body
-                    body = step.get("definition", {}).get("body", [])
-                    print(f"🐛 DEBUG: {indent}  Diving into while_loop body: {len(body)} steps")
-                    extract_actionable_steps(body, depth + 1)
-                elif step_type == "foreach":
-                    # Recursively extract from foreach body
-                    body = step.get("definition", {}).get("body", [])
-                    print(f"🐛 DEBUG: {indent}  Diving into foreach body: {len(body)} steps")
-                    extract_actionable_steps(body, depth + 1)
-                else:
-                    print(f"🐛 DEBUG: {indent}  Skipping {step_type}")
+                    extract_actionable_steps(then_steps)
+                    extract_actionable_steps(else_steps)
+                elif step_type in ("while_loop", "foreach"):
+                    # Recursively extract from loop body
+                    extract_actionable_steps(step.get("definition", {}).get("body", []))
 
-        print(f"🐛 DEBUG: Starting flattening process for {len(sub_agent_steps)} steps")
         extract_actionable_steps(sub_agent_steps)
-        print(f"🐛 DEBUG: Flattening complete: found {len(flattened)} actionable steps")
+        _tracer.event(
+            "debug.flatten_sub_agent_steps", "workflow", steps=len(sub_agent_steps), actionable=len(flattened)
+        )
 
         return flattened
 
@@ -565,7 +918,7 @@ class QueueBasedWorkflowExecutor:
 
         if task_id and hasattr(self, "subagent_manager"):
             # Try to get sub-agent state
-            with self.subagent_manager._lock:
+            with self.subagent_manager.task_lock(task_id):
                 sub_agent_context = self.subagent_manager.sub_agent_contexts.get(task_id, {})
                 sub_agent_state = sub_agent_context.get("sub_agent_state", {})
 
@@ -655,7 +1008,7 @@ class QueueBasedWorkflowExecutor:
 
         # Remove the waiting loops (in reverse order to maintain indices)
         for i in reversed(steps_to_skip):
-            queue.main_queue.pop(i)
+            del queue.main_queue[i]
 
     def _get_execution_context(self, workflow_id: str) -> dict[str, Any]:
         """Get simplified execution context for AI agents."""
@@ -673,6 +1026,72 @@ class QueueBasedWorkflowExecutor:
 
         return {"status": "not_found"}
 
+    def _get_versioned_view(self, workflow_id: str, since_version: str) -> dict[str, Any]:
+        """Get the state and execution context as a delta against a version the client holds.
+
+        The view is {"state": ..., "execution_context": ...}; state omits the raw alias of
+        inputs. A new version is recorded only when the view changes, and the last few
+        versions are kept to diff against. Unknown or evicted versions get a full snapshot.
+        Only the top-level state keys the state manager stamped as written since a recorded
+        view are copied and diffed.
+
+        Args:
+            workflow_id: The workflow ID
+            since_version: Version the client last applied, or "" for a snapshot
+
+        Returns:
+            {"state_version": ..., "delta": [...]} or {"state_version": ..., "snapshot": {...}}
+        """
+        history = self._view_history.setdefault(workflow_id, OrderedDict())
+        latest_number, latest = next(reversed(history.items()), (0, None))
+        try:
+            state_version, state, written = self.state_manager.read_changes(
+                workflow_id, latest.state_version if latest is not None else None
+            )
+        except Exception as e:
+            raise ValueError(f"Failed to read state for workflow {workflow_id}: {str(e)}") from e
+        context = self._get_execution_context(workflow_id)
+        view = {"state": state, "execution_context": context}
+
+        if latest is None or written is None:
+            changed_keys = None
+            changes = None if latest is None else latest.delta_to(state, context, None)
+        else:
+            changed_keys = set(written)
+            changes = latest.delta_to(state, context, changed_keys)
+
+        number = latest_number
+        if changes is None or changes:
+            if changed_keys is None:
+                recorded_state = copy.deepcopy(state)
+            else:
+                recorded_state = {tier: dict(values) for tier, values in latest.state.items()}
+                for tier, key in changed_keys:
+                    if key in state[tier]:
+                        recorded_state[tier][key] = copy.deepcopy(state[tier][key])
+                    else:
+                        recorded_state[tier].pop(key, None)
+            number += 1
+            history[number] = _VersionedView(state_version, recorded_state, copy.deepcopy(context), changed_keys)
+            while len(history) > _VIEW_HISTORY_SIZE:
+                history.popitem(last=False)
+        else:
+            # Nothing visible changed; advance the stamp so the same writes are not diffed again
+            latest.state_version = state_version
+        version = f"{self._view_epoch}.{number}"
+
+        epoch, _, since_number = since_version.partition(".")
+        base_number = int(since_number) if epoch == self._view_epoch and since_number.isdigit() else None
+        if base_number == number:
+            return {"state_version": version, "delta": []}
+        if base_number == latest_number and changes is not None:
+            return {"state_version": version, "delta": changes}
+        if base_number in history:
+            newer = [entry.changed_keys for entry_number, entry in history.items() if entry_number > base_number]
+            changed_keys = None if None in newer else set().union(*newer)
+            return {"state_version": version, "delta": history[base_number].delta_to(state, context, changed_keys)}
+        return {"state_version": version, "snapshot": view}
+
     def _create_simplified_execution_context(self, context) -> dict[str, Any]:
         """Create a simplified execution context with only data needed by AI agents."""
         # Get current workflow state for progress tracking
@@ -788,8 +1207,15 @@ class QueueBasedWorkflowExecutor:
         return error_msg
 
     def get_workflow_status(self, workflow_id: str) -> dict[str, Any]:
-        """Get the status of a workflow."""
+        """Get the status of a workflow.
+
+        Evicted workflows report their archived summary, read from the
+        persistence backend when there is one.
+        """
         if workflow_id not in self.workflows:
+            archived = self._get_archived_summary(workflow_id)
+            if archived is not None:
+                return archived
             return {"error": f"Workflow {workflow_id} not found"}
 
         lock = self._get_workflow_lock(workflow_id)
@@ -813,6 +1239,14 @@ class QueueBasedWorkflowExecutor:
             if context:
                 result["execution_context"] = self._create_simplified_execution_context(context)
 
+            # Include output captured so far from shell commands still running
+            running_commands = get_running_commands(workflow_id)
+            if running_commands:
+                result["running_commands"] = running_commands
+
+            if self.scheduler is not None:
+                result["scheduling"] = self.scheduler.get_workflow_stats(workflow_id)
+
             return result
 
     def update_workflow_state(self, workflow_id: str, updates: list[dict[str, Any]]) -> dict[str, Any]:
@@ -840,9 +1274,20 @@ class QueueBasedWorkflowExecutor:
 
     def get_next_sub_agent_step(self, workflow_id: str, task_id: str) -> dict[str, Any] | None:
         """Get the next step for a sub-agent task."""
-        # Delegate to sub-agent manager with explicit workflow_id
-        lock = self._get_workflow_lock(workflow_id)
-        return self.subagent_manager.get_next_sub_agent_step(task_id, lock)
+        # Sub-agents run against isolated state, so the parent workflow lock is not needed
+        return self.subagent_manager.get_next_sub_agent_step(task_id)
+
+    def get_next_sub_agent_steps(self, workflow_id: str, task_ids: list[str]) -> dict[str, dict[str, Any] | None]:
+        """Get the next step for several sub-agent tasks in one call.
+
+        Args:
+            workflow_id: The parent workflow ID
+            task_ids: IDs of the sub-agent tasks to advance
+
+        Returns:
+            Mapping of task ID to its next step, None for completed tasks or an error response
+        """
+        return self.subagent_manager.get_next_sub_agent_steps(task_ids)
 
     def execute_sub_agent_step(
         self, workflow_id: str, task_id: str, step_id: str, result: dict[str, Any] | None = None
@@ -952,6 +1397,153 @@ class QueueBasedWorkflowExecutor:
         except Exception as e:
             return {"error": str(e), "status": "failed"}
 
+    def _mark_finished(self, workflow_id: str) -> None:
+        """Start the retention clock for a finished workflow."""
+        with self._global_lock:
+            self._finished_at.setdefault(workflow_id, time.monotonic())
+
+    def compact_workflows(self) -> dict[str, Any]:
+        """Evict finished workflows that fall outside the retention policy.
+
+        Workflows are evicted once they have been finished for longer than
+        ttl_seconds, and oldest first while more than max_completed are resident.
+        Runs automatically when a workflow starts if the policy sets a limit.
+
+        Returns:
+            IDs of the evicted workflows and the number still resident
+        """
+        policy = self.retention
+        now = time.monotonic()
+        with self._global_lock:
+            for workflow_id, instance in list(self.workflows.items()):
+                if instance.status in _FINISHED_STATUSES:
+                    self._finished_at.setdefault(workflow_id, now)
+
+            expired = []
+            if policy.ttl_seconds is not None:
+                expired = [
+                    wf_id for wf_id, finished in self._finished_at.items() if now - finished >= policy.ttl_seconds
+                ]
+            if policy.max_completed is not None:
+                excess = len(self._finished_at) - policy.max_completed
+                expired.extend(wf_id for wf_id in list(self._finished_at)[: max(excess, 0)] if wf_id not in expired)
+
+        evicted = [workflow_id for workflow_id in expired if self.evict_workflow(workflow_id)]
+        return {"evicted": evicted, "resident": len(self.workflows)}
+
+    def evict_workflow(self, workflow_id: str) -> bool:
+        """Archive a finished workflow and free every per-workflow structure.
+
+        With a persistence backend the final workflow record is written there
+        and the workflow can be resumed later; otherwise a compact summary is
+        kept in memory, bounded by the retention policy's max_archived.
+
+        Args:
+            workflow_id: Workflow to evict
+
+        Returns:
+            True if the workflow was evicted, False if it is unknown or still running
+        """
+        instance = self.workflows.get(workflow_id)
+        if instance is None or instance.status not in _FINISHED_STATUSES:
+            return False
+
+        with self._get_workflow_lock(workflow_id):
+            if self.persistence is not None:
+                self._persist_workflow(instance, self.queues.get(workflow_id))
+            else:
+                summary = {
+                    "workflow_id": workflow_id,
+                    "workflow_name": instance.workflow_name,
+                    "status": instance.status,
+                    "created_at": instance.created_at,
+                    "completed_at": instance.completed_at,
+                    "error_message": instance.error_message,
+                }
+                with self._global_lock:
+                    self.archived[workflow_id] = summary
+                    while len(self.archived) > self.retention.max_archived:
+                        self.archived.popitem(last=False)
+
+            if hasattr(self.state_manager, "remove_workflow"):
+                self.state_manager.remove_workflow(workflow_id)
+            context_manager.remove_context(workflow_id)
+            self.subagent_manager.remove_workflow_tasks(workflow_id)
+
+        self._cleanup_workflow_resources(workflow_id)
+        with self._global_lock:
+            self._evicted_count += 1
+        return True
+
+    def _get_archived_summary(self, workflow_id: str) -> dict[str, Any] | None:
+        """Return the summary of an evicted workflow, or None if it was never archived."""
+        summary = self.archived.get(workflow_id)
+        if summary is not None:
+            return {**summary, "archived": True}
+        if self.persistence is not None:
+            record = self.persistence.load_workflow(workflow_id)
+            if record is not None and record.status in _FINISHED_STATUSES:
+                return {
+                    "workflow_id": workflow_id,
+                    "workflow_name": record.workflow_name,
+                    "status": record.status,
+                    "created_at": record.created_at,
+                    "completed_at": record.completed_at,
+                    "error_message": record.error_message,
+                    "archived": True,
+                }
+        return None
+
+    def get_memory_stats(self) -> dict[str, Any]:
+        """Report per-workflow memory use and the size of every per-workflow registry.
+
+        State sizes are estimated from the serialized length of each workflow's
+        state tiers. A registry holding more entries than there are resident
+        workflows points at structures that outlived their workflow.
+        """
+        states = getattr(self.state_manager, "_states", {})
+        sub_agent_tasks = Counter(
+            context["workflow_id"] for context in list(self.subagent_manager.sub_agent_contexts.values())
+        )
+
+        workflows = []
+        for workflow_id, instance in list(self.workflows.items()):
+            state = states.get(workflow_id)
+            queue = self.queues.get(workflow_id)
+            workflows.append(
+                {
+                    "workflow_id": workflow_id,
+                    "status": instance.status,
+                    "state_bytes": (
+                        len(json.dumps([state.inputs, state.state, state.computed], default=str)) if state else 0
+                    ),
+                    "queued_steps": len(queue.main_queue) + len(queue.client_queue) if queue else 0,
+                    "sub_agent_tasks": sub_agent_tasks.get(workflow_id, 0),
+                }
+            )
+
+        state_bytes = sum(workflow["state_bytes"] for workflow in workflows)
+        return {
+            "resident_workflows": len(workflows),
+            "finished_workflows": len(self._finished_at),
+            "evicted_workflows": self._evicted_count,
+            "state_bytes_total": state_bytes,
+            "state_bytes_per_workflow": state_bytes / len(workflows) if workflows else 0.0,
+            "registries": {
+                "workflows": len(self.workflows),
+                "queues": len(self.queues),
+                "workflow_locks": len(self._workflow_locks),
+                "advance_locks": len(self._advance_locks),
+                "async_workflow_locks": len(self._async_workflow_locks),
+                "view_history": len(self._view_history),
+                "states": len(states),
+                "execution_contexts": len(context_manager.contexts),
+                "sub_agent_contexts": len(self.subagent_manager.sub_agent_contexts),
+                "archived": len(self.archived),
+            },
+            "workflows": workflows,
+        }
+
     def _cleanup_workflow_resources(self, workflow_id: str) -> bool:
         """Clean up workflow resources after completion."""
         try:
@@ -963,10 +1555,17 @@ class QueueBasedWorkflowExecutor:
             if workflow_id in self.queues:
                 del self.queues[workflow_id]
 
-            # Remove workflow lock
+            # Remove workflow locks
             with self._global_lock:
                 if workflow_id in self._workflow_locks:
                     del self._workflow_locks[workflow_id]
+                self._advance_locks.pop(workflow_id, None)
+                self._view_history.pop(workflow_id, None)
+                self._async_workflow_locks.pop(workflow_id, None)
+                self._finished_at.pop(workflow_id, None)
+
+            if self.scheduler is not None:
+                self.scheduler.unregister(workflow_id)
 
             return True
         except Exception:
@@ -1130,20 +1729,24 @@ class QueueBasedWorkflowExecutor:
             result["workflow_id"] = workflow_id
         return result
 
-    # Async interface methods for compatibility with production tests
+    # Async interface
     async def start_workflow(
         self, workflow_def: WorkflowDefinition, inputs: dict[str, Any] | None = None
     ) -> dict[str, Any]:
-        """Async version of start method."""
-        return await asyncio.get_event_loop().run_in_executor(None, self.start, workflow_def, inputs)
+        """Async version of start method.
+
+        Starting a workflow only initializes in-memory state (persistence writes are
+        queued), so it runs directly on the event loop.
+        """
+        return self.start(workflow_def, inputs)
 
     async def execute_next(self, workflow_id: str | None = None) -> dict[str, Any] | None:
         """Async version of get_next_step method."""
         if workflow_id:
-            return await asyncio.get_event_loop().run_in_executor(None, self.get_next_step, workflow_id)
+            return await self.get_next_step_async(workflow_id)
         # If no workflow_id provided, get next step for any active workflow
-        for wf_id in self.workflows:
-            result = await asyncio.get_event_loop().run_in_executor(None, self.get_next_step, wf_id)
+        for wf_id in list(self.workflows):
+            result = await self.get_next_step_async(wf_id)
             if result:
                 return result
         return None
@@ -1175,6 +1778,10 @@ class QueueBasedWorkflowExecutor:
             if wf_id in self.workflows:
                 self.workflows[wf_id].status = "stopped"
 
+        # Make queued persistence writes durable so stopped workflows can be resumed
+        if self.persistence is not None:
+            self.persistence.flush()
+
         return {
             "shutdown_completed": True,
             "workflows_stopped": len(active_workflows),
@@ -1205,3 +1812,4 @@ class QueueBasedWorkflowExecutor:
                 # Update status tracking
                 if hasattr(self.state_manager, "_workflow_statuses"):
                     self.state_manager._workflow_statuses[workflow_id] = "cancelled"
+                self._persist_workflow(instance, self.queues.get(workflow_id))
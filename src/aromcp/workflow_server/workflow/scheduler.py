@@ -0,0 +1,227 @@
+"""Fair-share scheduling of server-side step processing across workflows.
+
+Each get_next_step call processes its server steps inside a time slice. A
+slice needs one of the scheduler's slots before it runs CPU-bound server
+steps; when slots are contended they go to the waiting workflow that has
+received the least CPU time relative to its weight (its virtual runtime),
+so one workflow with heavy expansions cannot starve the others. A slice
+that exceeds its CPU budget or step bound ends the call early, and the
+workflow resumes on the client's next get_next_step.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any
+
+
+@dataclass
+class WorkflowShare:
+    """Scheduling account of one workflow."""
+
+    weight: float = 1.0
+    vruntime: float = 0.0  # CPU seconds consumed divided by weight
+    cpu_time: float = 0.0  # CPU seconds spent in server steps
+    server_steps: int = 0
+    slices: int = 0  # Calls that processed at least one server step
+    preempted_slices: int = 0  # Calls ended early by the budget
+    waits: int = 0  # Slot acquisitions that had to queue
+    wait_time: float = 0.0
+    max_wait: float = 0.0
+
+
+class TimeSlice:
+    """One get_next_step call's share of server-step processing for a workflow."""
+
+    def __init__(self, scheduler: "FairShareScheduler", workflow_id: str):
+        self.scheduler = scheduler
+        self.workflow_id = workflow_id
+        self.cpu_time = 0.0
+        self.steps = 0
+        self.holding = False
+        self.preempted = False  # Set when the call ends early because the slice is exhausted
+        self.ended = False
+        self._lock = threading.Lock()
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether the slice has used up its CPU budget or step bound."""
+        budget = self.scheduler.slice_cpu_seconds
+        max_steps = self.scheduler.max_server_steps
+        return (budget is not None and self.cpu_time >= budget) or (max_steps is not None and self.steps >= max_steps)
+
+    def try_acquire(self) -> bool:
+        """Take a slot without waiting; True if the slice now holds one."""
+        with self._lock:
+            if not self.holding and not self.ended:
+                self.holding = self.scheduler._try_acquire()
+            return self.holding
+
+    def acquire(self) -> None:
+        """Wait for a slot in fair-share order.
+
+        Safe to run in a worker thread that outlives its caller: a slot granted after
+        the slice has ended, e.g. because the awaiting task was cancelled, is handed
+        straight back.
+        """
+        with self._lock:
+            if self.holding or self.ended:
+                return
+        self.scheduler._acquire(self.workflow_id)
+        with self._lock:
+            if not self.ended:
+                self.holding = True
+                return
+        self.scheduler._release()
+
+    def release(self) -> None:
+        """Give the slot back, e.g. before blocking on I/O."""
+        with self._lock:
+            holding, self.holding = self.holding, False
+        if holding:
+            self.scheduler._release()
+
+    @contextmanager
+    def charge(self) -> Iterator[None]:
+        """Charge the CPU time of the enclosed server step to the workflow."""
+        start = time.thread_time()
+        try:
+            yield
+        finally:
+            elapsed = time.thread_time() - start
+            self.cpu_time += elapsed
+            self.steps += 1
+            self.scheduler._charge(self.workflow_id, elapsed)
+
+    def end(self) -> None:
+        """Release the slot and record the slice."""
+        with self._lock:
+            self.ended = True
+        self.release()
+        if self.steps:
+            self.scheduler._record_slice(self.workflow_id, self.preempted)
+
+
+class FairShareScheduler:
+    """Weighted fair queuing of server-step processing across workflows."""
+
+    def __init__(self, slots: int = 1, slice_cpu_ms: float | None = 200.0, max_server_steps: int | None = None):
+        """Initialize the scheduler.
+
+        Args:
+            slots: Slices that may run server steps at once. Server steps are CPU-bound
+                Python, so more than one slot mostly adds GIL contention
+            slice_cpu_ms: CPU budget of one get_next_step call's server steps; None for no budget
+            max_server_steps: Bound on server steps processed in one call; None for no bound
+        """
+        self.slots = max(1, slots)
+        self.slice_cpu_seconds = slice_cpu_ms / 1000 if slice_cpu_ms else None
+        self.max_server_steps = max_server_steps
+        self._shares: dict[str, WorkflowShare] = {}
+        self._condition = threading.Condition()
+        self._in_use = 0
+        self._waiters: list[list[Any]] = []  # Heap of [vruntime, sequence, workflow_id]
+        self._sequence = itertools.count()
+        self._floor = 0.0  # Virtual runtime of the last slice granted from the queue
+
+    def register(self, workflow_id: str, weight: float = 1.0) -> None:
+        """Add a workflow with its share weight; higher weights get proportionally more CPU."""
+        with self._condition:
+            share = self._get_share(workflow_id)
+            share.weight = max(weight, 1e-6)
+
+    def unregister(self, workflow_id: str) -> None:
+        """Forget a workflow's scheduling account."""
+        with self._condition:
+            self._shares.pop(workflow_id, None)
+
+    def begin_slice(self, workflow_id: str) -> TimeSlice:
+        """Start the time slice for one get_next_step call."""
+        return TimeSlice(self, workflow_id)
+
+    def _get_share(self, workflow_id: str) -> WorkflowShare:
+        share = self._shares.get(workflow_id)
+        if share is None:
+            # New workflows start level with the others instead of owing or being owed CPU time
+            share = WorkflowShare(vruntime=self._floor)
+            self._shares[workflow_id] = share
+        return share
+
+    def _try_acquire(self) -> bool:
+        with self._condition:
+            if self._in_use < self.slots and not self._waiters:
+                self._in_use += 1
+                return True
+            return False
+
+    def _acquire(self, workflow_id: str) -> None:
+        start = time.monotonic()
+        with self._condition:
+            share = self._get_share(workflow_id)
+            # A workflow returning from idle cannot bank the CPU time it did not use
+            share.vruntime = max(share.vruntime, self._floor)
+            entry = [share.vruntime, next(self._sequence), workflow_id]
+            heapq.heappush(self._waiters, entry)
+            while self._in_use >= self.slots or self._waiters[0] is not entry:
+                self._condition.wait()
+            heapq.heappop(self._waiters)
+            self._in_use += 1
+            self._floor = max(self._floor, entry[0])
+
+            waited = time.monotonic() - start
+            share.waits += 1
+            share.wait_time += waited
+            share.max_wait = max(share.max_wait, waited)
+            # Another slot may still be free for the next waiter
+            self._condition.notify_all()
+
+    def _release(self) -> None:
+        with self._condition:
+            self._in_use -= 1
+            self._condition.notify_all()
+
+    def _charge(self, workflow_id: str, cpu_seconds: float) -> None:
+        with self._condition:
+            share = self._get_share(workflow_id)
+            share.cpu_time += cpu_seconds
+            share.vruntime += cpu_seconds / share.weight
+            share.server_steps += 1
+
+    def _record_slice(self, workflow_id: str, preempted: bool) -> None:
+        with self._condition:
+            share = self._get_share(workflow_id)
+            share.slices += 1
+            if preempted:
+                share.preempted_slices += 1
+
+    def get_workflow_stats(self, workflow_id: str) -> dict[str, Any] | None:
+        """Return one workflow's scheduling metrics, or None if it is not registered."""
+        with self._condition:
+            share = self._shares.get(workflow_id)
+            if share is None:
+                return None
+            stats = asdict(share)
+        stats["average_wait"] = stats["wait_time"] / stats["waits"] if stats["waits"] else 0.0
+        return stats
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return slot usage, queue length and per-workflow scheduling metrics."""
+        with self._condition:
+            workflow_ids = list(self._shares)
+            summary = {
+                "slots": self.slots,
+                "in_use": self._in_use,
+                "waiting": len(self._waiters),
+                "slice_cpu_ms": self.slice_cpu_seconds * 1000 if self.slice_cpu_seconds else None,
+                "max_server_steps": self.max_server_steps,
+            }
+        summary["workflows"] = {
+            workflow_id: stats
+            for workflow_id in workflow_ids
+            if (stats := self.get_workflow_stats(workflow_id)) is not None
+        }
+        return summary
@@ -1,7 +1,9 @@
 """Step processors for different workflow step types."""
 
+import logging
 from typing import Any
 
+from ..monitoring.tracing import get_tracer
 from ..state.manager import StateManager
 from ..utils.error_tracking import create_workflow_error, enhance_exception_message
 from .context import ExecutionContext
@@ -15,6 +17,10 @@ from .steps.mcp_call import MCPCallProcessor
 from .steps.shell_command import ShellCommandProcessor
 from .steps.user_message import UserMessageProcessor
 from .steps.wait_step import WaitStepProcessor
+from .templates import TemplatePlan, TemplateString, compile_template, render_template
+
+logger = logging.getLogger(__name__)
+_tracer = get_tracer()
 
 
 class StepProcessor:
@@ -51,7 +57,13 @@ class StepProcessor:
         # Use nested state for template expressions (not flattened)
         # Pass instance and context for scoped variable resolution
         processed_definition = self._replace_variables(
-            step.definition, current_state, preserve_conditions, instance, preserve_templates, context
+            step.definition,
+            current_state,
+            preserve_conditions,
+            instance,
+            preserve_templates,
+            context,
+            plan=step.get_template_plan(),
         )
 
         if step.type == "shell_command":
@@ -111,7 +123,9 @@ class StepProcessor:
         current_state = self.state_manager.read(instance.id)
 
         # Replace variables in step definition using the same logic as server steps
-        processed_definition = self._replace_variables(step.definition, current_state, False, instance, False, context)
+        processed_definition = self._replace_variables(
+            step.definition, current_state, False, instance, False, context, plan=step.get_template_plan()
+        )
 
         if step.type == "user_message":
             return self._process_user_message(instance, step, processed_definition)
@@ -236,8 +250,7 @@ class StepProcessor:
                         path = self._convert_bracket_notation_to_dot_notation(path)
                     except Exception as e:
                         # If evaluation fails, keep original path
-                        print(f"DEBUG: Path JavaScript evaluation failed: {e}")
-                        pass
+                        logger.debug(f"Path JavaScript evaluation failed: {e}")
 
                 # If value is a template expression, re-evaluate it with current state
                 original_value = value
@@ -277,9 +290,6 @@ class StepProcessor:
                     except Exception as e:
                         # If expression evaluation fails, keep the original value
                         # Log the error for debugging
-                        import logging
-
-                        logger = logging.getLogger(__name__)
                         logger.warning(f"JavaScript expression evaluation failed: {e}")
                         pass
 
@@ -344,7 +354,9 @@ class StepProcessor:
         self, instance: WorkflowInstance, step: WorkflowStep, processed_definition: dict[str, Any]
     ) -> dict[str, Any]:
         """Process a shell command step."""
-        result = self.shell_command_processor.process(processed_definition, instance.id, self.state_manager)
+        result = self.shell_command_processor.process(
+            processed_definition, instance.id, self.state_manager, step_id=step.id
+        )
 
         return {
             "executed": True,
@@ -739,30 +751,9 @@ class StepProcessor:
         current_loop = context.current_loop() if context else None
 
         if current_loop and not current_loop.is_complete():
-            # Add body steps for current iteration
-            workflow_steps = []
-            for i, step_def in enumerate(body):
-                if "id" not in step_def:
-                    step_def["id"] = f"{step.id}.body.{i}"
-                # Extract execution_context if present
-                execution_context = step_def.get("execution_context", "server")
-                definition_copy = {k: v for k, v in step_def.items() if k not in ["id", "type", "execution_context"]}
-
-                workflow_step = WorkflowStep(
-                    id=step_def["id"],
-                    type=step_def["type"],
-                    definition=definition_copy,
-                    execution_context=execution_context,
-                )
-                # Store the original step ID and loop information for break/continue logic
-                workflow_step._loop_id = step.id
-                workflow_step._loop_body_index = i
-                workflow_steps.append(workflow_step)
-
-            # Add the foreach step again for next iteration
-            workflow_steps.append(step)
-
-            queue.prepend_steps(workflow_steps)
+            # Queue only the current iteration: the shared body steps resolve loop variables from the
+            # execution context when they run, followed by the foreach step itself to advance the loop
+            queue.prepend_steps([*step.get_loop_body(), step])
 
             return {"executed": False, "index": current_loop.current_item_index}
         else:
@@ -1000,11 +991,16 @@ class StepProcessor:
         total_tasks = definition.get("total_tasks", 0)
         completed_task_index = definition.get("completed_task_index", 0)
 
-        print(f"🐛 DEBUG: Completed task {completed_task_index + 1}/{total_tasks}: {task_id}")
+        _tracer.event(
+            "debug.task_completed",
+            "workflow",
+            task_id=task_id,
+            task_index=completed_task_index,
+            total_tasks=total_tasks,
+        )
 
         # Check if there are more tasks to process
         if completed_task_index + 1 < total_tasks:
-            print("🐛 DEBUG: More tasks remaining, re-triggering parallel_foreach")
 
             # Find the original parallel_foreach step in the workflow definition
             # and re-add it to the queue so it can process the next task
@@ -1016,11 +1012,8 @@ class StepProcessor:
                 for wf_step in workflow_def.steps:
                     if wf_step.type == "parallel_foreach":
                         # Re-add this step to continue processing
-                        print(f"🐛 DEBUG: Re-adding parallel_foreach step: {wf_step.id}")
                         queue.main_queue.insert(0, wf_step)
                         break
-        else:
-            print("🐛 DEBUG: All tasks completed!")
 
         return {"executed": True, "task_completion": True}
 
@@ -1034,15 +1027,21 @@ class StepProcessor:
         current_task_index = definition.get("current_task_index", 0)
         total_tasks = definition.get("total_tasks", 0)
 
-        print(f"🐛 DEBUG: Advancing task {current_task_index + 1}/{total_tasks}: {task_id}")
-        print(f"🐛 DEBUG: Completed step {current_step_index + 1}/{total_steps}")
+        _tracer.event(
+            "debug.step_advanced",
+            "workflow",
+            task_id=task_id,
+            task_index=current_task_index,
+            total_tasks=total_tasks,
+            step_index=current_step_index,
+            total_steps=total_steps,
+        )
 
         # Re-trigger parallel_foreach to get the next step in the sequence
         workflow_def = instance.definition
         if workflow_def and hasattr(workflow_def, "steps"):
             for wf_step in workflow_def.steps:
                 if wf_step.type == "parallel_foreach":
-                    print(f"🐛 DEBUG: Re-adding parallel_foreach step for next step: {wf_step.id}")
                     queue.main_queue.insert(0, wf_step)
                     break
 
@@ -1092,9 +1091,14 @@ class StepProcessor:
         instance: WorkflowInstance | None = None,
         preserve_templates: bool = False,
         execution_context: ExecutionContext | None = None,
+        plan: TemplatePlan | None = None,
     ) -> Any:
         """Replace template variables in an object using scoped contexts.
 
+        Only the leaves recorded in the object's template plan are evaluated; the
+        root container and containers on the way to templated leaves are copied,
+        and every other subtree is shared with obj.
+
         Args:
             obj: Object to process for template variables
             state: Legacy state context for backward compatibility
@@ -1102,121 +1106,87 @@ class StepProcessor:
             instance: WorkflowInstance containing workflow inputs
             preserve_templates: Whether to preserve template expressions
             execution_context: Execution context for scoped variable resolution
+            plan: Precompiled plan for obj (e.g. WorkflowStep.get_template_plan()); compiled here if omitted
         """
-        # Build scoped context for enhanced expression evaluator
-        scoped_context = None
-        if instance or execution_context:
-            scoped_context = self._build_scoped_context(instance, state, execution_context)
-
-        # Create legacy evaluation context for backward compatibility
-        eval_context = state.copy()
-        if instance and instance.inputs:
-            # Add workflow inputs at top level for template evaluation
-            eval_context.update(instance.inputs)
-
-        if isinstance(obj, dict):
+        if plan is None:
+            plan = compile_template(obj)
+            if plan is None:
+                return obj.copy() if isinstance(obj, dict | list) else obj
+
+        contexts: list[Any] = []
+
+        def get_contexts() -> tuple[dict[str, Any], dict[str, Any] | None]:
+            # Built on first use and shared by every templated leaf
+            if not contexts:
+                # Build scoped context for enhanced expression evaluator
+                scoped_context = None
+                if instance or execution_context:
+                    scoped_context = self._build_scoped_context(instance, state, execution_context)
+
+                # Create legacy evaluation context for backward compatibility
+                eval_context = state.copy()
+                if instance and instance.inputs:
+                    # Add workflow inputs at top level for template evaluation
+                    eval_context.update(instance.inputs)
+                contexts.extend((eval_context, scoped_context))
+            return contexts[0], contexts[1]
+
+        def render_string(template: TemplateString) -> Any:
+            eval_context, scoped_context = get_contexts()
+            if template.single is not None:
+                # For single expressions, return the actual value (not stringified)
+                expr = template.single
+                try:
+                    # Use enhanced expression evaluator with scoped context
+                    result = self.expression_evaluator.evaluate(expr, eval_context, scoped_context)
+                    if result is not None:
+                        return result
+                except Exception:
+                    pass
+                # Handle None/undefined and evaluation errors with smart fallbacks
+                return self._get_single_expression_fallback(expr, eval_context)
+
+            # Multiple expressions or embedded in text - stringify results
+            def evaluate(expr: str) -> str:
+                try:
+                    # Use enhanced expression evaluator with scoped context
+                    result = self.expression_evaluator.evaluate(expr, eval_context, scoped_context)
+                    # Handle None/undefined values with smart fallbacks
+                    if result is None:
+                        return self._get_fallback_value(expr, eval_context)
+                    return str(result)
+                except Exception:
+                    # For evaluation errors, provide fallbacks
+                    return self._get_fallback_value(expr, eval_context)
+
+            return template.render(evaluate)
+
+        def skip_keys(obj: dict[str, Any]) -> tuple[str, ...]:
             # Special handling for conditional steps - preserve the condition string
             if preserve_conditions and "condition" in obj:
-                result = {}
-                for k, v in obj.items():
-                    if k == "condition":
-                        result[k] = v  # Keep condition as-is
-                    else:
-                        result[k] = self._replace_variables(
-                            v, state, preserve_conditions, instance, preserve_templates, execution_context
-                        )
-                return result
+                return ("condition",)
             # Special handling for control flow steps - preserve items/condition fields
-            elif preserve_templates and ("items" in obj or "condition" in obj):
-                result = {}
-                for k, v in obj.items():
-                    if k in ["items", "condition"]:
-                        result[k] = v  # Keep template expression as-is
-                    else:
-                        result[k] = self._replace_variables(
-                            v, state, preserve_conditions, instance, preserve_templates, execution_context
-                        )
-                return result
-            else:
-                return {
-                    k: self._replace_variables(
-                        v, state, preserve_conditions, instance, preserve_templates, execution_context
-                    )
-                    for k, v in obj.items()
-                }
-        elif isinstance(obj, list):
-            return [
-                self._replace_variables(
-                    item, state, preserve_conditions, instance, preserve_templates, execution_context
-                )
-                for item in obj
-            ]
-        elif isinstance(obj, str):
-            # Handle template strings with multiple variables
-            if "{{" in obj and "}}" in obj:
-                # Check if the entire string is a single template expression
-                import re
-
-                single_expr_match = re.match(r"^\{\{([^}]+)\}\}$", obj)
-                if single_expr_match:
-                    # For single expressions, return the actual value (not stringified)
-                    expr = single_expr_match.group(1).strip()
-                    try:
-                        # Use enhanced expression evaluator with scoped context
-                        result = self.expression_evaluator.evaluate(expr, eval_context, scoped_context)
-                        # For single expressions, return the actual value
-                        if result is not None:
-                            return result
-                        # Handle None/undefined with smart fallbacks
-                        fallback = self._get_fallback_value(expr, eval_context)
-                        # Try to convert to appropriate type for single expressions
-                        if "attempt" in expr and "number" in expr:
-                            try:
-                                return int(fallback) if fallback.isdigit() else 0
-                            except:
-                                return 0
-                        if "max_attempts" in expr:
-                            try:
-                                return int(fallback) if fallback.isdigit() else 10
-                            except:
-                                return 10
-                        return fallback
-                    except Exception:
-                        # For evaluation errors, provide fallbacks
-                        fallback = self._get_fallback_value(expr, eval_context)
-                        # Try to convert to appropriate type for single expressions
-                        if "attempt" in expr and "number" in expr:
-                            try:
-                                return int(fallback) if fallback.isdigit() else 0
-                            except:
-                                return 0
-                        if "max_attempts" in expr:
-                            try:
-                                return int(fallback) if fallback.isdigit() else 10
-                            except:
-                                return 10
-                        return fallback
-                else:
-                    # Multiple expressions or embedded in text - stringify results
-                    def replace_template(match):
-                        expr = match.group(1).strip()
-                        try:
-                            # Use enhanced expression evaluator with scoped context
-                            result = self.expression_evaluator.evaluate(expr, eval_context, scoped_context)
-                            # Handle None/undefined values with smart fallbacks
-                            if result is None:
-                                return self._get_fallback_value(expr, eval_context)
-                            return str(result)
-                        except Exception:
-                            # For evaluation errors, provide fallbacks
-                            return self._get_fallback_value(expr, eval_context)
-
-                    # Replace all {{expr}} patterns
-                    result = re.sub(r"\{\{([^}]+)\}\}", replace_template, obj)
-                    return result
-            return obj
-        else:
-            return obj
+            if preserve_templates and ("items" in obj or "condition" in obj):
+                return ("items", "condition")
+            return ()
+
+        return render_template(obj, plan, render_string, skip_keys)
+
+    def _get_single_expression_fallback(self, expr: str, state: dict[str, Any]) -> Any:
+        """Fallback for a whole-string template, typed where the expression implies a number."""
+        fallback = self._get_fallback_value(expr, state)
+        # Try to convert to appropriate type for single expressions
+        if "attempt" in expr and "number" in expr:
+            try:
+                return int(fallback) if fallback.isdigit() else 0
+            except:
+                return 0
+        if "max_attempts" in expr:
+            try:
+                return int(fallback) if fallback.isdigit() else 10
+            except:
+                return 10
+        return fallback
 
     def _get_fallback_value(self, expr: str, state: dict[str, Any]) -> str:
         """Provide intelligent fallback values for undefined template variables."""
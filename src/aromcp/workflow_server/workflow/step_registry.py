@@ -100,6 +100,7 @@ STEP_TYPES: dict[str, StepConfig] = {
             "state_updates",
             "error_handling",
             "execution_context",
+            "output_limit",
         ],
     },
     # Control flow steps (server-side logic)
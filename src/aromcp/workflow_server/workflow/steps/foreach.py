@@ -3,12 +3,15 @@
 Handles iteration over arrays with item and index variable binding.
 """
 
+import json
+from collections.abc import Iterator
 from typing import Any
 
 from ..context import ExecutionContext
 from ..control_flow import ControlFlowError, LoopControl, LoopState
 from ..expressions import ExpressionError, ExpressionEvaluator
 from ..models import WorkflowStep
+from ..templates import TemplatePlan, TemplateString, compile_template, render_template
 
 
 class ForEachProcessor:
@@ -230,6 +233,8 @@ class ForEachProcessor:
         Expand a foreach loop into individual steps for each item.
         This is an alternative to the iterative approach for simpler execution.
 
+        Materializes every iteration; use iter_foreach_steps for large arrays.
+
         Args:
             step: The foreach step to expand
             context: Current execution context
@@ -238,6 +243,25 @@ class ForEachProcessor:
         Returns:
             List of expanded workflow steps
         """
+        return list(self.iter_foreach_steps(step, context, state))
+
+    def iter_foreach_steps(
+        self, step: WorkflowStep, context: ExecutionContext, state: dict[str, Any]
+    ) -> Iterator[WorkflowStep]:
+        """
+        Lazily expand a foreach loop, producing each iteration's steps on demand.
+
+        Body templates are compiled once and each step only copies the parts of
+        its definition that reference the loop variables.
+
+        Args:
+            step: The foreach step to expand
+            context: Current execution context
+            state: Current workflow state
+
+        Returns:
+            Iterator over expanded workflow steps
+        """
         definition = step.definition
         items_expression = definition.get("items", "")
         variable_name = definition.get("variable_name", "item")
@@ -250,54 +274,67 @@ class ForEachProcessor:
 
             if not isinstance(items, list):
                 raise ControlFlowError(f"ForEach items expression must evaluate to an array, got {type(items)}")
-
-            expanded_steps = []
-
-            for index, item in enumerate(items):
-                # Create variable bindings for this iteration
-                iteration_variables = {variable_name: item, index_name: index}
-
-                # Expand each body step with variable substitution
-                for i, step_def in enumerate(body_steps):
-                    step_id = f"{step.id}.{index}.{i}"
-
-                    # Substitute variables in step definition
-                    substituted_def = self._substitute_variables(step_def, iteration_variables)
-
-                    expanded_steps.append(
-                        WorkflowStep(id=step_id, type=step_def.get("type", "unknown"), definition=substituted_def)
-                    )
-
-            return expanded_steps
-
         except ExpressionError as e:
             raise ControlFlowError(f"Failed to expand foreach step '{step.id}': {str(e)}") from e
+        except ControlFlowError:
+            raise
         except Exception as e:
             raise ControlFlowError(f"Error expanding foreach step: {str(e)}") from e
 
-    def _substitute_variables(self, step_def: dict[str, Any], variables: dict[str, Any]) -> dict[str, Any]:
+        body_plans = [compile_template(step_def) for step_def in body_steps]
+        return self._generate_iterations(step.id, items, variable_name, index_name, body_steps, body_plans)
+
+    def _generate_iterations(
+        self,
+        step_id: str,
+        items: list[Any],
+        variable_name: str,
+        index_name: str,
+        body_steps: list[dict[str, Any]],
+        body_plans: list[Any],
+    ) -> Iterator[WorkflowStep]:
+        """Yield the body steps of each iteration with its loop variables substituted."""
+        for index, item in enumerate(items):
+            # Create variable bindings for this iteration
+            iteration_variables = {variable_name: item, index_name: index}
+
+            for i, (step_def, plan) in enumerate(zip(body_steps, body_plans, strict=True)):
+                yield WorkflowStep(
+                    id=f"{step_id}.{index}.{i}",
+                    type=step_def.get("type", "unknown"),
+                    definition=self._substitute_variables(step_def, iteration_variables, plan),
+                )
+
+    def _substitute_variables(
+        self, step_def: dict[str, Any], variables: dict[str, Any], plan: TemplatePlan | None = None
+    ) -> dict[str, Any]:
         """
         Substitute foreach variables in a step definition.
 
         Args:
             step_def: Original step definition
             variables: Variables to substitute
+            plan: Precompiled template plan for step_def
 
         Returns:
             Step definition with variables substituted
         """
-        import json
-        import re
+        if plan is None:
+            plan = compile_template(step_def)
+            if plan is None:
+                return dict(step_def)
+
+        def render_string(template: TemplateString) -> str:
+            # Leave templates that don't reference loop variables exactly as written
+            if not any(expression in variables for expression in template.expressions):
+                return template.text
 
-        # Convert to JSON string for substitution
-        step_json = json.dumps(step_def)
+            def evaluate(expression: str) -> str:
+                if expression not in variables:
+                    return f"{{{{ {expression} }}}}"
+                value = variables[expression]
+                return value if isinstance(value, str) else json.dumps(value)
 
-        # Substitute variables
-        for var_name, var_value in variables.items():
-            # Replace {{variable_name}} patterns
-            pattern = r"\{\{\s*" + re.escape(var_name) + r"\s*\}\}"
-            replacement = json.dumps(var_value) if not isinstance(var_value, str) else var_value
-            step_json = re.sub(pattern, replacement, step_json)
+            return template.render(evaluate)
 
-        # Convert back to dictionary
-        return json.loads(step_json)
+        return render_template(step_def, plan, render_string)
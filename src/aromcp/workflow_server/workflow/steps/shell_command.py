@@ -1,24 +1,183 @@
 """Shell command step processor for workflow execution."""
 
+import codecs
 import os
+import signal
 import subprocess
+import threading
 import time
-from typing import Any
+from collections import deque
+from dataclasses import dataclass, field
+from typing import IO, Any
 
 from ....filesystem_server._security import get_project_root
 
+# Characters of stdout/stderr kept per stream; the first quarter keeps the start of the output
+DEFAULT_OUTPUT_LIMIT = 65_536
+_READ_CHUNK_SIZE = 65_536
+
+
+class OutputBuffer:
+    """Bounded capture of one output stream.
+
+    Keeps the first characters written (head) and a ring buffer of the most
+    recent ones (tail). Anything in between is counted but dropped, so memory
+    stays bounded no matter how much a command prints.
+    """
+
+    def __init__(self, limit: int = DEFAULT_OUTPUT_LIMIT):
+        self.head_limit = limit // 4
+        self.tail_limit = limit - self.head_limit
+        self.total_chars = 0
+        self._head: list[str] = []
+        self._head_size = 0
+        self._tail: deque[str] = deque()
+        self._tail_size = 0
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> None:
+        """Append text, evicting the oldest tail characters beyond the limit."""
+        if not text:
+            return
+        with self._lock:
+            self.total_chars += len(text)
+            room = self.head_limit - self._head_size
+            if room > 0:
+                self._head.append(text[:room])
+                self._head_size += min(room, len(text))
+                text = text[room:]
+                if not text:
+                    return
+            self._tail.append(text)
+            self._tail_size += len(text)
+            while self._tail_size > self.tail_limit:
+                excess = self._tail_size - self.tail_limit
+                oldest = self._tail[0]
+                if len(oldest) <= excess:
+                    self._tail.popleft()
+                    self._tail_size -= len(oldest)
+                else:
+                    self._tail[0] = oldest[excess:]
+                    self._tail_size -= excess
+
+    @property
+    def truncated_chars(self) -> int:
+        """Number of characters dropped between head and tail."""
+        return self.total_chars - self._head_size - self._tail_size
+
+    def getvalue(self) -> str:
+        """Return the retained output, marking where characters were dropped."""
+        with self._lock:
+            head = "".join(self._head)
+            tail = "".join(self._tail)
+            truncated = self.total_chars - self._head_size - self._tail_size
+        if truncated:
+            return f"{head}\n... [{truncated} characters truncated] ...\n{tail}"
+        return head + tail
+
+
+@dataclass
+class RunningCommand:
+    """A server-side shell command that is still executing."""
+
+    workflow_id: str
+    step_id: str | None
+    command: str
+    stdout: OutputBuffer
+    stderr: OutputBuffer
+    started_at: float = field(default_factory=time.monotonic)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the output captured so far."""
+        return {
+            "step_id": self.step_id,
+            "command": self.command,
+            "elapsed_seconds": round(time.monotonic() - self.started_at, 3),
+            "stdout": self.stdout.getvalue(),
+            "stderr": self.stderr.getvalue(),
+            "stdout_chars": self.stdout.total_chars,
+            "stderr_chars": self.stderr.total_chars,
+        }
+
+
+_running_commands: dict[str, list[RunningCommand]] = {}
+_running_lock = threading.Lock()
+
+
+def get_running_commands(workflow_id: str) -> list[dict[str, Any]]:
+    """Return snapshots of the shell commands currently running for a workflow."""
+    with _running_lock:
+        running = list(_running_commands.get(workflow_id, ()))
+    return [command.snapshot() for command in running]
+
+
+def _pump(stream: IO[bytes], buffer: OutputBuffer) -> None:
+    """Copy a pipe into a buffer as output arrives."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    fd = stream.fileno()
+    try:
+        while chunk := os.read(fd, _READ_CHUNK_SIZE):
+            buffer.write(decoder.decode(chunk))
+        buffer.write(decoder.decode(b"", final=True))
+    finally:
+        stream.close()
+
+
+def _run_streaming(command: str, work_dir: str, timeout: float, running: RunningCommand) -> int:
+    """Run a command, streaming its output into the running command's buffers.
+
+    Raises:
+        subprocess.TimeoutExpired: If the command does not finish in time; it is killed first
+    """
+    # shell=True is intentional for workflow step execution; a new session lets a timeout kill the whole tree
+    process = subprocess.Popen(  # noqa: S602
+        command,
+        shell=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=work_dir,
+        start_new_session=os.name == "posix",
+    )
+    readers = [
+        threading.Thread(target=_pump, args=(process.stdout, running.stdout), daemon=True),
+        threading.Thread(target=_pump, args=(process.stderr, running.stderr), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+    try:
+        return process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        if os.name == "posix":
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        else:
+            process.kill()
+        process.wait()
+        raise
+    finally:
+        for reader in readers:
+            reader.join()
+
 
 class ShellCommandProcessor:
     """Processes shell command steps internally."""
 
     @staticmethod
-    def process(step_definition: dict[str, Any], workflow_id: str, state_manager) -> dict[str, Any]:
+    def process(
+        step_definition: dict[str, Any], workflow_id: str, state_manager, step_id: str | None = None
+    ) -> dict[str, Any]:
         """Execute a shell command step.
 
+        Output is streamed into bounded buffers (see output_limit) and can be
+        read while the command runs through get_running_commands().
+
         Args:
             step_definition: Step definition with command and optional state_update
             workflow_id: ID of the workflow instance
             state_manager: State manager for updates
+            step_id: ID of the step, reported alongside in-progress output
 
         Returns:
             Execution result with output and any state updates
@@ -43,6 +202,7 @@ class ShellCommandProcessor:
         timeout = step_definition.get("timeout", 30)  # Default 30 seconds
         error_handling = step_definition.get("error_handling", {"strategy": "fail"})
         working_directory = step_definition.get("working_directory")
+        output_limit = step_definition.get("output_limit", DEFAULT_OUTPUT_LIMIT)
 
         # Handle retry strategy
         max_retries = error_handling.get("max_retries", 0) if error_handling.get("strategy") == "retry" else 0
@@ -66,25 +226,37 @@ class ShellCommandProcessor:
                 if not os.path.exists(work_dir) or not os.path.isdir(work_dir):
                     work_dir = os.getcwd()
 
-                # Execute command in the working directory (shell=True is intentional for workflow step execution)
-                result = subprocess.run(  # noqa: S602
-                    command,
-                    shell=True,
-                    capture_output=True,
-                    text=True,
-                    timeout=timeout,
-                    cwd=work_dir,
+                # Execute command in the working directory, publishing its output while it runs
+                running = RunningCommand(
+                    workflow_id, step_id, command, OutputBuffer(output_limit), OutputBuffer(output_limit)
                 )
+                with _running_lock:
+                    _running_commands.setdefault(workflow_id, []).append(running)
+                try:
+                    returncode = _run_streaming(command, work_dir, timeout, running)
+                finally:
+                    with _running_lock:
+                        commands = _running_commands.get(workflow_id, [])
+                        commands.remove(running)
+                        if not commands:
+                            _running_commands.pop(workflow_id, None)
 
                 output = {
-                    "stdout": result.stdout,
-                    "stderr": result.stderr,
-                    "exit_code": result.returncode,
+                    "stdout": running.stdout.getvalue(),
+                    "stderr": running.stderr.getvalue(),
+                    "exit_code": returncode,
                     "command": command,
                 }
+                truncated = {
+                    stream: buffer.truncated_chars
+                    for stream, buffer in (("stdout", running.stdout), ("stderr", running.stderr))
+                    if buffer.truncated_chars
+                }
+                if truncated:
+                    output["truncated_chars"] = truncated
 
                 # Check if command failed and handle according to error_handling strategy
-                if result.returncode != 0:
+                if returncode != 0:
                     strategy = error_handling.get("strategy", "fail")
 
                     if strategy == "retry" and attempt < max_retries:
@@ -96,20 +268,23 @@ class ShellCommandProcessor:
                         # Exhausted all retries, fail
                         return {
                             "status": "failed",
-                            "error": f"Command failed with exit code {result.returncode} after {max_retries + 1} attempts: {result.stderr}",
+                            "error": (
+                                f"Command failed with exit code {returncode} after {max_retries + 1} attempts: "
+                                f"{output['stderr']}"
+                            ),
                             "output": output,
                         }
                     elif strategy == "fail":
                         # Fail immediately
                         return {
                             "status": "failed",
-                            "error": f"Command failed with exit code {result.returncode}: {result.stderr}",
+                            "error": f"Command failed with exit code {returncode}: {output['stderr']}",
                             "output": output,
                         }
                     elif strategy == "continue":
                         # Continue execution despite failure
                         output["warning"] = (
-                            f"Command failed with exit code {result.returncode} but continuing due to error_handling strategy"
+                            f"Command failed with exit code {returncode} but continuing due to error_handling strategy"
                         )
                     elif strategy == "fallback":
                         # Use fallback value
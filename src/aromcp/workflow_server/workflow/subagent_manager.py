@@ -1,15 +1,21 @@
 """Sub-agent management for parallel workflow execution."""
 
+import logging
 import os
 import threading
 from typing import Any
 
+from ..monitoring.tracing import get_tracer
 from ..state.manager import StateManager
 from ..utils.error_tracking import create_workflow_error, enhance_exception_message
 from .expressions import ExpressionEvaluator
 from .models import WorkflowInstance, WorkflowStep
 from .queue import WorkflowQueue
 from .step_registry import StepRegistry
+from .templates import TemplatePlan, compile_template, render_template
+
+logger = logging.getLogger(__name__)
+_tracer = get_tracer()
 
 
 class SubAgentManager:
@@ -26,8 +32,10 @@ class SubAgentManager:
         self.sub_agent_contexts: dict[str, dict[str, Any]] = {}  # task_id -> context
         self.sub_agent_queues: dict[str, WorkflowQueue] = {}  # task_id -> queue
 
-        # Thread safety
+        # Thread safety: _lock guards the task registries above, while each task's queue and
+        # isolated state are guarded by its own lock so sub-agents advance independently
         self._lock = threading.RLock()
+        self._task_locks: dict[str, threading.RLock] = {}  # task_id -> lock
 
         # Debug mode detection
         self._debug_serial = os.getenv("AROMCP_WORKFLOW_DEBUG", "").lower() == "serial"
@@ -106,11 +114,11 @@ class SubAgentManager:
                     elif input_name in task_context:
                         sub_agent_inputs[input_name] = task_context[input_name]
 
+            # Initialize sub-agent state from task's default_state
+            sub_agent_state = self._initialize_sub_agent_state(sub_agent_task, task_context, instance.id)
+
             # Store sub-agent context for execution (thread-safe)
             with self._lock:
-                # Initialize sub-agent state from task's default_state
-                sub_agent_state = self._initialize_sub_agent_state(sub_agent_task, task_context, instance.id)
-
                 self.sub_agent_contexts[task_id] = {
                     "sub_agent_task": sub_agent_task,
                     "task_context": task_context,
@@ -119,10 +127,9 @@ class SubAgentManager:
                 }
 
                 # Create queue for sub-agent
-                print(f"🐛 DEBUG: Creating queue for {task_id} with {len(sub_agent_task.steps)} steps")
-                for i, step in enumerate(sub_agent_task.steps):
-                    print(f"🐛 DEBUG:   Step {i}: {step.id} ({step.type})")
+                _tracer.event("sub_agent.queue_created", "sub_agent", task_id=task_id, steps=len(sub_agent_task.steps))
                 self.sub_agent_queues[task_id] = WorkflowQueue(task_id, sub_agent_task.steps.copy())
+                self._task_locks.setdefault(task_id, threading.RLock())
 
             tasks.append({"task_id": task_id, "context": task_context, "inputs": sub_agent_inputs})
 
@@ -190,12 +197,50 @@ class SubAgentManager:
             enhanced_definition["_temp_debug_sub_agent_steps"] = [step.__dict__ for step in sub_agent_task.steps]
             enhanced_definition["_temp_debug_sub_agent_task_def"] = sub_agent_task
 
-            print("🐛 DEBUG: Parallel_foreach converted to TODO mode (AROMCP_WORKFLOW_DEBUG=serial)")
-            print(f"🐛 DEBUG: Created {len(tasks)} TODO items for serial execution in main agent")
+            _tracer.event("parallel_foreach.serial_todo_mode", "sub_agent", tasks=len(tasks))
 
         return {"definition": enhanced_definition}
 
-    def get_next_sub_agent_step(self, task_id: str, workflow_lock) -> dict[str, Any] | None:
+    def task_lock(self, task_id: str) -> threading.RLock:
+        """Return the lock guarding a sub-agent task's queue and isolated state."""
+        with self._lock:
+            return self._task_locks.setdefault(task_id, threading.RLock())
+
+    def remove_workflow_tasks(self, workflow_id: str) -> int:
+        """Drop the contexts, queues and locks of every sub-agent task of a workflow.
+
+        Args:
+            workflow_id: Parent workflow whose tasks are removed
+
+        Returns:
+            Number of tasks removed
+        """
+        with self._lock:
+            task_ids = [
+                task_id for task_id, context in self.sub_agent_contexts.items() if context["workflow_id"] == workflow_id
+            ]
+            for task_id in task_ids:
+                del self.sub_agent_contexts[task_id]
+                self.sub_agent_queues.pop(task_id, None)
+                self._task_locks.pop(task_id, None)
+            return len(task_ids)
+
+    def get_next_sub_agent_steps(self, task_ids: list[str]) -> dict[str, dict[str, Any] | None]:
+        """Advance several sub-agent tasks in one call.
+
+        Each task is advanced under its own lock, so a batch never blocks on
+        sub-agents working on other tasks.
+
+        Args:
+            task_ids: IDs of the sub-agent tasks to advance
+
+        Returns:
+            Mapping of task ID to its next step, None for completed tasks or an error response
+        """
+        with _tracer.span("sub_agent.next_steps_batch", "sub_agent", tasks=len(task_ids)):
+            return {task_id: self.get_next_sub_agent_step(task_id) for task_id in task_ids}
+
+    def get_next_sub_agent_step(self, task_id: str) -> dict[str, Any] | None:
         """Get the next step for a sub-agent task."""
         # Thread-safe context lookup
         with self._lock:
@@ -209,52 +254,39 @@ class SubAgentManager:
                 return create_workflow_error(error_msg, "unknown", task_id)
 
             context = self.sub_agent_contexts[task_id].copy()  # Copy to avoid concurrent modification
+            queue = self.sub_agent_queues.get(task_id)
+            task_lock = self._task_locks.setdefault(task_id, threading.RLock())
 
         workflow_id = context["workflow_id"]
 
-        # Use the workflow lock since sub-agents are part of the parent workflow
-        with workflow_lock:
-            queue = self.sub_agent_queues.get(task_id)
+        # Sub-agents only touch their own queue and isolated state, so the task lock is enough
+        with task_lock, _tracer.span("sub_agent.next_step", "sub_agent", task_id=task_id) as span:
             if not queue:
                 return create_workflow_error(f"Sub-agent queue not found: {task_id}", workflow_id, task_id)
 
             sub_agent_task = context["sub_agent_task"]
             task_context = context["task_context"]
 
-            # Debug logging (always enabled for debugging)
-            print(f"🐛 DEBUG: Getting next step for sub-agent task '{task_id}'")
-            print(f"🐛 DEBUG: Task context: {task_context}")
-            print(f"🐛 DEBUG: Queue has_steps: {queue.has_steps()}")
-            print(f"🐛 DEBUG: Queue main_queue length: {len(queue.main_queue)}")
-            if len(queue.main_queue) > 0:
-                print(f"🐛 DEBUG: First step in queue: {queue.main_queue[0].id} ({queue.main_queue[0].type})")
-            print(f"🐛 DEBUG: Sub-agent task steps: {len(sub_agent_task.steps)}")
-            if len(sub_agent_task.steps) > 0:
-                print(f"🐛 DEBUG: First sub-agent step: {sub_agent_task.steps[0].id} ({sub_agent_task.steps[0].type})")
+            if _tracer.enabled:
+                span.set(
+                    task_context=dict(task_context),
+                    queue_length=len(queue.main_queue),
+                    next_step=queue.main_queue[0].id if queue.main_queue else None,
+                    task_steps=len(sub_agent_task.steps),
+                )
 
             # Create replacement context combining sub-agent state and task context
             # Note: We'll refresh this state after each server-side step
             def get_current_replacement_state():
-                with self._lock:
-                    current_context = self.sub_agent_contexts.get(task_id, context)
-                    current_sub_agent_state = current_context.get("sub_agent_state", {})
-                    current_replacement_state = current_sub_agent_state.copy()
-                    current_replacement_state.update(task_context)
-                    return current_replacement_state
+                current_context = self.sub_agent_contexts.get(task_id, context)
+                current_sub_agent_state = current_context.get("sub_agent_state", {})
+                current_replacement_state = current_sub_agent_state.copy()
+                current_replacement_state.update(task_context)
+                return current_replacement_state
 
             replacement_state = get_current_replacement_state()
-
-            # Debug initial state
-            print(f"🐛 DEBUG: Sub-agent '{task_id}' isolated state:")
-            current_sub_agent_state = replacement_state.copy()
-            current_sub_agent_state.update({k: v for k, v in current_sub_agent_state.items() if k not in task_context})
-            print(f"🐛 DEBUG:   Sub-agent state keys: {list(current_sub_agent_state.keys())}")
-            print(f"🐛 DEBUG:   Task context: {task_context}")
-            print(f"🐛 DEBUG:   Combined state keys: {list(replacement_state.keys())}")
-            if "raw" in replacement_state:
-                print(f"🐛 DEBUG:   replacement_state.raw: {replacement_state['raw']}")
-            if "computed" in replacement_state:
-                print(f"🐛 DEBUG:   replacement_state.computed: {replacement_state['computed']}")
+            if _tracer.enabled:
+                span.set(state_keys=list(replacement_state), computed=dict(replacement_state.get("computed") or {}))
 
             # Process steps similar to main workflow
             while queue.has_steps():
@@ -266,7 +298,9 @@ class SubAgentManager:
                 if not step_config:
                     # Unknown step type - treat as client step
                     queue.pop_next()
-                    processed_definition = self._replace_variables(step.definition, replacement_state)
+                    processed_definition = self._replace_variables(
+                        step.definition, replacement_state, step.get_template_plan()
+                    )
 
                     return {
                         "step": {"id": f"{task_id}.{step.id}", "type": step.type, "definition": processed_definition},
@@ -294,7 +328,9 @@ class SubAgentManager:
                 elif step_config["execution"] == "client":
                     # Return client step for sub-agent
                     queue.pop_next()
-                    processed_definition = self._replace_variables(step.definition, replacement_state)
+                    processed_definition = self._replace_variables(
+                        step.definition, replacement_state, step.get_template_plan()
+                    )
 
                     step_result = {
                         "step": {"id": f"{task_id}.{step.id}", "type": step.type, "definition": processed_definition},
@@ -304,16 +340,11 @@ class SubAgentManager:
                         "total_steps": len(sub_agent_task.steps),
                     }
 
-                    # Debug logging (always enabled for debugging)
-                    print(f"🐛 DEBUG: Sub-agent '{task_id}' executing step '{step.id}' (type: {step.type})")
-                    print(f"🐛 DEBUG: Step definition: {processed_definition}")
-
+                    span.set(step_id=step.id, step_type=step.type, definition=processed_definition)
                     return step_result
 
             # No more steps - task complete
-            print(f"🐛 DEBUG: Sub-agent task '{task_id}' completed - no more steps")
-            print(f"🐛 DEBUG: Final queue state - has_steps: {queue.has_steps()}, main_queue: {len(queue.main_queue)}")
-
+            span.set(completed=True)
             return None
 
     def execute_sub_agent_step(
@@ -336,36 +367,31 @@ class SubAgentManager:
         # The get_next_sub_agent_step method already advances the step index
         return {"status": "success", "workflow_id": workflow_id, "task_id": task_id}
 
-    def _replace_variables(self, obj: Any, state: dict[str, Any]) -> Any:
-        """Replace template variables in an object with conditional fallback resolution."""
-        if isinstance(obj, dict):
-            return {k: self._replace_variables(v, state) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self._replace_variables(item, state) for item in obj]
-        elif isinstance(obj, str):
-            # Handle template strings with multiple variables
-            if "{{" in obj and "}}" in obj:
-                # Replace all template variables in the string
-                import re
-
-                def replace_template(match):
-                    expr = match.group(1).strip()
-                    try:
-                        result = self.expression_evaluator.evaluate(expr, state)
-                        # Handle None/undefined values with smart fallbacks
-                        if result is None:
-                            return self._get_fallback_value(expr, state)
-                        return str(result)
-                    except Exception:
-                        # For evaluation errors, provide fallbacks
-                        return self._get_fallback_value(expr, state)
-
-                # Replace all {{expr}} patterns
-                result = re.sub(r"\{\{([^}]+)\}\}", replace_template, obj)
-                return result
-            return obj
-        else:
-            return obj
+    def _replace_variables(self, obj: Any, state: dict[str, Any], plan: TemplatePlan | None = None) -> Any:
+        """Replace template variables in an object with conditional fallback resolution.
+
+        Args:
+            obj: Object to process for template variables
+            state: Evaluation context for template expressions
+            plan: Precompiled plan for obj (e.g. WorkflowStep.get_template_plan()); compiled here if omitted
+        """
+        if plan is None:
+            plan = compile_template(obj)
+            if plan is None:
+                return obj.copy() if isinstance(obj, dict | list) else obj
+
+        def evaluate(expr: str) -> str:
+            try:
+                result = self.expression_evaluator.evaluate(expr, state)
+                # Handle None/undefined values with smart fallbacks
+                if result is None:
+                    return self._get_fallback_value(expr, state)
+                return str(result)
+            except Exception:
+                # For evaluation errors, provide fallbacks
+                return self._get_fallback_value(expr, state)
+
+        return render_template(obj, plan, lambda template: template.render(evaluate))
 
     def _get_fallback_value(self, expr: str, state: dict[str, Any]) -> str:
         """Provide intelligent fallback values for undefined template variables."""
@@ -451,9 +477,9 @@ class SubAgentManager:
             elif step.type == "foreach":
                 self._expand_foreach(step, state, queue, workflow_id)
             else:
-                print(f"🐛 DEBUG: Unknown control flow step type: {step.type}")
+                logger.warning(f"Unknown control flow step type in sub-agent: {step.type}")
         except Exception as e:
-            print(f"🐛 ERROR: Failed to expand control flow step {step.id}: {enhance_exception_message(e)}")
+            logger.error(f"Failed to expand control flow step {step.id}: {enhance_exception_message(e)}")
 
     def _expand_while_loop(
         self, step: WorkflowStep, state: dict[str, Any], queue: WorkflowQueue, workflow_id: str
@@ -463,9 +489,6 @@ class SubAgentManager:
         body = step.definition.get("body", [])
         max_iterations = step.definition.get("max_iterations", 100)
 
-        print(f"🐛 DEBUG: Expanding while_loop '{step.id}' with condition: {condition}")
-        print(f"🐛 DEBUG: While loop body has {len(body)} steps")
-
         # Get or create loop context for this step
         loop_context = None
         for ctx in queue.loop_stack:
@@ -477,12 +500,11 @@ class SubAgentManager:
             # First iteration
             loop_context = {"loop_id": step.id, "iteration": 0}
             queue.push_loop_context("while", loop_context)
-            print(f"🐛 DEBUG: Created new while loop context for '{step.id}'")
 
         # Check iteration limit
         if loop_context["iteration"] >= max_iterations:
             queue.pop_loop_context()
-            print(f"🐛 DEBUG: While loop '{step.id}' reached max iterations ({max_iterations})")
+            _tracer.event("while_loop.max_iterations", "control_flow", step_id=step.id, max_iterations=max_iterations)
             return
 
         # Evaluate condition
@@ -496,23 +518,13 @@ class SubAgentManager:
             eval_state = state.copy()
             eval_state["loop"] = {"iteration": loop_context["iteration"]}
 
-            # Debug state contents
-            print(f"🐛 DEBUG: While loop '{step.id}' condition evaluation:")
-            print(f"🐛 DEBUG:   Condition: '{condition_expr}'")
-            print(f"🐛 DEBUG:   Iteration: {loop_context['iteration']}")
-            print(f"🐛 DEBUG:   State keys: {list(eval_state.keys())}")
-            if "raw" in eval_state:
-                print(f"🐛 DEBUG:   raw: {eval_state['raw']}")
-            if "computed" in eval_state:
-                print(f"🐛 DEBUG:   computed: {eval_state['computed']}")
-
-            result = self.expression_evaluator.evaluate(condition_expr, eval_state)
-            condition_result = bool(result)
-            print(f"🐛 DEBUG:   Condition result: {condition_result}")
-            print(f"🐛 DEBUG:   Raw result: {result}")
+            with _tracer.span("while_loop.condition", "expression", step_id=step.id, condition=condition_expr) as span:
+                result = self.expression_evaluator.evaluate(condition_expr, eval_state)
+                condition_result = bool(result)
+                span.set(iteration=loop_context["iteration"], result=condition_result)
         except Exception as e:
             queue.pop_loop_context()
-            print(f"🐛 ERROR: Error evaluating while condition '{condition}': {enhance_exception_message(e)}")
+            logger.error(f"Error evaluating while condition '{condition}': {enhance_exception_message(e)}")
             return
 
         if condition_result and body:
@@ -531,21 +543,15 @@ class SubAgentManager:
                     definition={k: v for k, v in step_def.items() if k not in ["id", "type"]},
                 )
                 workflow_steps.append(workflow_step)
-                print(f"🐛 DEBUG: Added body step: {workflow_step.id} ({workflow_step.type})")
 
             # Add the while loop step again for next iteration
             workflow_steps.append(step)
 
             queue.prepend_steps(workflow_steps)
             loop_context["iteration"] += 1
-
-            print(
-                f"🐛 DEBUG: While loop '{step.id}' iteration {loop_context['iteration']} - added {len(body)} body steps"
-            )
         else:
             # Loop complete
             queue.pop_loop_context()
-            print(f"🐛 DEBUG: While loop '{step.id}' completed - condition is false")
 
     def _expand_conditional(
         self, step: WorkflowStep, state: dict[str, Any], queue: WorkflowQueue, workflow_id: str
@@ -555,8 +561,6 @@ class SubAgentManager:
         then_steps = step.definition.get("then_steps", [])
         else_steps = step.definition.get("else_steps", [])
 
-        print(f"🐛 DEBUG: Expanding conditional '{step.id}' with condition: {condition}")
-
         # Evaluate condition
         try:
             if condition.startswith("{{") and condition.endswith("}}"):
@@ -564,11 +568,12 @@ class SubAgentManager:
             else:
                 condition_expr = condition
 
-            result = self.expression_evaluator.evaluate(condition_expr, state)
-            condition_result = bool(result)
-            print(f"🐛 DEBUG: Conditional condition '{condition_expr}' evaluated to: {condition_result}")
+            with _tracer.span("conditional.condition", "expression", step_id=step.id, condition=condition_expr) as span:
+                result = self.expression_evaluator.evaluate(condition_expr, state)
+                condition_result = bool(result)
+                span.set(result=condition_result)
         except Exception as e:
-            print(f"🐛 ERROR: Error evaluating conditional condition '{condition}': {enhance_exception_message(e)}")
+            logger.error(f"Error evaluating conditional condition '{condition}': {enhance_exception_message(e)}")
             return
 
         # Choose which steps to add
@@ -589,12 +594,8 @@ class SubAgentManager:
                     definition={k: v for k, v in step_def.items() if k not in ["id", "type"]},
                 )
                 workflow_steps.append(workflow_step)
-                print(f"🐛 DEBUG: Added conditional step: {workflow_step.id} ({workflow_step.type})")
 
             queue.prepend_steps(workflow_steps)
-            print(
-                f"🐛 DEBUG: Conditional '{step.id}' - added {len(workflow_steps)} steps from {'then' if condition_result else 'else'} branch"
-            )
 
     def _expand_foreach(
         self, step: WorkflowStep, state: dict[str, Any], queue: WorkflowQueue, workflow_id: str
@@ -603,8 +604,6 @@ class SubAgentManager:
         items_expr = step.definition.get("items", "")
         body = step.definition.get("body", [])
 
-        print(f"🐛 DEBUG: Expanding foreach '{step.id}' with items: {items_expr}")
-
         # Evaluate items expression
         try:
             if items_expr.startswith("{{") and items_expr.endswith("}}"):
@@ -612,10 +611,10 @@ class SubAgentManager:
 
             items = self.expression_evaluator.evaluate(items_expr, state)
             if not isinstance(items, list):
-                print(f"🐛 ERROR: foreach items must be a list, got {type(items)}")
+                logger.error(f"foreach items must be a list, got {type(items)}")
                 return
         except Exception as e:
-            print(f"🐛 ERROR: Error evaluating foreach items '{items_expr}': {enhance_exception_message(e)}")
+            logger.error(f"Error evaluating foreach items '{items_expr}': {enhance_exception_message(e)}")
             return
 
         # Get or create loop context
@@ -629,7 +628,6 @@ class SubAgentManager:
             # First iteration
             loop_context = {"loop_id": step.id, "items": items, "index": 0}
             queue.push_loop_context("foreach", loop_context)
-            print(f"🐛 DEBUG: Created new foreach loop context for '{step.id}' with {len(items)} items")
 
         # Check if there are more items
         if loop_context["index"] < len(loop_context["items"]):
@@ -645,7 +643,7 @@ class SubAgentManager:
                     ],
                 )
             except Exception as e:
-                print(f"🐛 ERROR: Failed to update state with foreach variables: {enhance_exception_message(e)}")
+                logger.error(f"Failed to update state with foreach variables: {enhance_exception_message(e)}")
 
             # Add body steps
             from .models import WorkflowStep
@@ -666,12 +664,10 @@ class SubAgentManager:
 
             queue.prepend_steps(workflow_steps)
             loop_context["index"] += 1
-
-            print(f"🐛 DEBUG: Foreach '{step.id}' iteration {loop_context['index']} - processing item: {item}")
+            _tracer.event("foreach.iteration", "control_flow", step_id=step.id, index=loop_context["index"] - 1)
         else:
             # Loop complete
             queue.pop_loop_context()
-            print(f"🐛 DEBUG: Foreach '{step.id}' completed - processed {len(loop_context['items'])} items")
 
     def _initialize_sub_agent_state(
         self, sub_agent_task: "SubAgentTask", task_context: dict[str, Any], workflow_id: str
@@ -773,16 +769,20 @@ class SubAgentManager:
                     except Exception as e:
                         # Some JavaScript expressions may not be compatible with our evaluator
                         # This is expected and we'll set the field to None as a fallback
-                        print(f"🐛 DEBUG: Failed to compute field '{field_name}': {e}")
+                        _tracer.event("computed_field.failed", "transform", field=field_name, error=str(e))
                         computed_fields[field_name] = None
 
             # Add computed fields to state
             if computed_fields:
                 sub_agent_state["computed"] = computed_fields
 
-        print(f"🐛 DEBUG: Initialized sub-agent state for {task_context.get('task_id', 'unknown')}:")
-        print(f"🐛 DEBUG:   Raw state: {sub_agent_state.get('raw', {})}")
-        print(f"🐛 DEBUG:   Computed fields: {sub_agent_state.get('computed', {})}")
+        if _tracer.enabled:
+            _tracer.event(
+                "sub_agent.state_initialized",
+                "sub_agent",
+                task_id=task_context.get("task_id", "unknown"),
+                computed=dict(sub_agent_state.get("computed", {})),
+            )
 
         return sub_agent_state
 
@@ -803,7 +803,7 @@ class SubAgentManager:
 
     def _recalculate_computed_fields(self, task_id: str, context_with_inputs: dict[str, Any]) -> None:
         """Recalculate computed fields for a sub-agent after state changes."""
-        with self._lock:
+        with self.task_lock(task_id):
             if task_id not in self.sub_agent_contexts:
                 return
 
@@ -869,12 +869,15 @@ class SubAgentManager:
 
                     except Exception as e:
                         # Some JavaScript expressions may not be compatible with our evaluator
-                        print(f"🐛 DEBUG: Failed to recompute field '{field_name}': {e}")
+                        _tracer.event("computed_field.failed", "transform", field=field_name, error=str(e))
                         computed_fields[field_name] = None
 
             # Update computed fields in state
             sub_agent_state["computed"] = computed_fields
-            print(f"🐛 DEBUG: Recalculated computed fields for {task_id}: {computed_fields}")
+            if _tracer.enabled:
+                _tracer.event(
+                    "sub_agent.computed_recalculated", "transform", task_id=task_id, computed=dict(computed_fields)
+                )
 
     def _process_sub_agent_server_step(
         self, step: "WorkflowStep", state: dict[str, Any], context: dict[str, Any]
@@ -890,20 +893,18 @@ class SubAgentManager:
 
         try:
             # Replace template variables in step definition
-            processed_definition = self._replace_variables(step.definition, state)
+            processed_definition = self._replace_variables(step.definition, state, step.get_template_plan())
 
             if step.type == "state_update":
                 self._handle_sub_agent_state_update(step, processed_definition, context, task_id)
             elif step.type == "shell_command":
                 # For now, skip shell commands in sub-agents for security
-                print(f"🐛 DEBUG: Skipping shell command in sub-agent {task_id}: {step.id}")
+                _tracer.event("sub_agent.shell_command_skipped", "sub_agent", task_id=task_id, step_id=step.id)
             else:
-                print(f"🐛 DEBUG: Unsupported server step type in sub-agent {task_id}: {step.type}")
+                logger.warning(f"Unsupported server step type in sub-agent {task_id}: {step.type}")
 
         except Exception as e:
-            from ..utils.error_tracking import enhance_exception_message
-
-            print(f"🐛 ERROR: Failed to process sub-agent server step {step.id}: {enhance_exception_message(e)}")
+            logger.error(f"Failed to process sub-agent server step {step.id}: {enhance_exception_message(e)}")
 
     def _handle_sub_agent_state_update(
         self, step: "WorkflowStep", processed_definition: dict[str, Any], context: dict[str, Any], task_id: str
@@ -921,22 +922,20 @@ class SubAgentManager:
         operation = processed_definition.get("operation", "set")
 
         if not path:
-            print(f"🐛 ERROR: Missing 'path' in state_update step {step.id} for sub-agent {task_id}")
+            logger.error(f"Missing 'path' in state_update step {step.id} for sub-agent {task_id}")
             return
 
         # Update the sub-agent's isolated state
-        with self._lock:
+        with self.task_lock(task_id):
             if task_id in self.sub_agent_contexts:
                 sub_agent_state = self.sub_agent_contexts[task_id]["sub_agent_state"]
 
                 # Apply the state update to isolated state
                 self._apply_state_update_to_dict(sub_agent_state, path, value, operation)
 
-                print(f"🐛 DEBUG: Applied state update to sub-agent {task_id}:")
-                print(f"🐛 DEBUG:   Path: {path}")
-                print(f"🐛 DEBUG:   Value: {value}")
-                print(f"🐛 DEBUG:   Operation: {operation}")
-                print(f"🐛 DEBUG:   Updated raw state: {sub_agent_state.get('raw', {})}")
+                _tracer.event(
+                    "sub_agent.state_update", "state", task_id=task_id, path=path, value=value, operation=operation
+                )
 
                 # Recalculate computed fields after state change
                 task_context = self.sub_agent_contexts[task_id].get("task_context", {})
@@ -955,7 +954,7 @@ class SubAgentManager:
 
                 self._recalculate_computed_fields(task_id, context_with_inputs)
             else:
-                print(f"🐛 ERROR: Sub-agent context not found for task_id: {task_id}")
+                logger.error(f"Sub-agent context not found for task_id: {task_id}")
 
     def _apply_state_update_to_dict(
         self, state_dict: dict[str, Any], path: str, value: Any, operation: str = "set"
@@ -0,0 +1,138 @@
+"""Precompiled {{ expression }} templates for step definitions.
+
+A step definition is compiled once into a TemplatePlan that records only the
+paths leading to strings containing templates, with each string split into
+literal text and stripped expression sources. Rendering walks just those paths:
+containers on the way to a templated leaf are shallow-copied, every other
+subtree is shared with the original definition.
+"""
+
+import functools
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+TEMPLATE_PATTERN = re.compile(r"\{\{([^}]+)\}\}")
+SINGLE_TEMPLATE_PATTERN = re.compile(r"^\{\{([^}]+)\}\}$")
+TEMPLATE_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True, slots=True)
+class TemplateString:
+    """A string split into literal text and embedded expressions.
+
+    ``literals`` always has one more element than ``expressions``; rendering
+    interleaves them. ``single`` is set when the whole string is one template,
+    in which case callers may return the raw value instead of a string.
+    """
+
+    text: str
+    literals: tuple[str, ...]
+    expressions: tuple[str, ...]
+    single: str | None = None
+
+    def render(self, evaluate: Callable[[str], str]) -> str:
+        """Join the literals with each expression's rendered text."""
+        parts = [self.literals[0]]
+        for expression, literal in zip(self.expressions, self.literals[1:], strict=True):
+            parts.append(evaluate(expression))
+            parts.append(literal)
+        return "".join(parts)
+
+
+@dataclass(frozen=True, slots=True)
+class TemplatePlan:
+    """Compiled template layout of a value.
+
+    Leaves carry a TemplateString; containers carry (key or index, plan) pairs
+    for the children that contain templates. Untemplated values have no plan.
+    """
+
+    template: TemplateString | None = None
+    children: tuple[tuple[Any, "TemplatePlan"], ...] = ()
+
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template_string(text: str) -> TemplateString | None:
+    """Split a string into literals and expressions, or None if it has no templates."""
+    if "{{" not in text or "}}" not in text:
+        return None
+
+    literals = []
+    expressions = []
+    position = 0
+    for match in TEMPLATE_PATTERN.finditer(text):
+        literals.append(text[position : match.start()])
+        expressions.append(match.group(1).strip())
+        position = match.end()
+    if not expressions:
+        return None
+    literals.append(text[position:])
+
+    single_match = SINGLE_TEMPLATE_PATTERN.match(text)
+    single = single_match.group(1).strip() if single_match else None
+    return TemplateString(text=text, literals=tuple(literals), expressions=tuple(expressions), single=single)
+
+
+def compile_template(obj: Any) -> TemplatePlan | None:
+    """Compile a definition into a TemplatePlan, or None if it contains no templates."""
+    if isinstance(obj, str):
+        template = compile_template_string(obj)
+        return TemplatePlan(template=template) if template is not None else None
+    if isinstance(obj, dict):
+        items = obj.items()
+    elif isinstance(obj, list):
+        items = enumerate(obj)
+    else:
+        return None
+
+    children = []
+    for key, value in items:
+        child = compile_template(value)
+        if child is not None:
+            children.append((key, child))
+    return TemplatePlan(children=tuple(children)) if children else None
+
+
+def render_template(
+    obj: Any,
+    plan: TemplatePlan | None,
+    render_string: Callable[[TemplateString], Any],
+    skip_keys: Callable[[dict[str, Any]], tuple[str, ...]] | None = None,
+) -> Any:
+    """
+    Render a value using its compiled plan.
+
+    Args:
+        obj: Value the plan was compiled from
+        plan: Plan from compile_template (None renders to obj itself)
+        render_string: Renders one templated string leaf
+        skip_keys: Optional callback naming dict keys to leave unrendered
+
+    Returns:
+        Rendered value sharing every untemplated subtree with obj
+    """
+    if plan is None:
+        return obj
+    if plan.template is not None:
+        return render_string(plan.template)
+
+    if isinstance(obj, dict):
+        result = dict(obj)
+        skipped = skip_keys(obj) if skip_keys is not None else ()
+        for key, child in plan.children:
+            if key not in skipped:
+                result[key] = render_template(obj[key], child, render_string, skip_keys)
+        return result
+    if isinstance(obj, list):
+        result = list(obj)
+        for index, child in plan.children:
+            result[index] = render_template(obj[index], child, render_string, skip_keys)
+        return result
+    return obj
+
+
+def clear_template_cache() -> None:
+    """Drop all compiled template strings."""
+    compile_template_string.cache_clear()
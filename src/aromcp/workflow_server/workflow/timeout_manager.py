@@ -1,6 +1,17 @@
-"""Timeout management for the MCP Workflow System."""
+"""Timeout management for the MCP Workflow System.
+
+Deadlines live in a min-heap ordered by monotonic due time. A single monitor
+thread sleeps on a condition variable until the earliest deadline (or until a
+new, earlier one is scheduled), so timeouts fire on time and idle managers cost
+nothing. Rescheduling and cancellation never search the heap: each context
+carries a generation number and heap entries from older generations are
+discarded when they surface.
+"""
 
 import asyncio
+import heapq
+import inspect
+import itertools
 import logging
 import threading
 import time
@@ -69,12 +80,19 @@ class TimeoutManager:
     def __init__(self):
         """Initialize timeout manager."""
         self._lock = threading.RLock()
+        self._wakeup = threading.Condition(self._lock)
         self._contexts: dict[str, TimeoutContext] = {}
         self._callbacks: dict[str, Callable] = {}
         self._warning_callbacks: dict[str, Callable] = {}
+
+        # Deadline heap of (due, sequence, generation, kind, id); kind is "warning" or "timeout"
+        self._deadlines: list[tuple[float, int, int, str, str]] = []
+        self._generations: dict[str, int] = {}  # Live generation per scheduled context
+        self._sequence = itertools.count()
+
+        # The monitor thread starts with the first scheduled deadline
         self._monitor_thread: threading.Thread | None = None
         self._monitor_active = False
-        self._start_monitoring()
 
     def create_timeout(
         self,
@@ -105,6 +123,7 @@ class TimeoutManager:
             if parent_id and parent_id in self._contexts:
                 self._contexts[parent_id].children.append(id)
 
+            self._schedule(id)
             return context
 
     def complete_timeout(self, id: str) -> TimeoutContext | None:
@@ -115,6 +134,7 @@ class TimeoutManager:
 
             context = self._contexts[id]
             context.end_time = datetime.now()
+            self._unschedule(id)
 
             # Clean up callbacks
             self._callbacks.pop(id, None)
@@ -133,6 +153,7 @@ class TimeoutManager:
             context = self._contexts[id]
             context.cancelled = True
             context.end_time = datetime.now()
+            self._unschedule(id)
             cancelled.append(id)
 
             # Clean up callbacks
@@ -158,6 +179,7 @@ class TimeoutManager:
 
             # Update timeout config
             context.timeout_config.timeout_seconds += additional_seconds
+            self._schedule(id)
             return True
 
     def get_timeout_status(self, id: str) -> dict[str, Any] | None:
@@ -220,53 +242,101 @@ class TimeoutManager:
 
             return created_contexts
 
+    def _schedule(self, id: str) -> None:
+        """(Re)schedule warning and timeout deadlines for an active context. Caller holds the lock."""
+        context = self._contexts[id]
+        generation = self._generations.get(id, 0) + 1
+        self._generations[id] = generation
+
+        # Translate the wall-clock context times into monotonic due times
+        now = time.monotonic()
+        elapsed = context.elapsed_seconds()
+        if not context.warned and id in self._warning_callbacks:
+            self._push(now + context.timeout_config.warning_seconds - elapsed, generation, "warning", id)
+        self._push(now + context.timeout_config.timeout_seconds - elapsed, generation, "timeout", id)
+
+    def _reschedule_if_active(self, id: str) -> None:
+        """Reschedule a context after its timeout changed, unless it already ended."""
+        context = self._contexts[id]
+        if not (context.cancelled or context.end_time):
+            self._schedule(id)
+
+    def _unschedule(self, id: str) -> None:
+        """Invalidate a context's pending deadlines; their heap entries are dropped lazily."""
+        self._generations.pop(id, None)
+
+    def _push(self, due: float, generation: int, kind: str, id: str) -> None:
+        """Add a deadline to the heap, waking the monitor if it is now the earliest."""
+        entry = (due, next(self._sequence), generation, kind, id)
+        heapq.heappush(self._deadlines, entry)
+
+        # Drop invalidated entries once they dominate the heap
+        if len(self._deadlines) > 4 * len(self._generations) + 64:
+            self._deadlines = [item for item in self._deadlines if self._generations.get(item[4]) == item[2]]
+            heapq.heapify(self._deadlines)
+
+        if not self._monitor_active:
+            self._start_monitoring()
+        elif self._deadlines[0] is entry:
+            self._wakeup.notify()
+
     def _start_monitoring(self):
         """Start the timeout monitoring thread."""
         self._monitor_active = True
 
         def monitor_timeouts():
-            while self._monitor_active:
-                try:
-                    self._check_timeouts()
-                    time.sleep(0.5)  # Check every 500ms
-                except Exception as e:
-                    logger.error(f"Error in timeout monitoring: {e}")
+            with self._wakeup:
+                while self._monitor_active:
+                    try:
+                        self._fire_due_deadlines()
+                    except Exception as e:
+                        logger.error(f"Error in timeout monitoring: {e}")
+                    delay = self._deadlines[0][0] - time.monotonic() if self._deadlines else None
+                    if delay is None or delay > 0:
+                        self._wakeup.wait(delay)
 
-        self._monitor_thread = threading.Thread(target=monitor_timeouts, daemon=True)
+        self._monitor_thread = threading.Thread(target=monitor_timeouts, name="timeout-monitor", daemon=True)
         self._monitor_thread.start()
 
-    def _check_timeouts(self):
-        """Check for warnings and timeouts."""
-        with self._lock:
-            for id, context in list(self._contexts.items()):
-                if context.cancelled or context.end_time:
-                    continue
+    def _fire_due_deadlines(self) -> None:
+        """Pop and handle every deadline that is due. Caller holds the lock."""
+        now = time.monotonic()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, _, generation, kind, id = heapq.heappop(self._deadlines)
+            self._on_deadline(kind, id, generation)
 
-                # Check for warning
-                if context.should_warn() and id in self._warning_callbacks:
+    def _on_deadline(self, kind: str, id: str, generation: int) -> None:
+        """Handle a warning or timeout deadline unless it has been superseded."""
+        with self._lock:
+            if self._generations.get(id) != generation:
+                return
+            context = self._contexts.get(id)
+            if context is None or context.cancelled or context.end_time:
+                return
+
+            if kind == "warning":
+                if not context.warned and id in self._warning_callbacks:
                     try:
-                        self._warning_callbacks[id](id, context.remaining_seconds())
+                        self._invoke(self._warning_callbacks[id], id, context.remaining_seconds())
                         context.warned = True
                     except Exception as e:
                         logger.error(f"Error in warning callback for {id}: {e}")
+                return
 
-                # Check for timeout
-                if context.is_timed_out() and not context.timed_out:
-                    context.timed_out = True
-                    context.end_time = datetime.now()
+            if not context.is_timed_out():
+                # The wall clock lags the monotonic due time - try again when it catches up
+                self._push(time.monotonic() + context.remaining_seconds(), generation, "timeout", id)
+                return
 
-                    if id in self._callbacks:
-                        try:
-                            self._callbacks[id](id)
-                        except Exception as e:
-                            logger.error(f"Error in timeout callback for {id}: {e}")
+            self._unschedule(id)
+            self._trigger_timeout(id)
 
-                    # Cascade timeout to children
-                    for child_id in context.children:
-                        self._trigger_timeout(child_id)
+    def _invoke(self, callback: Callable, *args: Any) -> None:
+        """Call a timeout or warning callback."""
+        callback(*args)
 
     def _trigger_timeout(self, id: str):
-        """Trigger timeout for a context."""
+        """Trigger timeout for a context and cascade to its children."""
         if id not in self._contexts:
             return
 
@@ -274,12 +344,13 @@ class TimeoutManager:
         if not context.timed_out:
             context.timed_out = True
             context.end_time = datetime.now()
+            self._unschedule(id)
 
             if id in self._callbacks:
                 try:
-                    self._callbacks[id](id)
+                    self._invoke(self._callbacks[id], id)
                 except Exception as e:
-                    logger.error(f"Error in cascaded timeout callback for {id}: {e}")
+                    logger.error(f"Error in timeout callback for {id}: {e}")
 
             # Cascade to children
             for child_id in context.children:
@@ -287,7 +358,9 @@ class TimeoutManager:
 
     def stop(self):
         """Stop the timeout manager."""
-        self._monitor_active = False
+        with self._wakeup:
+            self._monitor_active = False
+            self._wakeup.notify()
         if self._monitor_thread:
             self._monitor_thread.join(timeout=5.0)
 
@@ -311,6 +384,7 @@ class TimeoutManager:
             # If timeout already exists, update it
             if step_id in self._contexts:
                 self._contexts[step_id].timeout_config.timeout_seconds = timeout_seconds
+                self._reschedule_if_active(step_id)
             else:
                 self.create_timeout(step_id, timeout_seconds)
 
@@ -347,6 +421,7 @@ class TimeoutManager:
                 parent_remaining = parent_context.remaining_seconds()
                 if child_context.timeout_config.timeout_seconds > parent_remaining:
                     child_context.timeout_config.timeout_seconds = parent_remaining
+                    self._reschedule_if_active(child_id)
 
                 # Update parent-child relationship
                 if child_id not in parent_context.children:
@@ -369,6 +444,7 @@ class TimeoutManager:
                 context.warned = False
                 context.timed_out = False
                 context.cancelled = False
+                self._schedule(step_id)
 
                 # Update parent relationship if specified
                 if parent_id and parent_id in self._contexts:
@@ -401,6 +477,7 @@ class TimeoutManager:
                 context.warned = False
                 context.timed_out = False
                 context.cancelled = False
+                self._schedule(workflow_id)
 
     def end_step(self, step_id: str) -> None:
         """End monitoring a step."""
@@ -450,12 +527,59 @@ class TimeoutManager:
 
 
 class AsyncTimeoutManager(TimeoutManager):
-    """Async version of timeout manager for async workflows."""
+    """
+    Async version of timeout manager for async workflows.
+
+    Deadlines scheduled from inside a running event loop become loop.call_at
+    timers instead of heap entries, and coroutine callbacks run as tasks on that
+    loop. Deadlines scheduled without a running loop use the monitor thread.
+    """
 
     def __init__(self):
         """Initialize async timeout manager."""
         super().__init__()
-        self._async_tasks: dict[str, asyncio.Task] = {}
+        self._timer_handles: dict[str, list[asyncio.TimerHandle]] = {}
+
+    def _push(self, due: float, generation: int, kind: str, id: str) -> None:
+        """Schedule a deadline on the running event loop if there is one."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            super()._push(due, generation, kind, id)
+            return
+
+        # loop.time() and time.monotonic() advance together but need not share an origin
+        when = loop.time() + (due - time.monotonic())
+        handle = loop.call_at(when, self._on_deadline, kind, id, generation)
+        self._timer_handles.setdefault(id, []).append(handle)
+
+    def _schedule(self, id: str) -> None:
+        """Replace a context's loop timers before scheduling new ones."""
+        self._cancel_timer_handles(id)
+        super()._schedule(id)
+
+    def _unschedule(self, id: str) -> None:
+        """Invalidate pending deadlines and cancel their loop timers."""
+        super()._unschedule(id)
+        self._cancel_timer_handles(id)
+
+    def _cancel_timer_handles(self, id: str) -> None:
+        for handle in self._timer_handles.pop(id, ()):
+            handle.cancel()
+
+    def _invoke(self, callback: Callable, *args: Any) -> None:
+        """Call a callback, running coroutine results as tasks on the current loop."""
+        result = callback(*args)
+        if inspect.isawaitable(result):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                # Fired by the monitor thread for a deadline scheduled outside the loop
+                logger.warning(f"Dropping coroutine callback {callback!r}: no running event loop")
+                if inspect.iscoroutine(result):
+                    result.close()
+                return
+            asyncio.ensure_future(result)
 
     async def create_async_timeout(
         self,
@@ -465,73 +589,13 @@ class AsyncTimeoutManager(TimeoutManager):
         warning_callback: Callable | None = None,
         timeout_callback: Callable | None = None,
     ) -> TimeoutContext:
-        """Create an async timeout with automatic monitoring."""
-        # Create the timeout context
-        context = self.create_timeout(id, timeout_seconds, parent_id, warning_callback, timeout_callback)
-
-        # Create async monitoring task
-        async def monitor_async():
-            try:
-                # Wait for warning threshold
-                warning_time = timeout_seconds * 0.8
-                await asyncio.sleep(warning_time)
-
-                if not context.cancelled and not context.timed_out and warning_callback:
-                    await warning_callback(id, context.remaining_seconds())
-                    context.warned = True
-
-                # Wait for remaining time
-                remaining = context.remaining_seconds()
-                if remaining > 0:
-                    await asyncio.sleep(remaining)
-
-                # Trigger timeout
-                if not context.cancelled and not context.timed_out:
-                    context.timed_out = True
-                    context.end_time = datetime.now()
-                    if timeout_callback:
-                        await timeout_callback(id)
-
-            except asyncio.CancelledError:
-                pass
-            finally:
-                self._async_tasks.pop(id, None)
-
-        # Start monitoring task
-        task = asyncio.create_task(monitor_async())
-        self._async_tasks[id] = task
-
-        return context
+        """Create an async timeout monitored by event loop timers."""
+        return self.create_timeout(id, timeout_seconds, parent_id, warning_callback, timeout_callback)
 
     async def complete_async_timeout(self, id: str) -> TimeoutContext | None:
-        """Complete an async timeout and cancel monitoring."""
-        # Cancel monitoring task
-        if id in self._async_tasks:
-            self._async_tasks[id].cancel()
-            try:
-                await self._async_tasks[id]
-            except asyncio.CancelledError:
-                pass
-            del self._async_tasks[id]
-
-        # Complete the timeout
+        """Complete an async timeout and cancel its timers."""
         return self.complete_timeout(id)
 
     async def cancel_async_timeout(self, id: str, cascade: bool = True) -> list[str]:
-        """Cancel an async timeout and its monitoring."""
-        # Cancel monitoring tasks
-        to_cancel = [id]
-        if cascade and id in self._contexts:
-            to_cancel.extend(self._contexts[id].children)
-
-        for cancel_id in to_cancel:
-            if cancel_id in self._async_tasks:
-                self._async_tasks[cancel_id].cancel()
-                try:
-                    await self._async_tasks[cancel_id]
-                except asyncio.CancelledError:
-                    pass
-                del self._async_tasks[cancel_id]
-
-        # Cancel the timeouts
+        """Cancel an async timeout, its timers and optionally its children."""
         return self.cancel_timeout(id, cascade)
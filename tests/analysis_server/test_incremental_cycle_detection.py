@@ -0,0 +1,175 @@
+"""
+Tests for incremental SCC maintenance used by cycle detection.
+
+These tests verify that the SCC index stays correct as edges are added and
+removed, that cycles are enumerated lazily with a cap, and that CycleDetector
+and ImportTracker use it for single-edit cycle checks.
+"""
+
+import random
+
+import pytest
+
+from aromcp.analysis_server.tools.call_graph_builder import CallGraphBuilder
+from aromcp.analysis_server.tools.cycle_detector import CycleDetector
+from aromcp.analysis_server.tools.import_tracker import ImportTracker
+from aromcp.analysis_server.tools.scc_index import IncrementalSCCIndex
+from aromcp.analysis_server.tools.typescript_parser import TypeScriptParser
+
+
+def _components(index: IncrementalSCCIndex) -> set[frozenset]:
+    return {frozenset(index.component_of(node)) for node in index.nodes}
+
+
+class TestIncrementalSCCIndex:
+    """Test SCC maintenance under edge insertions and deletions."""
+
+    def test_adding_back_edge_merges_component(self):
+        """Closing a cycle merges exactly the nodes on it."""
+        index = IncrementalSCCIndex()
+        index.add_edge("a", "b")
+        index.add_edge("b", "c")
+        index.add_edge("c", "d")
+        assert not index.has_cycles()
+
+        index.add_edge("c", "a")
+
+        assert index.component_of("a") == {"a", "b", "c"}
+        assert index.component_of("d") == {"d"}
+        assert index.is_in_cycle("b")
+        assert not index.is_in_cycle("d")
+
+    def test_removing_edge_splits_only_its_component(self):
+        """Removing a cycle edge splits the component back into singletons."""
+        index = IncrementalSCCIndex()
+        for source, target in [("a", "b"), ("b", "a"), ("x", "y"), ("y", "x"), ("b", "x")]:
+            index.add_edge(source, target)
+
+        index.remove_edge("b", "a")
+
+        assert index.component_of("a") == {"a"}
+        assert index.component_of("x") == {"x", "y"}
+        assert index.get_stats()["splits"] == 1
+
+    def test_self_loops_are_tracked_separately(self):
+        """Self-loops count as cycles only when requested."""
+        index = IncrementalSCCIndex()
+        index.add_edge("f", "f")
+
+        assert index.has_cycles()
+        assert not index.has_cycles(include_self_loops=False)
+        assert index.find_cycles() == [["f"]]
+        assert index.find_cycles(include_self_loops=False) == []
+
+    def test_find_cycles_respects_cap(self):
+        """Cycle enumeration stops at max_cycles."""
+        index = IncrementalSCCIndex()
+        nodes = [f"n{i}" for i in range(6)]
+        for source in nodes:
+            for target in nodes:
+                if source != target:
+                    index.add_edge(source, target)
+
+        assert len(index.find_cycles(max_cycles=5)) == 5
+        assert len(index.cyclic_components()) == 1
+
+    def test_set_successors_applies_only_changes(self):
+        """Replacing a node's edges updates cycles for that edit."""
+        index = IncrementalSCCIndex()
+        index.set_successors("a", ["b"])
+        index.set_successors("b", ["c"])
+        index.set_successors("c", ["a"])
+        assert index.component_of("a") == {"a", "b", "c"}
+
+        index.set_successors("c", [])
+        assert not index.has_cycles()
+
+    def test_matches_networkx_on_random_edits(self):
+        """Components and cycles match a from-scratch computation."""
+        nx = pytest.importorskip("networkx")
+
+        rng = random.Random(7)
+        index = IncrementalSCCIndex()
+        graph = nx.DiGraph()
+
+        for _ in range(400):
+            source, target = rng.randrange(10), rng.randrange(10)
+            if rng.random() < 0.65:
+                index.add_edge(source, target)
+                graph.add_edge(source, target)
+            elif graph.has_edge(source, target):
+                index.remove_edge(source, target)
+                graph.remove_edge(source, target)
+
+            expected = {frozenset(c) for c in nx.strongly_connected_components(graph)}
+            assert _components(index) == expected
+
+        expected_cycles = sorted(sorted(c) for c in nx.simple_cycles(graph))
+        assert sorted(sorted(c) for c in index.find_cycles(max_cycles=None)) == expected_cycles
+
+
+class TestIncrementalCycleDetector:
+    """Test CycleDetector on top of the SCC index."""
+
+    @pytest.fixture
+    def builder(self):
+        builder = CallGraphBuilder()
+        builder.call_graph = {"a": ["b"], "b": ["c"], "c": ["a"], "d": []}
+        if builder.use_networkx:
+            for source, targets in builder.call_graph.items():
+                builder.call_graph_nx.add_node(source)
+                for target in targets:
+                    builder.call_graph_nx.add_edge(source, target)
+        return builder
+
+    def test_detects_cycle_from_index(self, builder):
+        """Cycles found through the index are reported and broken."""
+        detector = CycleDetector(builder)
+
+        cycles = detector.detect_and_break_cycles()
+
+        assert len(cycles) == 1
+        assert set(cycles[0]) == {"a", "b", "c"}
+        assert len(detector.get_broken_edges()) == 1
+
+    def test_broken_cycle_is_not_reported_again(self, builder):
+        """A second detection pass sees the break and finds no cycles."""
+        builder.call_graph["d"] = ["d"]
+        if builder.use_networkx:
+            builder.call_graph_nx.add_edge("d", "d")
+        detector = CycleDetector(builder)
+        assert len(detector.detect_and_break_cycles()) == 2
+
+        assert detector.detect_and_break_cycles() == []
+        assert len(detector.get_broken_edges()) == 2
+
+    def test_single_function_edit(self, builder):
+        """Updating one function's calls only reports its own cycle membership."""
+        detector = CycleDetector(builder)
+        detector.sync_index()
+
+        assert detector.update_function_calls("d", ["a"]) is False
+        assert detector.update_function_calls("c", ["d"]) is True
+        assert detector.scc_index.component_of("c") == {"a", "b", "c", "d"}
+        assert detector.update_function_calls("c", []) is False
+
+
+class TestImportTrackerIncrementalCycles:
+    """Test circular dependency checks after single-file edits."""
+
+    def test_update_file_dependencies(self, tmp_path):
+        """Editing one file's imports updates its circular dependency group."""
+        files = [tmp_path / name for name in ("a.ts", "b.ts", "c.ts")]
+        for file in files:
+            file.write_text("export const value = 1;\n")
+
+        tracker = ImportTracker(parser=TypeScriptParser())
+        tracker.build_dependency_graph([str(file) for file in files])
+
+        assert tracker.update_file_dependencies(str(files[0]), [str(files[1])]) == []
+        assert tracker.update_file_dependencies(str(files[1]), [str(files[2])]) == []
+
+        group = tracker.update_file_dependencies(str(files[2]), [str(files[0])])
+        assert group == sorted(str(file.resolve()) for file in files)
+
+        assert tracker.update_file_dependencies(str(files[2]), []) == []
@@ -0,0 +1,122 @@
+"""
+Tests for the persistent class-hierarchy index in InheritanceResolver.
+
+Covers reverse-edge lookups, memoized depths and override tables, and
+incremental updates when class files change or disappear.
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from aromcp.analysis_server.tools.inheritance_resolver import InheritanceResolver, MethodDefinition
+from aromcp.analysis_server.tools.typescript_parser import TypeScriptParser
+
+
+def _method(name: str, class_name: str, file_path: str, line: int) -> MethodDefinition:
+    return MethodDefinition(name=name, class_name=class_name, file_path=file_path, line=line, column=4)
+
+
+class TestInheritanceIndex:
+    """Test the maintained hierarchy index."""
+
+    @pytest.fixture
+    def resolver(self):
+        return InheritanceResolver(parser=TypeScriptParser())
+
+    @pytest.fixture
+    def user_file(self):
+        return str(Path(__file__).parent / "fixtures" / "phase2_project" / "src" / "auth" / "user.ts")
+
+    def test_build_populates_reverse_edges(self, resolver, user_file):
+        """Base -> derived adjacency mirrors derived -> base edges."""
+        chains = resolver.build_class_hierarchy([user_file])
+
+        assert len(chains) == 1
+        assert chains[0].base_class == "BaseUser"
+        assert chains[0].derived_classes == ["AuthenticatedUser", "GuestUser"]
+        assert resolver.derived_classes["BaseUser"] == ["AuthenticatedUser", "GuestUser"]
+        assert resolver._find_class_file("BaseUser") == user_file
+
+    def test_unchanged_files_are_not_reanalyzed(self, resolver, user_file, monkeypatch):
+        """A second build with unchanged files reuses the index."""
+        resolver.build_class_hierarchy([user_file])
+
+        calls = []
+        monkeypatch.setattr(resolver, "_analyze_file_inheritance", lambda path: calls.append(path))
+        chains = resolver.build_class_hierarchy([user_file])
+
+        assert calls == []
+        assert chains[0].base_class == "BaseUser"
+
+    def test_method_resolution_uses_override_table(self, resolver, user_file):
+        """Method lookups walk from the most derived definition upward."""
+        resolver.build_class_hierarchy([user_file])
+
+        definitions = resolver.resolve_method_reference("AuthenticatedUser", "getDisplayName")
+        assert [d.class_name for d in definitions] == ["AuthenticatedUser", "BaseUser"]
+
+        inherited = resolver.resolve_method_reference("GuestUser", "getId")
+        assert [d.class_name for d in inherited] == ["BaseUser"]
+
+        overrides = resolver.find_method_overrides("BaseUser", "getDisplayName")
+        assert [d.class_name for d in overrides] == ["AuthenticatedUser", "GuestUser"]
+
+    def test_incremental_update_invalidates_subtree(self, resolver):
+        """Changing a base class refreshes memoized data for its descendants only."""
+        resolver._register_class("a.ts", "Base", {"run": _method("run", "Base", "a.ts", 1)})
+        resolver._register_class("b.ts", "Middle", {}, parent="Base")
+        resolver._register_class("c.ts", "Leaf", {"run": _method("run", "Leaf", "c.ts", 3)}, parent="Middle")
+        resolver._register_class("d.ts", "Other", {"go": _method("go", "Other", "d.ts", 4)})
+
+        assert resolver._get_class_depth("Leaf") == 3
+        assert len(resolver.resolve_method_reference("Leaf", "run")) == 2
+        resolver.resolve_method_reference("Other", "go")
+
+        resolver._register_class("a.ts", "Base", {"stop": _method("stop", "Base", "a.ts", 1)})
+
+        assert "Leaf" not in resolver._override_tables
+        assert "Other" in resolver._override_tables
+        assert [d.class_name for d in resolver.resolve_method_reference("Leaf", "run")] == ["Leaf"]
+        assert resolver.resolve_method_reference("Leaf", "stop")[0].class_name == "Base"
+
+    def test_remove_file_keeps_edges_from_other_files(self, resolver):
+        """Removing a base class file keeps children that still extend it by name."""
+        resolver._register_class("a.ts", "Base", {})
+        resolver._register_class("b.ts", "Child", {}, parent="Base")
+
+        resolver.remove_file("a.ts")
+
+        assert "Base" not in resolver.method_definitions
+        assert resolver.class_hierarchy["Child"] == "Base"
+        assert resolver.derived_classes["Base"] == ["Child"]
+
+        resolver.remove_file("b.ts")
+        assert "Base" not in resolver.derived_classes
+
+    def test_modified_file_is_reanalyzed(self, resolver, tmp_path):
+        """Files whose mtime/size changed are re-indexed on the next build."""
+        user_file = tmp_path / "user.ts"
+        user_file.write_text("export class BaseUser {}\n")
+
+        resolver.build_class_hierarchy([str(user_file)])
+        signature = resolver._file_signatures[str(user_file)]
+
+        user_file.write_text("export class BaseUser {}\nexport class GuestUser extends BaseUser {}\n")
+        os.utime(user_file, ns=(signature[0] + 1_000_000, signature[0] + 1_000_000))
+        resolver.build_class_hierarchy([str(user_file)])
+
+        assert resolver._file_signatures[str(user_file)] != signature
+
+        resolver.build_class_hierarchy([])
+        assert resolver.class_hierarchy == {}
+        assert resolver._file_signatures == {}
+
+    def test_cyclic_hierarchy_terminates(self, resolver):
+        """Cycles in malformed code do not hang depth or method resolution."""
+        resolver._register_class("a.ts", "A", {"m": _method("m", "A", "a.ts", 1)}, parent="B")
+        resolver._register_class("b.ts", "B", {"m": _method("m", "B", "b.ts", 1)}, parent="A")
+
+        assert resolver._get_class_depth("A") == 2
+        assert [d.class_name for d in resolver.resolve_method_reference("A", "m")] == ["A", "B"]
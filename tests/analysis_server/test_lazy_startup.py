@@ -0,0 +1,51 @@
+"""
+Tests for deferred imports in the analysis server.
+
+The server must be able to declare its tools without importing tree-sitter
+grammars, networkx, psutil or the analyzer modules; those load on first use.
+"""
+
+import json
+import subprocess
+import sys
+
+from aromcp.utils.lazy_imports import lazy_callable
+
+HEAVY_MODULES = [
+    "tree_sitter",
+    "tree_sitter_typescript",
+    "networkx",
+    "psutil",
+    "aromcp.analysis_server.tools.symbol_resolver",
+    "aromcp.analysis_server.tools.typescript_parser",
+]
+
+
+def _modules_loaded_after(code: str) -> list[str]:
+    script = f"import json, sys\n{code}\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestLazyStartup:
+    """Test that heavy dependencies stay out of server startup."""
+
+    def test_server_import_defers_heavy_modules(self):
+        """Importing the server registers tools without loading analyzers."""
+        assert _modules_loaded_after("import aromcp.analysis_server.server") == []
+
+    def test_parser_defers_grammar_loading(self):
+        """Creating a parser does not load tree-sitter grammars until the first parse."""
+        loaded = _modules_loaded_after(
+            "from aromcp.analysis_server.tools.typescript_parser import TypeScriptParser\nTypeScriptParser()"
+        )
+        assert "tree_sitter_typescript" not in loaded
+
+    def test_lazy_callable_resolves_on_first_call(self):
+        """The proxy imports its target once and then forwards calls."""
+        dumps = lazy_callable("json", "dumps")
+        assert not dumps.is_loaded
+
+        assert dumps({"a": 1}) == '{"a": 1}'
+        assert dumps.is_loaded
+        assert dumps.resolve() is json.dumps
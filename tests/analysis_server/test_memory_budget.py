@@ -0,0 +1,196 @@
+"""
+Tests for the shared memory budget and cache admission control.
+
+These tests verify reservation accounting, rejection and cost/benefit
+reclaiming on admission, and that the analysis caches charge and release
+their bytes through the budget.
+"""
+
+import gc
+import logging
+
+from aromcp.analysis_server.models.typescript_models import CacheEntry
+from aromcp.analysis_server.tools.ast_cache import StripedASTCache
+from aromcp.analysis_server.tools.cache_manager import CacheManager, LRUCache
+from aromcp.analysis_server.tools.memory_manager import MemoryBudget, MemoryManager
+
+MB = 1024 * 1024
+
+
+def _entry(name: str) -> CacheEntry:
+    return CacheEntry(tree=name, file_hash=name, modification_time=0.0, parse_time_ms=0.0)
+
+
+class _FakeCache:
+    """Minimal cache of fixed-size items that releases bytes as it evicts."""
+
+    def __init__(self, budget: MemoryBudget, name: str, reserved_bytes: int):
+        self.items: list[int] = []
+        self.reservation = budget.reserve(name, reserved_bytes, reclaim=self.reclaim)
+
+    def add(self, size: int) -> bool:
+        if not self.reservation.try_admit(size):
+            return False
+        self.items.append(size)
+        return True
+
+    def reclaim(self, size_bytes: int):
+        freed = 0
+        while self.items and freed < size_bytes:
+            size = self.items.pop(0)
+            self.reservation.release(size)
+            freed += size
+
+
+class TestMemoryBudget:
+    """Test reservations and admission control."""
+
+    def test_reservations_are_capped_by_total(self):
+        """Guaranteed reservations never exceed the budget together."""
+        budget = MemoryBudget(total_mb=10)
+        first = budget.reserve("a", 8 * MB)
+        second = budget.reserve("a", 8 * MB)
+
+        assert first.reserved_bytes == 8 * MB
+        assert second.reserved_bytes == 2 * MB
+        assert second.name == "a#2"
+
+    def test_rejects_when_nothing_cheaper_to_evict(self):
+        """An over-reservation insert is rejected if only more valuable data could make room."""
+        budget = MemoryBudget(total_mb=4)
+        hot = _FakeCache(budget, "hot", 0)
+        cold = budget.reserve("cold", 0)
+
+        assert hot.add(4 * MB)
+        for _ in range(10):
+            hot.reservation.record_hit()
+
+        assert cold.try_admit(MB) is False
+        assert cold.rejected == 1
+        assert budget.used_bytes == 4 * MB
+
+    def test_reclaims_from_lower_benefit_borrower(self):
+        """Room is reclaimed from the borrower with the fewest hits per MB."""
+        budget = MemoryBudget(total_mb=4)
+        cold = _FakeCache(budget, "cold", 0)
+        hot = _FakeCache(budget, "hot", 0)
+
+        assert cold.add(2 * MB) and cold.add(2 * MB)
+        for _ in range(10):
+            hot.reservation.record_hit()
+
+        assert hot.add(MB)
+        assert cold.items == [2 * MB]
+        assert budget.used_bytes == 3 * MB
+        assert cold.reservation.reclaimed_bytes == 2 * MB
+
+    def test_reservation_guarantee_displaces_borrowers(self):
+        """A cache within its reservation can always take back borrowed bytes."""
+        budget = MemoryBudget(total_mb=4)
+        owner = _FakeCache(budget, "owner", 2 * MB)
+        borrower = _FakeCache(budget, "borrower", 0)
+
+        assert borrower.add(2 * MB) and borrower.add(2 * MB)
+        for _ in range(100):
+            borrower.reservation.record_hit()
+
+        assert owner.add(2 * MB)
+        assert budget.used_bytes == 4 * MB
+
+    def test_closed_reservation_returns_bytes(self):
+        """Dropping a cache closes its reservation and frees its bytes."""
+        budget = MemoryBudget(total_mb=100)
+        cache = StripedASTCache(10 * MB, memory_budget=budget)
+        cache.put("a.ts", _entry("a"), MB)
+        assert budget.used_bytes == MB
+
+        del cache
+        gc.collect()
+
+        assert budget.used_bytes == 0
+        assert budget.get_report().reservations == []
+
+    def test_periodic_report(self, caplog):
+        """The budget split is logged once the report interval elapses."""
+        budget = MemoryBudget(total_mb=10, report_interval_seconds=0)
+        cache = _FakeCache(budget, "ast", 5 * MB)
+
+        with caplog.at_level(logging.INFO, logger="aromcp.analysis_server.tools.memory_manager"):
+            cache.add(MB)
+
+        report = budget.get_report()
+        assert report.used_mb == 1
+        assert report.reservations[0].name == "ast"
+        assert report.reservations[0].admitted == 1
+        assert "Memory budget:" in caplog.text
+
+
+class TestBudgetedCaches:
+    """Test cache integration with the shared budget."""
+
+    def test_ast_cache_charges_and_releases(self):
+        """Evictions, pops and clears return bytes to the budget."""
+        budget = MemoryBudget(total_mb=100)
+        cache = StripedASTCache(3 * MB, memory_budget=budget)
+
+        for name in ("a", "b", "c", "d"):
+            assert cache.put(name, _entry(name), MB)
+        assert budget.used_bytes == cache.size_bytes == 3 * MB
+
+        cache.put("d", _entry("d2"), 2 * MB)
+        cache.pop("c")
+        assert budget.used_bytes == cache.size_bytes
+
+        cache.clear()
+        assert budget.used_bytes == 0
+
+    def test_ast_cache_rejected_insert_is_not_stored(self):
+        """An insert the budget rejects leaves the cache unchanged."""
+        budget = MemoryBudget(total_mb=1)
+        budget.reserve("other", MB)
+        cache = StripedASTCache(10 * MB, memory_budget=budget)
+
+        assert cache.put("a.ts", _entry("a"), 2 * MB) is False
+        assert "a.ts" not in cache
+        assert cache.rejected_count == 1
+
+    def test_ast_cache_rejected_replacement_keeps_old_entry(self):
+        """A replacement the budget rejects leaves the existing entry cached and charged."""
+        budget = MemoryBudget(total_mb=2)
+        budget.reserve("other", MB)
+        cache = StripedASTCache(10 * MB, memory_budget=budget)
+        assert cache.put("a.ts", _entry("a"), MB // 2)
+
+        assert cache.put("a.ts", _entry("a2"), 3 * MB) is False
+        assert cache.get("a.ts").tree == "a"
+        assert budget.used_bytes == cache.size_bytes == MB // 2
+
+    def test_lru_cache_reclaimed_by_other_cache(self):
+        """A budgeted LRUCache gives borrowed bytes back to a reserved cache."""
+        budget = MemoryBudget(total_mb=1)
+        ast_cache = StripedASTCache(MB, memory_budget=budget)
+        lru = LRUCache(max_size_mb=1)
+        lru.attach_budget(budget, "lru")
+
+        for i in range(4):
+            lru.set(f"k{i}", "x", size_bytes=256 * 1024)
+        assert budget.used_bytes == MB
+
+        assert ast_cache.put("a.ts", _entry("a"), 512 * 1024)
+        assert len(lru.entries) == 2
+        assert budget.used_bytes == MB
+
+    def test_memory_manager_budget_shared_by_caches(self):
+        """CacheManager and parser reservations appear in one budget report."""
+        from aromcp.analysis_server.tools.typescript_parser import TypeScriptParser
+
+        manager = MemoryManager(max_memory_mb=100, enable_monitoring=False)
+        cache_manager = CacheManager(memory_manager=manager)
+        parser = TypeScriptParser(cache_size_mb=10, memory_manager=manager)
+
+        names = {r.name for r in manager.get_budget_report().reservations}
+        assert {"cache_manager.memory", "cache_manager.symbol", "typescript_ast_cache"} <= names
+
+        cache_manager.set("key", {"value": 1})
+        assert manager.budget.used_bytes > 0
+        assert parser.get_memory_usage_mb() == 0
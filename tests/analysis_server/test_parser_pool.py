@@ -0,0 +1,138 @@
+"""
+Tests for the thread-safe parser pool and lock-striped AST cache.
+
+These tests verify that per-thread parsers share one cache, that the striped
+cache keeps global LRU order and exact size accounting, and that statistics
+stay consistent under concurrent parsing.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from aromcp.analysis_server.models.typescript_models import CacheEntry
+from aromcp.analysis_server.tools.ast_cache import StripedASTCache
+from aromcp.analysis_server.tools.parser_pool import ParserPool
+
+
+def _entry(name: str) -> CacheEntry:
+    return CacheEntry(tree=name, file_hash=name, modification_time=0.0, parse_time_ms=0.0)
+
+
+class TestStripedASTCache:
+    """Test the lock-striped LRU cache."""
+
+    def test_evicts_globally_least_recently_used(self):
+        """Eviction picks the oldest entry across all stripes."""
+        cache = StripedASTCache(max_bytes=300, stripes=4)
+        for name in ("a", "b", "c"):
+            cache.put(name, _entry(name), 100)
+
+        cache.get("a", touch=True)
+        cache.put("d", _entry("d"), 100)
+
+        assert "b" not in cache
+        assert [key for key, _ in cache.items()] == ["c", "a", "d"]
+        assert cache.size_bytes == 300
+
+    def test_replace_and_pop_keep_size_exact(self):
+        """Replacing and removing entries adjusts the accounted size exactly."""
+        cache = StripedASTCache(max_bytes=1000)
+        cache.put("a", _entry("a"), 100)
+        cache.put("a", _entry("a2"), 250)
+        cache.put("b", _entry("b"), 50)
+
+        assert len(cache) == 2
+        assert cache.size_bytes == 300
+
+        assert cache.pop("a").tree == "a2"
+        assert cache.size_bytes == 50
+
+        cache.remove_where(lambda key, entry: key == "b")
+        assert len(cache) == 0
+        assert cache.size_bytes == 0
+
+    def test_touch_counts_accesses(self):
+        """Touching an entry increments its access count."""
+        cache = StripedASTCache(max_bytes=1000)
+        cache.put("a", _entry("a"), 10)
+
+        cache.get("a", touch=True)
+        cache.get("a", touch=True)
+
+        assert cache.get("a").access_count == 2
+
+    def test_concurrent_puts_respect_budget(self):
+        """Concurrent inserts never leave the cache over budget."""
+        cache = StripedASTCache(max_bytes=5000, stripes=8)
+
+        def insert(worker: int):
+            for i in range(200):
+                cache.put(f"{worker}-{i}", _entry(str(i)), 100)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(insert, range(8)))
+
+        assert cache.size_bytes <= 5000
+        assert cache.size_bytes == len(cache) * 100
+
+
+class TestParserPool:
+    """Test per-thread parsers sharing one AST cache."""
+
+    @pytest.fixture
+    def ts_files(self, tmp_path):
+        files = []
+        for i in range(12):
+            file = tmp_path / f"module{i}.ts"
+            file.write_text(f"export function fn{i}(x: number): number {{\n  return x + {i};\n}}\n")
+            files.append(str(file))
+        return files
+
+    def test_each_thread_gets_its_own_parser(self):
+        """Parsers are per thread but share the pool's cache."""
+        pool = ParserPool(cache_size_mb=10)
+        barrier = threading.Barrier(4)
+
+        def get_parser(_):
+            barrier.wait()  # Force four distinct worker threads
+            return pool.get_parser()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            parsers = list(executor.map(get_parser, range(4)))
+
+        assert len({id(parser) for parser in parsers}) == 4
+        assert pool.size == 4
+        assert all(parser._ast_cache is pool.ast_cache for parser in parsers)
+        assert pool.get_parser() is pool.get_parser()
+
+    def test_concurrent_parsing_shares_cache(self, ts_files):
+        """Files parsed on one thread are cache hits on every other thread."""
+        pool = ParserPool(cache_size_mb=10)
+
+        def parse_all(_):
+            parser = pool.get_parser()
+            return [parser.parse_file(file).success for file in ts_files]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(parse_all, range(8)))
+
+        assert all(all(batch) for batch in results)
+        assert len(pool.ast_cache) == len(ts_files)
+
+        stats = pool.get_stats()
+        assert stats.files_parsed == 8 * len(ts_files)
+        assert stats.cache_hits + stats.cache_misses == stats.files_parsed
+        assert stats.cache_hits >= stats.files_parsed - 4 * len(ts_files)
+
+    def test_invalidate_removes_from_shared_cache(self, ts_files):
+        """Invalidating through the pool affects every thread's parser."""
+        pool = ParserPool(cache_size_mb=10)
+        parser = pool.get_parser()
+        parser.parse_file(ts_files[0])
+
+        pool.invalidate(ts_files[0])
+
+        assert parser.get_cached_tree(ts_files[0]) is None
+        assert pool.get_memory_usage_mb() == 0
@@ -0,0 +1,164 @@
+"""Tests for the asyncio-native executor path.
+
+Covers running blocking server steps off the event loop, advancing
+independent workflows concurrently on one loop, serializing calls for the
+same workflow, and matching the synchronous executor's responses.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from aromcp.workflow_server.state.manager import StateManager
+from aromcp.workflow_server.workflow.models import WorkflowDefinition, WorkflowStep
+from aromcp.workflow_server.workflow.queue_executor import QueueBasedWorkflowExecutor
+
+
+def _shell_workflow(command: str) -> WorkflowDefinition:
+    steps = [
+        WorkflowStep(
+            id="run",
+            type="shell_command",
+            definition={"command": command, "state_update": {"path": "state.out", "value": "stdout"}},
+        ),
+        WorkflowStep(id="report", type="user_message", definition={"message": "Output: {{ state.out }}"}),
+        WorkflowStep(id="pause", type="wait_step", definition={"message": "Waiting"}),
+        WorkflowStep(id="again", type="shell_command", definition={"command": "true"}),
+        WorkflowStep(id="done", type="user_message", definition={"message": "Done"}),
+    ]
+    return WorkflowDefinition(
+        name="test:async", description="", version="1.0.0", default_state={"state": {"out": ""}}, steps=steps
+    )
+
+
+def _messages(response: dict) -> list[str]:
+    return [step["definition"]["message"] for step in response["steps"] if step["type"] == "user_message"]
+
+
+class TestAsyncExecutor:
+    """Test get_next_step_async and the async interface built on it."""
+
+    @pytest.mark.asyncio
+    async def test_matches_sync_responses(self):
+        """The async path returns the same steps as get_next_step."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        sync_id = executor.start(_shell_workflow("printf hello"))["workflow_id"]
+        async_id = (await executor.start_workflow(_shell_workflow("printf hello")))["workflow_id"]
+
+        for _ in range(3):
+            sync_response = executor.get_next_step(sync_id)
+            async_response = await executor.get_next_step_async(async_id)
+            assert (sync_response and _messages(sync_response)) == (async_response and _messages(async_response))
+
+        assert executor.workflows[async_id].status == "completed"
+
+    @pytest.mark.asyncio
+    async def test_independent_workflows_progress_concurrently(self):
+        """Blocking shell commands in different workflows overlap on one event loop."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_ids = [executor.start(_shell_workflow("sleep 0.4 && printf slept"))["workflow_id"] for _ in range(3)]
+
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(executor.get_next_step_async(wf_id) for wf_id in workflow_ids))
+        elapsed = time.perf_counter() - start
+
+        assert [_messages(response) for response in responses] == [["Output: slept"]] * 3
+        assert elapsed < 1.0
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self):
+        """Other coroutines keep running while a shell command executes."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_id = executor.start(_shell_workflow("sleep 0.3"))["workflow_id"]
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        try:
+            await executor.get_next_step_async(workflow_id)
+        finally:
+            ticking.cancel()
+
+        assert ticks >= 10
+
+    @pytest.mark.asyncio
+    async def test_same_workflow_calls_are_serialized(self):
+        """Concurrent calls for one workflow advance it one batch at a time, in order."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_id = executor.start(_shell_workflow("sleep 0.1 && printf first"))["workflow_id"]
+
+        first, second = await asyncio.gather(
+            executor.get_next_step_async(workflow_id), executor.get_next_step_async(workflow_id)
+        )
+
+        assert _messages(first) == ["Output: first"]
+        assert _messages(second) == ["Done"]
+
+    @pytest.mark.asyncio
+    async def test_execute_next_uses_async_path(self):
+        """execute_next drives workflows to completion without a thread per call."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_id = executor.start(_shell_workflow("printf hi"))["workflow_id"]
+
+        responses = [await executor.execute_next(workflow_id) for _ in range(3)]
+
+        assert [response and _messages(response) for response in responses] == [["Output: hi"], ["Done"], None]
+        assert await executor.get_next_step_async("wf_missing") == {"error": "Workflow wf_missing not found"}
+
+
+class TestMixedDrivers:
+    """Test sync and async calls advancing the same workflow."""
+
+    @pytest.mark.asyncio
+    async def test_sync_call_does_not_step_past_async_command(self):
+        """A sync call waits for, or reports, an async call's in-flight shell command."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_id = executor.start(_shell_workflow("sleep 0.3 && printf built"))["workflow_id"]
+
+        advancing = asyncio.create_task(executor.get_next_step_async(workflow_id))
+        await asyncio.sleep(0.1)
+        on_loop = executor.get_next_step(workflow_id)
+        in_thread = asyncio.create_task(asyncio.to_thread(executor.get_next_step, workflow_id))
+        first = await advancing
+        second = await in_thread
+
+        assert [step["id"] for step in on_loop["steps"]] == [f"in_progress_{workflow_id}"]
+        assert _messages(first) == ["Output: built"]
+        assert [step["id"] for step in second["steps"]] == ["done"]
+
+    @pytest.mark.asyncio
+    async def test_async_call_waits_for_sync_command(self):
+        """An async call waits for a sync call's in-flight shell command, then takes the next batch."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_id = executor.start(_shell_workflow("sleep 0.3 && printf built"))["workflow_id"]
+
+        in_thread = asyncio.create_task(asyncio.to_thread(executor.get_next_step, workflow_id))
+        await asyncio.sleep(0.1)
+        second = await executor.get_next_step_async(workflow_id)
+        first = await in_thread
+
+        assert _messages(first) == ["Output: built"]
+        assert [step["id"] for step in second["steps"]] == ["done"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_hold_advance_lock(self):
+        """Cancelling an async call queued behind a sync call leaves the workflow usable."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_id = executor.start(_shell_workflow("sleep 0.2"))["workflow_id"]
+
+        in_thread = asyncio.create_task(asyncio.to_thread(executor.get_next_step, workflow_id))
+        await asyncio.sleep(0.05)
+        waiting = asyncio.create_task(executor.get_next_step_async(workflow_id))
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        await in_thread
+
+        response = await asyncio.wait_for(executor.get_next_step_async(workflow_id), timeout=2)
+
+        assert [step["id"] for step in response["steps"]] == ["done"]
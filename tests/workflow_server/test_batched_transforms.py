@@ -0,0 +1,152 @@
+"""Tests for batched computed-field evaluation.
+
+Covers compiling transforms once per source, evaluating each dependency level
+as a single batch, and reporting per-transform timings to the transformation
+metrics collector.
+"""
+
+import json
+import math
+
+from aromcp.workflow_server.monitoring.collectors import TransformationMetricsCollector
+from aromcp.workflow_server.monitoring.metrics import MetricsCollector
+from aromcp.workflow_server.state.manager import StateManager
+from aromcp.workflow_server.state.models import ComputedFieldError
+from aromcp.workflow_server.state.transformer import _JS_BATCH_RUNNER, TransformationEngine
+
+SCHEMA = {
+    "computed": {
+        "count": {"from": "inputs.items", "transform": "input.length"},
+        "name_length": {"from": "inputs.name", "transform": "input.length"},
+        "upper": {"from": "inputs.name", "transform": "input.toUpperCase()"},
+        "total": {"from": ["computed.count", "computed.name_length"], "transform": "input[0] + input[1]"},
+    }
+}
+
+
+class _CountingEngine:
+    """Stands in for PythonMonkey, counting how often source is compiled."""
+
+    def __init__(self):
+        self.evaluated = []
+
+    def eval(self, source):
+        self.evaluated.append(source)
+        return lambda value: value
+
+
+class _PythonJSEngine:
+    """Stands in for PythonMonkey with Python transforms and a batch runner following the JS protocol."""
+
+    def __init__(self, transforms):
+        self.transforms = transforms
+        self.batched_inputs = []
+
+    def eval(self, source):
+        if source == _JS_BATCH_RUNNER:
+            return self.run_batch
+        for name, function in self.transforms.items():
+            if f"return ({name});" in source:
+                return function
+        return lambda *args: None
+
+    def run_batch(self, functions, payload):
+        inputs = json.loads(payload)
+        self.batched_inputs.append(inputs)
+        outcomes = []
+        for function, value in zip(functions, inputs, strict=True):
+            result = function(value)
+            try:
+                json.dumps(result, allow_nan=False)
+                outcomes.append([True, result, 0.0])
+            except ValueError:
+                outcomes.append([None, None, 0.0])
+        return json.dumps(outcomes)
+
+
+class TestTransformationEngineBatch:
+    """Test compile caching and batch execution on the engine."""
+
+    def test_compiled_functions_are_cached_by_source(self):
+        """Each transform source is compiled once and reused."""
+        engine = TransformationEngine()
+        engine._js_engine = _CountingEngine()
+        engine._engine_type = "pythonmonkey"
+
+        first = engine.compile("input + 1")
+        assert engine.compile("input + 1") is first
+        engine.compile("input * 2")
+
+        assert engine._js_engine.evaluated == [
+            "(function (input) { return (input + 1); })",
+            "(function (input) { return (input * 2); })",
+        ]
+
+    def test_batch_matches_single_execution(self):
+        """Batched results equal execute() and failures are returned, not raised."""
+        engine = TransformationEngine()
+        requests = [("input * 2", 4), ("input.length", [1, 2, 3]), ("input.missing()", 1)]
+
+        results = engine.execute_batch(requests)
+
+        assert [result.value for result in results[:2]] == [engine.execute("input * 2", 4), 3]
+        assert isinstance(results[2].error, ComputedFieldError)
+        assert all(result.duration_ms >= 0 for result in results)
+
+    def test_non_json_values_match_single_execution(self):
+        """NaN and Infinity inputs or results are evaluated individually instead of coming back as null."""
+        engine = TransformationEngine()
+        engine._js_engine = _PythonJSEngine({"double": lambda x: x * 2, "nan": lambda x: math.nan})
+        engine._engine_type = "pythonmonkey"
+
+        results = engine.execute_batch([("double", 2), ("double", math.inf), ("nan", 0)])
+
+        assert results[0].value == 4
+        assert results[1].value == math.inf
+        assert math.isnan(results[2].value)
+        assert engine._js_engine.batched_inputs == [[2, None, 0]]
+
+
+class TestStateManagerBatching:
+    """Test per-level batching in StateManager."""
+
+    def test_fields_grouped_by_dependency_level(self):
+        """Independent fields share a level and dependents follow it."""
+        manager = StateManager(SCHEMA)
+        fields = list(manager._cascade_calculator.dependencies.keys())
+
+        levels = manager._group_by_dependency_level(fields)
+
+        assert len(levels) == 2
+        assert set(levels[0]) == {"count", "name_length", "upper"}
+        assert levels[1] == ["total"]
+
+    def test_one_batch_per_level(self):
+        """Affected fields in the same level are evaluated in a single batch."""
+        manager = StateManager(SCHEMA)
+        manager._transformer._engine_type = "pythonmonkey"
+        batch_sizes = []
+        execute_batch = manager._transformer.execute_batch
+
+        def counting_batch(requests):
+            batch_sizes.append(len(requests))
+            return execute_batch(requests)
+
+        manager._transformer.execute_batch = counting_batch
+
+        updates = [{"path": "inputs.items", "value": [1, 2]}, {"path": "inputs.name", "value": "ada"}]
+        result = manager.update("wf", updates)
+
+        assert batch_sizes == [3, 1]
+        assert result["upper"] == "ADA"
+        assert result["total"] == 5
+
+    def test_timings_reported_to_metrics_collector(self):
+        """Every computed transform is recorded against its workflow and field."""
+        collector = TransformationMetricsCollector(MetricsCollector())
+        manager = StateManager(SCHEMA, transformation_metrics=collector)
+
+        manager.update("wf_metrics", [{"path": "inputs.items", "value": [1, 2, 3]}])
+
+        stats = collector.get_transformation_statistics("wf_metrics")
+        assert set(stats["field_statistics"]) == {"count", "name_length", "upper", "total"}
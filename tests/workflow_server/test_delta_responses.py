@@ -0,0 +1,174 @@
+"""Tests for delta-encoded get_next_step responses.
+
+Covers computing and applying JSON-patch style deltas, and the versioned
+response protocol in which clients receive only state and context changes
+since the version they last saw.
+"""
+
+import json
+
+import pytest
+
+from aromcp.workflow_server.state.manager import StateManager
+from aromcp.workflow_server.workflow.deltas import apply_delta, compute_delta
+from aromcp.workflow_server.workflow.models import WorkflowDefinition, WorkflowStep
+from aromcp.workflow_server.workflow.queue_executor import QueueBasedWorkflowExecutor
+
+
+class TestDeltas:
+    """Test delta computation and application."""
+
+    def test_round_trip(self):
+        """Applying the delta to the old document yields the new one."""
+        old = {"a": 1, "b": {"c": [1, 2], "d": "x"}, "gone": True, "a/b": {"~": 1}, "flag": 1}
+        new = {"a": 2, "b": {"c": [1, 2, 3, 4], "e": None}, "a/b": {"~": 2}, "flag": True, "added": [0]}
+
+        delta = compute_delta(old, new)
+
+        assert apply_delta(old, delta) == new
+        assert old["b"]["c"] == [1, 2]
+        assert {"op": "add", "path": "/b/c/-", "value": 3} in delta
+        assert {"op": "replace", "path": "/a~1b/~0", "value": 2} in delta
+        assert {"op": "replace", "path": "/flag", "value": True} in delta
+
+    def test_equal_documents_have_empty_delta(self):
+        """No operations are produced when nothing changed."""
+        assert compute_delta({"a": [1, {"b": 2}]}, {"a": [1, {"b": 2}]}) == []
+
+    def test_non_append_list_change_replaces_list(self):
+        """Lists that did not just grow are replaced whole."""
+        assert compute_delta({"a": [1, 2, 3]}, {"a": [1, 3]}) == [{"op": "replace", "path": "/a", "value": [1, 3]}]
+
+    def test_invalid_operations_are_rejected(self):
+        """Unsupported operations and missing paths raise ValueError."""
+        with pytest.raises(ValueError):
+            apply_delta({"a": 1}, [{"op": "move", "path": "/a"}])
+        with pytest.raises(ValueError):
+            apply_delta({"a": 1}, [{"op": "add", "path": "/missing/b", "value": 1}])
+
+
+def _start(executor: QueueBasedWorkflowExecutor, items: int = 0) -> str:
+    steps = []
+    for i in range(4):
+        steps.append(WorkflowStep(id=f"say{i}", type="user_message", definition={"message": f"Step {i}"}))
+        steps.append(WorkflowStep(id=f"wait{i}", type="wait_step", definition={"message": "Waiting"}))
+    definition = WorkflowDefinition(
+        name="test:delta",
+        description="",
+        version="1.0.0",
+        default_state={"state": {"count": 0, "items": list(range(items))}},
+        steps=steps,
+    )
+    return executor.start(definition)["workflow_id"]
+
+
+class TestVersionedResponses:
+    """Test the versioned get_next_step protocol."""
+
+    def test_client_view_tracks_server_state(self):
+        """A snapshot followed by deltas reproduces the current state."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_id = _start(executor)
+
+        first = executor.get_next_step(workflow_id, since_version="")
+        view = first["snapshot"]
+        executor.update_workflow_state(workflow_id, [{"path": "state.count", "value": 5}])
+        second = executor.get_next_step(workflow_id, since_version=first["state_version"])
+        view = apply_delta(view, second["delta"])
+
+        assert "execution_context" not in first
+        assert "raw" not in view["state"]
+        assert second["state_version"] != first["state_version"]
+        assert {"op": "replace", "path": "/state/state/count", "value": 5} in second["delta"]
+        expected_state = executor.state_manager.read(workflow_id)
+        expected_state.pop("raw")
+        assert view["state"] == expected_state
+
+    def test_unchanged_view_keeps_version(self):
+        """Without changes the version stays the same and the delta is empty."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_id = _start(executor)
+
+        first = executor.get_next_step(workflow_id, since_version="")
+        second = executor._get_versioned_view(workflow_id, first["state_version"])
+
+        assert second == {"state_version": first["state_version"], "delta": []}
+
+    def test_older_and_unknown_versions(self):
+        """Recent versions diff against their own view; unknown ones get a snapshot."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_id = _start(executor)
+
+        first = executor.get_next_step(workflow_id, since_version="")
+        executor.update_workflow_state(workflow_id, [{"path": "state.count", "value": 1}])
+        executor.get_next_step(workflow_id, since_version=first["state_version"])
+        executor.update_workflow_state(workflow_id, [{"path": "state.count", "value": 2}])
+        third = executor.get_next_step(workflow_id, since_version=first["state_version"])
+        unknown = executor.get_next_step(workflow_id, since_version="other-process.3")
+
+        assert apply_delta(first["snapshot"], third["delta"])["state"]["state"]["count"] == 2
+        assert unknown["snapshot"]["state"]["state"]["count"] == 2
+
+    def test_legacy_responses_are_unchanged(self):
+        """Callers that do not pass since_version still get the execution context."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_id = _start(executor)
+
+        response = executor.get_next_step(workflow_id)
+
+        assert "execution_context" in response
+        assert "state_version" not in response
+
+    def test_delta_is_small_for_large_state(self):
+        """Changing one field of a large state sends a fraction of the snapshot."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_id = _start(executor, items=2000)
+
+        first = executor.get_next_step(workflow_id, since_version="")
+        executor.update_workflow_state(workflow_id, [{"path": "state.count", "value": 1}])
+        second = executor.get_next_step(workflow_id, since_version=first["state_version"])
+
+        assert len(json.dumps(second["delta"])) * 20 < len(json.dumps(first["snapshot"]))
+
+    def test_only_written_keys_are_copied(self):
+        """A new version copies only the keys written since the last one and shares the rest."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_id = _start(executor, items=100)
+
+        executor.get_next_step(workflow_id, since_version="")
+        executor.update_workflow_state(workflow_id, [{"path": "this.count", "value": 3}])
+        executor._get_versioned_view(workflow_id, "")
+
+        first, second = executor._view_history[workflow_id].values()
+        assert second.changed_keys == {("state", "count")}
+        assert second.state["state"]["items"] is first.state["state"]["items"]
+        assert second.state["state"]["count"] == 3
+
+    def test_replaced_state_is_diffed_whole(self):
+        """Deltas stay correct when the state object is replaced rather than updated."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_id = _start(executor)
+
+        first = executor.get_next_step(workflow_id, since_version="")
+        executor.state_manager.initialize_state(default_state={"count": 9}, workflow_id=workflow_id)
+        second = executor._get_versioned_view(workflow_id, first["state_version"])
+
+        assert apply_delta(first["snapshot"], second["delta"])["state"]["state"] == {"count": 9}
+
+
+class TestReadChanges:
+    """Test per-key write stamps in the state manager."""
+
+    def test_written_keys_since_version(self):
+        """Only top-level keys written after the given version are reported."""
+        manager = StateManager()
+        manager.initialize_state(inputs={"name": "a"}, default_state={"user": {"id": 1}}, workflow_id="wf")
+        version, state, changed = manager.read_changes("wf")
+
+        manager.update("wf", [{"path": "this.user.id", "value": 2}, {"path": "raw.name", "value": "b"}])
+        _, state, changed_since = manager.read_changes("wf", version)
+
+        assert changed is None
+        assert sorted(changed_since) == [("inputs", "name"), ("state", "user")]
+        assert state["state"]["user"] == {"id": 2}
+        assert manager.read_changes("wf", version - 1)[2] is None
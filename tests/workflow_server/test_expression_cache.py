@@ -0,0 +1,126 @@
+"""Tests for cached and compiled expression evaluation.
+
+This module verifies that parsed expressions are cached by text, that compiled
+closures produce the same results as the AST interpreter, and that the
+micro-benchmark reports per-evaluation cost for each mode.
+"""
+
+import pytest
+
+from aromcp.workflow_server.testing.benchmarks import PerformanceBenchmark
+from aromcp.workflow_server.workflow.expressions import (
+    ExpressionError,
+    ExpressionEvaluator,
+    clear_expression_cache,
+    compile_expression,
+    parse_expression,
+)
+
+EXPRESSIONS = [
+    "count + 1",
+    "count * 2 - 3 / 0",
+    "'total: ' + count",
+    "count > 3 && name !== ''",
+    "missing || 'default'",
+    "!enabled ? 'off' : 'on'",
+    "items.length >= 2",
+    "items[1]",
+    "items.includes(2)",
+    "items.concat([4, 5]).join('-')",
+    "user.profile.name.toUpperCase()",
+    "user['profile']",
+    "-count % 4",
+    "'5' == 5",
+    "null == undefined_var",
+    "[count, name, [1, 2]]",
+    "this.value + global.offset",
+    "this.list[0]",
+    "loop.item.status === 'done'",
+    "inputs.flag ? inputs.items[1] : this.value",
+    "this.value",
+]
+
+CONTEXT = {
+    "count": 5,
+    "name": "workflow",
+    "enabled": True,
+    "items": [1, 2, 3],
+    "user": {"profile": {"name": "ada"}},
+    "this": {"value": "legacy-this"},
+}
+
+
+class TestExpressionCache:
+    """Test AST caching by expression text."""
+
+    def setup_method(self):
+        clear_expression_cache()
+
+    def test_parse_is_cached_by_text(self):
+        """Repeated evaluations reuse the parsed AST."""
+        evaluator = ExpressionEvaluator(compile_expressions=False)
+        for _ in range(5):
+            assert evaluator.evaluate("count > 3", {"count": 4}) is True
+
+        info = parse_expression.cache_info()
+        assert info.misses == 1
+        assert info.hits == 4
+        assert parse_expression("count > 3") is parse_expression("count > 3")
+
+    def test_compiled_closure_shared_across_evaluators(self):
+        """Different evaluator instances share compiled expressions."""
+        first = ExpressionEvaluator()
+        second = ExpressionEvaluator()
+
+        assert first.evaluate("x + 1", {"x": 1}) == 2
+        assert second.evaluate("x + 1", {"x": 41}) == 42
+        assert compile_expression.cache_info().misses == 1
+
+    def test_parse_errors_are_not_cached(self):
+        """Invalid expressions raise on every evaluation."""
+        evaluator = ExpressionEvaluator()
+        for _ in range(2):
+            with pytest.raises(ExpressionError):
+                evaluator.evaluate("(count", {"count": 1})
+
+
+class TestCompiledExpressions:
+    """Test that compiled closures match the AST interpreter."""
+
+    @pytest.mark.parametrize("expression", EXPRESSIONS)
+    @pytest.mark.parametrize(
+        "scoped_context",
+        [
+            None,
+            {
+                "this": {"value": 10, "list": ["first"]},
+                "global": {"offset": 5},
+                "loop": {"item": {"status": "done"}},
+                "inputs": {"flag": True, "items": ["a", "b"]},
+            },
+        ],
+    )
+    def test_compiled_matches_interpreted(self, expression, scoped_context):
+        """Both evaluation modes return identical results."""
+        interpreted = ExpressionEvaluator(compile_expressions=False)
+        compiled = ExpressionEvaluator(compile_expressions=True)
+
+        expected = interpreted.evaluate(expression, dict(CONTEXT), scoped_context)
+        assert compiled.evaluate(expression, dict(CONTEXT), scoped_context) == expected
+
+
+class TestExpressionBenchmark:
+    """Test the expression evaluation micro-benchmark."""
+
+    def test_reports_per_evaluation_cost(self):
+        """Each mode reports its per-evaluation cost and speedup over uncached parsing."""
+        result = PerformanceBenchmark().benchmark_expression_evaluation(
+            ["count > 3 && name !== ''", "items.length"], CONTEXT, iterations=20
+        )
+
+        modes = result["expression_evaluation"]
+        assert set(modes) == {"uncached", "cached_ast", "compiled"}
+        for mode in modes.values():
+            assert mode["evaluations"] == 40
+            assert mode["per_evaluation_us"] > 0
+        assert modes["uncached"]["speedup"] == pytest.approx(1.0)
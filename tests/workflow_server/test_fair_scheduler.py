@@ -0,0 +1,206 @@
+"""Tests for fair-share scheduling of server-step processing.
+
+Covers granting contended slots in virtual-runtime order, weighting,
+wait metrics, and executor calls that yield a wait step once their
+time slice is exhausted.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from aromcp.workflow_server.state.manager import StateManager
+from aromcp.workflow_server.workflow.models import WorkflowDefinition, WorkflowStep
+from aromcp.workflow_server.workflow.queue_executor import QueueBasedWorkflowExecutor
+from aromcp.workflow_server.workflow.scheduler import FairShareScheduler
+
+
+def _wait_for_waiters(scheduler: FairShareScheduler, count: int) -> None:
+    deadline = time.monotonic() + 2
+    while scheduler.get_stats()["waiting"] < count and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+class TestFairShareScheduler:
+    """Test slot grants and scheduling accounts."""
+
+    def test_least_served_waiter_is_granted_first(self):
+        """A contended slot goes to the waiter with the lowest virtual runtime."""
+        scheduler = FairShareScheduler()
+        scheduler.register("heavy")
+        scheduler.register("light")
+        scheduler._charge("heavy", 1.0)
+        holder = scheduler.begin_slice("holder")
+        assert holder.try_acquire()
+
+        order = []
+
+        def run(workflow_id: str) -> None:
+            time_slice = scheduler.begin_slice(workflow_id)
+            time_slice.acquire()
+            order.append(workflow_id)
+            time_slice.end()
+
+        threads = [threading.Thread(target=run, args=("heavy",)), threading.Thread(target=run, args=("light",))]
+        for count, thread in enumerate(threads, start=1):
+            thread.start()
+            _wait_for_waiters(scheduler, count)
+        holder.end()
+        for thread in threads:
+            thread.join()
+
+        assert order == ["light", "heavy"]
+        assert scheduler.get_workflow_stats("heavy")["waits"] == 1
+        assert scheduler.get_workflow_stats("light")["max_wait"] > 0
+        assert scheduler.get_stats()["in_use"] == 0
+
+    def test_weight_scales_virtual_runtime(self):
+        """A workflow with twice the weight accrues half the virtual runtime."""
+        scheduler = FairShareScheduler()
+        scheduler.register("normal")
+        scheduler.register("priority", weight=2.0)
+
+        for workflow_id in ("normal", "priority"):
+            time_slice = scheduler.begin_slice(workflow_id)
+            with time_slice.charge():
+                sum(range(100000))
+            scheduler._charge(workflow_id, 1.0 - time_slice.cpu_time)
+
+        assert scheduler.get_workflow_stats("normal")["vruntime"] == pytest.approx(1.0)
+        assert scheduler.get_workflow_stats("priority")["vruntime"] == pytest.approx(0.5)
+
+    def test_new_workflow_starts_at_floor(self):
+        """Workflows registered later do not owe or get owed earlier CPU time."""
+        scheduler = FairShareScheduler()
+        scheduler.register("early")
+        scheduler._charge("early", 2.0)
+        time_slice = scheduler.begin_slice("early")
+        time_slice.acquire()
+        time_slice.end()
+
+        scheduler.register("late")
+
+        assert scheduler.get_workflow_stats("late")["vruntime"] == 2.0
+
+    def test_slice_budget(self):
+        """A slice is exhausted once its step bound is reached."""
+        scheduler = FairShareScheduler(slice_cpu_ms=0, max_server_steps=2)
+        time_slice = scheduler.begin_slice("wf")
+
+        for _ in range(2):
+            assert not time_slice.exhausted
+            with time_slice.charge():
+                pass
+
+        assert time_slice.exhausted
+        assert scheduler.slice_cpu_seconds is None
+
+
+def _heavy_definition(conditionals: int = 7) -> WorkflowDefinition:
+    steps = [
+        WorkflowStep(
+            id=f"check{i}",
+            type="conditional",
+            definition={
+                "condition": "{{ this.count > 5 }}",
+                "then_steps": [{"id": f"big{i}", "type": "user_message", "message": "big"}],
+            },
+        )
+        for i in range(conditionals)
+    ]
+    steps.append(WorkflowStep(id="done", type="user_message", definition={"message": "Done"}))
+    return WorkflowDefinition(
+        name="test:heavy", description="", version="1.0.0", default_state={"state": {"count": 0}}, steps=steps
+    )
+
+
+class TestExecutorScheduling:
+    """Test time slices in get_next_step."""
+
+    def test_exhausted_slice_yields_and_resumes(self):
+        """A call that reaches the step bound returns a wait step and continues on the next call."""
+        executor = QueueBasedWorkflowExecutor(StateManager(), scheduler=FairShareScheduler(max_server_steps=3))
+        workflow_id = executor.start(_heavy_definition())["workflow_id"]
+
+        responses = []
+        while (response := executor.get_next_step(workflow_id)) is not None:
+            responses.append([(step["id"], step["type"]) for step in response["steps"]])
+
+        assert responses == [
+            [("yield_check3", "wait_step")],
+            [("yield_check6", "wait_step")],
+            [("done", "user_message")],
+        ]
+        status = executor.get_workflow_status(workflow_id)
+        assert status["status"] == "completed"
+        assert status["scheduling"]["server_steps"] == 7
+        assert status["scheduling"]["slices"] == 3
+        assert status["scheduling"]["preempted_slices"] == 2
+
+    def test_weight_from_workflow_config(self):
+        """The scheduler_weight config entry sets the workflow's share."""
+        executor = QueueBasedWorkflowExecutor(StateManager(), scheduler=FairShareScheduler())
+        definition = _heavy_definition()
+        definition.config["scheduler_weight"] = 3.0
+
+        workflow_id = executor.start(definition)["workflow_id"]
+
+        assert executor.scheduler.get_workflow_stats(workflow_id)["weight"] == 3.0
+        while executor.get_next_step(workflow_id) is not None:
+            pass
+        assert executor.evict_workflow(workflow_id)
+        assert executor.scheduler.get_workflow_stats(workflow_id) is None
+
+    def test_without_scheduler_runs_to_client_step(self):
+        """Without a scheduler every server step runs in one call."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_id = executor.start(_heavy_definition())["workflow_id"]
+
+        response = executor.get_next_step(workflow_id)
+
+        assert [step["id"] for step in response["steps"]] == ["done"]
+        assert "scheduling" not in executor.get_workflow_status(workflow_id)
+
+
+class TestCancellation:
+    """Test that cancelled calls give their scheduler slot back."""
+
+    def test_slot_granted_after_end_is_returned(self):
+        """A slot acquired by a slice that already ended is released at once."""
+        scheduler = FairShareScheduler()
+        holder = scheduler.begin_slice("holder")
+        holder.try_acquire()
+        waiter = scheduler.begin_slice("waiter")
+
+        thread = threading.Thread(target=waiter.acquire)
+        thread.start()
+        _wait_for_waiters(scheduler, 1)
+        waiter.end()
+        holder.end()
+        thread.join(timeout=2)
+
+        assert not waiter.holding
+        assert scheduler.get_stats()["in_use"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_async_call_does_not_leak_slot(self):
+        """Cancelling an async call waiting for a slot leaves the scheduler usable."""
+        scheduler = FairShareScheduler()
+        executor = QueueBasedWorkflowExecutor(StateManager(), scheduler=scheduler)
+        workflow_id = executor.start(_heavy_definition())["workflow_id"]
+        holder = scheduler.begin_slice("holder")
+        holder.try_acquire()
+
+        waiting = asyncio.create_task(executor.get_next_step_async(workflow_id))
+        await asyncio.to_thread(_wait_for_waiters, scheduler, 1)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        holder.end()
+
+        response = await asyncio.wait_for(executor.get_next_step_async(workflow_id), timeout=2)
+
+        assert [step["id"] for step in response["steps"]] == ["done"]
+        assert scheduler.get_stats()["in_use"] == 0
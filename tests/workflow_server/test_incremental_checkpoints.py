@@ -0,0 +1,104 @@
+"""Tests for incremental checkpoints in ConcurrentStateManager.
+
+Covers storing deltas against a shared base snapshot, compacting chains,
+restoring by replaying deltas, bounded update history, and checkpoint
+size reporting.
+"""
+
+import time
+
+from aromcp.workflow_server.state.concurrent import ConcurrentStateManager
+from aromcp.workflow_server.state.models import WorkflowState
+
+
+def _manager(items: int = 0, **kwargs) -> ConcurrentStateManager:
+    manager = ConcurrentStateManager(**kwargs)
+    manager._base_manager._states["wf_cp"] = WorkflowState(state={"counter": 0, "items": list(range(items))})
+    return manager
+
+
+class TestIncrementalCheckpoints:
+    """Test checkpoint chains and restore."""
+
+    def test_checkpoints_share_base_snapshot(self):
+        """Later checkpoints store only their delta and reference the first snapshot."""
+        manager = _manager(items=1000)
+
+        first = manager.create_checkpoint("wf_cp")["checkpoint"]
+        manager.update("wf_cp", [{"path": "state.counter", "value": 1}])
+        second = manager.create_checkpoint("wf_cp")["checkpoint"]
+
+        assert second["base"] is first["base"]
+        assert second["deltas"] == [[{"op": "replace", "path": "/state/counter", "value": 1}]]
+        assert second["size_bytes"] * 50 < first["size_bytes"]
+
+    def test_restore_replays_deltas(self):
+        """Every checkpoint in a chain restores its own state."""
+        manager = _manager()
+        checkpoints = []
+        for i in range(5):
+            manager.update(
+                "wf_cp",
+                [{"path": "state.counter", "value": i}, {"path": "state.items", "value": i, "operation": "append"}],
+            )
+            checkpoints.append(manager.create_checkpoint("wf_cp")["checkpoint"])
+
+        for i, checkpoint in enumerate(checkpoints):
+            assert manager.restore_from_checkpoint("wf_cp", checkpoint)["success"]
+            state = manager.read("wf_cp")["state"]
+            assert state["counter"] == i
+            assert state["items"] == list(range(i + 1))
+
+    def test_restored_state_does_not_alias_checkpoint(self):
+        """Updates after a restore leave the stored snapshot untouched."""
+        manager = _manager()
+        checkpoint = manager.create_checkpoint("wf_cp")["checkpoint"]
+
+        manager.restore_from_checkpoint("wf_cp", checkpoint)
+        manager.update("wf_cp", [{"path": "state.items", "value": "x", "operation": "append"}])
+
+        assert manager.materialize_checkpoint(checkpoint)["state"]["items"] == []
+
+    def test_chain_is_compacted(self):
+        """A new base snapshot is taken after compact_interval deltas."""
+        manager = _manager(compact_interval=2)
+
+        bases = []
+        for i in range(5):
+            manager.update("wf_cp", [{"path": "state.counter", "value": i}])
+            checkpoint = manager.create_checkpoint("wf_cp")["checkpoint"]
+            bases.append((checkpoint["base_version"], len(checkpoint["deltas"])))
+
+        assert [count for _, count in bases] == [0, 1, 2, 0, 1]
+        assert bases[0][0] == bases[2][0] != bases[3][0]
+        assert manager.get_checkpoint_stats("wf_cp")["delta_count"] == 1
+
+
+class TestHistoryRetention:
+    """Test bounded update history and size reporting."""
+
+    def test_history_is_bounded(self):
+        """Only the most recent history_depth updates are retained."""
+        manager = _manager(history_depth=3)
+
+        for i in range(10):
+            manager.update("wf_cp", [{"path": "state.counter", "value": i}])
+
+        history = manager.get_update_history("wf_cp")
+        assert len(history) == 3
+        assert manager.get_checkpoint_stats("wf_cp")["history_entries"] == 3
+
+    def test_cleanup_keeps_depth_and_drops_stale_chains(self):
+        """Cleanup keeps the history bound and removes chains older than the cutoff."""
+        manager = _manager(history_depth=2)
+        manager.create_checkpoint("wf_cp")
+        manager._checkpoint_chains["wf_cp"].updated_at = time.time() - 7200
+        for i in range(5):
+            manager.update("wf_cp", [{"path": "state.counter", "value": i}])
+
+        stats = manager.cleanup_old_data(max_age_seconds=3600)
+        manager.update("wf_cp", [{"path": "state.counter", "value": 5}])
+
+        assert stats["checkpoint_chains_removed"] == 1
+        assert len(manager.get_update_history("wf_cp")) == 2
+        assert manager.get_checkpoint_stats("wf_cp")["base_version"] is None
@@ -0,0 +1,160 @@
+"""Tests for dirty-tracked, fingerprint-gated computed field recomputation.
+
+Covers the memoized path-to-field index, skipping fields whose resolved inputs
+are unchanged, and keeping reads free of recomputation once fields are current.
+"""
+
+import pytest
+
+from aromcp.workflow_server.state.manager import StateManager
+from aromcp.workflow_server.state.transformer import CascadingUpdateCalculator
+
+SCHEMA = {
+    "computed": {
+        "item_count": {"from": "this.items", "transform": "input.length"},
+        "has_items": {"from": "computed.item_count", "transform": "input[0] > 0"},
+        "user_name": {"from": "this.user", "transform": "input[0]['name']"},
+        "city": {"from": "this.user.address.city", "transform": "input.toLowerCase()"},
+        "label": {"from": "inputs.label", "transform": "input.toUpperCase()"},
+    }
+}
+
+
+def _counting_manager() -> tuple[StateManager, list[str]]:
+    manager = StateManager(SCHEMA)
+    # Give every field valid inputs; failed transforms are retried on each read
+    manager.update(
+        "wf",
+        [
+            {"path": "this.items", "value": []},
+            {"path": "this.user", "value": {"name": "", "address": {"city": ""}}},
+            {"path": "inputs.label", "value": ""},
+        ],
+    )
+    executed = []
+    execute = manager._transformer.execute
+
+    def counting_execute(transform, input_value):
+        executed.append(transform)
+        return execute(transform, input_value)
+
+    manager._transformer.execute = counting_execute
+    return manager, executed
+
+
+def _field_for(transform: str) -> str:
+    return next(name for name, info in SCHEMA["computed"].items() if info["transform"] == transform)
+
+
+class TestAffectedFieldIndex:
+    """Test the memoized changed-path index."""
+
+    def test_aliases_share_one_entry(self):
+        """this./state. and raw./inputs. paths resolve to the same fields."""
+        calculator = StateManager(SCHEMA)._cascade_calculator
+
+        assert calculator.get_affected_fields(["this.items"]) == ["item_count", "has_items"]
+        assert calculator.get_affected_fields(["state.items"]) == ["item_count", "has_items"]
+        assert calculator.get_affected_fields(["raw.label"]) == ["label"]
+        assert set(calculator._affected_cache) == {"state.items", "inputs.label"}
+
+    def test_nested_paths_match_parents_and_children(self):
+        """Changing a parent or a child of a dependency affects the field."""
+        calculator = StateManager(SCHEMA)._cascade_calculator
+
+        assert calculator.get_affected_fields(["this.user.name"]) == ["user_name"]
+        # user_name and city are independent, so their relative order is unspecified
+        assert sorted(calculator.get_affected_fields(["this.user"])) == ["city", "user_name"]
+        assert sorted(calculator.get_affected_fields(["this.user.address.city.extra"])) == ["city", "user_name"]
+        assert calculator.get_affected_fields(["this.other"]) == []
+
+    def test_bare_dependencies_match_state_and_inputs(self):
+        """Bare dependency names are affected by either tier."""
+        calculator = CascadingUpdateCalculator({"copy": {"dependencies": ["value"], "transform": "input"}})
+
+        assert calculator.get_affected_fields(["state.value"]) == ["copy"]
+        assert calculator.get_affected_fields(["inputs.value"]) == ["copy"]
+        assert calculator.get_affected_fields(["value"]) == ["copy"]
+
+
+class TestIncrementalRecomputation:
+    """Test fingerprint-gated recomputation in StateManager."""
+
+    def test_unchanged_inputs_are_not_recomputed(self):
+        """Setting a dependency to an equal value skips its transform."""
+        manager, executed = _counting_manager()
+        manager.update("wf", [{"path": "this.items", "value": [1, 2]}])
+        executed.clear()
+
+        manager.update("wf", [{"path": "this.items", "value": [1, 2]}])
+
+        assert executed == []
+
+    def test_unchanged_intermediate_stops_the_cascade(self):
+        """Dependents of a recomputed field with the same value are skipped."""
+        manager, executed = _counting_manager()
+        manager.update("wf", [{"path": "this.items", "value": [1, 2]}])
+        executed.clear()
+
+        result = manager.update("wf", [{"path": "this.items", "value": [3, 4]}])
+
+        assert [_field_for(transform) for transform in executed] == ["item_count"]
+        assert result["has_items"] is True
+
+    def test_reads_do_not_recompute_current_fields(self):
+        """Once an update has refreshed the stale fields, reads are free."""
+        manager, executed = _counting_manager()
+        manager.update("wf", [{"path": "this.items", "value": [1]}, {"path": "inputs.label", "value": "a"}])
+        executed.clear()
+
+        state = manager.read("wf")
+        manager.get_flattened_state("wf")
+
+        assert executed == []
+        assert state["computed"]["item_count"] == 1
+        assert state["computed"]["label"] == "A"
+
+    def test_only_affected_fields_recompute(self):
+        """An update recomputes the fields reading the changed path and nothing else."""
+        manager, executed = _counting_manager()
+        manager.update("wf", [{"path": "this.user", "value": {"name": "ada", "address": {"city": "OSLO"}}}])
+        executed.clear()
+
+        result = manager.update("wf", [{"path": "this.user.address.city", "value": "LIMA"}])
+
+        assert sorted(_field_for(transform) for transform in executed) == ["city", "user_name"]
+        assert result["city"] == "lima"
+
+    def test_failed_update_restores_fingerprints(self):
+        """A rolled-back update leaves fingerprints matching the restored values."""
+        manager, executed = _counting_manager()
+        manager.update("wf", [{"path": "this.items", "value": [1, 2]}])
+        fingerprints = dict(manager._states["wf"].computed_fingerprints)
+
+        updates = [{"path": "this.items", "value": [9]}, {"path": "this.items", "value": 1, "operation": "increment"}]
+        with pytest.raises(ValueError):
+            manager.update("wf", updates)
+
+        assert manager._states["wf"].computed_fingerprints == fingerprints
+        assert manager.read("wf")["computed"]["item_count"] == 2
+
+    def test_failed_transform_is_retried(self):
+        """A field whose transform failed is recomputed on the next read with the same inputs."""
+        manager, executed = _counting_manager()
+        counting_execute = manager._transformer.execute
+        failures = ["input.toUpperCase()"]
+
+        def flaky_execute(transform, input_value):
+            if transform in failures:
+                failures.remove(transform)
+                raise RuntimeError("transient failure")
+            return counting_execute(transform, input_value)
+
+        manager._transformer.execute = flaky_execute
+        manager.update("wf", [{"path": "inputs.label", "value": "a"}])
+
+        assert "label" not in manager._states["wf"].computed_fingerprints
+        assert manager.read("wf")["computed"]["label"] == "A"
+        executed.clear()
+        manager.read("wf")
+        assert executed == []
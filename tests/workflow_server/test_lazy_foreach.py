@@ -0,0 +1,102 @@
+"""Tests for lazily produced foreach iterations.
+
+Verifies that foreach loops queue one iteration at a time from shared body
+steps, that loop variables bind through the execution context, and that the
+standalone expansion helper produces steps on demand.
+"""
+
+import itertools
+
+from aromcp.workflow_server.state.manager import StateManager
+from aromcp.workflow_server.workflow.context import ExecutionContext
+from aromcp.workflow_server.workflow.models import WorkflowDefinition, WorkflowStep
+from aromcp.workflow_server.workflow.queue_executor import QueueBasedWorkflowExecutor
+from aromcp.workflow_server.workflow.steps.foreach import ForEachProcessor
+
+
+def _foreach_workflow(files: list[str]) -> WorkflowDefinition:
+    body = [{"type": "user_message", "message": "File {{ loop.item }} #{{ loop.index }}"}]
+    steps = [WorkflowStep(id="loop", type="foreach", definition={"items": "state.files", "body": body})]
+    return WorkflowDefinition(
+        name="test:foreach", description="", version="1.0.0", default_state={"state": {"files": files}}, steps=steps
+    )
+
+
+class TestLazyForeachExecution:
+    """Test foreach iteration in the queue-based executor."""
+
+    def test_client_steps_see_current_iteration(self):
+        """Each iteration's messages render with that iteration's item and index."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_id = executor.start(_foreach_workflow(["a", "b", "c"]))["workflow_id"]
+
+        response = executor.get_next_step(workflow_id)
+
+        messages = [step["definition"]["message"] for step in response["steps"]]
+        assert messages == ["File a #0", "File b #1", "File c #2"]
+
+    def test_queue_holds_one_iteration(self):
+        """The queue never grows beyond one iteration's body plus the loop step."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_id = executor.start(_foreach_workflow([f"file{i}.ts" for i in range(300)]))["workflow_id"]
+        queue = executor.queues[workflow_id]
+        sizes = []
+        prepend_steps = queue.prepend_steps
+
+        def recording_prepend(steps):
+            prepend_steps(steps)
+            sizes.append(len(queue.main_queue))
+
+        queue.prepend_steps = recording_prepend
+
+        response = executor.get_next_step(workflow_id)
+
+        assert len(response["steps"]) == 300
+        assert max(sizes) == 2
+
+    def test_body_steps_shared_across_iterations(self):
+        """Body steps are built once and the definition is left untouched."""
+        workflow = _foreach_workflow(["a", "b"])
+        loop_step = workflow.steps[0]
+
+        body = loop_step.get_loop_body()
+
+        assert loop_step.get_loop_body() is body
+        assert [step.id for step in body] == ["loop.body.0"]
+        assert body[0]._loop_id == "loop"
+        assert "id" not in loop_step.definition["body"][0]
+
+
+class TestIterForeachSteps:
+    """Test the standalone lazy expansion helper."""
+
+    def test_iterations_are_produced_on_demand(self):
+        """Only consumed iterations are built."""
+        processor = ForEachProcessor()
+        step = WorkflowStep(
+            id="each",
+            type="foreach",
+            definition={
+                "items": "files",
+                "variable_name": "file",
+                "body": [{"type": "user_message", "message": "{{ file }} of {{ inputs.total }}", "static": [1]}],
+            },
+        )
+        state = {"files": [f"f{i}" for i in range(5000)]}
+
+        steps = processor.iter_foreach_steps(step, ExecutionContext("wf_lazy"), state)
+        first_two = list(itertools.islice(steps, 2))
+
+        assert [s.id for s in first_two] == ["each.0.0", "each.1.0"]
+        assert first_two[1].definition["message"] == "f1 of {{ inputs.total }}"
+        assert first_two[1].definition["static"] is step.definition["body"][0]["static"]
+
+    def test_non_string_values_are_json_encoded(self):
+        """Substitution matches the previous JSON-based behaviour."""
+        processor = ForEachProcessor()
+
+        result = processor._substitute_variables(
+            {"message": "{{ item }}", "other": "{{item}} and {{ other }}"}, {"item": {"a": 1}, "index": 0}
+        )
+
+        assert result == {"message": '{"a": 1}', "other": '{"a": 1} and {{ other }}'}
@@ -0,0 +1,222 @@
+"""Tests for log-bucketed metric histograms.
+
+Covers bucket placement and percentile accuracy, merging and
+serialization, rolling windows, MetricsCollector series and summaries,
+and Prometheus export of histogram buckets.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from aromcp.workflow_server.monitoring import (
+    ExecutionMetricsCollector,
+    LogHistogram,
+    MetricsCollector,
+    PerformanceMetrics,
+    PerformanceMonitor,
+    PrometheusExporter,
+    RollingHistogram,
+)
+
+
+class TestLogHistogram:
+    """Test bucketing, percentiles and merging."""
+
+    def test_bucket_bounds_follow_native_schema(self):
+        """Bucket i holds (2**((i-1)/8), 2**(i/8)] at schema 3."""
+        histogram = LogHistogram(schema=3)
+
+        assert histogram.bucket_index(1.0) == 0
+        assert histogram.bucket_index(2.0) == 8
+        assert histogram.bucket_index(2.01) == 9
+        assert histogram.bucket_bounds(8) == (2 ** (7 / 8), 2.0)
+
+    def test_percentiles_are_within_bucket_error(self):
+        """Percentiles of a skewed distribution stay within a few percent of the exact values."""
+        rng = random.Random(7)
+        values = sorted(rng.lognormvariate(3, 1) for _ in range(20000))
+        histogram = LogHistogram()
+        for value in values:
+            histogram.record(value)
+
+        for percent in (50, 90, 99):
+            exact = values[int(percent / 100 * len(values)) - 1]
+            assert histogram.percentile(percent) == pytest.approx(exact, rel=0.05)
+        assert histogram.percentile(100) == values[-1]
+        assert len(histogram.positive) < 150
+
+    def test_zero_and_negative_values(self):
+        """Zero and negative values are ordered below the positive buckets."""
+        histogram = LogHistogram()
+        for value in (-5, 0, 3):
+            histogram.record(value)
+
+        assert histogram.zero_count == 1
+        assert histogram.percentile(10) < 0
+        assert histogram.percentile(50) == 0.0
+        assert [count for _, count in histogram.cumulative_buckets()] == [1, 2, 3]
+
+    def test_merge_and_serialization(self):
+        """Merged histograms equal one histogram of all values, and survive a round trip."""
+        first, second, combined = LogHistogram(), LogHistogram(), LogHistogram()
+        for value in range(1, 100):
+            (first if value % 2 else second).record(value)
+            combined.record(value)
+
+        merged = first.copy().merge(second)
+
+        assert merged.summary() == combined.summary()
+        assert merged.positive == combined.positive
+        assert LogHistogram.from_dict(merged.to_dict()).summary() == combined.summary()
+        with pytest.raises(ValueError):
+            merged.merge(LogHistogram(schema=2))
+
+
+class TestRollingHistogram:
+    """Test rolling-window snapshots."""
+
+    def test_window_covers_recent_intervals(self):
+        """Snapshots include only intervals inside the window; the total includes everything."""
+        histogram = RollingHistogram(interval_seconds=10, intervals=6)
+        histogram.record(1, timestamp=1000)
+        histogram.record(2, timestamp=1035)
+        histogram.record(3, timestamp=1055)
+
+        assert histogram.snapshot(20, now=1059).count == 2
+        assert histogram.snapshot(60, now=1059).count == 3
+        assert histogram.snapshot().count == 3
+
+    def test_expired_intervals_are_dropped(self):
+        """Intervals older than the ring are freed and late values only reach the total."""
+        histogram = RollingHistogram(interval_seconds=10, intervals=3)
+        histogram.record(1, timestamp=1000)
+        histogram.record(2, timestamp=1100)
+        histogram.record(3, timestamp=1010)
+
+        assert list(histogram._slots) == [110]
+        assert histogram.total.count == 3
+
+
+def _metric(duration_ms: float, success: bool = True, workflow_id: str = "wf_1", step_type: str = "shell_command"):
+    return PerformanceMetrics(
+        operation_name=f"step_execution:{step_type}",
+        timestamp=datetime.now(),
+        duration_ms=duration_ms,
+        success=success,
+        workflow_id=workflow_id,
+        operation_type="step_execution",
+    )
+
+
+class TestMetricsCollectorHistograms:
+    """Test histogram series in MetricsCollector."""
+
+    def test_series_per_workflow_step_type_and_metric(self):
+        """Filters select series by workflow, operation and metric."""
+        collector = MetricsCollector(max_metrics_per_type=10)
+        for i in range(1, 1001):
+            collector.record_performance_metric(_metric(i, success=i % 10 != 0, workflow_id=f"wf_{i % 2}"))
+        collector.record_performance_metric(_metric(5000, step_type="mcp_call"))
+
+        shell = collector.get_histogram(operation="step_execution:shell_command")
+        failures = collector.get_histogram("error_duration_ms")
+
+        assert shell.count == 1000
+        assert shell.percentile(99) == pytest.approx(990, rel=0.05)
+        assert failures.count == 100
+        assert collector.get_histogram(workflow_id="wf_0").count == 500
+        assert len(collector.get_performance_metrics()) == 10
+
+    def test_summary_uses_last_hour(self):
+        """Summary statistics count the last hour only and include percentiles."""
+        collector = MetricsCollector()
+        old = _metric(10000)
+        old.timestamp = datetime.now() - timedelta(hours=2)
+        collector.record_performance_metric(old)
+        for duration in (10, 20, 30):
+            collector.record_performance_metric(_metric(duration))
+        collector.record_performance_metric(_metric(40, success=False))
+
+        perf = collector.get_summary_statistics()["performance"]
+
+        assert perf["total_operations_hour"] == 4
+        assert perf["failed_operations_hour"] == 1
+        assert perf["max_duration_ms"] == 40
+        assert perf["avg_duration_ms"] == 25
+        assert perf["p50_duration_ms"] == pytest.approx(20, rel=0.05)
+
+    def test_cleanup_removes_workflow_series(self):
+        """Cleaning up a workflow's metrics drops its histogram series."""
+        collector = MetricsCollector()
+        collector.start_workflow_metrics("wf_1", "test")
+        collector.record_performance_metric(_metric(10))
+        collector.complete_workflow_metrics("wf_1")
+        collector._workflow_metrics["wf_1"].end_time = datetime.now() - timedelta(days=30)
+
+        collector.cleanup_old_metrics(days=7)
+
+        assert collector.get_histograms() == {}
+
+    def test_step_timing_stats(self):
+        """Workflow step timing and percentiles come from the step histograms."""
+        collector = MetricsCollector()
+        execution = ExecutionMetricsCollector(collector)
+        execution.record_workflow_start("wf_1", "test")
+        for duration in (10, 30):
+            collector.record_performance_metric(_metric(duration))
+
+        execution.record_workflow_completion("wf_1")
+
+        metrics = collector.get_workflow_metrics("wf_1")
+        assert metrics.avg_step_duration_ms == 20
+        assert metrics.max_step_duration_ms == 30
+        assert execution.get_step_latency_percentiles(step_type="shell_command")["count"] == 2
+        assert execution.get_step_latency_percentiles(step_type="mcp_call") == {"count": 0}
+
+
+class TestPerformanceMonitorHistograms:
+    """Test custom metric summaries."""
+
+    def test_metrics_summary(self):
+        """Summaries keep exact aggregates and add percentiles."""
+        monitor = PerformanceMonitor()
+        for value in range(1, 101):
+            monitor.record_metric("task_duration", value)
+
+        summary = monitor.get_metrics_summary("task_duration")
+
+        assert summary["count"] == 100
+        assert summary["min"] == 1
+        assert summary["max"] == 100
+        assert summary["total"] == 5050
+        assert summary["p90"] == pytest.approx(90, rel=0.05)
+        assert "error" in monitor.get_metrics_summary("missing")
+
+
+class TestPrometheusHistograms:
+    """Test Prometheus export of histogram buckets."""
+
+    def test_collector_histograms_are_exported(self):
+        """Each series is exported as cumulative buckets at schema bounds, with count and sum."""
+        collector = MetricsCollector()
+        for duration in (1, 2, 2, 100):
+            collector.record_performance_metric(_metric(duration))
+
+        text = PrometheusExporter(namespace="wf").export_histograms(collector.get_histograms())
+        labels = 'operation="step_execution:shell_command",operation_type="step_execution",workflow_id="wf_1"'
+
+        assert "# TYPE wf_operation_duration_ms histogram" in text
+        assert f'wf_operation_duration_ms_bucket{{{labels},le="1"}} 1' in text
+        assert f'wf_operation_duration_ms_bucket{{{labels},le="2"}} 3' in text
+        assert f'wf_operation_duration_ms_bucket{{{labels},le="+Inf"}} 4' in text
+        assert f"wf_operation_duration_ms_count{{{labels}}} 4" in text
+        assert f"wf_operation_duration_ms_sum{{{labels}}} 105.0" in text
+
+    def test_performance_metrics_use_log_buckets(self):
+        """Exporting a list of metrics buckets it the same way."""
+        text = PrometheusExporter(namespace="wf").export_performance_metrics([_metric(3), _metric(3000)])
+
+        assert 'wf_operation_duration_ms_bucket{operation="step_execution:shell_command",le="+Inf"} 2' in text
+        assert 'wf_operation_duration_ms_count{operation="step_execution:shell_command"} 2' in text
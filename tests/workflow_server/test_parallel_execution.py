@@ -465,7 +465,7 @@ class TestConcurrentStateManager:
 
         # Then
         assert manager._base_manager is not None
-        assert manager._locks == {}
+        assert manager._path_locks == {}
         assert manager._versions == {}
         assert manager._conflict_resolution.strategy == "merge"
 
@@ -613,9 +613,10 @@ class TestConcurrentStateManager:
         assert checkpoint_result["success"]
         checkpoint = checkpoint_result["checkpoint"]
         assert checkpoint["workflow_id"] == "wf_123"
-        assert checkpoint["state"]["state"]["counter"] == 5
-        assert checkpoint["state"]["state"]["name"] == "test"
-        assert checkpoint["state"]["computed"]["double"] == 10
+        checkpoint_state = manager.materialize_checkpoint(checkpoint)
+        assert checkpoint_state["state"]["counter"] == 5
+        assert checkpoint_state["state"]["name"] == "test"
+        assert checkpoint_state["computed"]["double"] == 10
 
         # When - Modify state
         manager.update("wf_123", [{"path": "state.counter", "value": 15}])
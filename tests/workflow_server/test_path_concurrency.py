@@ -0,0 +1,213 @@
+"""Tests for path-level optimistic concurrency in ConcurrentStateManager.
+
+Covers per-path version stamps, version checks that only fail on
+overlapping paths, concurrent commits of disjoint batches, and path-aware
+conflict merging.
+"""
+
+import threading
+import time
+
+import pytest
+
+from aromcp.workflow_server.state.concurrent import (
+    BatchUpdate,
+    ConcurrentStateManager,
+    PathLockTable,
+    PathVersionTrie,
+    _path_segments,
+)
+from aromcp.workflow_server.state.models import StateUpdate, WorkflowState
+
+
+def _manager() -> ConcurrentStateManager:
+    manager = ConcurrentStateManager()
+    manager._base_manager._states["wf_paths"] = WorkflowState(state={"results": {}, "counter": 0})
+    return manager
+
+
+class TestPathVersionTrie:
+    """Test per-path version stamps."""
+
+    def test_overlapping_paths_report_changes(self):
+        """A write is visible to the path, its ancestors and its descendants only."""
+        trie = PathVersionTrie()
+        trie.stamp(_path_segments("state.results.task_17"), 5)
+
+        assert trie.changed_since(_path_segments("state.results.task_17"), 4)
+        assert trie.changed_since(_path_segments("state.results"), 4)
+        assert trie.changed_since(_path_segments("state.results.task_17.output"), 4)
+        assert not trie.changed_since(_path_segments("state.results.task_42"), 4)
+        assert not trie.changed_since(_path_segments("state.results.task_17"), 5)
+
+    def test_ancestor_write_supersedes_descendants(self):
+        """Overwriting a parent marks every child as changed and prunes their stamps."""
+        trie = PathVersionTrie()
+        trie.stamp(_path_segments("state.results.task_17"), 2)
+        trie.stamp(_path_segments("state.results"), 3)
+
+        assert trie.changed_since(_path_segments("state.results.task_42"), 2)
+        assert trie._root.children["state"].children["results"].children == {}
+
+    def test_path_segments_normalize_scopes_and_indexes(self):
+        """Aliased scopes and bracket indexes map onto the same segments."""
+        assert _path_segments("this.items[2].name") == ("state", "items", "2", "name")
+        assert _path_segments("raw.counter") == ("inputs", "counter")
+
+
+class TestPathLevelVersionChecks:
+    """Test optimistic version checks scoped to written paths."""
+
+    def test_disjoint_paths_do_not_conflict(self):
+        """A stale expected version succeeds when no overlapping path changed."""
+        manager = _manager()
+        version = manager.read("wf_paths", include_version=True)["__version__"]["version"]
+
+        first = manager.update("wf_paths", [{"path": "state.results.task_17", "value": 1}], expected_version=version)
+        second = manager.update("wf_paths", [{"path": "state.results.task_42", "value": 2}], expected_version=version)
+
+        assert first["success"] and second["success"]
+        assert manager.read("wf_paths")["state"]["results"] == {"task_17": 1, "task_42": 2}
+
+    def test_overlapping_paths_conflict(self):
+        """A stale expected version fails on the same path or an ancestor."""
+        manager = _manager()
+        version = manager.read("wf_paths", include_version=True)["__version__"]["version"]
+        manager.update("wf_paths", [{"path": "state.results.task_17", "value": 1}], expected_version=version)
+
+        same = manager.update("wf_paths", [{"path": "state.results.task_17", "value": 2}], expected_version=version)
+        parent = manager.update("wf_paths", [{"path": "state.results", "value": {}}], expected_version=version)
+
+        assert same["error"] == parent["error"] == "VERSION_CONFLICT"
+        assert same["conflicting_paths"] == ["state.results.task_17"]
+        assert parent["conflicting_paths"] == ["state.results"]
+
+    def test_raw_alias_conflicts_with_inputs(self):
+        """A write through the legacy raw scope conflicts with a stale write to the same input."""
+        manager = _manager()
+        version = manager.update("wf_paths", [{"path": "inputs.counter", "value": 1}])["new_version"]
+        manager.update("wf_paths", [{"path": "raw.counter", "value": 2}])
+
+        result = manager.update("wf_paths", [{"path": "inputs.counter", "value": 3}], expected_version=version)
+
+        assert result["error"] == "VERSION_CONFLICT"
+        assert manager.read("wf_paths")["inputs"]["counter"] == 2
+
+    def test_restore_conflicts_with_every_path(self):
+        """Versions read before a restore conflict on any path afterwards."""
+        manager = _manager()
+        checkpoint = manager.create_checkpoint("wf_paths")["checkpoint"]
+        version = manager.update("wf_paths", [{"path": "state.counter", "value": 1}])["new_version"]
+
+        manager.restore_from_checkpoint("wf_paths", checkpoint)
+        result = manager.update("wf_paths", [{"path": "state.results.x", "value": 1}], expected_version=version - 1)
+
+        assert result["error"] == "VERSION_CONFLICT"
+
+
+class TestVersionedReads:
+    """Test that versions reported by reads never run ahead of the state returned."""
+
+    def test_write_during_read_causes_conflict(self):
+        """A write committed while a read is in progress makes that reader's update conflict."""
+        manager = _manager()
+        base_read = manager._base_manager.read
+        state_read = threading.Event()
+        write_done = threading.Event()
+
+        def paused_read(workflow_id, paths=None):
+            result = base_read(workflow_id, paths)
+            state_read.set()
+            write_done.wait(timeout=2)
+            return result
+
+        manager._base_manager.read = paused_read
+        results = {}
+        reader = threading.Thread(
+            target=lambda: results.update(manager.read("wf_paths", include_version=True)), daemon=True
+        )
+        reader.start()
+        assert state_read.wait(timeout=2)
+        manager.update("wf_paths", [{"path": "state.counter", "value": 100}])
+        write_done.set()
+        reader.join(timeout=2)
+
+        version = results["__version__"]["version"]
+        stale = manager.update("wf_paths", [{"path": "state.counter", "value": 1}], expected_version=version)
+
+        assert results["state"]["counter"] == 0
+        assert stale["error"] == "VERSION_CONFLICT"
+        assert base_read("wf_paths")["state"]["counter"] == 100
+
+
+class TestConcurrentCommits:
+    """Test that only overlapping batches wait for each other."""
+
+    def _timed_updates(self, paths: list[str]) -> float:
+        manager = _manager()
+        apply = manager._base_manager.update
+
+        def slow_update(workflow_id, updates):
+            time.sleep(0.2)
+            return apply(workflow_id, updates)
+
+        manager._base_manager.update = slow_update
+        threads = [
+            threading.Thread(target=manager.update, args=("wf_paths", [{"path": path, "value": 1}])) for path in paths
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start
+
+    def test_disjoint_batches_commit_concurrently(self):
+        """Batches on different paths do not wait for each other."""
+        assert self._timed_updates([f"state.results.task_{i}" for i in range(4)]) < 0.6
+
+    def test_overlapping_batches_are_serialized(self):
+        """Batches on overlapping paths run one after another."""
+        assert self._timed_updates(["state.results", "state.results.task_1"]) >= 0.4
+
+    def test_hold_times_out(self):
+        """Waiting on an overlapping path gives up after the timeout."""
+        table = PathLockTable()
+
+        with table.hold([_path_segments("state.results")]), pytest.raises(TimeoutError):
+            with table.hold([_path_segments("state.results.task_1")], timeout=0.05):
+                pass
+
+
+class TestPathAwareMerge:
+    """Test conflict merging against pending updates."""
+
+    def test_last_writer_wins_drops_only_overlapping_updates(self):
+        """Pending updates to disjoint paths survive a merge."""
+        manager = _manager()
+        pending = BatchUpdate(
+            updates=[
+                StateUpdate(path="state.results", value={}),
+                StateUpdate(path="state.counter", value=3),
+            ]
+        )
+        manager._pending_updates["wf_paths"].append(pending)
+
+        result = manager.update("wf_paths", [{"path": "state.results.task_1", "value": 1}])
+
+        assert result["success"]
+        assert [update.path for update in pending.updates] == ["state.counter"]
+
+    def test_first_writer_wins_drops_overlapping_new_updates(self):
+        """New updates under a pending path are dropped before they are applied."""
+        manager = _manager()
+        manager.configure_conflict_resolution(merge_policy="first_writer_wins")
+        manager._pending_updates["wf_paths"].append(BatchUpdate(updates=[StateUpdate(path="state.results", value={})]))
+
+        manager.update(
+            "wf_paths", [{"path": "state.results.task_1", "value": 1}, {"path": "state.counter", "value": 2}]
+        )
+
+        state = manager.read("wf_paths")["state"]
+        assert state["results"] == {}
+        assert state["counter"] == 2
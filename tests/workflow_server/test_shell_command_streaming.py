@@ -0,0 +1,105 @@
+"""Tests for streaming shell_command execution with bounded output capture.
+
+Covers head/tail retention in OutputBuffer, bounded capture of large
+outputs, killing timed-out command trees, and reading in-progress output
+through workflow status while the workflow lock is free.
+"""
+
+import threading
+import time
+
+from aromcp.workflow_server.state.manager import StateManager
+from aromcp.workflow_server.workflow.models import WorkflowDefinition, WorkflowStep
+from aromcp.workflow_server.workflow.queue_executor import QueueBasedWorkflowExecutor
+from aromcp.workflow_server.workflow.steps.shell_command import (
+    OutputBuffer,
+    ShellCommandProcessor,
+    get_running_commands,
+)
+
+
+class TestOutputBuffer:
+    """Test head and tail retention."""
+
+    def test_short_output_is_kept_whole(self):
+        """Output under the limit is returned unchanged."""
+        buffer = OutputBuffer(limit=100)
+        buffer.write("hello ")
+        buffer.write("world")
+
+        assert buffer.getvalue() == "hello world"
+        assert buffer.truncated_chars == 0
+
+    def test_long_output_keeps_head_and_tail(self):
+        """The first quarter and the most recent output survive; the middle is counted."""
+        buffer = OutputBuffer(limit=40)
+        for i in range(100):
+            buffer.write(f"{i:03d}|")
+
+        value = buffer.getvalue()
+        assert value.startswith("000|001|")
+        assert value.endswith("098|099|")
+        assert buffer.total_chars == 400
+        assert buffer.truncated_chars == 360
+        assert "[360 characters truncated]" in value
+
+
+class TestStreamingExecution:
+    """Test ShellCommandProcessor with streamed output."""
+
+    def test_large_output_is_bounded(self):
+        """A chatty command keeps only output_limit characters per stream."""
+        result = ShellCommandProcessor.process(
+            {"command": "yes x | tr -d '\\n' | head -c 500000; printf END", "output_limit": 1000}, "wf_test", None
+        )
+
+        output = result["output"]
+        assert result["status"] == "success"
+        assert output["stdout"].startswith("x" * 250)
+        assert output["stdout"].endswith("xEND")
+        assert len(output["stdout"]) < 1100
+        assert output["truncated_chars"] == {"stdout": 500003 - 1000}
+
+    def test_timeout_kills_command_tree(self):
+        """A timed-out command is killed without waiting for its children."""
+        start = time.perf_counter()
+        result = ShellCommandProcessor.process({"command": "sleep 5 | cat", "timeout": 0.3}, "wf_test", None)
+
+        assert result["status"] == "failed"
+        assert "timed out" in result["error"]
+        assert time.perf_counter() - start < 3
+        assert get_running_commands("wf_test") == []
+
+
+class TestInProgressStatus:
+    """Test in-progress output reported by workflow status."""
+
+    def test_status_reports_running_output(self):
+        """Status returns partial output while get_next_step waits on the command."""
+        steps = [
+            WorkflowStep(
+                id="build", type="shell_command", definition={"command": "printf started; sleep 0.5; printf done"}
+            ),
+            WorkflowStep(id="report", type="user_message", definition={"message": "Built"}),
+        ]
+        definition = WorkflowDefinition(name="test:streaming", description="", version="1.0.0", steps=steps)
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_id = executor.start(definition)["workflow_id"]
+        responses = []
+        runner = threading.Thread(target=lambda: responses.append(executor.get_next_step(workflow_id)))
+
+        runner.start()
+        running = []
+        deadline = time.monotonic() + 3
+        while not running and time.monotonic() < deadline:
+            running = [
+                command
+                for command in executor.get_workflow_status(workflow_id).get("running_commands", [])
+                if command["stdout"] == "started"
+            ]
+            time.sleep(0.02)
+        runner.join()
+
+        assert running and running[0]["step_id"] == "build"
+        assert responses[0]["steps"][0]["definition"]["message"] == "Built"
+        assert "running_commands" not in executor.get_workflow_status(workflow_id)
@@ -0,0 +1,256 @@
+"""Tests for the SQLite workflow persistence backend.
+
+Covers the delta log and snapshot compaction, group commit, state restore
+through StateManager, and resuming a workflow in a fresh executor after a
+simulated restart.
+"""
+
+import datetime
+import sqlite3
+import time
+
+import pytest
+
+from aromcp.workflow_server.persistence import PersistedWorkflow, SQLiteBackend
+from aromcp.workflow_server.state.manager import StateManager
+from aromcp.workflow_server.state.models import StateSchema
+from aromcp.workflow_server.workflow.context import context_manager
+from aromcp.workflow_server.workflow.models import WorkflowDefinition, WorkflowStep
+from aromcp.workflow_server.workflow.queue_executor import QueueBasedWorkflowExecutor
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "workflows.db"
+
+
+@pytest.fixture
+def backend(db_path):
+    backend = SQLiteBackend(db_path, snapshot_interval=3)
+    yield backend
+    backend.close()
+
+
+def _workflow_def() -> WorkflowDefinition:
+    return WorkflowDefinition(
+        name="test:persisted",
+        description="Persisted workflow",
+        version="1.0.0",
+        default_state={"state": {"counter": 0}},
+        state_schema=StateSchema(state={"counter": "number"}, computed={}, inputs={}),
+        inputs={},
+        steps=[
+            WorkflowStep(id="prompt1", type="agent_prompt", definition={"prompt": "First"}),
+            WorkflowStep(id="prompt2", type="agent_prompt", definition={"prompt": "Second"}),
+            WorkflowStep(id="prompt3", type="agent_prompt", definition={"prompt": "Third"}),
+        ],
+    )
+
+
+class TestSQLiteBackend:
+    """Test the delta log, snapshots and writer thread."""
+
+    def test_uses_wal_journal(self, backend, db_path):
+        """The database is opened in WAL mode."""
+        backend.flush()
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_workflow_record_round_trip(self, backend):
+        """Workflow records are stored and listed by status."""
+        backend.save_workflow(
+            PersistedWorkflow(
+                workflow_id="wf_1",
+                workflow_name="test:a",
+                inputs={"x": 1},
+                remaining_steps=["s2"],
+                pending_steps=["s1"],
+            )
+        )
+        backend.save_workflow(PersistedWorkflow(workflow_id="wf_2", workflow_name="test:b", status="completed"))
+
+        record = backend.load_workflow("wf_1")
+        assert record.inputs == {"x": 1}
+        assert record.remaining_steps == ["s2"]
+        assert record.pending_steps == ["s1"]
+        assert [w.workflow_id for w in backend.list_workflows(status="completed")] == ["wf_2"]
+        assert backend.load_workflow("missing") is None
+
+    def test_snapshot_compacts_delta_log(self, backend, db_path):
+        """Deltas covered by a snapshot are dropped and only newer ones are replayed."""
+        manager = StateManager(persistence=backend)
+        for i in range(5):
+            manager.update("wf", [{"path": "state.counter", "value": i}])
+
+        persisted = backend.load_state("wf")
+        assert persisted.snapshot_sequence == 3
+        assert persisted.snapshot["state"] == {"counter": 2}
+        assert [sequence for sequence, _ in persisted.deltas] == [4, 5]
+
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM deltas").fetchone()[0] == 2
+
+    def test_group_commit_batches_writes(self, db_path):
+        """Writes arriving within the commit window share one transaction."""
+        backend = SQLiteBackend(db_path, commit_interval_ms=50)
+        try:
+            manager = StateManager(persistence=backend)
+            start = time.perf_counter()
+            for i in range(200):
+                manager.update("wf", [{"path": "state.counter", "value": i}])
+            per_update_ms = (time.perf_counter() - start) * 1000 / 200
+            backend.flush()
+
+            stats = backend.get_stats()
+            assert stats["writes"] >= 200
+            assert stats["commits"] < 20
+            assert per_update_ms < 5
+        finally:
+            backend.close()
+
+    def test_delete_workflow(self, backend):
+        """Deleting a workflow removes its record, snapshot and deltas."""
+        manager = StateManager(persistence=backend)
+        manager.update("wf", [{"path": "state.counter", "value": 1}])
+        backend.save_workflow(PersistedWorkflow(workflow_id="wf", workflow_name="test:a"))
+
+        backend.delete_workflow("wf")
+
+        assert backend.load_workflow("wf") is None
+        assert backend.load_state("wf") is None
+
+
+class TestStateRestore:
+    """Test rebuilding StateManager state from the backend."""
+
+    def test_restore_replays_snapshot_and_deltas(self, db_path):
+        """A new manager sees the same state after restoring."""
+        backend = SQLiteBackend(db_path, snapshot_interval=2)
+        manager = StateManager(persistence=backend)
+        manager.update("wf", [{"path": "inputs.name", "value": "ada"}, {"path": "state.items", "value": []}])
+        manager.update("wf", [{"path": "state.items", "value": "a", "operation": "append"}])
+        manager.update("wf", [{"path": "this.counter", "value": 2, "operation": "increment"}])
+        manager.update("wf", [{"path": "state.config", "value": {"debug": True}, "operation": "merge"}])
+        manager.update("wf", [{"path": "state.items", "value": "b", "operation": "append"}])
+        expected = manager.read("wf")
+        backend.close()
+
+        reopened = SQLiteBackend(db_path)
+        try:
+            restored = StateManager(persistence=reopened)
+            assert restored.restore("wf") is True
+            assert restored.read("wf") == expected
+
+            # The delta log continues where it left off
+            restored.update("wf", [{"path": "state.counter", "value": 10}])
+            assert reopened.load_state("wf").sequence == 6
+        finally:
+            reopened.close()
+
+    def test_failed_updates_are_not_recorded(self, backend):
+        """Rolled-back updates never reach the delta log."""
+        manager = StateManager(persistence=backend)
+        manager.update("wf", [{"path": "state.counter", "value": 1}])
+        with pytest.raises(ValueError):
+            manager.update("wf", [{"path": "state.counter", "value": 1, "operation": "append"}])
+
+        assert backend.load_state("wf").sequence == 1
+
+    def test_non_serializable_update_fails_loudly(self, backend):
+        """Values JSON cannot represent are rejected and the update is rolled back."""
+        manager = StateManager(persistence=backend)
+        manager.update("wf", [{"path": "state.counter", "value": 1}])
+
+        with pytest.raises(TypeError):
+            manager.update("wf", [{"path": "state.counter", "value": object()}])
+
+        assert manager.read("wf")["state"]["counter"] == 1
+        backend.flush()
+        assert backend.load_state("wf").sequence == 1
+
+    def test_rejected_snapshot_records_nothing(self, backend):
+        """An update whose due snapshot cannot be serialized leaves no delta behind."""
+        manager = StateManager(persistence=backend)
+        manager.initialize_state(inputs={"started": datetime.date(2024, 1, 1)}, workflow_id="wf")
+        manager.update("wf", [{"path": "state.n", "value": 1}])
+        manager.update("wf", [{"path": "state.n", "value": 2}])
+
+        with pytest.raises(TypeError):
+            manager.update("wf", [{"path": "state.n", "value": 3}])
+
+        backend.flush()
+        persisted = backend.load_state("wf")
+        assert manager.read("wf")["state"]["n"] == 2
+        assert [sequence for sequence, _ in persisted.deltas] == [1, 2]
+        assert persisted.snapshot_sequence == 0
+
+    def test_restore_without_persisted_state(self):
+        """Restoring is a no-op without a backend or recorded state."""
+        assert StateManager().restore("wf") is False
+
+
+class TestWorkflowResume:
+    """Test resuming workflows in a new executor after a restart."""
+
+    def setup_method(self):
+        context_manager.contexts.clear()
+
+    def teardown_method(self):
+        context_manager.contexts.clear()
+
+    def test_resume_continues_from_persisted_position(self, db_path):
+        """A resumed workflow keeps its state and hands out the remaining steps."""
+        backend = SQLiteBackend(db_path)
+        executor = QueueBasedWorkflowExecutor(StateManager(), persistence=backend)
+        workflow_id = executor.start(_workflow_def())["workflow_id"]
+
+        assert executor.get_next_step(workflow_id)["steps"][0]["id"] == "prompt1"
+        executor.update_workflow_state(workflow_id, [{"path": "state.counter", "value": 7}])
+        assert executor.get_next_step(workflow_id)["steps"][0]["id"] == "prompt2"
+        backend.close()
+
+        # Simulate a restart: fresh backend, state manager and executor
+        context_manager.contexts.clear()
+        reopened = SQLiteBackend(db_path)
+        try:
+            resumed = QueueBasedWorkflowExecutor(StateManager(), persistence=reopened)
+            result = resumed.resume_workflow(workflow_id, _workflow_def())
+
+            assert result["resumed"] is True
+            assert result["status"] == "running"
+            assert result["steps_remaining"] == 1
+            assert result["state"]["state"]["counter"] == 7
+
+            assert resumed.get_next_step(workflow_id)["steps"][0]["id"] == "prompt3"
+            assert resumed.get_next_step(workflow_id) is None
+            assert reopened.load_workflow(workflow_id).status == "completed"
+        finally:
+            reopened.close()
+
+    def test_resume_restores_computed_fields(self, db_path):
+        """A fresh state manager gets the definition's computed fields on resume."""
+        definition = _workflow_def()
+        definition.state_schema.computed = {"doubled": {"from": "this.counter", "transform": "input[0] * 2"}}
+        backend = SQLiteBackend(db_path)
+        executor = QueueBasedWorkflowExecutor(StateManager(), persistence=backend)
+        workflow_id = executor.start(definition)["workflow_id"]
+        executor.update_workflow_state(workflow_id, [{"path": "state.counter", "value": 4}])
+        backend.close()
+
+        context_manager.contexts.clear()
+        reopened = SQLiteBackend(db_path)
+        try:
+            resumed = QueueBasedWorkflowExecutor(StateManager(), persistence=reopened)
+            result = resumed.resume_workflow(workflow_id, definition)
+            resumed.update_workflow_state(workflow_id, [{"path": "state.counter", "value": 5}])
+
+            assert result["state"]["computed"]["doubled"] == 8
+            assert resumed.state_manager.read(workflow_id)["computed"]["doubled"] == 10
+        finally:
+            reopened.close()
+
+    def test_resume_unknown_workflow(self, backend):
+        """Resuming a workflow that was never persisted reports an error."""
+        executor = QueueBasedWorkflowExecutor(StateManager(), persistence=backend)
+        assert "error" in executor.resume_workflow("wf_missing", _workflow_def())
+        assert "error" in QueueBasedWorkflowExecutor().resume_workflow("wf_missing", _workflow_def())
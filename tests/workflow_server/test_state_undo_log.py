@@ -0,0 +1,144 @@
+"""
+Tests for undo-log based atomic state updates
+
+Verifies that StateManager.update rolls back failed batches in place by
+replaying only the touched paths, without deep-copying the workflow state.
+"""
+
+import copy
+from unittest.mock import patch
+
+import pytest
+
+from aromcp.workflow_server.state.manager import StateManager, UndoLog
+from aromcp.workflow_server.state.models import ComputedFieldError
+from aromcp.workflow_server.workflow.context import ExecutionContext
+
+
+class TestUndoLog:
+    """Test the undo log in isolation"""
+
+    def test_rollback_restores_in_reverse_order(self):
+        """Values, new keys, appends and merges are restored newest first"""
+        data = {"count": 1, "items": [1, 2], "config": {"a": 1}}
+        items = data["items"]
+        undo = UndoLog()
+
+        undo.record(data, "count")
+        data["count"] = 2
+        undo.record(data, "count")
+        data["count"] = 3
+        undo.record(data, "new_key")
+        data["new_key"] = "x"
+        undo.record_append(data["items"])
+        data["items"].append(3)
+        undo.record_merge(data["config"], {"a": 2, "b": 3})
+        data["config"].update({"a": 2, "b": 3})
+
+        assert len(undo) == 6
+        undo.rollback()
+
+        assert data == {"count": 1, "items": [1, 2], "config": {"a": 1}}
+        assert data["items"] is items
+        assert len(undo) == 0
+
+    def test_list_index_restored(self):
+        """List elements recorded by index are restored"""
+        data = ["a", "b"]
+        undo = UndoLog()
+        undo.record(data, 1)
+        data[1] = "changed"
+
+        undo.rollback()
+
+        assert data == ["a", "b"]
+
+
+class TestAtomicUpdateRollback:
+    """Test that failed updates leave state exactly as it was"""
+
+    @pytest.fixture
+    def manager(self):
+        manager = StateManager()
+        manager.update(
+            "wf",
+            [
+                {"path": "state.user", "value": {"name": "ada", "tags": ["a"]}},
+                {"path": "state.counter", "value": 1},
+                {"path": "state.matrix", "value": [[1, 2], [3, 4]]},
+            ],
+        )
+        return manager
+
+    def test_failed_batch_restores_touched_paths(self, manager):
+        """Earlier updates in a failed batch are undone"""
+        before = copy.deepcopy(manager.read("wf"))
+        user = manager._states["wf"].state["user"]
+
+        with pytest.raises(ValueError):
+            manager.update(
+                "wf",
+                [
+                    {"path": "state.counter", "value": 5, "operation": "increment"},
+                    {"path": "state.user.tags", "value": "b", "operation": "append"},
+                    {"path": "state.user", "value": {"name": "bob", "age": 3}, "operation": "merge"},
+                    {"path": "state.new.nested.key", "value": True},
+                    {"path": "state.matrix.1.0", "value": 99},
+                    {"path": "state.counter", "value": "x", "operation": "append"},
+                ],
+            )
+
+        assert manager.read("wf") == before
+        assert manager._states["wf"].state["user"] is user
+
+    def test_scoped_this_updates_rolled_back(self, manager):
+        """this.* updates are undone while global.* keeps its existing semantics"""
+        context = ExecutionContext("wf")
+
+        with pytest.raises(ValueError):
+            manager.update(
+                "wf",
+                [
+                    {"path": "this.counter", "value": 10},
+                    {"path": "global.version", "value": 2},
+                    {"path": "this.counter", "value": 1, "operation": "merge"},
+                ],
+                context,
+            )
+
+        assert manager.read("wf")["state"]["counter"] == 1
+        assert context.global_variables["version"] == 2
+
+    def test_computed_fields_rolled_back(self):
+        """Computed values written before a propagated error are restored"""
+        schema = {
+            "inputs": {"value": "number"},
+            "computed": {
+                "double": {"from": "inputs.value", "transform": "input * 2"},
+                "checked": {
+                    "from": "inputs.value",
+                    "transform": "input.missing.value",
+                    "on_error": "propagate",
+                },
+            },
+        }
+        manager = StateManager(schema)
+        manager._states["wf"] = manager._get_or_create_state("wf")
+        manager._states["wf"].inputs["value"] = 1
+        manager._states["wf"].computed["double"] = 2
+
+        with pytest.raises(ComputedFieldError):
+            manager.update("wf", [{"path": "inputs.value", "value": 5}])
+
+        state = manager._states["wf"]
+        assert state.inputs == {"value": 1}
+        assert state.computed == {"double": 2}
+
+    def test_update_does_not_deepcopy_state(self, manager):
+        """Successful and failed updates never deep-copy the workflow state"""
+        with patch("copy.deepcopy", side_effect=AssertionError("deepcopy called")):
+            manager.update("wf", [{"path": "state.counter", "operation": "increment", "value": None}])
+            with pytest.raises(ValueError):
+                manager.update("wf", [{"path": "state.user.name", "value": 1, "operation": "increment"}])
+
+        assert manager._states["wf"].state["counter"] == 2
@@ -0,0 +1,125 @@
+"""Tests for batched sub-agent dispatch and per-task locking.
+
+Covers advancing several sub-agent tasks in one call, keeping sub-agents
+independent of each other's locks and of the parent workflow lock, and the
+dispatch scaling benchmark.
+"""
+
+import threading
+
+from aromcp.workflow_server.state.manager import StateManager
+from aromcp.workflow_server.testing.benchmarks import ScalabilityBenchmark
+from aromcp.workflow_server.workflow.models import SubAgentTask, WorkflowDefinition, WorkflowStep
+from aromcp.workflow_server.workflow.queue_executor import QueueBasedWorkflowExecutor
+
+
+def _start_fan_out(items: list[str]) -> tuple[QueueBasedWorkflowExecutor, str, list[str]]:
+    sub_agent_task = SubAgentTask(
+        name="process",
+        description="",
+        inputs={},
+        steps=[
+            WorkflowStep(
+                id="check",
+                type="conditional",
+                definition={
+                    "condition": "{{ index >= 0 }}",
+                    "then_steps": [{"id": "report", "type": "user_message", "message": "{{ item }}: {{ index }}"}],
+                },
+            )
+        ],
+    )
+    definition = WorkflowDefinition(
+        name="test:fan_out",
+        default_state={"state": {"items": items}},
+        steps=[
+            WorkflowStep(
+                id="fan_out",
+                type="parallel_foreach",
+                definition={"items": "{{ state.items }}", "sub_agent_task": "process", "max_parallel": len(items)},
+            )
+        ],
+        sub_agent_tasks={"process": sub_agent_task},
+    )
+    executor = QueueBasedWorkflowExecutor(StateManager())
+    workflow_id = executor.start(definition)["workflow_id"]
+    fan_out = executor.get_next_step(workflow_id)["steps"][0]
+    return executor, workflow_id, [task["task_id"] for task in fan_out["definition"]["tasks"]]
+
+
+class TestBatchDispatch:
+    """Test advancing several sub-agent tasks per call."""
+
+    def test_batch_advances_every_task(self):
+        """Each task gets its own next step, then None once complete."""
+        executor, workflow_id, task_ids = _start_fan_out(["a", "b", "c"])
+
+        first = executor.get_next_sub_agent_steps(workflow_id, task_ids)
+        second = executor.get_next_sub_agent_steps(workflow_id, task_ids)
+
+        assert [first[task_id]["step"]["definition"]["message"] for task_id in task_ids] == ["a: 0", "b: 1", "c: 2"]
+        assert second == dict.fromkeys(task_ids)
+
+    def test_unknown_task_reports_error_without_failing_batch(self):
+        """An unknown task ID yields an error entry alongside the other results."""
+        executor, workflow_id, task_ids = _start_fan_out(["a"])
+
+        result = executor.get_next_sub_agent_steps(workflow_id, [task_ids[0], "missing.item0"])
+
+        assert result[task_ids[0]]["step"]["id"] == f"{task_ids[0]}.report"
+        assert "Sub-agent task not found" in result["missing.item0"]["error"]["message"]
+
+
+class TestPerTaskLocking:
+    """Test that sub-agents only contend on their own task lock."""
+
+    def _advance_while_held(self, executor, workflow_id: str, task_id: str, lock) -> dict | None:
+        acquired = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with lock:
+                acquired.set()
+                release.wait(5)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        acquired.wait(5)
+        try:
+            return executor.get_next_sub_agent_step(workflow_id, task_id)
+        finally:
+            release.set()
+            holder.join()
+
+    def test_other_task_lock_does_not_block(self):
+        """A sub-agent advances while another task's lock is held."""
+        executor, workflow_id, task_ids = _start_fan_out(["a", "b"])
+        other_lock = executor.subagent_manager.task_lock(task_ids[0])
+
+        step = self._advance_while_held(executor, workflow_id, task_ids[1], other_lock)
+
+        assert step["step"]["definition"]["message"] == "b: 1"
+
+    def test_parent_workflow_lock_does_not_block(self):
+        """Sub-agent dispatch does not wait for the parent workflow lock."""
+        executor, workflow_id, task_ids = _start_fan_out(["a"])
+        parent_lock = executor._get_workflow_lock(workflow_id)
+
+        step = self._advance_while_held(executor, workflow_id, task_ids[0], parent_lock)
+
+        assert step["step"]["definition"]["message"] == "a: 0"
+
+
+class TestDispatchBenchmark:
+    """Test the sub-agent dispatch scaling benchmark."""
+
+    def test_reports_every_mode(self):
+        """All modes dispatch every step; batching needs one call per step round."""
+        result = ScalabilityBenchmark().benchmark_subagent_dispatch(agent_counts=[1, 4], steps_per_agent=2)
+
+        scaling = result["dispatch_scaling"]
+        assert [r["agent_count"] for r in scaling["batched"]] == [1, 4]
+        assert [r["calls"] for r in scaling["batched"]] == [3, 3]
+        assert [r["calls"] for r in scaling["concurrent"]] == [3, 12]
+        assert [r["calls"] for r in scaling["parent_lock"]] == [3, 12]
+        assert all(r["client_steps"] == r["agent_count"] * 2 for mode in scaling.values() for r in mode)
@@ -0,0 +1,152 @@
+"""Tests for precompiled {{ }} template plans.
+
+Verifies that step definitions compile once into plans that only reference
+templated leaves, that rendering shares untouched subtrees, and that
+StepProcessor and SubAgentManager keep their replacement semantics.
+"""
+
+from aromcp.workflow_server.state.manager import StateManager
+from aromcp.workflow_server.workflow.expressions import ExpressionEvaluator
+from aromcp.workflow_server.workflow.loader import WorkflowLoader
+from aromcp.workflow_server.workflow.models import WorkflowDefinition, WorkflowInstance, WorkflowStep
+from aromcp.workflow_server.workflow.step_processors import StepProcessor
+from aromcp.workflow_server.workflow.step_registry import StepRegistry
+from aromcp.workflow_server.workflow.subagent_manager import SubAgentManager
+from aromcp.workflow_server.workflow.templates import compile_template, compile_template_string, render_template
+
+DEFINITION = {
+    "message": "Processing {{ inputs.file }} ({{ this.count }} done)",
+    "static": {"nested": {"deep": ["a", "b"]}, "flag": True},
+    "items": [1, "{{ this.count }}", {"path": "{{ inputs.file }}"}],
+    "timeout": 30,
+}
+
+
+def _processor() -> StepProcessor:
+    return StepProcessor(StateManager(), ExpressionEvaluator())
+
+
+def _instance(inputs: dict) -> WorkflowInstance:
+    definition = WorkflowDefinition(name="test:templates", description="", version="1.0.0")
+    return WorkflowInstance(id="wf_templates", workflow_name="test:templates", definition=definition, inputs=inputs)
+
+
+class TestTemplateCompilation:
+    """Test plan compilation."""
+
+    def test_plan_records_only_templated_paths(self):
+        """Untemplated keys and indices are absent from the plan."""
+        plan = compile_template(DEFINITION)
+
+        assert [key for key, _ in plan.children] == ["message", "items"]
+        items_plan = dict(plan.children)["items"]
+        assert [index for index, _ in items_plan.children] == [1, 2]
+
+    def test_string_split_into_literals_and_expressions(self):
+        """Expressions are stripped and literals kept around them."""
+        template = compile_template_string("a {{ x }} b {{y}}")
+
+        assert template.literals == ("a ", " b ", "")
+        assert template.expressions == ("x", "y")
+        assert template.single is None
+        assert compile_template_string("{{ x.y }}").single == "x.y"
+        assert compile_template_string("no templates") is None
+        assert compile_template_string("{{}}") is None
+
+    def test_untemplated_definition_has_no_plan(self):
+        """Definitions without templates compile to None."""
+        assert compile_template({"a": [1, {"b": "plain"}]}) is None
+
+    def test_step_plan_built_once_per_definition(self):
+        """WorkflowStep caches its plan until the definition object is replaced."""
+        step = WorkflowStep(id="s", type="user_message", definition={"message": "{{ x }}"})
+        plan = step.get_template_plan()
+
+        assert step.get_template_plan() is plan
+        step.definition = {"message": "plain"}
+        assert step.get_template_plan() is None
+
+    def test_loader_compiles_plans_at_load_time(self):
+        """Parsed steps already carry their template plan."""
+        steps = WorkflowLoader()._parse_steps(
+            [{"id": "greet", "type": "user_message", "message": "Hello {{ inputs.name }}"}]
+        )
+
+        assert "_template_plan" in steps[0].__dict__
+        assert steps[0].get_template_plan() is not None
+
+
+class TestTemplateRendering:
+    """Test rendering through the plan."""
+
+    def test_untouched_subtrees_are_shared(self):
+        """Only containers on the path to a templated leaf are copied."""
+        rendered = render_template(
+            DEFINITION, compile_template(DEFINITION), lambda template: template.render(lambda expr: "X")
+        )
+
+        assert rendered is not DEFINITION
+        assert rendered["static"] is DEFINITION["static"]
+        assert rendered["items"] is not DEFINITION["items"]
+        assert rendered["items"][2] == {"path": "X"}
+        assert rendered["message"] == "Processing X (X done)"
+        assert DEFINITION["message"].startswith("Processing {{")
+
+    def test_step_processor_semantics(self):
+        """Single templates keep their type, embedded ones are stringified, and fallbacks apply."""
+        processor = _processor()
+        state = {"inputs": {}, "state": {"count": 3}, "computed": {}}
+        definition = {
+            "count": "{{ this.count }}",
+            "message": "Count is {{ this.count }}",
+            "missing": "{{ inputs.max_attempts }}",
+            "static": {"keep": "me"},
+        }
+
+        result = processor._replace_variables(definition, state, instance=_instance({"name": "ada"}))
+
+        assert result["count"] == 3
+        assert result["message"] == "Count is 3"
+        assert result["missing"] == 10
+        assert result["static"] is definition["static"]
+
+    def test_preserve_flags(self):
+        """Conditions and loop items stay unrendered when requested."""
+        processor = _processor()
+        state = {"inputs": {}, "state": {"count": 3}, "computed": {}}
+        definition = {"condition": "{{ this.count > 1 }}", "items": "{{ this.list }}", "body": "{{ this.count }}"}
+
+        instance = _instance({})
+        conditional = processor._replace_variables(definition, state, True, instance)
+        loop = processor._replace_variables(definition, state, False, instance, True)
+
+        assert conditional["condition"] == definition["condition"]
+        assert loop["items"] == definition["items"]
+        assert loop["condition"] == definition["condition"]
+        assert loop["body"] == 3
+
+    def test_untemplated_root_is_copied(self):
+        """Callers may mutate the top level of the result without touching the definition."""
+        definition = {"message": "plain"}
+        result = _processor()._replace_variables(definition, {})
+
+        assert result == definition
+        assert result is not definition
+
+    def test_subagent_manager_renders_with_shared_plan(self):
+        """Many sub-agent tasks render the same compiled step plan."""
+        manager = SubAgentManager(StateManager(), ExpressionEvaluator(), StepRegistry())
+        step = WorkflowStep(
+            id="process", type="agent_prompt", definition={"prompt": "Fix {{ item }}", "context": {"retries": 2}}
+        )
+        plan = step.get_template_plan()
+
+        results = [
+            manager._replace_variables(step.definition, {"item": f"file{i}.ts"}, step.get_template_plan())
+            for i in range(200)
+        ]
+
+        assert step.get_template_plan() is plan
+        assert results[0]["prompt"] == "Fix file0.ts"
+        assert results[199]["prompt"] == "Fix file199.ts"
+        assert all(result["context"] is step.definition["context"] for result in results)
@@ -0,0 +1,157 @@
+"""Tests for the deadline-heap TimeoutManager and its asyncio variant.
+
+Verifies that timeouts fire close to their deadline instead of on a polling
+interval, that extend/cancel reschedule without scanning, that expirations
+cascade to children, and that AsyncTimeoutManager uses event loop timers.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from aromcp.workflow_server.workflow.timeout_manager import AsyncTimeoutManager, TimeoutManager
+
+
+@pytest.fixture
+def manager():
+    manager = TimeoutManager()
+    yield manager
+    manager.stop()
+
+
+class TestDeadlineScheduling:
+    """Test heap-based deadline scheduling."""
+
+    def test_idle_manager_has_no_monitor_thread(self, manager):
+        """The monitor thread starts with the first deadline."""
+        assert manager._monitor_thread is None
+
+        manager.create_timeout("step", 30)
+
+        assert manager._monitor_thread.is_alive()
+
+    def test_timeout_fires_near_deadline(self, manager):
+        """Expiry is detected well within the old 500 ms polling interval."""
+        fired = threading.Event()
+        fired_at = []
+
+        def on_timeout(id):
+            fired_at.append(time.monotonic())
+            fired.set()
+
+        start = time.monotonic()
+        manager.create_timeout("step", 0.05, timeout_callback=on_timeout)
+
+        assert fired.wait(2.0)
+        assert fired_at[0] - start < 0.25
+        assert manager.get_timeout_status("step")["timed_out"] is True
+
+    def test_warning_fires_before_timeout(self, manager):
+        """Warning callbacks run at the warning threshold."""
+        events = []
+        done = threading.Event()
+        manager.create_timeout(
+            "step",
+            0.1,
+            warning_callback=lambda id, remaining: events.append(("warning", remaining)),
+            timeout_callback=lambda id: (events.append(("timeout", id)), done.set()),
+        )
+
+        assert done.wait(2.0)
+        assert [kind for kind, _ in events] == ["warning", "timeout"]
+        assert events[0][1] > 0
+
+    def test_extend_reschedules_deadline(self, manager):
+        """Extending a timeout moves its deadline instead of firing at the old one."""
+        fired = threading.Event()
+        manager.create_timeout("step", 0.1, timeout_callback=lambda id: fired.set())
+        manager.extend_timeout("step", 0.3)
+
+        assert not fired.wait(0.25)
+        assert fired.wait(2.0)
+
+    def test_cancel_invalidates_pending_deadlines(self, manager):
+        """Cancelled timeouts never fire and leave no live generation behind."""
+        fired = threading.Event()
+        manager.create_timeout("parent", 0.05, timeout_callback=lambda id: fired.set())
+        manager.create_timeout("child", 0.05, parent_id="parent", timeout_callback=lambda id: fired.set())
+
+        assert manager.cancel_timeout("parent") == ["parent", "child"]
+
+        assert not fired.wait(0.2)
+        assert manager._generations == {}
+
+    def test_expiry_cascades_to_children(self, manager):
+        """A parent expiring times out its children without waiting for their deadlines."""
+        expired = []
+        done = threading.Event()
+
+        def on_timeout(id):
+            expired.append(id)
+            if len(expired) == 3:
+                done.set()
+
+        manager.create_timeout("parent", 0.05, timeout_callback=on_timeout)
+        manager.create_timeout("child", 60, parent_id="parent", timeout_callback=on_timeout)
+        manager.create_timeout("grandchild", 60, parent_id="child", timeout_callback=on_timeout)
+
+        assert done.wait(2.0)
+        assert expired == ["parent", "child", "grandchild"]
+        assert manager._generations == {}
+
+    def test_invalidated_entries_are_compacted(self, manager):
+        """Repeated rescheduling does not grow the heap without bound."""
+        manager.create_timeout("step", 60)
+        for _ in range(1000):
+            manager.extend_timeout("step", 1)
+
+        assert len(manager._deadlines) <= 4 * len(manager._generations) + 65
+
+
+class TestAsyncTimeoutManager:
+    """Test the event-loop timer variant."""
+
+    def test_timeouts_use_loop_timers(self):
+        """Coroutine callbacks run on the loop and no monitor thread is started."""
+
+        async def scenario():
+            manager = AsyncTimeoutManager()
+            expired = asyncio.Event()
+            warnings = []
+
+            async def on_warning(id, remaining):
+                warnings.append(id)
+
+            async def on_timeout(id):
+                expired.set()
+
+            await manager.create_async_timeout("step", 0.05, warning_callback=on_warning, timeout_callback=on_timeout)
+            await asyncio.wait_for(expired.wait(), 2.0)
+            return manager, warnings
+
+        manager, warnings = asyncio.run(scenario())
+
+        assert warnings == ["step"]
+        assert manager._monitor_thread is None
+        assert manager.get_timeout_status("step")["timed_out"] is True
+
+    def test_cancel_removes_loop_timers(self):
+        """Cancelling cancels the scheduled loop timers for the whole subtree."""
+
+        async def scenario():
+            manager = AsyncTimeoutManager()
+            fired = []
+            await manager.create_async_timeout("parent", 0.05, timeout_callback=fired.append)
+            await manager.create_async_timeout("child", 0.05, parent_id="parent", timeout_callback=fired.append)
+
+            cancelled = await manager.cancel_async_timeout("parent")
+            await asyncio.sleep(0.1)
+            return manager, cancelled, fired
+
+        manager, cancelled, fired = asyncio.run(scenario())
+
+        assert cancelled == ["parent", "child"]
+        assert fired == []
+        assert manager._timer_handles == {}
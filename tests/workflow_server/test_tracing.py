@@ -0,0 +1,144 @@
+"""Tests for span tracing.
+
+Covers the no-op path while disabled, span nesting and lazy payloads, the
+bounded ring buffer, JSONL and Chrome trace-event export, and the spans the
+executor records for workflows, steps and expressions.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from aromcp.workflow_server.monitoring.tracing import Tracer, get_tracer
+from aromcp.workflow_server.state.manager import StateManager
+from aromcp.workflow_server.workflow.models import WorkflowDefinition, WorkflowStep
+from aromcp.workflow_server.workflow.queue_executor import QueueBasedWorkflowExecutor
+
+
+@pytest.fixture
+def global_tracer():
+    tracer = get_tracer()
+    tracer.clear()
+    tracer.enable()
+    yield tracer
+    tracer.disable()
+    tracer.clear()
+
+
+class TestTracer:
+    """Test the tracer itself."""
+
+    def test_disabled_tracer_records_nothing(self):
+        """Spans are shared no-ops and payloads are never built."""
+        tracer = Tracer()
+        calls = []
+
+        with tracer.span("step", payload=lambda: calls.append(1) or {}) as span:
+            span.set(ignored=True)
+        tracer.event("event", payload=lambda: calls.append(1) or {})
+
+        assert tracer.span("other") is span
+        assert tracer.get_spans() == []
+        assert calls == []
+
+    def test_spans_nest_and_payloads_are_recorded(self):
+        """Child spans and events point at their enclosing span."""
+        tracer = Tracer(enabled=True)
+
+        with tracer.span("workflow", "workflow", workflow_id="wf") as outer:
+            with tracer.span("step", "step", payload=lambda: {"definition": {"a": 1}}):
+                tracer.event("note", value=3)
+            outer.set(steps=1)
+
+        event, step, workflow = tracer.get_spans()
+        assert workflow.parent_id is None
+        assert step.parent_id == workflow.span_id
+        assert event.parent_id == step.span_id
+        assert event.duration_ns is None
+        assert step.attributes == {"definition": {"a": 1}}
+        assert workflow.attributes == {"workflow_id": "wf", "steps": 1}
+        assert workflow.duration_ns >= step.duration_ns
+
+    def test_exceptions_are_recorded_and_propagate(self):
+        """A failing block still records its span with the error."""
+        tracer = Tracer(enabled=True)
+
+        with pytest.raises(ValueError), tracer.span("step"):
+            raise ValueError("boom")
+
+        assert tracer.get_spans()[0].attributes["error"] == "ValueError: boom"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_tasks_nest_independently(self):
+        """Spans opened in interleaved asyncio tasks keep their own parents."""
+        tracer = Tracer(enabled=True)
+
+        async def run(name: str):
+            with tracer.span(name, "workflow"):
+                await asyncio.sleep(0.01)
+                with tracer.span(f"{name}.child"):
+                    await asyncio.sleep(0.01)
+
+        await asyncio.gather(run("a"), run("b"))
+
+        spans = {span.name: span for span in tracer.get_spans()}
+        assert spans["a"].parent_id is None and spans["b"].parent_id is None
+        assert spans["a.child"].parent_id == spans["a"].span_id
+        assert spans["b.child"].parent_id == spans["b"].span_id
+
+    def test_ring_buffer_keeps_newest_spans(self):
+        """The buffer drops the oldest spans once full."""
+        tracer = Tracer(capacity=3, enabled=True)
+
+        for i in range(5):
+            tracer.event(f"event{i}")
+
+        assert [span.name for span in tracer.get_spans()] == ["event2", "event3", "event4"]
+
+    def test_exports(self, tmp_path):
+        """Spans export as JSON lines and as Chrome trace events."""
+        tracer = Tracer(enabled=True)
+        with tracer.span("step", "step", state={"x": object()}):
+            tracer.event("note")
+
+        assert tracer.export_jsonl(str(tmp_path / "trace.jsonl")) == 2
+        lines = (tmp_path / "trace.jsonl").read_text().splitlines()
+        assert [json.loads(line)["name"] for line in lines] == ["note", "step"]
+
+        assert tracer.export_chrome_trace(str(tmp_path / "trace.json")) == 2
+        events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+        assert [event["ph"] for event in events] == ["i", "X"]
+        assert events[1]["dur"] >= 0
+
+
+class TestExecutorTracing:
+    """Test spans recorded by the workflow executor."""
+
+    def test_workflow_step_and_expression_hierarchy(self, global_tracer):
+        """get_next_step spans contain step spans, which contain expression spans."""
+        steps = [
+            WorkflowStep(
+                id="check",
+                type="conditional",
+                definition={
+                    "condition": "{{ this.count > 1 }}",
+                    "then_steps": [{"id": "yes", "type": "user_message", "message": "big"}],
+                },
+            )
+        ]
+        definition = WorkflowDefinition(
+            name="test:trace", description="", version="1.0.0", default_state={"state": {"count": 2}}, steps=steps
+        )
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        workflow_id = executor.start(definition)["workflow_id"]
+
+        executor.get_next_step(workflow_id)
+
+        spans = {span.span_id: span for span in global_tracer.get_spans()}
+        workflow = next(span for span in spans.values() if span.category == "workflow")
+        conditional = next(span for span in spans.values() if span.name == "conditional")
+        expressions = [span for span in spans.values() if span.category == "expression"]
+        assert workflow.attributes["workflow_id"] == workflow_id
+        assert conditional.parent_id == workflow.span_id
+        assert any(span.parent_id == conditional.span_id for span in expressions)
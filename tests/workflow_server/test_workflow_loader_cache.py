@@ -0,0 +1,183 @@
+"""Tests for the compiled workflow cache in WorkflowLoader.
+
+Covers reusing parsed definitions while a file is unchanged, invalidating on
+mtime or size changes, the optional on-disk cache, and keeping shared
+definitions free of per-instance mutation.
+"""
+
+import os
+import sys
+
+import pytest
+
+from aromcp.workflow_server.state.manager import StateManager
+from aromcp.workflow_server.workflow.loader import CompiledWorkflow, WorkflowLoader
+from aromcp.workflow_server.workflow.models import WorkflowValidationError
+from aromcp.workflow_server.workflow.queue_executor import QueueBasedWorkflowExecutor
+
+# Modules this file's classes come from; other tests may purge and re-import the package
+_IMPORTED_MODULES = {name: module for name, module in sys.modules.items() if name.startswith("aromcp")}
+
+WORKFLOW = """
+name: "test:cached"
+description: "Cached workflow"
+version: "1.0.0"
+default_state:
+  inputs:
+    limit: 3
+  state:
+    counter: 0
+    items: []
+state_schema:
+  computed:
+    next_count:
+      from: "state.counter"
+      transform: "input + 1"
+inputs:
+  name:
+    type: string
+    description: "Name"
+    required: false
+steps:
+  - id: greet
+    type: user_message
+    message: "Hello {{ inputs.name }}"
+  - id: loop
+    type: foreach
+    items: "{{ this.items }}"
+    body:
+      - id: show
+        type: user_message
+        message: "{{ item }}"
+"""
+
+
+@pytest.fixture
+def workflow_file(tmp_path):
+    workflows_dir = tmp_path / ".aromcp" / "workflows"
+    workflows_dir.mkdir(parents=True)
+    path = workflows_dir / "test:cached.yaml"
+    path.write_text(WORKFLOW)
+    return path
+
+
+def _bump_mtime(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestInMemoryCache:
+    """Test reuse and invalidation of cached definitions."""
+
+    def test_repeat_loads_return_cached_definition(self, tmp_path, workflow_file):
+        """Loading an unchanged file again skips parsing and validation."""
+        loader = WorkflowLoader(project_root=str(tmp_path))
+
+        first = loader.load("test:cached")
+
+        assert loader.load("test:cached") is first
+        assert loader.get_cache_stats()["hits"] == 1
+        assert loader.get_cache_stats()["misses"] == 1
+
+    def test_compiled_entry_keeps_validator_analysis(self, tmp_path, workflow_file):
+        """The validator's reference extraction and step contexts are cached with the definition."""
+        compiled = WorkflowLoader(project_root=str(tmp_path)).load_compiled("test:cached")
+
+        assert isinstance(compiled, CompiledWorkflow)
+        assert compiled.definition.name == "test:cached"
+        assert compiled.step_contexts["has_foreach"] is True
+        assert compiled.step_contexts["has_while_loop"] is False
+        assert "state.counter" in compiled.referenced_variables
+
+    def test_modified_file_is_reloaded(self, tmp_path, workflow_file):
+        """A changed mtime or size invalidates the entry."""
+        loader = WorkflowLoader(project_root=str(tmp_path))
+        first = loader.load("test:cached")
+
+        _bump_mtime(workflow_file)
+        second = loader.load("test:cached")
+        workflow_file.write_text(WORKFLOW.replace("Cached workflow", "Changed workflow"))
+        third = loader.load("test:cached")
+
+        assert second is not first
+        assert third.description == "Changed workflow"
+
+    def test_invalid_file_is_not_cached(self, tmp_path, workflow_file):
+        """Validation errors are raised on every load rather than cached."""
+        workflow_file.write_text("name: broken\n")
+        loader = WorkflowLoader(project_root=str(tmp_path))
+
+        for _ in range(2):
+            with pytest.raises(WorkflowValidationError):
+                loader.load("test:cached")
+        assert loader.get_cache_stats()["entries"] == 0
+
+    def test_listing_shares_the_cache(self, tmp_path, workflow_file):
+        """Listing workflows populates the same cache used by load()."""
+        loader = WorkflowLoader(project_root=str(tmp_path))
+
+        workflows = loader.list_available_workflows(include_global=False)
+        loader.load("test:cached")
+
+        assert [workflow["name"] for workflow in workflows] == ["test:cached"]
+        assert loader.get_cache_stats()["hits"] == 1
+
+
+class TestDiskCache:
+    """Test the optional on-disk compiled cache."""
+
+    @pytest.fixture(autouse=True)
+    def _pin_imported_modules(self, monkeypatch):
+        # Pickle looks classes up through sys.modules and rejects copies from a re-import
+        for name, module in _IMPORTED_MODULES.items():
+            monkeypatch.setitem(sys.modules, name, module)
+
+    def test_new_loader_reads_compiled_entry_from_disk(self, tmp_path, workflow_file):
+        """A fresh loader with the same cache directory skips parsing."""
+        cache_dir = tmp_path / "cache"
+        WorkflowLoader(project_root=str(tmp_path), cache_dir=str(cache_dir)).load("test:cached")
+
+        loader = WorkflowLoader(project_root=str(tmp_path), cache_dir=str(cache_dir))
+        loader._compile_file = None  # Any parse would fail loudly
+        definition = loader.load("test:cached")
+
+        assert definition.name == "test:cached"
+        assert definition.steps[0].get_template_plan() is not None
+        assert loader.get_cache_stats()["disk_hits"] == 1
+
+    def test_stale_disk_entries_are_replaced(self, tmp_path, workflow_file):
+        """Only the entry for the current file version is kept on disk."""
+        cache_dir = tmp_path / "cache"
+        loader = WorkflowLoader(project_root=str(tmp_path), cache_dir=str(cache_dir))
+        loader.load("test:cached")
+
+        _bump_mtime(workflow_file)
+        loader.load("test:cached")
+
+        assert len(list(cache_dir.glob("*.pickle"))) == 1
+
+    def test_corrupt_disk_entry_is_ignored(self, tmp_path, workflow_file):
+        """An unreadable cache file falls back to parsing the workflow."""
+        cache_dir = tmp_path / "cache"
+        WorkflowLoader(project_root=str(tmp_path), cache_dir=str(cache_dir)).load("test:cached")
+        for entry in cache_dir.glob("*.pickle"):
+            entry.write_bytes(b"not a pickle")
+
+        definition = WorkflowLoader(project_root=str(tmp_path), cache_dir=str(cache_dir)).load("test:cached")
+
+        assert definition.name == "test:cached"
+
+
+class TestSharedDefinitions:
+    """Test that starting workflows leaves cached definitions untouched."""
+
+    def test_start_does_not_mutate_default_state(self, tmp_path, workflow_file):
+        """Inputs from one start never leak into the shared default state."""
+        loader = WorkflowLoader(project_root=str(tmp_path))
+        executor = QueueBasedWorkflowExecutor(StateManager())
+
+        executor.start(loader.load("test:cached"), inputs={"name": "ada"})
+        executor.start(loader.load("test:cached"))
+
+        default_state = loader.load("test:cached").default_state
+        assert default_state == {"inputs": {"limit": 3}, "state": {"counter": 0, "items": []}}
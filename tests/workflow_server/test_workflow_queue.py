@@ -0,0 +1,63 @@
+"""Tests for the deque-backed WorkflowQueue.
+
+Covers ordering of pops and prepends, in-place mutation used by break and
+continue handling, and the queue scaling benchmark.
+"""
+
+from collections import deque
+
+from aromcp.workflow_server.testing.benchmarks import ScalabilityBenchmark
+from aromcp.workflow_server.workflow.models import WorkflowStep
+from aromcp.workflow_server.workflow.queue import WorkflowQueue
+
+
+def _steps(*ids: str) -> list[WorkflowStep]:
+    return [WorkflowStep(id=step_id, type="user_message", definition={"message": step_id}) for step_id in ids]
+
+
+class TestWorkflowQueue:
+    """Test queue operations."""
+
+    def test_prepend_keeps_order(self):
+        """Prepended steps run before the existing queue in their given order."""
+        queue = WorkflowQueue("wf", _steps("c", "d"))
+
+        queue.prepend_steps(_steps("a", "b"))
+
+        assert [queue.pop_next().id for _ in range(4)] == ["a", "b", "c", "d"]
+        assert queue.pop_next() is None
+        assert not queue.has_steps()
+
+    def test_initial_steps_are_not_shared(self):
+        """Popping from the queue leaves the workflow definition's step list intact."""
+        steps = _steps("a", "b")
+        queue = WorkflowQueue("wf", steps)
+
+        queue.pop_next()
+
+        assert isinstance(queue.main_queue, deque)
+        assert [step.id for step in steps] == ["a", "b"]
+
+    def test_peek_and_index_access(self):
+        """Peeking and front indexing see the next step without removing it."""
+        queue = WorkflowQueue("wf", _steps("a", "b"))
+
+        assert queue.peek_next().id == "a"
+        assert queue.main_queue[0].id == "a"
+        assert len(queue.main_queue) == 2
+
+
+class TestQueueScalingBenchmark:
+    """Test the queue scaling benchmark."""
+
+    def test_reports_both_implementations(self):
+        """Deque and list queues perform the same operations for every size."""
+        result = ScalabilityBenchmark().benchmark_queue_scaling(queue_sizes=[10, 100], loop_iterations=2)
+
+        deque_results = result["queue_scaling"]["deque"]
+        list_results = result["queue_scaling"]["list"]
+        assert [r["queue_size"] for r in deque_results] == [10, 100]
+        assert [r["operations"] for r in deque_results] == [r["operations"] for r in list_results]
+        # Two nested loops of five steps each, two iterations per loop, plus the trailing steps
+        assert deque_results[0]["operations"] == 1 + 2 * (5 + 1 + 2 * 6 + 1) + 10
+        assert set(result["speedup"]) == {10, 100}
@@ -0,0 +1,150 @@
+"""Tests for finished-workflow retention and memory reclamation.
+
+Covers evicting finished workflows by count and age, freeing every
+per-workflow structure, archiving summaries in memory or through the
+persistence backend, and the executor memory metrics.
+"""
+
+from aromcp.workflow_server.persistence import SQLiteBackend
+from aromcp.workflow_server.state.manager import StateManager
+from aromcp.workflow_server.workflow.context import context_manager
+from aromcp.workflow_server.workflow.models import RetentionPolicy, WorkflowDefinition, WorkflowStep
+from aromcp.workflow_server.workflow.queue_executor import QueueBasedWorkflowExecutor
+
+
+def _definition() -> WorkflowDefinition:
+    return WorkflowDefinition(
+        name="test:retention",
+        default_state={"state": {"payload": "x" * 1000}},
+        steps=[WorkflowStep(id="say", type="user_message", definition={"message": "Hello"})],
+    )
+
+
+def _run(executor: QueueBasedWorkflowExecutor) -> str:
+    workflow_id = executor.start(_definition())["workflow_id"]
+    while executor.get_next_step(workflow_id) is not None:
+        pass
+    return workflow_id
+
+
+def _assert_freed(executor: QueueBasedWorkflowExecutor, workflow_id: str) -> None:
+    assert workflow_id not in executor.workflows
+    assert workflow_id not in executor.queues
+    assert workflow_id not in executor._workflow_locks
+    assert workflow_id not in executor._advance_locks
+    assert workflow_id not in executor.state_manager._states
+    assert workflow_id not in executor.state_manager._workflow_statuses
+    assert workflow_id not in context_manager.contexts
+
+
+class TestRetentionPolicy:
+    """Test automatic and explicit eviction of finished workflows."""
+
+    def test_max_completed_evicts_oldest_on_start(self):
+        """Starting a workflow evicts the oldest finished ones beyond the limit."""
+        executor = QueueBasedWorkflowExecutor(StateManager(), retention=RetentionPolicy(max_completed=2))
+        finished = [_run(executor) for _ in range(3)]
+
+        running = executor.start(_definition())["workflow_id"]
+
+        _assert_freed(executor, finished[0])
+        assert set(executor.workflows) == {finished[1], finished[2], running}
+        assert executor.get_workflow_status(finished[0]) == {
+            "workflow_id": finished[0],
+            "workflow_name": "test:retention",
+            "status": "completed",
+            "created_at": executor.archived[finished[0]]["created_at"],
+            "completed_at": executor.archived[finished[0]]["completed_at"],
+            "error_message": None,
+            "archived": True,
+        }
+
+    def test_ttl_evicts_only_finished_workflows(self):
+        """Running workflows are never evicted, however old."""
+        executor = QueueBasedWorkflowExecutor(StateManager(), retention=RetentionPolicy(ttl_seconds=0))
+        finished = _run(executor)
+        running = executor.start(_definition())["workflow_id"]
+
+        result = executor.compact_workflows()
+
+        assert result == {"evicted": [], "resident": 1}
+        _assert_freed(executor, finished)
+        assert executor.get_workflow_status(running)["status"] == "running"
+        assert executor.evict_workflow(running) is False
+
+    def test_without_limits_nothing_is_evicted(self):
+        """The default policy keeps finished workflows until evicted explicitly."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        finished = _run(executor)
+
+        assert executor.compact_workflows()["evicted"] == []
+        assert executor.evict_workflow(finished)
+        _assert_freed(executor, finished)
+
+    def test_archive_is_bounded(self):
+        """Only max_archived summaries are kept without a persistence backend."""
+        retention = RetentionPolicy(max_completed=0, max_archived=2)
+        executor = QueueBasedWorkflowExecutor(StateManager(), retention=retention)
+        finished = [_run(executor) for _ in range(4)]
+
+        executor.compact_workflows()
+
+        assert list(executor.archived) == finished[2:]
+        assert "error" in executor.get_workflow_status(finished[0])
+
+    def test_sub_agent_tasks_are_removed(self):
+        """Sub-agent contexts, queues and locks of the workflow are dropped."""
+        executor = QueueBasedWorkflowExecutor(StateManager())
+        finished = _run(executor)
+        other = executor.start(_definition())["workflow_id"]
+        for workflow_id in (finished, other):
+            executor.subagent_manager.sub_agent_contexts[f"{workflow_id}.task"] = {"workflow_id": workflow_id}
+            executor.subagent_manager.task_lock(f"{workflow_id}.task")
+
+        executor.evict_workflow(finished)
+
+        assert list(executor.subagent_manager.sub_agent_contexts) == [f"{other}.task"]
+        assert list(executor.subagent_manager._task_locks) == [f"{other}.task"]
+
+
+class TestPersistentArchive:
+    """Test archiving through the persistence backend."""
+
+    def test_evicted_workflow_is_read_from_backend(self):
+        """With persistence, summaries come from the backend instead of memory."""
+        backend = SQLiteBackend(":memory:")
+        try:
+            executor = QueueBasedWorkflowExecutor(
+                StateManager(), persistence=backend, retention=RetentionPolicy(max_completed=0)
+            )
+            finished = _run(executor)
+
+            executor.compact_workflows()
+            status = executor.get_workflow_status(finished)
+
+            assert executor.archived == {}
+            assert status["status"] == "completed"
+            assert status["archived"] is True
+            assert backend.load_state(finished) is not None
+        finally:
+            backend.close()
+
+
+class TestMemoryStats:
+    """Test executor memory metrics."""
+
+    def test_registries_track_resident_workflows(self):
+        """Per-workflow registries shrink back to the resident workflows after eviction."""
+        executor = QueueBasedWorkflowExecutor(StateManager(), retention=RetentionPolicy(max_completed=1))
+        for _ in range(5):
+            _run(executor)
+        executor.compact_workflows()
+
+        stats = executor.get_memory_stats()
+
+        assert stats["resident_workflows"] == 1
+        assert stats["evicted_workflows"] == 4
+        assert stats["state_bytes_per_workflow"] > 1000
+        registries = stats["registries"]
+        assert registries["queues"] == registries["workflow_locks"] == registries["states"] == 1
+        assert stats["workflows"][0]["queued_steps"] == 0